@@ -5,6 +5,9 @@ LOG_LEVEL                               = "INFO"    # Options: DEBUG, INFO, WARN
 DB_NAME                                 = "../data/table_tennis.db"
 PUBLIC_DB_NAME                          = "../data/pingiskollen_public.db"
 PDF_CACHE_DIR                           = "data/pdfs"
+PDF_SESSION_CACHE_CLASSES               = 16        # Classes whose parsed stage PDFs (words/text) are kept between passes, see pdf_session.py
+PDF_BACKEND                             = "pdfplumber"  # "pdfplumber" or "pdfium" (pypdfium2, faster), see pdf_backend.py
+PARSER_GOLDENS_DIR                      = "data/parser_goldens"  # Parsed output of the cached PDFs, see utils_scripts/check_parser_goldens.py
 
 SCRAPE_LICENSES_MAX_CLUBS               = 0         # How many clubs to iterate, 0 for all clubs
 SCRAPE_LICENSES_NBR_OF_SEASONS          = 1         # Amount of seasons to iterate for each club, always starting with the oldest, 0 for all seasons
@@ -16,6 +19,12 @@ SCRAPE_RANKINGS_ORDER                   = "newest"  # Order of ranking runs to s
 SCRAPE_TRANSITIONS_NBR_OF_SEASONS       = 1         # Amount of seasons to iterate for each club, always starting with the oldest, 0 for all seasons
 SCRAPE_TRANSITIONS_ORDER                = "newest"  # Order of seasons to scrape, "oldest" or "newest"
 
+# Headless Chrome shared by the Profixio scrapers (licenses, rankings, transitions), see utils.DriverPool
+WEBDRIVER_POOL_SIZE                     = 1         # Warm browsers kept between scrapers
+WEBDRIVER_MAX_PAGES                     = 200       # Recycle a browser once it has loaded this many pages
+WEBDRIVER_PATH_CACHE                    = "../data/chromedriver_path.txt"   # Resolved chromedriver binary
+WEBDRIVER_PATH_CACHE_DAYS               = 7         # Re-resolve (webdriver_manager) after N days
+
 # Profixio leagues
 SCRAPE_LEAGUES_SEASON_IDS               = None      # List like ['768'] to force specific seasons (None = auto/current)
 SCRAPE_LEAGUES_ONLY_CURRENT             = False     # When True, only scrape the current season (starred in nav)
@@ -52,6 +61,17 @@ RESOLVE_ENTRIES_CLASS_ID_EXTS           = None                   # List (TEXT) [
 
 RESOLVE_MATCHES_CUTOFF_DATE             = '2000-06-01'          # Date format: YYYY-MM-DD, None for all
 
+RESOLVE_CLASS_WORKERS                   = 1                     # Worker processes planning classes in parallel (entries/matches resolvers), 1 = in-process
+RESOLVE_PLAYERS_FULL                    = False                 # Player resolvers: True = resolve all raw rows, False = only rows changed since their last run (raw_change_log)
+RESOLVE_RANKINGS_MODE                   = "sql"                 # Player rankings: "sql" = set-based INSERT ... SELECT (rejects in player_ranking_reject), "rows" = per-row validate/upsert with per-row logging
+
+# Sampling profiler (see profiler.py). Stages are function names like 'upd_tournament_data' or
+# 'resolve_tournament_class_entries', or a logger's 'run_type:object_type' like 'scrape:tournament_entry'
+PROFILE_STAGES                          = None                  # List ['upd_tournament_data', 'resolve_tournament_class_entries'], None for off
+PROFILE_INTERVAL_MS                     = 5                     # Sampling interval in milliseconds
+PROFILE_TOP_N                           = 15                    # Hotspots listed in the run summary
+PROFILE_DIR                             = "profiles"            # Profiles are saved under <dir>/<run_id>/, next to run_log.xlsx
+
 # Placeholder wiring used by the match resolver when a Vacant/WO side needs a
 # real participant record. Keep these IDs in sync with the seed data in the DB.
 PLACEHOLDER_PLAYER_ID                   = 99999
@@ -35,6 +35,26 @@ def get_conn():
         raise
 
 
+def get_readonly_conn(db_name: str = DB_NAME):
+    """Read-only connection (same type parsing as get_conn), e.g. for worker processes that only plan work."""
+
+    try:
+        _register_sqlite_date_time_adapters()
+
+        conn = sqlite3.connect(
+            f"file:{db_name}?mode=ro",
+            uri=True,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+        )
+        conn.execute("PRAGMA temp_store = MEMORY;")
+
+        return conn, conn.cursor()
+
+    except sqlite3.Error as e:
+        print(f"❌ Read-only database connection failed: {e}")
+        raise
+
+
 def compact_sqlite():
     print("ℹ️  Compacting SQLite database...")
     try:
@@ -463,6 +483,19 @@ def create_tables(cursor):
             )
         ''')
 
+        # Group structure refined from the stage 3/4 PDFs, with the inputs it was derived from (see resolve_tournament_classes.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tournament_class_structure_cache (
+                tournament_class_id_ext                     TEXT        NOT NULL,
+                data_source_id                              INTEGER     NOT NULL,
+                raw_hash                                    TEXT        NOT NULL,   -- raw_stages + raw_stage_hrefs (+ refinement version)
+                pdf_hash                                    TEXT        NOT NULL,   -- stage:sha256 of the stage 3/4 PDFs the refinement read
+                tournament_class_structure_id               INTEGER     NOT NULL,
+                row_updated                                 TIMESTAMP   DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (tournament_class_id_ext, data_source_id)
+            ) WITHOUT ROWID
+        ''')
+
         # Tournament entries (singles or doubles)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS tournament_class_entry (
@@ -704,6 +737,33 @@ def create_tables(cursor):
             );
         ''')
 
+        # Player merge log (one row per merged-away player, see upd_players_verified.merge_players)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS player_merge_log (
+                merge_id                            INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id                            INTEGER NOT NULL,
+                run_id                              TEXT,
+                old_player_id                       INTEGER NOT NULL,
+                new_player_id                       INTEGER NOT NULL,
+                player_row                          TEXT,       -- JSON of the deleted old player row, NULL if kept
+                row_created                         TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                undone_at                           TIMESTAMP
+            );
+        ''')
+
+        # Dependent rows touched by a merge: repointed (by rowid) or deleted on unique-key collision (JSON)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS player_merge_log_row (
+                merge_id                            INTEGER NOT NULL,
+                table_name                          TEXT NOT NULL,
+                row_id                              INTEGER NOT NULL,
+                action                              TEXT NOT NULL,
+                row_data                            TEXT,
+                FOREIGN KEY (merge_id)              REFERENCES player_merge_log(merge_id)               ON DELETE CASCADE,
+                CHECK (action IN ('repointed', 'deleted'))
+            );
+        ''')
+
         ###########################################
         ### PLAYER LICENSES
         ###########################################
@@ -788,6 +848,175 @@ def create_tables(cursor):
             )
         ''')
 
+        # player_ranking_raw rows the set-based ranking resolver could not resolve (see PlayerRanking.resolve_from_raw)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS player_ranking_reject (
+                raw_row_id                      INTEGER PRIMARY KEY,
+                run_id_ext                      TEXT,
+                run_date                        DATE,
+                player_id_ext                   TEXT,
+                reason                          TEXT NOT NULL,          -- missing_fields | no_player_mapping
+                row_created                     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Ranking history packed per player_id_ext (see models/player_ranking_history.py), refreshed by resolve_player_rankings
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS player_ranking_history (
+                player_id_ext                   TEXT NOT NULL,
+                data_source_id                  INTEGER NOT NULL,
+                run_count                       INTEGER NOT NULL,
+                first_run_date                  DATE NOT NULL,
+                last_run_date                   DATE NOT NULL,
+                last_points                     INTEGER NOT NULL,
+                last_change_date                DATE,                   -- Last run with points_change_since_last <> 0
+                run_dates                       BLOB NOT NULL,          -- Delta-encoded day ordinals (int32 LE)
+                points                          BLOB NOT NULL,          -- Delta-encoded points (int32 LE)
+                row_updated                     TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (player_id_ext, data_source_id)
+            ) WITHOUT ROWID
+        ''')
+
+        ###########################################
+        ### PLAYER CACHES (materialized views)
+        ###########################################
+
+        # Materialized v_plyr_profile, one row per player (see upd_player_caches.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS plyr_profile_cache (
+                player_id                       INTEGER PRIMARY KEY,
+                player_name                     TEXT,
+                year_born                       INTEGER,
+                is_verified                     BOOLEAN,
+                id_exts                         TEXT,
+                id_ext_count                    INTEGER,
+                recent_club                     TEXT,
+                recent_tournament_class         TEXT,
+                ranking_groups                  TEXT,
+                ranking_points                  TEXT,
+                recent_transition               TEXT,
+                row_updated                     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Materialized v_plyr_match_history, one row per (player, match)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS plyr_match_history_cache (
+                player_id                       INTEGER NOT NULL,
+                match_id                        INTEGER NOT NULL,
+                player_side_no                  INTEGER,
+                tournament_id                   INTEGER,
+                tournament_shortname            TEXT,
+                tournament_startdate            DATE,
+                tournament_class_id             INTEGER,
+                class_longname                  TEXT,
+                class_date                      DATE,
+                stage_description               TEXT,
+                result                          TEXT,
+                opponent_name                   TEXT,
+                opponent_player_id              INTEGER,
+                opponent_club                   TEXT,
+                player_club                     TEXT,
+                best_of                         INTEGER,
+                match_date                      DATE,
+                match_status                    TEXT,
+                winner_side                     INTEGER,
+                walkover_side                   INTEGER,
+                games_score                     TEXT,
+                games_won_side1                 INTEGER,
+                games_won_side2                 INTEGER,
+                match_score_summary             TEXT,
+                row_updated                     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Head-to-head per ordered player pair (player_id_a < player_id_b), completed non-walkover matches
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS player_h2h (
+                player_id_a                     INTEGER NOT NULL,
+                player_id_b                     INTEGER NOT NULL,
+                matches                         INTEGER NOT NULL,
+                wins_a                          INTEGER NOT NULL,
+                wins_b                          INTEGER NOT NULL,
+                sets_a                          INTEGER NOT NULL,
+                sets_b                          INTEGER NOT NULL,
+                last_match_id                   INTEGER,
+                last_match_date                 DATE,
+                match_ids                       TEXT,       -- comma-separated, newest first
+                row_updated                     TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (player_id_a, player_id_b)
+            )
+        ''')
+
+        ###########################################
+        ### PLAYER RATINGS (Glicko-2, see upd_player_ratings.py)
+        ###########################################
+
+        # Current rating state per player (full precision, used to resume incremental runs)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS player_rating (
+                player_id                       INTEGER PRIMARY KEY,
+                rating                          REAL NOT NULL,
+                rd                              REAL NOT NULL,
+                volatility                      REAL NOT NULL,
+                matches                         INTEGER NOT NULL,
+                last_date                       DATE,
+                row_updated                     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Rating after each day a player played (one row per player and date)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS player_rating_history (
+                player_id                       INTEGER NOT NULL,
+                date                            DATE NOT NULL,
+                rating                          REAL NOT NULL,
+                rd                              REAL NOT NULL,
+                PRIMARY KEY (player_id, date)
+            ) WITHOUT ROWID
+        ''')
+
+        # Single-row watermark: last rated date and a fingerprint of the matches rated up to it
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS player_rating_watermark (
+                id                              INTEGER PRIMARY KEY CHECK (id = 1),
+                last_date                       DATE NOT NULL,
+                match_count                     INTEGER NOT NULL,
+                checksum                        TEXT NOT NULL,
+                row_updated                     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Players whose cached rows are stale, filled by triggers (see create_triggers)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS plyr_cache_dirty (
+                player_id                       INTEGER PRIMARY KEY,
+                row_created                     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Changed player_*_raw rows, appended by triggers (see create_triggers) and consumed by the
+        # player resolvers from their watermark onwards (see models/raw_change_log.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS raw_change_log (
+                change_id                       INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name                      TEXT NOT NULL,
+                row_id                          INTEGER NOT NULL,
+                op                              TEXT NOT NULL,          -- I = inserted, U = content changed, T = seen again unchanged (last_seen_at)
+                row_created                     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Last raw_change_log entry each consumer (resolver) has processed
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS raw_change_watermark (
+                consumer                        TEXT PRIMARY KEY,
+                table_name                      TEXT NOT NULL,
+                last_change_id                  INTEGER NOT NULL,
+                row_updated                     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
         ##########################################
         ### LEAGUES
         ##########################################
@@ -1340,6 +1569,22 @@ def create_and_populate_static_tables(cursor, logger):
             );
         ''')
 
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS log_spans (
+                id                      INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id                  TEXT NOT NULL,
+                span_id                 TEXT NOT NULL,
+                parent_span_id          TEXT,                   -- NULL for the stage span (one per OperationLogger)
+                name                    TEXT NOT NULL,          -- e.g. 'scrape:tournament_entry', 'class', 'download', 'parse'
+                object_type             TEXT,                   -- Same as parent run
+                process_type            TEXT,                   -- Same as parent run
+                context_json            TEXT,
+                started_at              REAL NOT NULL,          -- Unix epoch seconds
+                duration_ms             REAL NOT NULL,
+                pid                     INTEGER                 -- Process that did the work (parallel planners)
+            );
+        ''')
+
         # Create table for documenting club names with prefixes
         # Not implemented anywhere right now I think
         cursor.execute('''
@@ -1399,12 +1644,25 @@ def create_indexes(cursor):
         # Enforce uniqueness per class/group
         "CREATE UNIQUE INDEX IF NOT EXISTS uq_tcg_class_group ON tournament_class_group (tournament_class_id, tournament_class_group_id)",
 
+        # -------------------------------
+        # Player
+        # -------------------------------
+        # Name + year search (Player.search_by_name_and_year_batch)
+        "CREATE INDEX IF NOT EXISTS idx_player_name_year ON player(lastname, firstname, year_born)",
+        "CREATE INDEX IF NOT EXISTS idx_player_year_born ON player(year_born)",
+
         # -------------------------------
         # Player ID Ext
         # -------------------------------
         # Joins player → player_id_ext
         "CREATE INDEX IF NOT EXISTS idx_player_id_ext_player_id ON player_id_ext(player_id)",
 
+        # -------------------------------
+        # Player Merge Log
+        # -------------------------------
+        "CREATE INDEX IF NOT EXISTS idx_player_merge_log_batch ON player_merge_log(batch_id)",
+        "CREATE INDEX IF NOT EXISTS idx_player_merge_log_row_merge ON player_merge_log_row(merge_id, table_name)",
+
         # -------------------------------
         # Player License
         # -------------------------------
@@ -1432,6 +1690,34 @@ def create_indexes(cursor):
         "CREATE INDEX IF NOT EXISTS idx_player_ranking_player_date ON player_ranking(player_id_ext, run_date DESC)",
         # Efficient queries when pulling entire ranking snapshot by date
         "CREATE INDEX IF NOT EXISTS idx_player_ranking_date ON player_ranking(run_date)",
+        # Run dates of the raw rankings not resolved yet (set-based ranking resolver)
+        "CREATE INDEX IF NOT EXISTS idx_player_ranking_raw_date ON player_ranking_raw(run_date)",
+
+        # -------------------------------
+        # Match Player
+        # -------------------------------
+        # Player match history lookup (all matches for a player)
+        "CREATE INDEX IF NOT EXISTS idx_match_player_player ON match_player(player_id)",
+
+        # -------------------------------
+        # Player caches
+        # -------------------------------
+        # Point reads of a player's match history
+        "CREATE INDEX IF NOT EXISTS idx_pmhc_player ON plyr_match_history_cache(player_id, match_id)",
+        # Opponent side of head-to-head pairs
+        "CREATE INDEX IF NOT EXISTS idx_player_h2h_b ON player_h2h(player_id_b)",
+
+        # -------------------------------
+        # Raw change log
+        # -------------------------------
+        # A consumer's pending changes of one raw table
+        "CREATE INDEX IF NOT EXISTS idx_raw_change_log_table ON raw_change_log(table_name, change_id)",
+
+        # -------------------------------
+        # Debug tables
+        # -------------------------------
+        # Span export per run
+        "CREATE INDEX IF NOT EXISTS idx_log_spans_run ON log_spans(run_id)",
     ]
 
     try:
@@ -1449,8 +1735,102 @@ def create_triggers(cursor):
     # Always enforce FK constraints
     cursor.execute("PRAGMA foreign_keys = ON;")
 
-    triggers = [
+    # Mark players whose plyr_*_cache rows must be refreshed (consumed by upd_player_caches.py).
+    # UPDATE triggers carry a WHEN clause so no-op upserts (DO UPDATE ... ELSE old value) don't
+    # mark every player on each run. ON CONFLICT DO NOTHING rather than INSERT OR IGNORE: an
+    # outer upsert's DO UPDATE overrides the OR IGNORE of statements in the triggers it fires.
+    def _mark_dirty(name, event, table, player_sql, when=None, timing="AFTER"):
+        when_sql = f"WHEN {when}" if when else ""
+        return (
+            name,
+            f'''
+            CREATE TRIGGER {name} {timing} {event} ON {table} {when_sql}
+            BEGIN
+                INSERT INTO plyr_cache_dirty (player_id) SELECT * FROM ({player_sql}) WHERE true
+                ON CONFLICT (player_id) DO NOTHING;
+            END;
+            '''
+        )
+
+    def _changed(*cols):
+        return " OR ".join(f"NEW.{c} IS NOT OLD.{c}" for c in cols)
+
+    # Log changed player_*_raw rows for the player resolvers (see models/raw_change_log.py). Upserts
+    # only touch last_seen_at when the content hash is unchanged; that is logged as 'T' for the
+    # license rows only, where the latest seen row decides the ranking groups.
+    def _log_change(name, event, table, op, when=None):
+        when_sql = f"WHEN {when}" if when else ""
+        return (
+            name,
+            f'''
+            CREATE TRIGGER {name} AFTER {event} ON {table} {when_sql}
+            BEGIN
+                INSERT INTO raw_change_log (table_name, row_id, op) VALUES ('{table}', NEW.row_id, '{op}');
+            END;
+            '''
+        )
+
+    match_players_new = "SELECT player_id FROM match_player WHERE match_id = NEW.match_id"
+    match_players_old = "SELECT player_id FROM match_player WHERE match_id = OLD.match_id"
+    ranking_player_new = (
+        "SELECT player_id FROM player_id_ext "
+        "WHERE player_id_ext = NEW.player_id_ext AND data_source_id = NEW.data_source_id"
+    )
+    old_and_new = "VALUES (OLD.player_id), (NEW.player_id)"
+    # Opponent columns live on the other players' rows, so match_player/player changes mark the whole match
+    match_players_mp_new = "SELECT player_id FROM match_player WHERE match_id = NEW.match_id UNION SELECT OLD.player_id"
+    match_players_mp_old = "SELECT player_id FROM match_player WHERE match_id = OLD.match_id UNION SELECT OLD.player_id"
+    player_and_opponents = (
+        "SELECT mp2.player_id FROM match_player mp1 "
+        "JOIN match_player mp2 ON mp2.match_id = mp1.match_id "
+        "WHERE mp1.player_id = NEW.player_id UNION SELECT NEW.player_id"
+    )
 
+    triggers = [
+        # Match history
+        _mark_dirty("trg_dirty_match_player_ins",   "INSERT",   "match_player",             match_players_new),
+        _mark_dirty("trg_dirty_match_player_del",   "DELETE",   "match_player",             match_players_mp_old),
+        _mark_dirty("trg_dirty_match_player_upd",   "UPDATE",   "match_player",             match_players_mp_new, _changed("player_id", "side_no", "club_id", "player_order")),
+        _mark_dirty("trg_dirty_match_upd",          "UPDATE",   "match",                    match_players_new,  _changed("best_of", "date", "status", "winner_side", "walkover_side")),
+        # BEFORE: the match_player rows are gone once the delete has cascaded
+        _mark_dirty("trg_dirty_match_del",          "DELETE",   "match",                    match_players_old,  timing="BEFORE"),
+        _mark_dirty("trg_dirty_game_ins",           "INSERT",   "game",                     match_players_new),
+        _mark_dirty("trg_dirty_game_del",           "DELETE",   "game",                     match_players_old),
+        _mark_dirty("trg_dirty_game_upd",           "UPDATE",   "game",                     match_players_new,  _changed("points_side1", "points_side2")),
+        _mark_dirty("trg_dirty_tcm_ins",            "INSERT",   "tournament_class_match",   match_players_new),
+        _mark_dirty("trg_dirty_tcm_del",            "DELETE",   "tournament_class_match",   match_players_old),
+        _mark_dirty("trg_dirty_tcm_upd",            "UPDATE",   "tournament_class_match",   match_players_new,  _changed("tournament_class_id", "tournament_class_stage_id")),
+
+        # Profile
+        _mark_dirty("trg_dirty_player_upd",         "UPDATE",   "player",                   player_and_opponents, _changed("firstname", "lastname", "fullname_raw", "year_born", "is_verified")),
+        _mark_dirty("trg_dirty_player_del",         "DELETE",   "player",                   "VALUES (OLD.player_id)"),
+        _mark_dirty("trg_dirty_player_id_ext_ins",  "INSERT",   "player_id_ext",            "VALUES (NEW.player_id)"),
+        _mark_dirty("trg_dirty_player_id_ext_del",  "DELETE",   "player_id_ext",            "VALUES (OLD.player_id)"),
+        _mark_dirty("trg_dirty_player_id_ext_upd",  "UPDATE",   "player_id_ext",            old_and_new,        _changed("player_id", "player_id_ext")),
+        _mark_dirty("trg_dirty_license_ins",        "INSERT",   "player_license",           "VALUES (NEW.player_id)"),
+        _mark_dirty("trg_dirty_license_del",        "DELETE",   "player_license",           "VALUES (OLD.player_id)"),
+        _mark_dirty("trg_dirty_license_upd",        "UPDATE",   "player_license",           old_and_new,        _changed("player_id", "club_id", "season_id")),
+        _mark_dirty("trg_dirty_tcp_ins",            "INSERT",   "tournament_class_player",  "VALUES (NEW.player_id)"),
+        _mark_dirty("trg_dirty_tcp_del",            "DELETE",   "tournament_class_player",  "VALUES (OLD.player_id)"),
+        _mark_dirty("trg_dirty_tcp_upd",            "UPDATE",   "tournament_class_player",  old_and_new,        _changed("player_id", "tournament_class_entry_id")),
+        _mark_dirty("trg_dirty_transition_ins",     "INSERT",   "player_transition",        "VALUES (NEW.player_id)"),
+        _mark_dirty("trg_dirty_transition_del",     "DELETE",   "player_transition",        "VALUES (OLD.player_id)"),
+        _mark_dirty("trg_dirty_transition_upd",     "UPDATE",   "player_transition",        old_and_new,        _changed("player_id", "club_id_from", "club_id_to", "season_id")),
+        _mark_dirty("trg_dirty_prg_ins",            "INSERT",   "player_ranking_group",     "VALUES (NEW.player_id)"),
+        _mark_dirty("trg_dirty_prg_del",            "DELETE",   "player_ranking_group",     "VALUES (OLD.player_id)"),
+        _mark_dirty("trg_dirty_prg_upd",            "UPDATE",   "player_ranking_group",     old_and_new,        _changed("player_id", "ranking_group_id")),
+        _mark_dirty("trg_dirty_ranking_ins",        "INSERT",   "player_ranking",           ranking_player_new),
+        _mark_dirty("trg_dirty_ranking_upd",        "UPDATE",   "player_ranking",           ranking_player_new, _changed("points", "run_date")),
+
+        # Raw change log
+        _log_change("trg_raw_license_ins",          "INSERT",   "player_license_raw",       "I"),
+        _log_change("trg_raw_license_upd",          "UPDATE",   "player_license_raw",       "U", _changed("content_hash")),
+        _log_change("trg_raw_license_seen",         "UPDATE OF last_seen_at", "player_license_raw", "T",
+                    "NEW.content_hash IS OLD.content_hash AND NEW.last_seen_at IS NOT OLD.last_seen_at"),
+        _log_change("trg_raw_ranking_ins",          "INSERT",   "player_ranking_raw",       "I"),
+        _log_change("trg_raw_ranking_upd",          "UPDATE",   "player_ranking_raw",       "U", _changed("content_hash")),
+        _log_change("trg_raw_transition_ins",       "INSERT",   "player_transition_raw",    "I"),
+        _log_change("trg_raw_transition_upd",       "UPDATE",   "player_transition_raw",    "U", _changed("content_hash")),
     ]
 
     try:
@@ -1593,108 +1973,20 @@ def create_views(cursor):
         "v_plyr_profile",
         '''
         CREATE VIEW IF NOT EXISTS v_plyr_profile AS
-        WITH recent_license AS (
-            SELECT pl.player_id,
-                c.club_id,
-                c.shortname || ' (' || s.label || ')' AS club_with_season,
-                pl.season_id,
-                ROW_NUMBER() OVER (PARTITION BY pl.player_id ORDER BY s.start_date DESC) AS rn
-            FROM player_license pl
-            JOIN season s ON pl.season_id = s.season_id
-            JOIN club c ON pl.club_id = c.club_id
-        ),
-        recent_tournament AS (
-            SELECT tcp.player_id,
-                t.tournament_id,
-                t.shortname AS tournament_name,
-                tc.shortname AS class_shortname,
-                tc.startdate AS class_startdate,
-                ROW_NUMBER() OVER (PARTITION BY tcp.player_id ORDER BY tc.startdate DESC) AS rn
-            FROM tournament_class_player tcp
-            JOIN tournament_class_entry tce
-                ON tcp.tournament_class_entry_id = tce.tournament_class_entry_id
-            JOIN tournament_class tc
-                ON tce.tournament_class_id = tc.tournament_class_id
-            JOIN tournament t
-                ON tc.tournament_id = t.tournament_id
-        ),
-        recent_transition AS (
-            SELECT pt.player_id,
-                cf.shortname || ' → ' || ct.shortname || ' (' || s.label || ')' AS transition_text,
-                ROW_NUMBER() OVER (PARTITION BY pt.player_id ORDER BY s.start_date DESC) AS rn
-            FROM player_transition pt
-            JOIN club cf ON pt.club_id_from = cf.club_id
-            JOIN club ct ON pt.club_id_to = ct.club_id
-            JOIN season s ON pt.season_id = s.season_id
-        ),
-        id_exts AS (
-            SELECT pie.player_id,
-                GROUP_CONCAT(pie.player_id_ext) AS id_ext_list,
-                COUNT(*) AS id_ext_count
-            FROM player_id_ext pie
-            GROUP BY pie.player_id
-        ),
-        ranking_groups AS (
-            SELECT prg.player_id,
-                GROUP_CONCAT(rg.class_short, ', ') AS ranking_groups
-            FROM player_ranking_group prg
-            JOIN ranking_group rg ON prg.ranking_group_id = rg.ranking_group_id
-            GROUP BY prg.player_id
-        ),
-        recent_ranking_points AS (
-            SELECT 
-                pie.player_id,
-                pr.points,
-                pr.run_date,
-                ROW_NUMBER() OVER (PARTITION BY pie.player_id ORDER BY pr.run_date DESC, pr.points DESC) AS rn
-            FROM player_id_ext pie
-            JOIN player_ranking pr
-                ON pr.player_id_ext = pie.player_id_ext
-        )
+        -- Thin wrapper over plyr_profile_cache (refreshed by upd_player_caches.py)
         SELECT
-            -- Player context
-            p.player_id,
-            CASE 
-                WHEN p.is_verified = 1 THEN p.firstname || ' ' || p.lastname
-                ELSE p.fullname_raw
-            END AS player_name,
-            p.year_born,
-            p.is_verified,
-            COALESCE(id_exts.id_ext_list, '') AS id_exts,
-            COALESCE(id_exts.id_ext_count, 0) AS id_ext_count,
-
-            -- Club context
-            rl.club_with_season AS recent_club,
-
-            -- Tournament context
-            rt.tournament_name || ' - ' || rt.class_shortname || ' (' || rt.class_startdate || ')' AS recent_tournament_class,
-
-            -- Ranking groups (merged list)
-            COALESCE(rg.ranking_groups, '') AS ranking_groups,
-
-            -- Ranking points (latest across all player_id_ext)
-            CASE 
-                WHEN rpp.points IS NOT NULL 
-                THEN rpp.points || ' (' || rpp.run_date || ')'
-                ELSE ''
-            END AS ranking_points,
-
-            -- Transition
-            tr.transition_text AS recent_transition
-
-        FROM player p
-        LEFT JOIN id_exts
-            ON p.player_id = id_exts.player_id
-        LEFT JOIN recent_license rl
-            ON p.player_id = rl.player_id AND rl.rn = 1
-        LEFT JOIN recent_tournament rt
-            ON p.player_id = rt.player_id AND rt.rn = 1
-        LEFT JOIN ranking_groups rg
-            ON p.player_id = rg.player_id
-        LEFT JOIN recent_transition tr
-            ON p.player_id = tr.player_id AND tr.rn = 1
-        LEFT JOIN recent_ranking_points rpp
-            ON p.player_id = rpp.player_id AND rpp.rn = 1;
+            player_id,
+            player_name,
+            year_born,
+            is_verified,
+            id_exts,
+            id_ext_count,
+            recent_club,
+            recent_tournament_class,
+            ranking_groups,
+            ranking_points,
+            recent_transition
+        FROM plyr_profile_cache;
         '''
     ),
 
@@ -1937,140 +2229,36 @@ def create_views(cursor):
             "v_plyr_match_history",
             '''
             CREATE VIEW IF NOT EXISTS v_plyr_match_history AS
-            WITH
-                game_summary AS (
-                    SELECT
-                        g.match_id,
-                        GROUP_CONCAT(g.points_side1 || '-' || g.points_side2, ', ') AS games_score,
-                        SUM(CASE WHEN g.points_side1 > g.points_side2 THEN 1 ELSE 0 END) AS games_won_side1,
-                        SUM(CASE WHEN g.points_side2 > g.points_side1 THEN 1 ELSE 0 END) AS games_won_side2
-                    FROM game g
-                    GROUP BY g.match_id
-                ),
-                player_side AS (
-                    SELECT 
-                        mp.match_id,
-                        mp.player_id,
-                        mp.side_no,
-                        mp.club_id
-                    FROM match_player mp
-                )
+            -- Thin wrapper over plyr_match_history_cache (refreshed by upd_player_caches.py)
             SELECT
-                -- Player context (filter field)
-                ps.player_id,
-                
-                -- Tournament context
-                t.shortname             AS tournament_shortname,
-                --t.startdate             AS tournament_startdate,
-                --t.city                  AS tournament_city,
-                
-                -- Class context
-                -- tc.shortname            AS class_shortname,
-                tc.longname             AS class_longname,
-                tc.startdate            AS date,
-
-                -- Win/loss for this player
-                CASE 
-                    WHEN m.winner_side = ps.side_no THEN 'WIN'
-                    WHEN m.winner_side IS NOT NULL AND m.winner_side != ps.side_no THEN 'LOSS'
-                    ELSE NULL
-                END AS result,
-
-                -- Opponent info
-                CASE 
-                    WHEN p_opp.is_verified = 1 
-                    THEN TRIM(p_opp.firstname || ' ' || p_opp.lastname)
-                    ELSE TRIM(
-                        CASE 
-                            WHEN INSTR(p_opp.fullname_raw, ' ') > 0 
-                            THEN SUBSTR(p_opp.fullname_raw, INSTR(p_opp.fullname_raw, ' ') + 1) 
-                                || ' ' || SUBSTR(p_opp.fullname_raw, 1, INSTR(p_opp.fullname_raw, ' ') - 1)
-                            ELSE p_opp.fullname_raw
-                        END
-                    )
-                END AS opponent_name,
-                p_opp.player_id         AS opponent_player_id,
-                c_opp.shortname         AS opponent_club,
-
-                -- Match result
-                CASE 
-                    WHEN gs.games_won_side1 IS NOT NULL AND gs.games_won_side2 IS NOT NULL
-                    THEN gs.games_won_side1 || '-' || gs.games_won_side2
-                    ELSE NULL
-                END AS match_score_summary,
-                gs.games_score,
-                --gs.games_won_side1,
-                --gs.games_won_side2,
-                
-
-                
-                -- Stage / group context
-                -- tcs.shortname           AS stage_shortname,
-                tcs.description         AS stage_description,
-                -- tcm.stage_round_no      AS stage_round_no,
-                -- tcg.description         AS group_name,
-                
-                -- Match info
-                m.match_id,
-                m.best_of,
-                m.date                  AS match_date,
-                m.status                AS match_status,
-                m.winner_side,
-                m.walkover_side,
-                
-                -- Player's side info
-                ps.side_no              AS player_side_no,
-                c_player.shortname      AS player_club,
-                
-                -- Match result
-                gs.games_score,
-                gs.games_won_side1,
-                gs.games_won_side2,
-                CASE 
-                    WHEN gs.games_won_side1 IS NOT NULL AND gs.games_won_side2 IS NOT NULL
-                    THEN gs.games_won_side1 || '-' || gs.games_won_side2
-                    ELSE NULL
-                END AS match_score_summary,
-                
-                -- Win/loss for this player
-                CASE 
-                    WHEN m.winner_side = ps.side_no THEN 'WIN'
-                    WHEN m.winner_side IS NOT NULL AND m.winner_side != ps.side_no THEN 'LOSS'
-                    ELSE NULL
-                END AS result,
-                
-                -- IDs
-                t.tournament_id,
-                tc.tournament_class_id
-                
-            FROM player_side ps
-            JOIN match m
-                ON m.match_id = ps.match_id
-            JOIN tournament_class_match tcm
-                ON tcm.match_id = m.match_id
-            JOIN tournament_class tc
-                ON tc.tournament_class_id = tcm.tournament_class_id
-            JOIN tournament t
-                ON t.tournament_id = tc.tournament_id
-            LEFT JOIN club c_player
-                ON c_player.club_id = ps.club_id
-            LEFT JOIN tournament_class_stage tcs
-                ON tcs.tournament_class_stage_id = tcm.tournament_class_stage_id
-            LEFT JOIN tournament_class_group tcg
-                ON tcg.tournament_class_group_id = tcm.tournament_class_group_id
-            LEFT JOIN game_summary gs
-                ON gs.match_id = m.match_id
-            -- Opponent join (other side)
-            LEFT JOIN match_player mp_opp
-                ON mp_opp.match_id = m.match_id 
-                AND mp_opp.side_no != ps.side_no 
-                AND mp_opp.player_order = 1
-            LEFT JOIN player p_opp
-                ON p_opp.player_id = mp_opp.player_id
-            LEFT JOIN club c_opp
-                ON c_opp.club_id = mp_opp.club_id
-                
-            ORDER BY t.startdate DESC, tc.startdate DESC, m.match_id;
+                player_id,
+                tournament_shortname,
+                class_longname,
+                class_date              AS date,
+                result,
+                opponent_name,
+                opponent_player_id,
+                opponent_club,
+                match_score_summary,
+                games_score,
+                stage_description,
+                match_id,
+                best_of,
+                match_date,
+                match_status,
+                winner_side,
+                walkover_side,
+                player_side_no,
+                player_club,
+                games_score,
+                games_won_side1,
+                games_won_side2,
+                match_score_summary,
+                result,
+                tournament_id,
+                tournament_class_id
+            FROM plyr_match_history_cache
+            ORDER BY tournament_startdate DESC, class_date DESC, match_id;
             '''
         ),
 
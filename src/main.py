@@ -11,6 +11,8 @@ from utils import (
     clear_debug_tables, 
     export_logs_to_excel, 
     export_runs_to_excel, 
+    export_spans, 
+    profile_stage, 
     setup_logging, 
     OperationLogger,
     export_db_dictionary
@@ -165,22 +167,25 @@ def main():
         # upd_clubs(dry_run=False)
 
         # # Update player data
-        # upd_player_data(
-        #     run_id                            = pipeline_run_id,
-        #     do_scrape_player_licenses         = True,
-        #     do_scrape_player_rankings         = True,
-        #     do_scrape_player_transitions      = True
-        # )
+        # with profile_stage("upd_player_data", pipeline_run_id):
+        #     upd_player_data(
+        #         run_id                            = pipeline_run_id,
+        #         do_scrape_player_licenses         = True,
+        #         do_scrape_player_rankings         = True,
+        #         do_scrape_player_transitions      = True
+        #     )
 
         # Update tournament data
-        upd_tournament_data(
-            run_id                                                  = pipeline_run_id,
-            do_scrape_tournaments                                   = False,
-            do_scrape_tournament_classes                            = False,
-            do_scrape_tournament_class_entries                      = False,
-            do_scrape_tournament_class_group_matches_ondata         = False,
-            do_scrape_tournament_class_knockout_matches_ondata      = False
-        )
+        # Stages in PROFILE_STAGES are sample-profiled (profile_stage here, scrapers/resolvers via their logger)
+        with profile_stage("upd_tournament_data", pipeline_run_id):
+            upd_tournament_data(
+                run_id                                                  = pipeline_run_id,
+                do_scrape_tournaments                                   = False,
+                do_scrape_tournament_classes                            = False,
+                do_scrape_tournament_class_entries                      = False,
+                do_scrape_tournament_class_group_matches_ondata         = False,
+                do_scrape_tournament_class_knockout_matches_ondata      = False
+            )
 
         # upd_league_data(
         #     run_id                                                  = pipeline_run_id,
@@ -189,6 +194,7 @@ def main():
 
         export_runs_to_excel(export_latest_only=False)   # Set to True to export only latest run
         export_logs_to_excel()
+        export_spans(pipeline_run_id)                      # Chrome trace (chrome://tracing, Perfetto); fmt="collapsed" for flamegraph.pl
 
     except Exception as e:
         logging.error(f"Error: {e}", stack_info=True, stacklevel=3, exc_info=True)
@@ -350,65 +350,121 @@ class Player(CacheMixin):
         """
         Fallback DB search on player table. 
         Handles cases where first/last are NULL by using fullname_raw.
+        Single-query wrapper around search_by_name_and_year_batch.
+        """
+        return Player.search_by_name_and_year_batch(cursor, [(firstname, lastname, year_born)]).get(0, [])
+
+    @staticmethod
+    def search_by_name_and_year_batch(
+        cursor,
+        queries: List[Tuple[Optional[str], Optional[str], Optional[int]]]
+    ) -> Dict[int, List['Player']]:
+        """
+        Batch version of search_by_name_and_year for many (firstname, lastname, year_born) tuples.
+        Loads the sanitized queries into a TEMP table and resolves all of them, ext_ids included,
+        with one query. Returns query index → matching players (indexes without matches are omitted).
+
+        Same rules per query as the single search:
+          - firstname/lastname equal the sanitized value, or the column is NULL and fullname_raw contains it
+          - year_born equal, or (no year given) year_born NULL/0
+        Exact name matches use idx_player_name_year; the fullname_raw fallback only checks
+        players of the queried year (idx_player_year_born) with a NULL name column.
         """
         try:
-            fn = sanitize_name(firstname) if firstname else None
-            ln = sanitize_name(lastname) if lastname else None
-            yb = year_born if year_born is not None else None
-            params = []
-            where_clauses = []
-
-            if fn:
-                where_clauses.append("(firstname = ? OR (firstname IS NULL AND fullname_raw LIKE ?))")
-                params.extend([fn, f"%{fn}%"])
-            if ln:
-                where_clauses.append("(lastname = ? OR (lastname IS NULL AND fullname_raw LIKE ?))")
-                params.extend([ln, f"%{ln}%"])
-            if yb is not None:
-                where_clauses.append("year_born = ?")
-                params.append(yb)
-            else:
-                where_clauses.append("(year_born IS NULL OR year_born = 0)")
-
-            if not where_clauses:
-                return []
-
-            where_sql = " AND ".join(where_clauses)
-            cursor.execute(
-                f"""
-                SELECT player_id, firstname, lastname, year_born, date_born, fullname_raw, is_verified
-                FROM player
-                WHERE {where_sql}
-                """,
-                params
-            )
-            found = []
-            for row in cursor.fetchall():
-                pid = row[0]
-                p = Player(
-                    player_id=pid,
-                    firstname=row[1],
-                    lastname=row[2],
-                    year_born=row[3],
-                    date_born=row[4],
-                    fullname_raw=row[5],
-                    is_verified=bool(row[6]),
-                    ext_ids=[]
-                )
-                # collect ext_ids
-                cursor.execute(
-                    "SELECT player_id_ext, data_source_id FROM player_id_ext WHERE player_id = ?",
-                    (pid,)
+            cursor.execute("DROP TABLE IF EXISTS temp.tmp_player_name_query")
+            cursor.execute("""
+                CREATE TEMP TABLE tmp_player_name_query (
+                    query_no    INTEGER PRIMARY KEY,
+                    firstname   TEXT,
+                    lastname    TEXT,
+                    year_born   INTEGER
                 )
-                p.ext_ids = [
-                    {'player_id_ext': r[0], 'data_source_id': r[1]}
-                    for r in cursor.fetchall()
+            """)
+            cursor.executemany(
+                "INSERT INTO tmp_player_name_query (query_no, firstname, lastname, year_born) VALUES (?, ?, ?, ?)",
+                [
+                    (i, sanitize_name(fn) if fn else None, sanitize_name(ln) if ln else None, yb)
+                    for i, (fn, ln, yb) in enumerate(queries)
                 ]
-                found.append(p)
-            return found
+            )
+            cursor.execute("""
+                WITH year_match AS (
+                    -- Candidate players by year (indexed): year given → equal, else NULL/0
+                    SELECT q.query_no, p.player_id
+                    FROM tmp_player_name_query q
+                    JOIN player p ON p.year_born = q.year_born
+                    UNION ALL
+                    SELECT q.query_no, p.player_id
+                    FROM tmp_player_name_query q
+                    JOIN player p ON p.year_born IS NULL
+                    WHERE q.year_born IS NULL
+                    UNION ALL
+                    SELECT q.query_no, p.player_id
+                    FROM tmp_player_name_query q
+                    JOIN player p ON p.year_born = 0
+                    WHERE q.year_born IS NULL
+                ),
+                name_match AS (
+                    -- Exact first + last name (indexed)
+                    SELECT q.query_no, p.player_id
+                    FROM tmp_player_name_query q
+                    JOIN player p
+                        ON p.lastname = q.lastname
+                       AND p.firstname = q.firstname
+                       AND p.year_born = q.year_born
+                    UNION ALL
+                    SELECT q.query_no, p.player_id
+                    FROM tmp_player_name_query q
+                    JOIN player p
+                        ON p.lastname = q.lastname
+                       AND p.firstname = q.firstname
+                    WHERE q.year_born IS NULL AND (p.year_born IS NULL OR p.year_born = 0)
+
+                    UNION ALL
+
+                    -- A name missing on either side: fall back to fullname_raw containment
+                    SELECT ym.query_no, p.player_id
+                    FROM year_match ym
+                    JOIN tmp_player_name_query q ON q.query_no = ym.query_no
+                    JOIN player p ON p.player_id = ym.player_id
+                    WHERE (p.firstname IS NULL OR p.lastname IS NULL OR q.firstname IS NULL OR q.lastname IS NULL)
+                      AND (q.firstname IS NULL OR p.firstname = q.firstname
+                           OR (p.firstname IS NULL AND p.fullname_raw LIKE '%' || q.firstname || '%'))
+                      AND (q.lastname IS NULL OR p.lastname = q.lastname
+                           OR (p.lastname IS NULL AND p.fullname_raw LIKE '%' || q.lastname || '%'))
+                )
+                SELECT
+                    nm.query_no, p.player_id, p.firstname, p.lastname, p.year_born, p.date_born,
+                    p.fullname_raw, p.is_verified, pie.player_id_ext, pie.data_source_id
+                FROM name_match nm
+                JOIN player p ON p.player_id = nm.player_id
+                LEFT JOIN player_id_ext pie ON pie.player_id = p.player_id
+                ORDER BY nm.query_no, p.player_id
+            """)
+
+            found: Dict[int, Dict[int, Player]] = defaultdict(dict)
+            for row in cursor.fetchall():
+                query_no, pid = row[0], row[1]
+                p = found[query_no].get(pid)
+                if p is None:
+                    p = found[query_no][pid] = Player(
+                        player_id=pid,
+                        firstname=row[2],
+                        lastname=row[3],
+                        year_born=row[4],
+                        date_born=row[5],
+                        fullname_raw=row[6],
+                        is_verified=bool(row[7]),
+                        ext_ids=[]
+                    )
+                if row[8] is not None:
+                    p.ext_ids.append({'player_id_ext': row[8], 'data_source_id': row[9]})
+
+            cursor.execute("DROP TABLE IF EXISTS temp.tmp_player_name_query")
+            return {query_no: list(players.values()) for query_no, players in found.items()}
         except Exception as e:
-            logging.error(f"Error in search_by_name_and_year: {e}")
-            return []
+            logging.error(f"Error in search_by_name_and_year_batch: {e}")
+            return {}
 
 
     @staticmethod
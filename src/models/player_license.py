@@ -1,7 +1,9 @@
 # src/models/player_license.py
 
+from bisect import bisect_left, bisect_right
 from datetime import date
 from dataclasses import dataclass
+from itertools import accumulate
 import logging
 from typing import Optional, List, Tuple, Dict, Any, Set, Iterable
 from collections import defaultdict
@@ -10,6 +12,38 @@ from models.cache_mixin import CacheMixin
 from models.season import Season
 from utils import normalize_key
 
+class LicenseIntervals:
+    """
+    Licenses for one cache key, sorted by valid_from, with a running max of valid_to.
+    A point-in-time query is a bisect on valid_from plus a backward scan that stops as soon
+    as no earlier interval can still be open. Iterates like the plain row list it replaces.
+    """
+    __slots__ = ("rows", "starts", "max_ends", "latest")
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows       = sorted(rows, key=lambda r: r["valid_from"])
+        self.starts     = [r["valid_from"] for r in self.rows]
+        self.max_ends   = list(accumulate((r["valid_to"] for r in self.rows), max))
+        self.latest     = max(rows, key=lambda r: r["valid_to"], default=None)
+
+    def valid_on(self, on_date: date) -> List[Dict[str, Any]]:
+        """Rows with valid_from <= on_date <= valid_to."""
+        hits = []
+        for j in range(bisect_right(self.starts, on_date) - 1, -1, -1):
+            if self.max_ends[j] < on_date:
+                break
+            if self.rows[j]["valid_to"] >= on_date:
+                hits.append(self.rows[j])
+        hits.reverse()
+        return hits
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
 @dataclass
 class PlayerLicense(CacheMixin):
     player_id:                  int
@@ -127,7 +161,10 @@ class PlayerLicense(CacheMixin):
         return "unchanged"
     
     @classmethod
-    def cache_name_club_map(cls, cursor) -> Dict[Tuple[str, int], List[Dict[str, Any]]]:
+    def cache_name_club_map(cls, cursor) -> Dict[Tuple[str, int], LicenseIntervals]:
+        """
+        Normalized full name + club_id → LicenseIntervals (see find_valid / find_valid_many).
+        """
         sql = """
             SELECT 
                 pl.player_id,
@@ -155,30 +192,61 @@ class PlayerLicense(CacheMixin):
                 "valid_to":     row['valid_to'],
                 "season_id":    row['season_id']
             })
-        return license_map
+        return {key: LicenseIntervals(rows) for key, rows in license_map.items()}
+
+    @staticmethod
+    def find_valid(license_index: Dict[Any, LicenseIntervals], key: Any, on_date: date) -> List[Dict[str, Any]]:
+        """Licenses under key valid on on_date."""
+        intervals = license_index.get(key)
+        return intervals.valid_on(on_date) if intervals else []
+
+    @staticmethod
+    def find_valid_many(license_index: Dict[Any, LicenseIntervals], keys: Iterable[Any], on_date: date) -> Dict[Any, List[Dict[str, Any]]]:
+        """
+        Batch point-in-time lookup: every key (e.g. all name/club keys of a class's entries)
+        against one date. Keys without valid licenses are omitted.
+        """
+        result: Dict[Any, List[Dict[str, Any]]] = {}
+        for key in set(keys):
+            intervals = license_index.get(key)
+            if intervals:
+                hits = intervals.valid_on(on_date)
+                if hits:
+                    result[key] = hits
+        return result
 
     @classmethod
-    def cache_all(cls, cursor) -> Dict[int, Set[Tuple[int, int]]]:
+    def cache_all(cls, cursor) -> Dict[int, Dict[int, List[int]]]:
         """
         Load all player_license rows into memory.
-        Returns a dict mapping player_id → set of (club_id, season_id).
+        Returns a dict mapping player_id → club_id → sorted list of season_ids.
         """
-        license_map: Dict[int, Set[Tuple[int, int]]] = defaultdict(set)
+        license_map: Dict[int, Dict[int, Set[int]]] = defaultdict(lambda: defaultdict(set))
         cursor.execute(
             "SELECT player_id, club_id, season_id FROM player_license"
         )
         for pid, cid, sid in cursor.fetchall():
-            license_map[pid].add((cid, sid))
+            license_map[pid][cid].add(sid)
         logging.info(f"Cached licenses for {len(license_map)} players")
-        return license_map
+        return {pid: {cid: sorted(sids) for cid, sids in clubs.items()} for pid, clubs in license_map.items()}
 
     @staticmethod
-    def has_license(license_map: Dict[int, Set[Tuple[int, int]]], player_id: int, club_id: int, seasons: Iterable[int]) -> bool:
+    def has_license(license_map: Dict[int, Dict[int, List[int]]], player_id: int, club_id: int, seasons: Iterable[int]) -> bool:
         """
         Check if the given player_id has a license in club_id for any of the specified seasons.
+        A contiguous range of seasons is answered with one bisect.
         """
-        licenses = license_map.get(player_id, set())
-        return any((club_id, sid) in licenses for sid in seasons)
+        season_ids = license_map.get(player_id, {}).get(club_id)
+        if not season_ids:
+            return False
+        if isinstance(seasons, range) and seasons.step == 1:
+            i = bisect_left(season_ids, seasons.start)
+            return i < len(season_ids) and season_ids[i] < seasons.stop
+        for sid in seasons:
+            i = bisect_left(season_ids, sid)
+            if i < len(season_ids) and season_ids[i] == sid:
+                return True
+        return False
     
     @staticmethod
     def get_by_player_id(cursor, player_id: int, season_id: Optional[int] = None, club_id: Optional[int] = None) -> List['PlayerLicense']:
@@ -556,12 +624,12 @@ class PlayerLicense(CacheMixin):
         key = (fn_norm, ln_norm, club_id)
         if key not in licenses_cache:
             return None
+        intervals = licenses_cache[key]
+        if not isinstance(intervals, LicenseIntervals):
+            intervals = LicenseIntervals(intervals)
 
         # Strict match on date
-        valid_pids = {
-            lic["player_id"] for lic in licenses_cache[key]
-            if lic["valid_from"] <= tournament_date <= lic["valid_to"]
-        }
+        valid_pids = {lic["player_id"] for lic in intervals.valid_on(tournament_date)}
         if len(valid_pids) == 1:
             return next(iter(valid_pids))
         elif len(valid_pids) > 1:
@@ -569,7 +637,7 @@ class PlayerLicense(CacheMixin):
             return next(iter(valid_pids))  # Arbitrary first
 
         if fallback_to_latest:
-            most_recent = max(licenses_cache[key], key=lambda lic: lic["valid_to"], default=None)
+            most_recent = intervals.latest
             if most_recent:
                 logging.info(f"Fallback to latest license for {firstname} {lastname} at club {club_id} (valid_to={most_recent['valid_to']})")
                 return most_recent["player_id"]
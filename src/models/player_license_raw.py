@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple
 import sqlite3
+from models.raw_change_log import RawChanges
 from utils import compute_content_hash as _compute_content_hash
 
 
@@ -124,17 +125,19 @@ class PlayerLicenseRaw:
         )
 
     @classmethod
-    def get_all(cls, cursor: sqlite3.Cursor) -> List["PlayerLicenseRaw"]:
+    def get_all(cls, cursor: sqlite3.Cursor, changes: Optional["RawChanges"] = None) -> List["PlayerLicenseRaw"]:
         """
-        Fetch all rows from player_license_raw and return as dataclass objects.
+        Fetch all rows from player_license_raw (or only the changed ones) and return as dataclass objects.
         """
-        cursor.execute("""
+        condition, params = changes.row_filter() if changes else ("1", ())
+        cursor.execute(f"""
             SELECT
                 row_id, season_id_ext, season_label, club_name, club_id_ext,
                 CAST(player_id_ext AS TEXT) AS player_id_ext_str,
                 firstname, lastname, gender, year_born, license_info_raw, ranking_group_raw
             FROM player_license_raw
-        """)
+            WHERE {condition}
+        """, params)
         return [cls.from_row(r) for r in cursor.fetchall()]
 
     @classmethod
@@ -158,15 +161,21 @@ class PlayerLicenseRaw:
         return {(r[0], r[1], r[2], r[3]): r[4] for r in cursor.fetchall()}
 
     # Used by resolve_player_ranking_groups
+    # With changes: all rows of the players that have a changed row
     @classmethod
-    def fetch_rows_with_ranking_groups(cls, cursor) -> List[Tuple[str, str, datetime]]:
-        query = """
+    def fetch_rows_with_ranking_groups(cls, cursor, changes: Optional["RawChanges"] = None) -> List[Tuple[str, str, datetime]]:
+        scope, params = "", ()
+        if changes and not changes.full:
+            condition, params = changes.row_filter()
+            scope = f"AND player_id_ext IN (SELECT player_id_ext FROM player_license_raw WHERE {condition})"
+        query = f"""
             SELECT player_id_ext, ranking_group_raw, last_seen_at
             FROM player_license_raw
             WHERE ranking_group_raw IS NOT NULL AND ranking_group_raw != ''
+            {scope}
             ORDER BY player_id_ext, last_seen_at DESC  -- Helps with grouping
         """
-        cursor.execute(query)
+        cursor.execute(query, params)
         return cursor.fetchall()
 
     def upsert(self, cursor: sqlite3.Cursor) -> Optional[str]:
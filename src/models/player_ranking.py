@@ -135,4 +135,107 @@ class PlayerRanking:
             if cursor.lastrowid:
                 return "inserted"
             return "updated"
-        return "unchanged"
\ No newline at end of file
+        return "unchanged"
+
+    @staticmethod
+    def resolve_from_raw(cursor: sqlite3.Cursor, scope_sql: str, params: tuple = ()) -> Dict[str, Any]:
+        """
+        Set-based resolve of the player_ranking_raw rows whose row_id scope_sql selects.
+
+        Rows with missing fields (PlayerRankingRaw.validate) or without a player_id_ext mapping go to
+        player_ranking_reject with a reason code; the others are upserted in one INSERT ... SELECT with
+        the same change detection as upsert(). Later raw rows win for the same player and run date.
+        Returns counts: scoped, inserted, updated, unchanged, rejected (reason -> count), and the
+        player_id_exts of the scoped rows.
+        """
+        cursor.execute("DROP TABLE IF EXISTS temp.tmp_ranking_scope")
+        cursor.execute("CREATE TEMP TABLE tmp_ranking_scope (row_id INTEGER PRIMARY KEY)")
+        cursor.execute(f"INSERT OR IGNORE INTO tmp_ranking_scope (row_id) {scope_sql}", params)
+        scoped = cursor.rowcount
+
+        # Rejects (recomputed for the scoped rows)
+        cursor.execute("DELETE FROM player_ranking_reject WHERE raw_row_id IN (SELECT row_id FROM tmp_ranking_scope)")
+        cursor.execute("""
+            INSERT INTO player_ranking_reject (raw_row_id, run_id_ext, run_date, player_id_ext, reason)
+            SELECT row_id, run_id_ext, run_date, player_id_ext, reason
+            FROM (
+                SELECT
+                    r.row_id, r.run_id_ext, r.run_date, r.player_id_ext,
+                    -- missing_fields mirrors PlayerRankingRaw.validate (falsy: NULL, '', numeric 0)
+                    CASE
+                        WHEN COALESCE(r.run_id_ext, '') = '' OR COALESCE(r.run_date, '') = ''
+                          OR COALESCE(r.player_id_ext, '') = '' OR COALESCE(r.firstname, '') = ''
+                          OR COALESCE(r.lastname, '') = '' OR COALESCE(r.year_born, '') IN ('', 0)
+                          OR r.points IS NULL OR r.position IS NULL
+                        THEN 'missing_fields'
+                        WHEN NOT EXISTS (
+                            SELECT 1 FROM player_id_ext pie
+                            WHERE pie.player_id_ext = r.player_id_ext AND pie.data_source_id = 3
+                        )
+                        THEN 'no_player_mapping'
+                    END AS reason
+                FROM tmp_ranking_scope s
+                JOIN player_ranking_raw r ON r.row_id = s.row_id
+            )
+            WHERE reason IS NOT NULL
+        """)
+        cursor.execute("""
+            SELECT reason, COUNT(*) FROM player_ranking_reject
+            WHERE raw_row_id IN (SELECT row_id FROM tmp_ranking_scope)
+            GROUP BY reason
+        """)
+        rejected = dict(cursor.fetchall())
+
+        cursor.execute("SELECT COUNT(*) FROM player_ranking")
+        count_before = cursor.fetchone()[0]
+
+        # Upsert; data_source_id 3 = 'Profixio', as in the per-row resolver
+        cursor.execute("""
+            INSERT INTO player_ranking (
+                run_id_ext, run_date, player_id_ext, points, points_change_since_last,
+                position_world, position, data_source_id, row_created, row_updated
+            )
+            SELECT
+                r.run_id_ext, r.run_date, r.player_id_ext, r.points,
+                COALESCE(r.points_change_since_last, 0), COALESCE(r.position_world, 0), r.position,
+                3, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+            FROM tmp_ranking_scope s
+            JOIN player_ranking_raw r ON r.row_id = s.row_id
+            LEFT JOIN player_ranking_reject x ON x.raw_row_id = r.row_id
+            WHERE x.raw_row_id IS NULL
+            ORDER BY r.row_id
+            ON CONFLICT (player_id_ext, data_source_id, run_date)
+            DO UPDATE SET
+                run_id_ext                  = excluded.run_id_ext,
+                points                      = excluded.points,
+                points_change_since_last    = excluded.points_change_since_last,
+                position_world              = excluded.position_world,
+                position                    = excluded.position,
+                row_updated                 = CURRENT_TIMESTAMP
+            WHERE player_ranking.points != excluded.points
+            OR player_ranking.points_change_since_last != excluded.points_change_since_last
+            OR player_ranking.position_world != excluded.position_world
+            OR player_ranking.position != excluded.position
+            OR player_ranking.run_id_ext != excluded.run_id_ext
+        """)
+        changed = cursor.rowcount
+
+        cursor.execute("SELECT COUNT(*) FROM player_ranking")
+        inserted = cursor.fetchone()[0] - count_before
+        cursor.execute("""
+            SELECT DISTINCT r.player_id_ext
+            FROM tmp_ranking_scope s
+            JOIN player_ranking_raw r ON r.row_id = s.row_id
+            WHERE r.player_id_ext IS NOT NULL
+        """)
+        player_id_exts = [row[0] for row in cursor.fetchall()]
+        cursor.execute("DROP TABLE temp.tmp_ranking_scope")
+
+        return {
+            "scoped":       scoped,
+            "inserted":     inserted,
+            "updated":      changed - inserted,
+            "unchanged":    scoped - sum(rejected.values()) - changed,
+            "rejected":     rejected,
+            "player_id_exts": player_id_exts,
+        }
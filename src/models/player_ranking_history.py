@@ -0,0 +1,187 @@
+# src/models/player_ranking_history.py
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date
+from itertools import accumulate, groupby
+import sqlite3
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+HISTORY_BATCH_SIZE = 5000               # player_ranking_history rows written per executemany
+
+
+def _pack(values: List[int]) -> bytes:
+    """Delta-encoded int32 array, little-endian."""
+    deltas = array("i", (value - previous for value, previous in zip(values, [0] + values[:-1])))
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return deltas.tobytes()
+
+
+def _unpack(blob: bytes) -> List[int]:
+    deltas = array("i")
+    deltas.frombytes(blob)
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return list(accumulate(deltas))
+
+
+def _as_date(day: Union[date, str]) -> date:
+    return day if isinstance(day, date) else date.fromisoformat(str(day)[:10])
+
+
+@dataclass
+class PlayerRankingHistory:
+    """
+    Ranking history of one player_id_ext: run dates and points in run date order.
+    Mirrors player_ranking_history, one row per (player_id_ext, data_source_id) packing that
+    ext's player_ranking rows into two delta-encoded BLOBs, next to the latest run's points and
+    the last run that changed them. Latest points come from those columns; change-since and
+    range queries decode the arrays and bisect, so none of them window over player_ranking.
+    """
+    player_id_ext:      str
+    data_source_id:     int
+    run_dates:          List[date]
+    points:             List[int]
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "PlayerRankingHistory":
+        player_id_ext, data_source_id, run_dates, points = row
+        return cls(
+            player_id_ext   = player_id_ext,
+            data_source_id  = data_source_id,
+            run_dates       = [date.fromordinal(d) for d in _unpack(run_dates)],
+            points          = _unpack(points),
+        )
+
+    def latest(self) -> Tuple[date, int]:
+        return self.run_dates[-1], self.points[-1]
+
+    def points_at(self, day: Union[date, str]) -> Optional[int]:
+        """Points of the last run on or before day, None if the ext was not ranked yet."""
+        i = bisect_right(self.run_dates, _as_date(day))
+        return self.points[i - 1] if i else None
+
+    def change_since(self, day: Union[date, str]) -> Optional[int]:
+        """Latest points minus the points at day, None if the ext was not ranked yet at day."""
+        before = self.points_at(day)
+        return None if before is None else self.points[-1] - before
+
+    def range(self, start: Optional[Union[date, str]] = None, end: Optional[Union[date, str]] = None) -> List[Tuple[date, int]]:
+        """(run_date, points) of the runs from start to end, both inclusive."""
+        lo = bisect_left(self.run_dates, _as_date(start)) if start else 0
+        hi = bisect_right(self.run_dates, _as_date(end)) if end else len(self.run_dates)
+        return list(zip(self.run_dates[lo:hi], self.points[lo:hi]))
+
+    @classmethod
+    def get(cls, cursor: sqlite3.Cursor, player_id_ext: str, data_source_id: int = 3) -> Optional["PlayerRankingHistory"]:
+        cursor.execute("""
+            SELECT player_id_ext, data_source_id, run_dates, points
+            FROM player_ranking_history
+            WHERE player_id_ext = ? AND data_source_id = ?
+        """, (str(player_id_ext), data_source_id))
+        row = cursor.fetchone()
+        return cls.from_row(row) if row else None
+
+    @classmethod
+    def get_many(cls, cursor: sqlite3.Cursor, player_id_exts: Iterable[str], data_source_id: int = 3) -> Dict[str, "PlayerRankingHistory"]:
+        exts = sorted({str(ext) for ext in player_id_exts})
+        histories: Dict[str, PlayerRankingHistory] = {}
+        for i in range(0, len(exts), 500):
+            chunk = exts[i:i + 500]
+            cursor.execute(f"""
+                SELECT player_id_ext, data_source_id, run_dates, points
+                FROM player_ranking_history
+                WHERE data_source_id = ? AND player_id_ext IN ({', '.join('?' * len(chunk))})
+            """, (data_source_id, *chunk))
+            histories.update((row[0], cls.from_row(row)) for row in cursor.fetchall())
+        return histories
+
+    @staticmethod
+    def latest_points(cursor: sqlite3.Cursor, data_source_id: int = 3) -> Dict[str, Tuple[str, int]]:
+        """player_id_ext -> (last run_date, points), read from the scalar columns (no decoding)."""
+        cursor.execute("""
+            SELECT player_id_ext, last_run_date, last_points
+            FROM player_ranking_history
+            WHERE data_source_id = ?
+        """, (data_source_id,))
+        return {ext: (run_date, points) for ext, run_date, points in cursor.fetchall()}
+
+    @classmethod
+    def changes_since(cls, cursor: sqlite3.Cursor, day: Union[date, str], data_source_id: int = 3) -> Dict[str, int]:
+        """player_id_ext -> points change since day, for the exts ranked at day."""
+        cursor.execute("""
+            SELECT player_id_ext, data_source_id, run_dates, points
+            FROM player_ranking_history
+            WHERE data_source_id = ? AND first_run_date <= ?
+        """, (data_source_id, str(day)))
+        changes = {}
+        for row in cursor.fetchall():
+            change = cls.from_row(row).change_since(day)
+            if change is not None:
+                changes[row[0]] = change
+        return changes
+
+    @staticmethod
+    def count(cursor: sqlite3.Cursor) -> int:
+        cursor.execute("SELECT COUNT(*) FROM player_ranking_history")
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def refresh(cursor: sqlite3.Cursor, player_id_exts: Optional[Iterable[str]] = None) -> int:
+        """
+        Rebuild the history rows of player_id_exts from player_ranking (all exts if None).
+        Returns the number of history rows written.
+        """
+        if player_id_exts is None:
+            cursor.execute("DELETE FROM player_ranking_history")
+            scope = ""
+        else:
+            cursor.execute("DROP TABLE IF EXISTS temp.tmp_ranking_history_exts")
+            cursor.execute("CREATE TEMP TABLE tmp_ranking_history_exts (player_id_ext TEXT PRIMARY KEY)")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO tmp_ranking_history_exts (player_id_ext) VALUES (?)",
+                ((str(ext),) for ext in player_id_exts),
+            )
+            cursor.execute("DELETE FROM player_ranking_history WHERE player_id_ext IN (SELECT player_id_ext FROM tmp_ranking_history_exts)")
+            scope = "WHERE player_id_ext IN (SELECT player_id_ext FROM tmp_ranking_history_exts)"
+
+        # Separate cursor: the history rows are written while reading
+        read = cursor.connection.cursor()
+        read.execute(f"""
+            SELECT player_id_ext, data_source_id, run_date, points, points_change_since_last
+            FROM player_ranking
+            {scope}
+            ORDER BY player_id_ext, data_source_id, run_date
+        """)
+        insert_sql = """
+            INSERT INTO player_ranking_history (
+                player_id_ext, data_source_id, run_count, first_run_date, last_run_date,
+                last_points, last_change_date, run_dates, points
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        written, batch = 0, []
+        for (player_id_ext, data_source_id), rows in groupby(read, key=lambda r: (r[0], r[1])):
+            rows = list(rows)
+            run_dates = [_as_date(r[2]).toordinal() for r in rows]
+            points = [r[3] or 0 for r in rows]
+            last_change_date = next((r[2] for r in reversed(rows) if r[4]), None)
+            batch.append((
+                player_id_ext, data_source_id, len(rows), rows[0][2], rows[-1][2],
+                points[-1], last_change_date, _pack(run_dates), _pack(points),
+            ))
+            if len(batch) >= HISTORY_BATCH_SIZE:
+                cursor.executemany(insert_sql, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert_sql, batch)
+            written += len(batch)
+        read.close()
+
+        if player_id_exts is not None:
+            cursor.execute("DROP TABLE temp.tmp_ranking_history_exts")
+        return written
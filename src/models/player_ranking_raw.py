@@ -4,8 +4,17 @@ from dataclasses import dataclass
 from typing import Optional, List, Dict, Any, Tuple
 import sqlite3
 from datetime import date
+from models.raw_change_log import RawChanges
 from utils import compute_content_hash as _compute_content_hash
 
+# Known bad data (specific run_id_ext + run_date combinations), left out when resolving
+KNOWN_BAD_RUNS_EXCLUDED = """NOT (
+    (run_date = '2023-10-02' AND run_id_ext = '346') OR
+    (run_date = '2012-07-02' AND run_id_ext = '166') OR
+    (run_date = '2011-07-04' AND run_id_ext = '150') OR
+    (run_date = '2010-08-02' AND run_id_ext = '139')
+)"""
+
 @dataclass
 class PlayerRankingRaw:
     """
@@ -98,23 +107,20 @@ class PlayerRankingRaw:
     # All but known bad data (specific run_id_ext + run_date combinations)
     # Used in resolve_player_rankings.py
     @classmethod
-    def get_all(cls, cursor: sqlite3.Cursor) -> List["PlayerRankingRaw"]:
+    def get_all(cls, cursor: sqlite3.Cursor, changes: Optional["RawChanges"] = None) -> List["PlayerRankingRaw"]:
         """
-        Fetch all rows from player_ranking_raw and return as dataclass objects.
+        Fetch all rows from player_ranking_raw (or only the changed ones) and return as dataclass objects.
         """
-        cursor.execute("""
+        condition, params = changes.row_filter() if changes else ("1", ())
+        cursor.execute(f"""
             SELECT
                 row_id, run_id_ext, run_date, player_id_ext, firstname, lastname,
                 year_born, club_name, points, points_change_since_last, position_world,
                 position, data_source_id, content_hash, last_seen_at, row_created, row_updated
             FROM player_ranking_raw
-            WHERE NOT (
-                (run_date = '2023-10-02' AND run_id_ext = '346') OR
-                (run_date = '2012-07-02' AND run_id_ext = '166') OR
-                (run_date = '2011-07-04' AND run_id_ext = '150') OR
-                (run_date = '2010-08-02' AND run_id_ext = '139')
-            )
-        """)
+            WHERE {KNOWN_BAD_RUNS_EXCLUDED}
+            AND {condition}
+        """, params)
         return [cls.from_dict({
             "row_id": r[0],
             "run_id_ext": r[1],
@@ -136,6 +142,32 @@ class PlayerRankingRaw:
         }) for r in cursor.fetchall()]
     
 
+    # Used by the set-based mode of resolve_player_rankings.py
+    @classmethod
+    def scope_sql(cls, changes: Optional["RawChanges"] = None, full: bool = False) -> Tuple[str, tuple]:
+        """
+        Query (and parameters) of the row_ids to resolve set-based (see PlayerRanking.resolve_from_raw).
+        Full: all rows. Otherwise the rows of run dates not in player_ranking yet, the rows rejected
+        before (their player may be mapped by now) and the rows changed since the consumer's watermark.
+        """
+        if full:
+            return f"SELECT row_id FROM player_ranking_raw WHERE {KNOWN_BAD_RUNS_EXCLUDED}", ()
+        scopes, params = [
+            """run_date IN (
+                SELECT DISTINCT run_date FROM player_ranking_raw
+                EXCEPT
+                SELECT DISTINCT run_date FROM player_ranking
+            )""",
+            "row_id IN (SELECT raw_row_id FROM player_ranking_reject)",
+        ], ()
+        if changes and not changes.full:
+            condition, params = changes.row_filter()
+            scopes.append(condition)
+        return (
+            f"SELECT row_id FROM player_ranking_raw WHERE {KNOWN_BAD_RUNS_EXCLUDED} AND ({' OR '.join(scopes)})",
+            params,
+        )
+
     def upsert(self, cursor: sqlite3.Cursor) -> Optional[str]:
         """Upserting row with content-hash gating. Returns: 'inserted', 'updated', 'unchanged', or None (invalid)."""
 
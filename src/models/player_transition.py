@@ -48,6 +48,19 @@ class PlayerTransition:
             logging.error(f"Error retrieving transitions by player_id {player_id}: {e}")
             return []
 
+    @staticmethod
+    def cache_by_player(cursor) -> Dict[int, List[tuple]]:
+        """
+        Load all transitions into memory.
+        Returns a dict mapping player_id → list of (club_id_from, club_id_to, transition_date).
+        """
+        transitions: Dict[int, List[tuple]] = {}
+        cursor.execute("SELECT player_id, club_id_from, club_id_to, transition_date FROM player_transition")
+        for pid, club_from, club_to, transition_date in cursor.fetchall():
+            transitions.setdefault(pid, []).append((club_from, club_to, transition_date))
+        logging.info(f"Cached transitions for {len(transitions)} players")
+        return transitions
+
     def save_to_db(self, cursor, logger):
 
         item_key = f"Player ID {self.player_id}, Season ID {self.season_id}"
@@ -3,6 +3,7 @@
 from dataclasses import dataclass
 from datetime import date
 from typing import Optional, Tuple
+from models.raw_change_log import RawChanges
 from utils import compute_content_hash as _compute_content_hash
 
 @dataclass
@@ -79,15 +80,17 @@ class PlayerTransitionRaw:
         )
 
     @classmethod
-    def get_all(cls, cursor) -> list["PlayerTransitionRaw"]:
+    def get_all(cls, cursor, changes: Optional["RawChanges"] = None) -> list["PlayerTransitionRaw"]:
         """
-        Fetch all rows from player_transition_raw and return as dataclass objects.
+        Fetch all rows from player_transition_raw (or only the changed ones) and return as dataclass objects.
         """
-        cursor.execute("""
+        condition, params = changes.row_filter() if changes else ("1", ())
+        cursor.execute(f"""
             SELECT 
                 row_id, season_id_ext, season_label, firstname, lastname, date_born, year_born, club_from, club_to, transition_date
             FROM player_transition_raw
-        """)
+            WHERE {condition}
+        """, params)
         return [cls.from_row(r) for r in cursor.fetchall()]
 
     # @staticmethod
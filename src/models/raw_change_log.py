@@ -0,0 +1,92 @@
+# src/models/raw_change_log.py
+
+from dataclasses import dataclass
+import sqlite3
+from typing import Optional, Tuple
+
+
+@dataclass
+class RawChanges:
+    """
+    Rows of one player_*_raw table a consumer (resolver) has not processed yet.
+
+    Triggers on the raw tables append every inserted or changed row to raw_change_log (see
+    db.create_triggers); each consumer keeps the last change it processed in raw_change_watermark.
+    A run covers the changes up to the last one logged when it started, and advance() moves the
+    watermark there once the run succeeded. Full runs (first run of a consumer, or requested)
+    cover every row of the table.
+    """
+    consumer:           str
+    table_name:         str
+    after_change_id:    int                             # consumer's watermark
+    upto_change_id:     int                             # last change logged at the start of the run
+    ops:                Tuple[str, ...] = ("I", "U")
+    full:               bool = False
+
+    @classmethod
+    def pending(
+        cls,
+        cursor:     sqlite3.Cursor,
+        consumer:   str,
+        table_name: str,
+        ops:        Tuple[str, ...] = ("I", "U"),
+        full:       bool = False,
+    ) -> "RawChanges":
+        cursor.execute("SELECT COALESCE(MAX(change_id), 0) FROM raw_change_log")
+        upto_change_id = cursor.fetchone()[0]
+        cursor.execute("SELECT last_change_id FROM raw_change_watermark WHERE consumer = ?", (consumer,))
+        row = cursor.fetchone()
+        return cls(
+            consumer        = consumer,
+            table_name      = table_name,
+            after_change_id = row[0] if row else 0,
+            upto_change_id  = upto_change_id,
+            ops             = tuple(ops),
+            full            = full or row is None,
+        )
+
+    def row_filter(self, column: str = "row_id") -> Tuple[str, tuple]:
+        """SQL condition (and its parameters) restricting a query on the raw table to the changed rows."""
+        if self.full:
+            return "1", ()
+        return (
+            f"""{column} IN (
+                SELECT row_id FROM raw_change_log
+                WHERE table_name = ? AND change_id > ? AND change_id <= ?
+                AND op IN ({', '.join('?' * len(self.ops))})
+            )""",
+            (self.table_name, self.after_change_id, self.upto_change_id, *self.ops),
+        )
+
+    def count(self, cursor: sqlite3.Cursor) -> Optional[int]:
+        """Number of changed rows, None for a full run."""
+        if self.full:
+            return None
+        condition, params = self.row_filter()
+        cursor.execute(f"SELECT COUNT(*) FROM {self.table_name} WHERE {condition}", params)
+        return cursor.fetchone()[0]
+
+    def describe(self, cursor: sqlite3.Cursor) -> str:
+        if self.full:
+            return f"all rows of {self.table_name} (full)"
+        return f"{self.count(cursor):,} changed rows of {self.table_name} since change {self.after_change_id}"
+
+    def advance(self, cursor: sqlite3.Cursor) -> int:
+        """
+        Mark the changes up to upto_change_id as processed by the consumer and drop the log
+        entries every consumer of the table has processed. Returns the number of entries dropped.
+        """
+        cursor.execute("""
+            INSERT INTO raw_change_watermark (consumer, table_name, last_change_id)
+            VALUES (?, ?, ?)
+            ON CONFLICT (consumer) DO UPDATE SET
+                table_name      = excluded.table_name,
+                last_change_id  = MAX(raw_change_watermark.last_change_id, excluded.last_change_id),
+                row_updated     = CURRENT_TIMESTAMP
+        """, (self.consumer, self.table_name, self.upto_change_id))
+        cursor.execute("""
+            DELETE FROM raw_change_log
+            WHERE table_name = ?
+            AND change_id <= (SELECT MIN(last_change_id) FROM raw_change_watermark WHERE table_name = ?)
+        """, (self.table_name, self.table_name))
+        return cursor.rowcount
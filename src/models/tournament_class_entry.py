@@ -124,6 +124,16 @@ class TournamentClassEntry(CacheMixin):
         cols = [col[0] for col in cursor.description]
         return [{col: val for col, val in zip(cols, rec)} for rec in cursor.fetchall()]
 
+    @classmethod
+    def count_for_class(cls, cursor: sqlite3.Cursor, tournament_class_id: int) -> int:
+        """Number of entries for a class (what remove_for_class would delete)."""
+        cursor.execute("""
+            SELECT COUNT(*)
+            FROM tournament_class_entry
+            WHERE tournament_class_id = ?
+        """, (tournament_class_id,))
+        return cursor.fetchone()[0]
+
     @classmethod
     def remove_for_class(cls, cursor: sqlite3.Cursor, tournament_class_id: int) -> int:
         """
@@ -32,6 +32,7 @@ class TournamentClassEntryRaw(CacheMixin):
     @classmethod
     def from_dict(cls, data: dict) -> "TournamentClassEntryRaw":
         return cls(
+            row_id                      = data.get("row_id"),
             tournament_id_ext           = data.get("tournament_id_ext"),
             tournament_class_id_ext     = data.get("tournament_class_id_ext"),
             tournament_player_id_ext    = data.get("tournament_player_id_ext"),
@@ -75,6 +75,17 @@ class TournamentClassMatch:
         """, (tournament_class_group_id, tournament_class_id, tournament_class_match_id_ext))
         return cursor.rowcount
     
+    @classmethod
+    def count_for_class(cls, cursor: sqlite3.Cursor, tournament_class_id: int) -> int:
+        """Number of resolved matches for a class (what remove_for_class would delete)."""
+        cursor.execute("""
+            SELECT COUNT(DISTINCT match_id)
+            FROM tournament_class_match
+            WHERE tournament_class_id = ?
+              AND match_id IS NOT NULL
+        """, (tournament_class_id,))
+        return cursor.fetchone()[0]
+
     @classmethod
     def remove_for_class(cls, cursor: sqlite3.Cursor, tournament_class_id: int) -> int:
         """
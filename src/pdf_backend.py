@@ -0,0 +1,357 @@
+# src/pdf_backend.py
+"""
+PDF text backends behind the part of the pdfplumber API the parsers use.
+
+open_pdf(data, backend) returns a document with .pages and close(). Every page has width, height,
+chars, extract_words(...), extract_text(...), crop(bbox), lines and rects, and hands out chars and
+words in pdfplumber's dict shape (text, x0, x1, top, bottom, ...; top/bottom measured from the top
+of the page).
+
+Backends (config.PDF_BACKEND per run, or the backend argument of open_pdf / ClassPdfSession):
+- "pdfplumber": pdfplumber itself (pdfminer.six layout analysis, pure Python). The reference.
+- "pdfium":     pypdfium2 (PDFium, C++). Chars come from PDFium's text page; words and text are
+                grouped from them with pdfplumber's rules (same tolerances and options). Several
+                times faster. Upright text only; lines and rects are not extracted (empty lists).
+
+utils_scripts/check_pdf_backend_parity.py diffs the word streams and parsed results of a backend
+against pdfplumber over the cached PDFs.
+"""
+
+import ctypes
+from itertools import groupby
+import logging
+import math
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import PDF_BACKEND
+
+BACKENDS = ("pdfplumber", "pdfium")
+
+LIGATURES = {"ﬀ": "ff", "ﬃ": "ffi", "ﬄ": "ffl", "ﬁ": "fi", "ﬂ": "fl", "ﬆ": "st", "ﬅ": "st"}
+
+_warned_fallback = False
+
+
+def open_pdf(data: bytes, backend: Optional[str] = None):
+    """Open PDF bytes with the given backend (default config.PDF_BACKEND)."""
+    global _warned_fallback
+    backend = backend or PDF_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{backend}', expected one of {BACKENDS}")
+
+    if backend == "pdfium":
+        try:
+            return PdfiumDocument(data)
+        except ImportError as e:
+            if not _warned_fallback:
+                logging.warning(f"PDF backend 'pdfium' unavailable ({e}), using pdfplumber")
+                _warned_fallback = True
+
+    import io
+    import pdfplumber
+    return pdfplumber.open(io.BytesIO(data))
+
+
+# ────────────────────────────────────────────────────────────────────
+# pdfplumber-compatible pages built from chars
+# ────────────────────────────────────────────────────────────────────
+
+class CharPage:
+    """A page given as pdfplumber-shaped chars; words and text are grouped like pdfplumber does."""
+
+    def __init__(self, chars: List[dict], width: float, height: float, page_number: int):
+        self._chars      = chars
+        self.width       = width
+        self.height      = height
+        self.page_number = page_number
+        self.lines:      List[dict] = []
+        self.rects:      List[dict] = []
+
+    @property
+    def chars(self) -> List[dict]:
+        return self._chars
+
+    def crop(self, bbox: Tuple[float, float, float, float]) -> "CharPage":
+        """Chars overlapping bbox (x0, top, x1, bottom), clipped to it (pdfplumber's Page.crop)."""
+        bx0, btop, bx1, bbottom = bbox
+        cropped = []
+        for c in self.chars:
+            x0, x1 = max(c["x0"], bx0), min(c["x1"], bx1)
+            top, bottom = max(c["top"], btop), min(c["bottom"], bbottom)
+            if x1 < x0 or bottom < top or (x1 == x0 and bottom == top):
+                continue
+            clipped = dict(c, x0=x0, x1=x1, top=top, bottom=bottom, width=x1 - x0, height=bottom - top)
+            clipped["doctop"] = c["doctop"] + (top - c["top"])
+            cropped.append(clipped)
+        return CharPage(cropped, self.width, self.height, self.page_number)
+
+    def extract_words(
+        self,
+        x_tolerance:            float = 3,
+        y_tolerance:            float = 3,
+        keep_blank_chars:       bool = False,
+        use_text_flow:          bool = False,
+        extra_attrs:            Optional[Sequence[str]] = None,
+        split_at_punctuation:   Any = False,
+        expand_ligatures:       bool = True,
+        **_ignored,
+    ) -> List[dict]:
+        return [
+            word for word, _chars in _iter_words(
+                self.chars, x_tolerance, y_tolerance, keep_blank_chars, use_text_flow,
+                list(extra_attrs or []), split_at_punctuation, expand_ligatures,
+            )
+        ]
+
+    def extract_text(self, x_tolerance: float = 3, y_tolerance: float = 3, **_ignored) -> str:
+        """Non-layout text: words joined by spaces, lines (clustered on top) by newlines."""
+        words = self.extract_words(x_tolerance=x_tolerance, y_tolerance=y_tolerance)
+        lines = _cluster_objects(words, "top", y_tolerance)
+        return "\n".join(" ".join(w["text"] for w in sorted(line, key=itemgetter("x0"))) for line in lines)
+
+
+def _cluster_objects(objs: List[dict], key: str, tolerance: float) -> List[List[dict]]:
+    """pdfplumber.utils.cluster_objects: objects grouped by chains of key values within tolerance."""
+    values = sorted({obj[key] for obj in objs})
+    cluster_of: Dict[float, int] = {}
+    cluster, last = 0, None
+    for value in values:
+        if last is not None and (tolerance == 0 or value > last + tolerance):
+            cluster += 1
+        cluster_of[value] = cluster
+        last = value
+    ordered = sorted(objs, key=lambda obj: cluster_of[obj[key]])
+    return [list(group) for _, group in groupby(ordered, key=lambda obj: cluster_of[obj[key]])]
+
+
+def _iter_words(chars, x_tolerance, y_tolerance, keep_blank_chars, use_text_flow, extra_attrs, split_at_punctuation, expand_ligatures):
+    """pdfplumber's WordExtractor for upright left-to-right text."""
+    if split_at_punctuation is True:
+        import string
+        split_at_punctuation = string.punctuation
+    punctuation = split_at_punctuation or ""
+
+    for _, group in groupby(chars, key=itemgetter("upright", *extra_attrs)):
+        group = list(group)
+        if use_text_flow:
+            lines = [group]
+        else:
+            lines = [sorted(line, key=lambda c: (c["x0"], c["x1"])) for line in _cluster_objects(group, "top", y_tolerance)]
+
+        for line in lines:
+            current: List[dict] = []
+            for char in line:
+                text = char["text"]
+                if not keep_blank_chars and text.isspace():
+                    if current:
+                        yield _merge_chars(current, extra_attrs, expand_ligatures), current
+                    current = []
+                elif text in punctuation:
+                    if current:
+                        yield _merge_chars(current, extra_attrs, expand_ligatures), current
+                    yield _merge_chars([char], extra_attrs, expand_ligatures), [char]
+                    current = []
+                elif current and _begins_new_word(current[-1], char, x_tolerance, y_tolerance):
+                    yield _merge_chars(current, extra_attrs, expand_ligatures), current
+                    current = [char]
+                else:
+                    current.append(char)
+            if current:
+                yield _merge_chars(current, extra_attrs, expand_ligatures), current
+
+
+def _begins_new_word(prev: dict, curr: dict, x_tolerance: float, y_tolerance: float) -> bool:
+    return curr["x0"] < prev["x0"] or curr["x0"] > prev["x1"] + x_tolerance or curr["top"] > prev["top"] + y_tolerance
+
+
+def _merge_chars(chars: List[dict], extra_attrs: List[str], expand_ligatures: bool) -> dict:
+    x0 = min(c["x0"] for c in chars)
+    x1 = max(c["x1"] for c in chars)
+    top = min(c["top"] for c in chars)
+    bottom = max(c["bottom"] for c in chars)
+    text = "".join(LIGATURES.get(c["text"], c["text"]) if expand_ligatures else c["text"] for c in chars)
+    word = {
+        "text":         text,
+        "x0":           x0,
+        "x1":           x1,
+        "top":          top,
+        "doctop":       top + (chars[0]["doctop"] - chars[0]["top"]),
+        "bottom":       bottom,
+        "upright":      chars[0]["upright"],
+        "height":       bottom - top,
+        "width":        x1 - x0,
+        "direction":    "ltr",
+    }
+    for attr in extra_attrs:
+        word[attr] = chars[0][attr]
+    return word
+
+
+# ────────────────────────────────────────────────────────────────────
+# pypdfium2
+# ────────────────────────────────────────────────────────────────────
+
+class PdfiumDocument:
+    def __init__(self, data: bytes):
+        import pypdfium2
+
+        self._pdf  = pypdfium2.PdfDocument(data)
+        self._pages: Optional[List[PdfiumPage]] = None
+
+    @property
+    def pages(self) -> List["PdfiumPage"]:
+        if self._pages is None:
+            pages, doctop = [], 0.0
+            for i in range(len(self._pdf)):
+                page = PdfiumPage(self._pdf[i], i + 1, doctop)
+                doctop += page.height
+                pages.append(page)
+            self._pages = pages
+        return self._pages
+
+    def close(self) -> None:
+        for page in self._pages or []:
+            page.close()
+        self._pdf.close()
+
+    def __enter__(self) -> "PdfiumDocument":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+class PdfiumPage(CharPage):
+    def __init__(self, page, page_number: int, doctop: float):
+        width, height = page.get_size()
+        super().__init__(None, width, height, page_number)
+        self._page   = page
+        self._doctop = doctop
+
+    @property
+    def chars(self) -> List[dict]:
+        if self._chars is None:
+            self._chars = _pdfium_chars(self._page, self.height, self._doctop)
+        return self._chars
+
+    def close(self) -> None:
+        self._page.close()
+
+
+def _pdfium_chars(page, height: float, doctop: float) -> List[dict]:
+    """
+    Chars of a PDFium text page with pdfminer's boxes: x0 at the glyph origin, x1 = x0 + the glyph's
+    advance width, bottom at baseline + font descent, height = font size (PDFium's own char boxes
+    follow the glyph outlines, and its loose boxes reach into the next word's gap).
+    """
+    import pypdfium2.raw as pdfium_c
+
+    textpage = page.get_textpage()
+    raw = textpage.raw
+    font_buf = ctypes.create_string_buffer(256)
+    origin_x, origin_y = ctypes.c_double(), ctypes.c_double()
+    descent = ctypes.c_float()
+    advance = ctypes.c_float()
+    descents: Dict[Tuple[int, float], float] = {}      # (font handle, size) → descent
+    advances: Dict[Tuple[int, float, int], float] = {}  # (font handle, size, code) → advance width
+    chars: List[dict] = []
+    indices: List[int] = []                             # text page index of each char
+    try:
+        count = textpage.count_chars()
+        i = 0
+        while i < count:
+            index, i = i, i + 1
+            # Spaces/line breaks PDFium inserts itself have no glyph in the page
+            if pdfium_c.FPDFText_IsGenerated(raw, index) == 1:
+                continue
+            code = pdfium_c.FPDFText_GetUnicode(raw, index)
+            if code == 0 or code in (0x0D, 0x0A, 0xFFFE):
+                continue
+            if 0xD800 <= code < 0xDC00 and i < count:
+                low = pdfium_c.FPDFText_GetUnicode(raw, i)
+                if 0xDC00 <= low < 0xE000:
+                    code, i = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00), i + 1
+            # PDFium reports a hyphen at the end of a line as 0x02
+            if code == 0x02:
+                code = 0x2D
+            pdfium_c.FPDFText_GetCharOrigin(raw, index, origin_x, origin_y)
+            size = pdfium_c.FPDFText_GetFontSize(raw, index)
+
+            font = pdfium_c.FPDFTextObj_GetFont(pdfium_c.FPDFText_GetTextObject(raw, index))
+            key = (ctypes.cast(font, ctypes.c_void_p).value or 0, size)
+            if key not in descents:
+                ok = font and pdfium_c.FPDFFont_GetDescent(font, ctypes.c_float(size), descent)
+                descents[key] = descent.value if ok else -0.2 * size
+            if key + (code,) not in advances:
+                ok = font and pdfium_c.FPDFFont_GetGlyphWidth(font, code, ctypes.c_float(size), advance)
+                advances[key + (code,)] = advance.value if ok else 0.0
+            fontname = ""
+            if pdfium_c.FPDFText_GetFontInfo(raw, index, font_buf, len(font_buf), None):
+                fontname = font_buf.value.decode("utf-8", "replace")
+            angle = pdfium_c.FPDFText_GetCharAngle(raw, index)
+
+            x0 = origin_x.value
+            if advances[key + (code,)] > 0:
+                x1 = x0 + advances[key + (code,)]
+            else:
+                # No width for the code in the font's encoding (e.g. some Type 1 hyphens): loose box
+                _left, _bottom, right, _top = textpage.get_charbox(index, loose=True)
+                x1 = max(right, x0)
+            bottom = height - (origin_y.value + descents[key])
+            top = bottom - size
+            chars.append({
+                "text":         chr(code),
+                "fontname":     fontname,
+                "size":         size,
+                "x0":           x0,
+                "x1":           x1,
+                "top":          top,
+                "bottom":       bottom,
+                "doctop":       doctop + top,
+                "width":        x1 - x0,
+                "height":       size,
+                "upright":      angle < 0 or min(angle, 2 * math.pi - angle) < 1e-3,    # -1: unknown
+            })
+            indices.append(index)
+        _widen_ligatures(textpage, chars, indices)
+    finally:
+        textpage.close()
+    return _restore_collapsed_spaces(chars)
+
+
+def _widen_ligatures(textpage, chars: List[dict], indices: List[int]) -> None:
+    """
+    PDFium splits a ligature glyph (fi, fl, ffi) into one char per letter, all at the glyph's
+    origin. Give each of them the ligature's width (its loose box) instead of their letter's.
+    """
+    for n in range(len(chars) - 1):
+        char, following = chars[n], chars[n + 1]
+        if char["x0"] != following["x0"] or char["bottom"] != following["bottom"]:
+            continue
+        for m in (n, n + 1):
+            _left, _bottom, right, _top = textpage.get_charbox(indices[m], loose=True)
+            chars[m]["x1"] = max(right, chars[m]["x0"])
+            chars[m]["width"] = chars[m]["x1"] - chars[m]["x0"]
+
+
+def _restore_collapsed_spaces(chars: List[dict]) -> List[dict]:
+    """
+    PDFium's text page keeps one char of a run of spaces. A gap after a space that is a whole number
+    of that space's widths is such a run: put the spaces back (pdfplumber sees each of them, which
+    matters for keep_blank_chars=True).
+    """
+    restored: List[dict] = []
+    for char, following in zip(chars, chars[1:] + [None]):
+        restored.append(char)
+        if following is None or char["text"] != " " or char["width"] <= 0 or following["bottom"] != char["bottom"]:
+            continue
+        runs = (following["x0"] - char["x1"]) / char["width"]
+        missing = round(runs)
+        if missing < 1 or abs(runs - missing) > 0.01:
+            continue
+        for n in range(1, missing + 1):
+            shift = n * char["width"]
+            restored.append(dict(char, x0=char["x0"] + shift, x1=char["x1"] + shift))
+    return restored
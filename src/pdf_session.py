@@ -0,0 +1,167 @@
+# src/pdf_session.py
+"""
+Per-class PDF document sessions.
+
+The stage PDFs of a class are read by several parsers in one run:
+- scrape_tournament_class_entries_ondata: stage 1, stage 2 and the final stage (4/5/6)
+- scrape_tournament_class_group_matches_ondata: stage 3, and stage 4 when a pool has walkovers
+- scrape_tournament_class_knockout_matches_ondata: stage 5
+- resolve_tournament_classes: stage 4/3 for group structure refinement
+
+A ClassPdfSession loads each stage once (download/cache lookup, file read, document opened with
+the PDF backend of the run, see pdf_backend.py) and memoizes what the parsers extract from it: page words per extract_words() options, page
+text, lines, rects and page sizes. Extractions are handed out as copies, so parsers can sort
+and annotate them freely.
+
+Parsers get the session of the class they are working on from class_pdf_session(). The
+scrapers handle one class at a time, so asking for another class releases the open documents
+of the previous one; release_pdf_sessions() closes whatever is still open when a pass is done.
+The extractions of the last PDF_SESSION_CACHE_CLASSES classes are kept, so a later pass over
+the same classes in the run doesn't parse their PDFs again.
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import PDF_BACKEND, PDF_SESSION_CACHE_CLASSES
+from pdf_backend import open_pdf
+from utils import _download_pdf_ondata_by_tournament_class_and_stage
+
+
+class ClassPdfSession:
+    def __init__(self, tournament_id_ext: str, class_id_ext: str, backend: Optional[str] = None):
+        self.tournament_id_ext  = tournament_id_ext
+        self.class_id_ext       = class_id_ext
+        self.backend            = backend or PDF_BACKEND
+        self._downloads:        Dict[int, Tuple[Optional[Path], bool, Optional[str]]] = {}
+        self._bytes:            Dict[int, bytes] = {}
+        self._md5:              Dict[int, str] = {}
+        self._docs:             Dict[int, Any] = {}           # stage → open document
+        self._extracted:        Dict[Tuple, Any] = {}         # (kind, stage, options) → per-page results
+
+    # ────────────────────────────────────────────────────────────────────
+    # Files
+    # ────────────────────────────────────────────────────────────────────
+
+    def download(self, stage: int, force_download: bool = False) -> Tuple[Optional[Path], bool, Optional[str]]:
+        """_download_pdf_ondata_by_tournament_class_and_stage, once per stage (failures are retried)."""
+        result = self._downloads.get(stage)
+        if result is None:
+            result = _download_pdf_ondata_by_tournament_class_and_stage(
+                tournament_id_ext   = self.tournament_id_ext,
+                class_id_ext        = self.class_id_ext,
+                stage               = stage,
+                force_download      = force_download,
+            )
+            if result[0] is None:
+                return result
+            self._downloads[stage] = result
+        return result
+
+    def path(self, stage: int) -> Optional[Path]:
+        return self.download(stage)[0]
+
+    def bytes(self, stage: int) -> Optional[bytes]:
+        if stage not in self._bytes:
+            path = self.path(stage)
+            if path is None:
+                return None
+            with open(path, "rb") as f:
+                self._bytes[stage] = f.read()
+        return self._bytes[stage]
+
+    def md5(self, stage: int) -> Optional[str]:
+        if stage not in self._md5:
+            data = self.bytes(stage)
+            if data is None:
+                return None
+            self._md5[stage] = hashlib.md5(data).hexdigest()
+        return self._md5[stage]
+
+    def document(self, stage: int):
+        """The stage's document (pdfplumber API); stays open (with its parsed pages) until release()."""
+        if stage not in self._docs:
+            data = self.bytes(stage)
+            if data is None:
+                raise FileNotFoundError(f"No PDF for stage {stage} (tid_ext {self.tournament_id_ext}, cid_ext {self.class_id_ext})")
+            self._docs[stage] = open_pdf(data, self.backend)
+        return self._docs[stage]
+
+    @contextmanager
+    def open(self, stage: int):
+        """Stand-in for `with pdfplumber.open(path) as pdf:` that leaves the document open for the next parser."""
+        yield self.document(stage)
+
+    # ────────────────────────────────────────────────────────────────────
+    # Extractions (copies of the memoized per-page results)
+    # ────────────────────────────────────────────────────────────────────
+
+    def _extract(self, kind: str, stage: int, options: Dict[str, Any], extract: Callable[[Any], Any]) -> List:
+        key = (kind, stage, _freeze(options))
+        if key not in self._extracted:
+            self._extracted[key] = [extract(page) for page in self.document(stage).pages]
+        return self._extracted[key]
+
+    def words(self, stage: int, **options) -> List[List[dict]]:
+        """page.extract_words(**options) for every page."""
+        pages = self._extract("words", stage, options, lambda page: page.extract_words(**options) or [])
+        return [[dict(w) for w in words] for words in pages]
+
+    def text(self, stage: int, **options) -> List[str]:
+        """page.extract_text(**options) for every page ('' for pages without text)."""
+        return list(self._extract("text", stage, options, lambda page: page.extract_text(**options) or ""))
+
+    def lines(self, stage: int) -> List[List[dict]]:
+        pages = self._extract("lines", stage, {}, lambda page: page.lines)
+        return [[dict(obj) for obj in objs] for objs in pages]
+
+    def rects(self, stage: int) -> List[List[dict]]:
+        pages = self._extract("rects", stage, {}, lambda page: page.rects)
+        return [[dict(obj) for obj in objs] for objs in pages]
+
+    def page_sizes(self, stage: int) -> List[Tuple[float, float]]:
+        return list(self._extract("size", stage, {}, lambda page: (page.width, page.height)))
+
+    def release(self) -> None:
+        """Close the open documents and drop the file contents; downloads and extractions are kept."""
+        for doc in self._docs.values():
+            try:
+                doc.close()
+            except Exception:
+                pass
+        self._docs.clear()
+        self._bytes.clear()
+
+
+def _freeze(options: Dict[str, Any]) -> Tuple:
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in options.items()))
+
+
+# ────────────────────────────────────────────────────────────────────
+# Sessions of the current run
+# ────────────────────────────────────────────────────────────────────
+
+_sessions: "OrderedDict[Tuple[str, str], ClassPdfSession]" = OrderedDict()     # least recently used first
+
+
+def class_pdf_session(tournament_id_ext: str, class_id_ext: str) -> ClassPdfSession:
+    """Session for a class; releases the session of the class handled before it."""
+    key = (tournament_id_ext, class_id_ext)
+    session = _sessions.pop(key, None)
+    if _sessions:
+        next(reversed(_sessions.values())).release()
+    if session is None:
+        session = ClassPdfSession(*key)
+    _sessions[key] = session
+    while len(_sessions) > max(PDF_SESSION_CACHE_CLASSES, 1):
+        _sessions.popitem(last=False)[1].release()
+    return session
+
+
+def release_pdf_sessions() -> None:
+    """Close every open document (end of a pass); extractions stay cached for the rest of the run."""
+    for session in _sessions.values():
+        session.release()
@@ -0,0 +1,419 @@
+# src/pdf_store.py
+"""
+Content-addressed store for the OnData class PDFs, with a manifest database.
+
+Each PDF is stored once, by content, as PDF_CACHE_DIR/objects/<sha256[:2]>/<sha256>.pdf. The paths
+the parsers read (tournament_<tid>/class_<cid>/stage_<n>.pdf) are hardlinks to it (copies where the
+file system has no hardlinks), so identical PDFs (empty stages, classes published twice) are kept once.
+
+The manifest (PDF_CACHE_DIR/manifest.db, SQLite) has a row per class stage that was fetched:
+path, sha256, size, fetched_at, validated_at and the HTTP metadata of the last fetch, or the HTTP
+status / error when OnData had no PDF for it. Single lookups check that the file is still there; the
+bulk "what's present, missing or stale" queries are answered from it alone, without stat-ing the files. sync() reconciles the
+manifest with the directory: adopts PDFs saved without it, forgets deleted ones, drops unused objects.
+"""
+
+from dataclasses import dataclass
+import hashlib
+import os
+from pathlib import Path
+import shutil
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config import PDF_CACHE_DIR
+
+PDF_URL = "https://resultat.ondata.se/ViewClassPDF.php"
+MANIFEST_NAME = "manifest.db"
+OBJECTS_DIR = "objects"
+
+Target = Tuple[str, str, int]       # (tournament_id_ext, class_id_ext, stage)
+
+
+@dataclass
+class PdfFile:
+    tournament_id_ext:      str
+    class_id_ext:           str
+    stage:                  int
+    path:                   Optional[str]       # relative to the store root, None when no PDF is available
+    sha256:                 Optional[str]
+    size:                   Optional[int]
+    fetched_at:             Optional[str]
+    validated_at:           Optional[str]
+    checked_at:             Optional[str]
+    http_status:            Optional[int]
+    http_etag:              Optional[str]
+    http_last_modified:     Optional[str]
+    http_content_type:      Optional[str]
+    error:                  Optional[str]
+
+
+COLUMNS = [name for name in PdfFile.__dataclass_fields__]
+
+
+class PdfStore:
+    def __init__(self, root: Optional[Path] = None):
+        self.root       = Path(root if root is not None else PDF_CACHE_DIR)
+        self.db_path    = self.root / MANIFEST_NAME
+        self._conn:     Optional[sqlite3.Connection] = None
+        self._pid:      Optional[int] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Manifest connection of this process (reopened in forked workers)."""
+        if self._conn is None or self._pid != os.getpid():
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            conn.execute("PRAGMA temp_store = MEMORY;")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pdf_file (
+                    tournament_id_ext   TEXT NOT NULL,
+                    class_id_ext        TEXT NOT NULL,
+                    stage               INTEGER NOT NULL,
+                    path                TEXT,                   -- Relative to the store root, NULL when OnData has no PDF
+                    sha256              TEXT,
+                    size                INTEGER,
+                    fetched_at          TIMESTAMP,              -- Last download (or adoption) of the PDF, UTC
+                    validated_at        TIMESTAMP,              -- Last %PDF- header and hash check, UTC
+                    checked_at          TIMESTAMP NOT NULL,     -- Last lookup at OnData (or adoption), UTC
+                    http_status         INTEGER,
+                    http_etag           TEXT,
+                    http_last_modified  TEXT,
+                    http_content_type   TEXT,
+                    error               TEXT,
+                    PRIMARY KEY (tournament_id_ext, class_id_ext, stage)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pdf_file_sha256 ON pdf_file(sha256)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    # ────────────────────────────────────────────────────────────────────
+    # Paths
+    # ────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def relative_path(tournament_id_ext: str, class_id_ext: str, stage: int) -> str:
+        return f"tournament_{tournament_id_ext}/class_{class_id_ext}/stage_{stage}.pdf"
+
+    def object_path(self, sha256: str) -> Path:
+        return self.root / OBJECTS_DIR / sha256[:2] / f"{sha256}.pdf"
+
+    # ────────────────────────────────────────────────────────────────────
+    # Single stages
+    # ────────────────────────────────────────────────────────────────────
+
+    def get(self, tournament_id_ext: str, class_id_ext: str, stage: int) -> Optional[PdfFile]:
+        row = self.conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM pdf_file WHERE tournament_id_ext = ? AND class_id_ext = ? AND stage = ?",
+            (tournament_id_ext, class_id_ext, stage),
+        ).fetchone()
+        return PdfFile(*row) if row else None
+
+    def path(self, tournament_id_ext: str, class_id_ext: str, stage: int) -> Optional[Path]:
+        """
+        Path of the stored PDF (None if there is none). A file deleted behind the manifest's back is
+        forgotten, so the caller adopts or fetches it again instead of getting a path that isn't there.
+        """
+        row = self.conn.execute(
+            "SELECT path FROM pdf_file WHERE tournament_id_ext = ? AND class_id_ext = ? AND stage = ?",
+            (tournament_id_ext, class_id_ext, stage),
+        ).fetchone()
+        if not row or not row[0]:
+            return None
+        path = self.root / row[0]
+        if not path.exists():
+            self.forget(tournament_id_ext, class_id_ext, stage)
+            return None
+        return path
+
+    def forget(self, tournament_id_ext: str, class_id_ext: str, stage: int) -> None:
+        """Clear the stored PDF of a stage whose file is gone (its fetch history is kept)."""
+        self.conn.execute(
+            "UPDATE pdf_file SET path = NULL, sha256 = NULL, size = NULL, error = 'File removed from cache' "
+            "WHERE tournament_id_ext = ? AND class_id_ext = ? AND stage = ?",
+            (tournament_id_ext, class_id_ext, stage),
+        )
+
+    def put(self, tournament_id_ext: str, class_id_ext: str, stage: int, data: bytes, http: Optional[Dict] = None) -> Path:
+        """Store PDF bytes for a stage (shared with identical PDFs) and record them in the manifest."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        obj = self.object_path(sha256)
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            tmp = obj.with_name(f"{obj.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, obj)
+
+        rel = self.relative_path(tournament_id_ext, class_id_ext, stage)
+        self._link(obj, self.root / rel)
+        http = http or {}
+        self.conn.execute(f"""
+            INSERT INTO pdf_file ({', '.join(COLUMNS)})
+            VALUES (?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'), datetime('now'), ?, ?, ?, ?, NULL)
+            ON CONFLICT (tournament_id_ext, class_id_ext, stage) DO UPDATE SET
+                path = excluded.path, sha256 = excluded.sha256, size = excluded.size,
+                fetched_at = excluded.fetched_at, validated_at = excluded.validated_at, checked_at = excluded.checked_at,
+                http_status = excluded.http_status, http_etag = excluded.http_etag,
+                http_last_modified = excluded.http_last_modified, http_content_type = excluded.http_content_type,
+                error = NULL
+        """, (
+            tournament_id_ext, class_id_ext, stage, rel, sha256, len(data),
+            http.get("status"), http.get("etag"), http.get("last_modified"), http.get("content_type"),
+        ))
+        return self.root / rel
+
+    def record_unavailable(self, tournament_id_ext: str, class_id_ext: str, stage: int, http_status: Optional[int], error: str) -> None:
+        """OnData had no PDF for the stage; a PDF stored earlier is kept."""
+        self.conn.execute("""
+            INSERT INTO pdf_file (tournament_id_ext, class_id_ext, stage, checked_at, http_status, error)
+            VALUES (?, ?, ?, datetime('now'), ?, ?)
+            ON CONFLICT (tournament_id_ext, class_id_ext, stage) DO UPDATE SET
+                checked_at = excluded.checked_at, http_status = excluded.http_status, error = excluded.error
+        """, (tournament_id_ext, class_id_ext, stage, http_status, error))
+
+    def fetch(self, tournament_id_ext: str, class_id_ext: str, stage: int, timeout: float = 20, raise_errors: bool = False) -> Tuple[Optional[Path], bool, str]:
+        """
+        Download a stage PDF from OnData into the store. Returns (path, downloaded, message) like
+        utils._download_pdf_ondata_by_tournament_class_and_stage. A stored PDF is revalidated with
+        If-None-Match / If-Modified-Since when its last fetch sent an ETag / Last-Modified.
+        Network errors are returned as a message (raised with raise_errors) and not recorded.
+        """
+        import requests
+        from utils import _format_size
+
+        url = f"{PDF_URL}?tournamentID={tournament_id_ext}&classID={class_id_ext}&stage={stage}"
+        known = self.get(tournament_id_ext, class_id_ext, stage)
+        headers = {}
+        if known and known.path:
+            if known.http_etag:
+                headers["If-None-Match"] = known.http_etag
+            if known.http_last_modified:
+                headers["If-Modified-Since"] = known.http_last_modified
+
+        try:
+            resp = requests.get(url, timeout=timeout, headers=headers)
+        except Exception as e:
+            if raise_errors:
+                raise
+            return None, False, f"Failed to download PDF from {url}: {e}"
+
+        if resp.status_code == 304 and known and known.path:
+            self.conn.execute(
+                "UPDATE pdf_file SET checked_at = datetime('now'), fetched_at = datetime('now'), http_status = 304 "
+                "WHERE tournament_id_ext = ? AND class_id_ext = ? AND stage = ?",
+                (tournament_id_ext, class_id_ext, stage),
+            )
+            return self.root / known.path, False, f"Cached PDF used (not modified): {self.root / known.path}"
+
+        if resp.status_code != 200 or not resp.content.startswith(b"%PDF-"):
+            message = f"No valid PDF for stage {stage} (status: {resp.status_code})"
+            self.record_unavailable(tournament_id_ext, class_id_ext, stage, resp.status_code, message)
+            return None, False, message
+
+        path = self.put(tournament_id_ext, class_id_ext, stage, resp.content, http={
+            "status":           resp.status_code,
+            "etag":             resp.headers.get("ETag"),
+            "last_modified":    resp.headers.get("Last-Modified"),
+            "content_type":     resp.headers.get("Content-Type"),
+        })
+        return path, True, f"Downloaded PDF: {path} ({_format_size(len(resp.content))})"
+
+    def adopt(self, tournament_id_ext: str, class_id_ext: str, stage: int) -> Optional[Path]:
+        """Take a PDF saved at the stage's path without the manifest into the store (invalid files are removed)."""
+        path = self.root / self.relative_path(tournament_id_ext, class_id_ext, stage)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        if not data.startswith(b"%PDF-"):
+            path.unlink(missing_ok=True)
+            return None
+        return self.put(tournament_id_ext, class_id_ext, stage, data)
+
+    def _link(self, obj: Path, path: Path) -> None:
+        if path.exists():
+            try:
+                if os.path.samefile(obj, path):
+                    return
+            except OSError:
+                pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.unlink(missing_ok=True)
+        try:
+            os.link(obj, tmp)
+        except OSError:
+            shutil.copyfile(obj, tmp)
+        os.replace(tmp, path)
+
+    # ────────────────────────────────────────────────────────────────────
+    # Bulk queries
+    # ────────────────────────────────────────────────────────────────────
+
+    def _load_targets(self, targets: Iterable[Target]) -> None:
+        self.conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS pdf_target (
+                tournament_id_ext TEXT NOT NULL, class_id_ext TEXT NOT NULL, stage INTEGER NOT NULL,
+                PRIMARY KEY (tournament_id_ext, class_id_ext, stage)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("DELETE FROM pdf_target")
+        self.conn.executemany("INSERT OR IGNORE INTO pdf_target VALUES (?, ?, ?)", ((str(t), str(c), int(s)) for t, c, s in targets))
+
+    def _query_targets(self, targets: Iterable[Target], where: str, params: Tuple = ()) -> List[Target]:
+        self._load_targets(targets)
+        rows = self.conn.execute(f"""
+            SELECT t.tournament_id_ext, t.class_id_ext, t.stage
+            FROM pdf_target t
+            LEFT JOIN pdf_file f USING (tournament_id_ext, class_id_ext, stage)
+            WHERE {where}
+            ORDER BY t.tournament_id_ext, t.class_id_ext, t.stage
+        """, params).fetchall()
+        return [(t, c, s) for t, c, s in rows]
+
+    def present(self, targets: Iterable[Target]) -> List[Target]:
+        """Targets with a stored PDF."""
+        return self._query_targets(targets, "f.path IS NOT NULL")
+
+    def missing(self, targets: Iterable[Target], recheck_after_days: Optional[float] = None) -> List[Target]:
+        """
+        Targets without a stored PDF. With recheck_after_days, stages OnData had no PDF for less than
+        that many days ago are left out.
+        """
+        if recheck_after_days is None:
+            return self._query_targets(targets, "f.path IS NULL")
+        return self._query_targets(
+            targets,
+            "f.path IS NULL AND (f.checked_at IS NULL OR f.checked_at < datetime('now', ?))",
+            (f"-{recheck_after_days} days",),
+        )
+
+    def stale(self, targets: Iterable[Target], older_than_days: float) -> List[Target]:
+        """Targets whose stored PDF was fetched more than older_than_days ago."""
+        return self._query_targets(
+            targets,
+            "f.path IS NOT NULL AND f.fetched_at < datetime('now', ?)",
+            (f"-{older_than_days} days",),
+        )
+
+    def files(
+        self,
+        stages:             Optional[Iterable[int]] = None,
+        tournament_min:     Optional[int] = None,
+        tournament_max:     Optional[int] = None,
+    ) -> List[PdfFile]:
+        """Stored PDFs, optionally by stage and numeric tournament id range, most recently fetched first."""
+        where, params = ["path IS NOT NULL"], []
+        if stages:
+            stages = sorted(set(stages))
+            where.append(f"stage IN ({', '.join('?' * len(stages))})")
+            params.extend(stages)
+        if tournament_min is not None:
+            where.append("CAST(tournament_id_ext AS INTEGER) >= ?")
+            params.append(tournament_min)
+        if tournament_max is not None:
+            where.append("CAST(tournament_id_ext AS INTEGER) <= ?")
+            params.append(tournament_max)
+        rows = self.conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM pdf_file WHERE {' AND '.join(where)} ORDER BY fetched_at DESC, path",
+            params,
+        ).fetchall()
+        return [PdfFile(*row) for row in rows]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM pdf_file WHERE path IS NOT NULL").fetchone()[0]
+
+    # ────────────────────────────────────────────────────────────────────
+    # Maintenance
+    # ────────────────────────────────────────────────────────────────────
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Reconcile the manifest with the directory (one walk): adopt PDFs it doesn't know or whose size
+        changed, forget stages whose file is gone, and remove objects no stage refers to anymore.
+        """
+        stats = {"files": 0, "adopted": 0, "invalid_removed": 0, "forgotten": 0, "objects_removed": 0}
+        known = {
+            rel: (size, sha256)
+            for rel, size, sha256 in self.conn.execute("SELECT path, size, sha256 FROM pdf_file WHERE path IS NOT NULL")
+        }
+
+        on_disk: Set[str] = set()
+        for tournament_dir in _scandir(self.root, "tournament_"):
+            for class_dir in _scandir(Path(tournament_dir.path), "class_"):
+                for entry in os.scandir(class_dir.path):
+                    if not (entry.is_file() and entry.name.startswith("stage_") and entry.name.endswith(".pdf")):
+                        continue
+                    try:
+                        stage = int(entry.name[len("stage_"):-len(".pdf")])
+                    except ValueError:
+                        continue
+                    tid_ext = tournament_dir.name[len("tournament_"):]
+                    cid_ext = class_dir.name[len("class_"):]
+                    rel = self.relative_path(tid_ext, cid_ext, stage)
+                    stats["files"] += 1
+                    on_disk.add(rel)
+                    if rel in known and known[rel][0] == entry.stat().st_size:
+                        continue
+                    if self.adopt(tid_ext, cid_ext, stage) is None:
+                        on_disk.discard(rel)
+                        stats["invalid_removed"] += 1
+                    else:
+                        stats["adopted"] += 1
+
+        gone = [rel for rel in known if rel not in on_disk]
+        if gone:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "UPDATE pdf_file SET path = NULL, sha256 = NULL, size = NULL, error = 'File removed from cache' WHERE path = ?",
+                ((rel,) for rel in gone),
+            )
+            self.conn.execute("COMMIT")
+        stats["forgotten"] = len(gone)
+
+        referenced = {sha256 for (sha256,) in self.conn.execute("SELECT DISTINCT sha256 FROM pdf_file WHERE sha256 IS NOT NULL")}
+        objects_dir = self.root / OBJECTS_DIR
+        if objects_dir.exists():
+            for prefix_dir in os.scandir(objects_dir):
+                if not prefix_dir.is_dir():
+                    continue
+                for entry in os.scandir(prefix_dir.path):
+                    sha256 = entry.name.split(".", 1)[0]
+                    if entry.name.endswith(".pdf") and sha256 not in referenced:
+                        os.unlink(entry.path)
+                        stats["objects_removed"] += 1
+        return stats
+
+    def dedupe_stats(self) -> Dict[str, int]:
+        """Stored stages, distinct PDFs, and the bytes the shared objects save."""
+        files, objects, total, unique = self.conn.execute("""
+            SELECT COUNT(*), COUNT(DISTINCT sha256), COALESCE(SUM(size), 0),
+                   COALESCE((SELECT SUM(size) FROM (SELECT MAX(size) AS size FROM pdf_file WHERE sha256 IS NOT NULL GROUP BY sha256)), 0)
+            FROM pdf_file WHERE sha256 IS NOT NULL
+        """).fetchone()
+        return {"files": files, "objects": objects, "bytes": total, "bytes_saved": total - unique}
+
+
+def _scandir(path: Path, prefix: str):
+    if not path.is_dir():
+        return []
+    return [entry for entry in os.scandir(path) if entry.is_dir() and entry.name.startswith(prefix)]
+
+
+_store: Optional[PdfStore] = None
+
+
+def pdf_store() -> PdfStore:
+    """The store at PDF_CACHE_DIR (one manifest connection per process)."""
+    global _store
+    if _store is None:
+        _store = PdfStore()
+    return _store
@@ -0,0 +1,175 @@
+# src/pdf_text_index.py
+"""
+Full-text index (SQLite FTS5) of the page text of the PDFs in the PDF store.
+
+The index lives in the store's manifest database. Page text is indexed per PDF content (sha256), so
+identical PDFs are extracted and indexed once; searches join pdf_file for tournament, class and stage,
+with the stage and tournament range filters in SQL.
+
+Tokens are folded to lower case without diacritics (unicode61, remove_diacritics 2): "hamren" finds
+"Hamrén", "angel" finds "Ängel". A search term matches words in order, the last one as a prefix
+("berg er" finds "Berg Erik").
+
+update() indexes the PDFs that are new or changed since the last update (text extracted in a process
+pool) and drops the text of PDFs no stage refers to anymore.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import PDF_BACKEND
+from pdf_store import PdfStore, pdf_store
+
+INDEX_BATCH_SIZE = 200                  # PDFs written per transaction
+
+
+@dataclass
+class PdfTextHit:
+    tournament_id_ext:  str
+    class_id_ext:       str
+    stage:              int
+    path:               str             # relative to the store root
+    page:               int             # 1-based
+    snippet:            str
+
+
+class PdfTextIndex:
+    def __init__(self, store: Optional[PdfStore] = None):
+        self.store = store or pdf_store()
+        conn = self.store.conn
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS pdf_page_text USING fts5(
+                text,
+                sha256 UNINDEXED,
+                page UNINDEXED,
+                tokenize = "unicode61 remove_diacritics 2"
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pdf_text_indexed (
+                sha256          TEXT PRIMARY KEY,
+                pages           INTEGER NOT NULL,
+                backend         TEXT NOT NULL,
+                indexed_at      TIMESTAMP NOT NULL,
+                error           TEXT                    -- Text extraction failed (the PDF is not retried until it changes)
+            ) WITHOUT ROWID
+        """)
+
+    def update(self, backend: Optional[str] = None, max_workers: Optional[int] = None) -> Dict[str, int]:
+        """Index new/changed PDFs and drop the text of unused ones. Returns counts."""
+        conn = self.store.conn
+        pending = [
+            (sha256, str(self.store.root / path))
+            for sha256, path in conn.execute("""
+                SELECT f.sha256, MIN(f.path)
+                FROM pdf_file f
+                LEFT JOIN pdf_text_indexed i ON i.sha256 = f.sha256
+                WHERE f.sha256 IS NOT NULL AND i.sha256 IS NULL
+                GROUP BY f.sha256
+            """)
+        ]
+        unused = [sha256 for (sha256,) in conn.execute("""
+            SELECT sha256 FROM pdf_text_indexed
+            WHERE sha256 NOT IN (SELECT sha256 FROM pdf_file WHERE sha256 IS NOT NULL)
+        """)]
+
+        stats = {"indexed": 0, "pages": 0, "failed": 0, "removed": len(unused)}
+        if unused:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM pdf_page_text WHERE sha256 NOT IN (SELECT sha256 FROM pdf_file WHERE sha256 IS NOT NULL)")
+            conn.execute("DELETE FROM pdf_text_indexed WHERE sha256 NOT IN (SELECT sha256 FROM pdf_file WHERE sha256 IS NOT NULL)")
+            conn.execute("COMMIT")
+        if not pending:
+            return stats
+
+        backend = backend or PDF_BACKEND
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            results = executor.map(_extract_pages, ((sha256, path, backend) for sha256, path in pending), chunksize=8)
+            batch: List[Tuple[str, List[str], Optional[str]]] = []
+            for result in results:
+                batch.append(result)
+                if len(batch) >= INDEX_BATCH_SIZE:
+                    self._write(batch, backend, stats)
+                    batch = []
+            if batch:
+                self._write(batch, backend, stats)
+        return stats
+
+    def _write(self, batch: List[Tuple[str, List[str], Optional[str]]], backend: str, stats: Dict[str, int]) -> None:
+        conn = self.store.conn
+        conn.execute("BEGIN")
+        for sha256, pages, error in batch:
+            conn.executemany(
+                "INSERT INTO pdf_page_text (text, sha256, page) VALUES (?, ?, ?)",
+                ((text, sha256, page_no) for page_no, text in enumerate(pages, start=1) if text),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO pdf_text_indexed (sha256, pages, backend, indexed_at, error) VALUES (?, ?, ?, datetime('now'), ?)",
+                (sha256, len(pages), backend, error),
+            )
+            stats["indexed"] += 1
+            stats["pages"] += len(pages)
+            stats["failed"] += error is not None
+        conn.execute("COMMIT")
+
+    def search(
+        self,
+        keyword:            str,
+        stages:             Optional[Iterable[int]] = None,
+        tournament_min:     Optional[int] = None,
+        tournament_max:     Optional[int] = None,
+        limit:              Optional[int] = None,
+    ) -> List[PdfTextHit]:
+        """Pages containing keyword, most recently fetched PDFs first (every stage path of a shared PDF)."""
+        query = fts_query(keyword)
+        if not query:
+            return []
+        where, params = ["pdf_page_text MATCH ?"], [query]
+        if stages:
+            stages = sorted(set(stages))
+            where.append(f"f.stage IN ({', '.join('?' * len(stages))})")
+            params.extend(stages)
+        if tournament_min is not None:
+            where.append("CAST(f.tournament_id_ext AS INTEGER) >= ?")
+            params.append(tournament_min)
+        if tournament_max is not None:
+            where.append("CAST(f.tournament_id_ext AS INTEGER) <= ?")
+            params.append(tournament_max)
+        sql = f"""
+            SELECT f.tournament_id_ext, f.class_id_ext, f.stage, f.path, t.page,
+                   snippet(pdf_page_text, 0, '[', ']', '…', 10)
+            FROM pdf_page_text t
+            JOIN pdf_file f ON f.sha256 = t.sha256
+            WHERE {' AND '.join(where)}
+            ORDER BY f.fetched_at DESC, f.path, t.page
+        """
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [PdfTextHit(*row) for row in self.store.conn.execute(sql, params)]
+
+    def count(self) -> int:
+        return self.store.conn.execute("SELECT COUNT(*) FROM pdf_text_indexed").fetchone()[0]
+
+
+def fts_query(keyword: str) -> str:
+    """FTS5 phrase for a search term: its words in order, the last one as a prefix."""
+    words = re.findall(r"\w+", keyword)
+    return f'"{" ".join(words)}"*' if words else ""
+
+
+def _extract_pages(args) -> Tuple[str, List[str], Optional[str]]:
+    """Page texts of one PDF (worker process)."""
+    sha256, path, backend = args
+    from pdf_backend import open_pdf
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        with open_pdf(data, backend) as pdf:
+            return sha256, [page.extract_text() or "" for page in pdf.pages], None
+    except Exception as e:
+        return sha256, [], f"{type(e).__name__}: {e}"
@@ -0,0 +1,248 @@
+# src/player_rating_engine.py
+#
+# Glicko-2 playing-strength ratings over resolved singles matches (NumPy).
+#
+# One rating period = one calendar day (COALESCE(match.date, class startdate)). Player state lives
+# in flat arrays (mu, phi, sigma, last_day, matches) indexed by position; each day is one
+# vectorized Glicko-2 step over the players who played that day. Inactivity is applied lazily:
+# when a player returns after k idle days, phi grows by k * sigma² before the day is rated.
+#
+# Only completed, non-walkover singles matches with a known winner and date are rated.
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterable, Tuple, Union
+
+import numpy as np
+
+RATING_INIT = 1500.0
+RD_INIT     = 350.0
+VOL_INIT    = 0.06
+TAU         = 0.5
+SCALE       = 173.7178
+EPS         = 1e-6
+
+PHI_MAX     = RD_INIT / SCALE
+
+SINGLES_SQL = '''
+    SELECT
+        m.match_id,
+        COALESCE(m.date, (
+            SELECT MIN(tc.startdate)
+            FROM tournament_class_match tcm
+            JOIN tournament_class tc ON tc.tournament_class_id = tcm.tournament_class_id
+            WHERE tcm.match_id = m.match_id
+        )) AS match_date,
+        MAX(CASE WHEN mp.side_no = 1 THEN mp.player_id END) AS player_id_1,
+        MAX(CASE WHEN mp.side_no = 2 THEN mp.player_id END) AS player_id_2,
+        m.winner_side
+    FROM match m
+    JOIN match_player mp ON mp.match_id = m.match_id
+    WHERE m.status = 'completed'
+      AND m.walkover_side IS NULL
+      AND m.winner_side IN (1, 2)
+    GROUP BY m.match_id
+    HAVING COUNT(*) = 2
+       AND COUNT(DISTINCT mp.side_no) = 2
+       AND match_date IS NOT NULL
+'''
+
+
+@dataclass
+class RatingState:
+    """Array-backed player state; pos maps player_id → array index."""
+    player_ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    mu:         np.ndarray = field(default_factory=lambda: np.empty(0))
+    phi:        np.ndarray = field(default_factory=lambda: np.empty(0))
+    sigma:      np.ndarray = field(default_factory=lambda: np.empty(0))
+    last_day:   np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))   # -1 = never played
+    matches:    np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    pos:        Dict[int, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, float, float, float, int, Union[str, date]]]) -> "RatingState":
+        """Rows of (player_id, rating, rd, volatility, matches, last_date) as stored in player_rating."""
+        rows = list(rows)
+        state = cls()
+        if not rows:
+            return state
+        pid, rating, rd, vol, n, last = zip(*rows)
+        state.player_ids = np.array(pid, dtype=np.int64)
+        state.mu = (np.array(rating, dtype=float) - RATING_INIT) / SCALE
+        state.phi = np.array(rd, dtype=float) / SCALE
+        state.sigma = np.array(vol, dtype=float)
+        state.matches = np.array(n, dtype=np.int64)
+        state.last_day = np.array([to_day(d) if d else -1 for d in last], dtype=np.int64)
+        state.pos = {p: i for i, p in enumerate(pid)}
+        return state
+
+    def index(self, player_ids: np.ndarray) -> np.ndarray:
+        """Array positions for player_ids, appending unseen players with initial ratings."""
+        new = [p for p in np.unique(player_ids).tolist() if p not in self.pos]
+        if new:
+            k = len(new)
+            start = len(self.player_ids)
+            self.player_ids = np.concatenate([self.player_ids, np.array(new, dtype=np.int64)])
+            self.mu = np.concatenate([self.mu, np.zeros(k)])
+            self.phi = np.concatenate([self.phi, np.full(k, PHI_MAX)])
+            self.sigma = np.concatenate([self.sigma, np.full(k, VOL_INIT)])
+            self.last_day = np.concatenate([self.last_day, np.full(k, -1, dtype=np.int64)])
+            self.matches = np.concatenate([self.matches, np.zeros(k, dtype=np.int64)])
+            self.pos.update((p, start + i) for i, p in enumerate(new))
+        return np.array([self.pos[p] for p in player_ids.tolist()], dtype=np.int64)
+
+    def rows(self, idx: np.ndarray) -> list:
+        """(player_id, rating, rd, volatility, matches, last_date) rows for positions idx."""
+        return list(zip(
+            self.player_ids[idx].tolist(),
+            (self.mu[idx] * SCALE + RATING_INIT).tolist(),
+            (self.phi[idx] * SCALE).tolist(),
+            self.sigma[idx].tolist(),
+            self.matches[idx].tolist(),
+            to_dates(self.last_day[idx]),
+        ))
+
+
+def to_day(day: Union[str, date]) -> int:
+    """Days since 1970-01-01 of an ISO date string or a date (DATE columns come back as date with PARSE_DECLTYPES)."""
+    return int(np.datetime64(str(day)[:10], "D").astype(np.int64))
+
+
+def to_dates(days: np.ndarray) -> list:
+    return np.datetime_as_string(days.astype("datetime64[D]")).tolist()
+
+
+def load_matches(con: sqlite3.Connection) -> Dict[str, np.ndarray]:
+    """Rated singles matches as column arrays sorted by (day, match_id); score_1 = 1.0 if side 1 won."""
+    rows = con.execute(SINGLES_SQL).fetchall()
+    if not rows:
+        return {
+            "match_id": np.empty(0, dtype=np.int64), "day": np.empty(0, dtype=np.int64),
+            "player_id_1": np.empty(0, dtype=np.int64), "player_id_2": np.empty(0, dtype=np.int64),
+            "score_1": np.empty(0),
+        }
+    match_id, dates, p1, p2, winner = zip(*rows)
+    day = np.array([str(d)[:10] for d in dates], dtype="datetime64[D]").astype(np.int64)
+    match_id = np.array(match_id, dtype=np.int64)
+    order = np.lexsort((match_id, day))
+    return {
+        "match_id":     match_id[order],
+        "day":          day[order],
+        "player_id_1":  np.array(p1, dtype=np.int64)[order],
+        "player_id_2":  np.array(p2, dtype=np.int64)[order],
+        "score_1":      (np.array(winner, dtype=np.int64) == 1).astype(float)[order],
+    }
+
+
+def checksum(matches: Dict[str, np.ndarray], mask: np.ndarray) -> str:
+    """Fingerprint of the rated matches selected by mask (ids, days, players, results)."""
+    h = hashlib.sha1()
+    for key in ("match_id", "day", "player_id_1", "player_id_2", "score_1"):
+        h.update(np.ascontiguousarray(matches[key][mask]).tobytes())
+    return h.hexdigest()
+
+
+def _volatility(sigma: np.ndarray, phi: np.ndarray, v: np.ndarray, delta: np.ndarray) -> np.ndarray:
+    """Glicko-2 step 5 (Illinois iteration), vectorized over players."""
+    a = np.log(sigma ** 2)
+    phi2, delta2 = phi ** 2, delta ** 2
+
+    def f(x):
+        ex = np.exp(x)
+        return ex * (delta2 - phi2 - v - ex) / (2 * (phi2 + v + ex) ** 2) - (x - a) / TAU ** 2
+
+    A = a.copy()
+    big = delta2 > phi2 + v
+    B = np.where(big, np.log(np.where(big, delta2 - phi2 - v, 1.0)), a - TAU)
+    k = np.ones_like(a)
+    todo = ~big & (f(B) < 0)
+    while todo.any():
+        k[todo] += 1
+        B[todo] = a[todo] - k[todo] * TAU
+        todo &= f(B) < 0
+
+    fA, fB = f(A), f(B)
+    active = np.abs(B - A) > EPS
+    for _ in range(100):
+        if not active.any():
+            break
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        flip = fC * fB <= 0
+        A = np.where(active & flip, B, A)
+        fA = np.where(active, np.where(flip, fB, fA / 2), fA)
+        B = np.where(active, C, B)
+        fB = np.where(active, fC, fB)
+        active &= np.abs(B - A) > EPS
+    return np.exp(A / 2)
+
+
+def apply_matches(state: RatingState, matches: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Rate matches (sorted by day) into state, one Glicko-2 period per day.
+    Returns the history rows produced: player_id, day, rating, rd (one per player and played day).
+    """
+    out = {"player_id": [], "day": [], "rating": [], "rd": []}
+    if len(matches["day"]) == 0:
+        return {k: np.empty(0) for k in out}
+
+    i_all = state.index(matches["player_id_1"])
+    j_all = state.index(matches["player_id_2"])
+    s_all = matches["score_1"]
+    days, starts = np.unique(matches["day"], return_index=True)
+    bounds = np.append(starts, len(matches["day"]))
+
+    for day, lo, hi in zip(days.tolist(), bounds[:-1], bounds[1:]):
+        i, j, s = i_all[lo:hi], j_all[lo:hi], s_all[lo:hi]
+        players, local = np.unique(np.concatenate([i, j]), return_inverse=True)
+        n = len(players)
+
+        # Lazy inactivity: idle days since the last played day inflate phi
+        last = state.last_day[players]
+        idle = np.where(last >= 0, day - last - 1, 0)
+        phi = np.minimum(np.sqrt(state.phi[players] ** 2 + idle * state.sigma[players] ** 2), PHI_MAX)
+        mu, sigma = state.mu[players], state.sigma[players]
+
+        # Both perspectives of every match
+        a, b = local, np.concatenate([local[len(i):], local[:len(i)]])
+        score = np.concatenate([s, 1.0 - s])
+        g = 1.0 / np.sqrt(1.0 + 3.0 * phi[b] ** 2 / np.pi ** 2)
+        e = 1.0 / (1.0 + np.exp(-g * (mu[a] - mu[b])))
+
+        v = 1.0 / np.bincount(a, weights=g ** 2 * e * (1.0 - e), minlength=n)
+        delta_sum = np.bincount(a, weights=g * (score - e), minlength=n)
+
+        sigma_new = _volatility(sigma, phi, v, v * delta_sum)
+        phi_star = np.sqrt(phi ** 2 + sigma_new ** 2)
+        phi_new = 1.0 / np.sqrt(1.0 / phi_star ** 2 + 1.0 / v)
+        mu_new = mu + phi_new ** 2 * delta_sum
+
+        state.mu[players] = mu_new
+        state.phi[players] = phi_new
+        state.sigma[players] = sigma_new
+        state.last_day[players] = day
+        state.matches[players] += np.bincount(a, minlength=n)
+
+        out["player_id"].append(state.player_ids[players])
+        out["day"].append(np.full(n, day, dtype=np.int64))
+        out["rating"].append(mu_new * SCALE + RATING_INIT)
+        out["rd"].append(phi_new * SCALE)
+
+    return {k: np.concatenate(v) for k, v in out.items()}
+
+
+def history_rows(history: Dict[str, np.ndarray]) -> list:
+    """History arrays → (player_id, date, rating, rd) rows in primary-key order, rounded to one decimal."""
+    if len(history["day"]) == 0:
+        return []
+    order = np.lexsort((history["day"], history["player_id"]))
+    return list(zip(
+        history["player_id"][order].astype(np.int64).tolist(),
+        to_dates(history["day"][order].astype(np.int64)),
+        np.round(history["rating"][order], 1).tolist(),
+        np.round(history["rd"][order], 1).tolist(),
+    ))
@@ -0,0 +1,248 @@
+# src/player_stats_engine.py
+#
+# Vectorized per-player match/set/point aggregates (NumPy).
+#
+# Loads match_player and game once into flat integer arrays and computes the same aggregates as
+# the match_stats / game_stats CTEs of the public results summary, with group reductions instead
+# of SQL GROUP BYs:
+#   - bincount             → counts and sums per player
+#   - sort + reduceat      → min/max points per set
+# Only completed, non-walkover matches are counted. NULL game points behave as in SQL: the set is
+# counted, a NULL side is left out of that side's sums/averages/min/max, and the set is never
+# won or deuce.
+#
+# Optional date slices (e.g. one season) filter on COALESCE(match.date, class startdate).
+# An optional player table limits the load to those players (delta builds of the public DB).
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+NULL_POINTS = -1
+
+MATCH_STATS_COLUMNS = ["player_id", "total_matches", "match_wins"]
+
+GAME_STATS_COLUMNS = [
+    "player_id", "total_sets", "sets_won", "total_deuce_sets", "deuce_sets_won",
+    "total_points_scored", "total_points_lost",
+    "avg_points_scored_per_set", "avg_points_lost_per_set",
+    "max_points_scored_in_set", "min_points_scored_in_set",
+    "max_points_lost_in_set", "min_points_lost_in_set",
+]
+
+
+def season_date_range(con: sqlite3.Connection, season_id: int, schema: str = "main") -> Tuple[str, str]:
+    """(start_date, end_date) of a season, for per-season slices."""
+    row = con.execute(f"SELECT start_date, end_date FROM {schema}.season WHERE season_id = ?", (season_id,)).fetchone()
+    if row is None:
+        raise ValueError(f"Unknown season_id {season_id}")
+    return row[0], row[1]
+
+
+def _match_filter_sql(schema: str, date_from: Optional[str], date_to: Optional[str]) -> Tuple[str, list]:
+    sql = "m.status = 'completed' AND m.walkover_side IS NULL"
+    params: list = []
+    if date_from or date_to:
+        match_date = f"""COALESCE(m.date, (
+            SELECT MIN(tc.startdate)
+            FROM {schema}.tournament_class_match tcm
+            JOIN {schema}.tournament_class tc ON tc.tournament_class_id = tcm.tournament_class_id
+            WHERE tcm.match_id = m.match_id
+        ))"""
+        if date_from:
+            sql += f" AND {match_date} >= ?"
+            params.append(date_from)
+        if date_to:
+            sql += f" AND {match_date} <= ?"
+            params.append(date_to)
+    return sql, params
+
+
+def load_arrays(
+    con:        sqlite3.Connection,
+    schema:     str = "main",
+    date_from:  Optional[str] = None,
+    date_to:    Optional[str] = None,
+    players:    Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns two int64 arrays:
+      - mp:    (n, 4) match_id, player_id, side_no, winner_side (0 = unknown)
+      - games: (k, 3) match_id, points_side1, points_side2 (NULL → -1), sorted by match_id
+    players: optional table with a player_id column (e.g. a TEMP table) to load only those
+    players' rows and the games of their matches.
+    """
+    where, params = _match_filter_sql(schema, date_from, date_to)
+    mp_where = games_where = where
+    if players:
+        mp_where += f" AND mp.player_id IN (SELECT player_id FROM {players})"
+        games_where += f""" AND g.match_id IN (
+            SELECT match_id FROM {schema}.match_player WHERE player_id IN (SELECT player_id FROM {players})
+        )"""
+
+    mp = np.array(con.execute(f"""
+        SELECT mp.match_id, mp.player_id, mp.side_no, COALESCE(m.winner_side, 0)
+        FROM {schema}.match_player mp
+        JOIN {schema}.match m ON m.match_id = mp.match_id
+        WHERE {mp_where}
+    """, params).fetchall(), dtype=np.int64).reshape(-1, 4)
+
+    games = np.array(con.execute(f"""
+        SELECT g.match_id, COALESCE(g.points_side1, {NULL_POINTS}), COALESCE(g.points_side2, {NULL_POINTS})
+        FROM {schema}.game g
+        JOIN {schema}.match m ON m.match_id = g.match_id
+        WHERE {games_where}
+        ORDER BY g.match_id
+    """, params).fetchall(), dtype=np.int64).reshape(-1, 3)
+
+    return mp, games
+
+
+def compute_match_stats(mp: np.ndarray) -> Dict[str, np.ndarray]:
+    """total_matches (distinct matches) and match_wins per player."""
+    if len(mp) == 0:
+        return {c: np.empty(0, dtype=np.int64) for c in MATCH_STATS_COLUMNS}
+
+    players, pidx = np.unique(mp[:, 1], return_inverse=True)
+    n = len(players)
+
+    # Distinct (player, match) pairs
+    pair_key = np.unique(pidx.astype(np.int64) << 32 | mp[:, 0])
+    total_matches = np.bincount(pair_key >> 32, minlength=n)
+    match_wins = np.bincount(pidx, weights=(mp[:, 3] == mp[:, 2]), minlength=n).astype(np.int64)
+
+    return {"player_id": players, "total_matches": total_matches, "match_wins": match_wins}
+
+
+def compute_game_stats(mp: np.ndarray, games: np.ndarray) -> Dict[str, np.ndarray]:
+    """Set/deuce/point aggregates per player (only players with at least one game row)."""
+    if len(mp) == 0 or len(games) == 0:
+        return {c: np.empty(0) for c in GAME_STATS_COLUMNS}
+
+    # Expand every match_player row to the games of its match (games sorted by match_id)
+    start = np.searchsorted(games[:, 0], mp[:, 0], side="left")
+    end = np.searchsorted(games[:, 0], mp[:, 0], side="right")
+    counts = end - start
+    row_idx = np.repeat(np.arange(len(mp)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    game_idx = np.repeat(start, counts) + offsets
+
+    side = mp[row_idx, 2]
+    p1, p2 = games[game_idx, 1], games[game_idx, 2]
+    scored = np.where(side == 1, p1, p2)
+    lost = np.where(side == 1, p2, p1)
+    scored_ok = scored != NULL_POINTS
+    lost_ok = lost != NULL_POINTS
+
+    players, pidx = np.unique(mp[row_idx, 1], return_inverse=True)
+    n = len(players)
+
+    won = scored_ok & lost_ok & (scored > lost)
+    deuce = scored_ok & lost_ok & (np.maximum(p1, p2) > 11)
+
+    def _count(mask):
+        return np.bincount(pidx, weights=mask, minlength=n).astype(np.int64)
+
+    def _sum(values, mask):
+        return np.bincount(pidx, weights=np.where(mask, values, 0), minlength=n)
+
+    def _min_max(values, mask):
+        """Per-player (min, max) of values[mask]; NaN where a player has no valid value."""
+        g = pidx[mask]
+        order = np.argsort(g, kind="stable")
+        g, v = g[order], values[mask][order]
+        present = np.bincount(g, minlength=n) > 0
+        lo, hi = np.full(n, np.nan), np.full(n, np.nan)
+        if len(v):
+            starts = np.searchsorted(g, np.arange(n)[present])
+            lo[present] = np.minimum.reduceat(v, starts)
+            hi[present] = np.maximum.reduceat(v, starts)
+        return lo, hi
+
+    n_scored, n_lost = _count(scored_ok), _count(lost_ok)
+    sum_scored, sum_lost = _sum(scored, scored_ok), _sum(lost, lost_ok)
+    min_scored, max_scored = _min_max(scored, scored_ok)
+    min_lost, max_lost = _min_max(lost, lost_ok)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "player_id":                    players,
+            "total_sets":                   np.bincount(pidx, minlength=n),
+            "sets_won":                     _count(won),
+            "total_deuce_sets":             _count(deuce),
+            "deuce_sets_won":               _count(deuce & won),
+            "total_points_scored":          np.where(n_scored > 0, sum_scored, np.nan),
+            "total_points_lost":            np.where(n_lost > 0, sum_lost, np.nan),
+            "avg_points_scored_per_set":    np.where(n_scored > 0, sum_scored / n_scored, np.nan),
+            "avg_points_lost_per_set":      np.where(n_lost > 0, sum_lost / n_lost, np.nan),
+            "max_points_scored_in_set":     max_scored,
+            "min_points_scored_in_set":     min_scored,
+            "max_points_lost_in_set":       max_lost,
+            "min_points_lost_in_set":       min_lost,
+        }
+
+
+def compute_player_stats(
+    con:        sqlite3.Connection,
+    schema:     str = "main",
+    season_id:  Optional[int] = None,
+    date_from:  Optional[str] = None,
+    date_to:    Optional[str] = None,
+    players:    Optional[str] = None,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Load once and compute (match_stats, game_stats). season_id overrides date_from/date_to;
+    players restricts the result to the player_ids of that table (see load_arrays).
+    """
+    if season_id is not None:
+        date_from, date_to = season_date_range(con, season_id, schema)
+    mp, games = load_arrays(con, schema, date_from, date_to, players)
+    return compute_match_stats(mp), compute_game_stats(mp, games)
+
+
+def _rows(stats: Dict[str, np.ndarray], columns: list, float_columns: set) -> list:
+    """Column arrays → row tuples; NaN → NULL, integer-valued columns back to int."""
+    cols = []
+    for c in columns:
+        arr = stats[c]
+        if c in float_columns:
+            cols.append([None if np.isnan(x) else float(x) for x in arr.tolist()])
+        elif arr.dtype.kind == "f":
+            cols.append([None if np.isnan(x) else int(x) for x in arr.tolist()])
+        else:
+            cols.append(arr.tolist())
+    return list(zip(*cols))
+
+
+def write_stats_tables(
+    con:            sqlite3.Connection,
+    match_stats:    Dict[str, np.ndarray],
+    game_stats:     Dict[str, np.ndarray],
+    match_table:    str = "tmp_match_stats",
+    game_table:     str = "tmp_game_stats",
+) -> None:
+    """Bulk-write both result sets into (TEMP) tables named like the summary CTEs' columns."""
+    con.execute(f"DROP TABLE IF EXISTS temp.{match_table}")
+    con.execute(f"DROP TABLE IF EXISTS temp.{game_table}")
+    con.execute(f"CREATE TEMP TABLE {match_table} (player_id INTEGER PRIMARY KEY, total_matches INTEGER, match_wins INTEGER)")
+    con.execute(f"""
+        CREATE TEMP TABLE {game_table} (
+            player_id INTEGER PRIMARY KEY,
+            total_sets INTEGER, sets_won INTEGER, total_deuce_sets INTEGER, deuce_sets_won INTEGER,
+            total_points_scored INTEGER, total_points_lost INTEGER,
+            avg_points_scored_per_set REAL, avg_points_lost_per_set REAL,
+            max_points_scored_in_set INTEGER, min_points_scored_in_set INTEGER,
+            max_points_lost_in_set INTEGER, min_points_lost_in_set INTEGER
+        )
+    """)
+    con.executemany(
+        f"INSERT INTO {match_table} ({', '.join(MATCH_STATS_COLUMNS)}) VALUES ({', '.join('?' * len(MATCH_STATS_COLUMNS))})",
+        _rows(match_stats, MATCH_STATS_COLUMNS, set())
+    )
+    con.executemany(
+        f"INSERT INTO {game_table} ({', '.join(GAME_STATS_COLUMNS)}) VALUES ({', '.join('?' * len(GAME_STATS_COLUMNS))})",
+        _rows(game_stats, GAME_STATS_COLUMNS, {"avg_points_scored_per_set", "avg_points_lost_per_set"})
+    )
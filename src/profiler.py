@@ -0,0 +1,126 @@
+# src/profiler.py
+"""
+Low-overhead sampling profiler for pipeline stages.
+
+A daemon thread snapshots the profiled thread's call stack every PROFILE_INTERVAL_MS
+(sys._current_frames()), so the stage itself runs uninstrumented. Samples are wall-clock:
+time spent waiting on the network, pdfplumber or SQLite all shows up where it is spent.
+
+Stages are opted in through config.PROFILE_STAGES (see OperationLogger and utils.profile_stage);
+profiles are saved per run under PROFILE_DIR/<run_id>/:
+- <stage>.folded        collapsed stacks (flamegraph.pl, speedscope)
+- <stage>_hotspots.txt  functions by cumulative time
+
+Only the thread that started the profiler is sampled; work in worker processes
+(e.g. RESOLVE_CLASS_WORKERS > 1) shows up as time spent waiting on them.
+"""
+
+from collections import Counter
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import PROFILE_STAGES, PROFILE_INTERVAL_MS, PROFILE_TOP_N, PROFILE_DIR
+
+
+def profiling_enabled(*stage_names: str) -> bool:
+    """True if any of the given names (function name, 'run_type:object_type', ...) is listed in PROFILE_STAGES."""
+    return bool(PROFILE_STAGES) and any(name in PROFILE_STAGES for name in stage_names if name)
+
+
+class SamplingProfiler:
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS, thread_id: Optional[int] = None):
+        self.interval   = interval_ms / 1000.0
+        self.thread_id  = thread_id or threading.get_ident()
+        self.stacks:    Counter = Counter()     # (code, ...) root → leaf → samples
+        self.samples    = 0
+        self.duration   = 0.0
+        self._t0        = None
+        self._stop      = threading.Event()
+        self._thread    = None
+
+    def start(self) -> "SamplingProfiler":
+        self._t0 = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.duration = time.perf_counter() - self._t0
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    # ────────────────────────────────────────────────────────────────────
+    # Results
+    # ────────────────────────────────────────────────────────────────────
+
+    def _stage_stacks(self) -> Dict[Tuple, int]:
+        """Stacks with the frames shared by every sample (main() → ... → stage entry) stripped."""
+        if not self.stacks:
+            return {}
+        stacks = list(self.stacks)
+        common = 0
+        shortest = min(len(s) for s in stacks)
+        while common < shortest - 1 and all(s[common] == stacks[0][common] for s in stacks):
+            common += 1
+        # Keep the stage entry itself as the root frame
+        common = max(common - 1, 0)
+        folded: Counter = Counter()
+        for stack, n in self.stacks.items():
+            folded[stack[common:]] += n
+        return folded
+
+    def hotspots(self, top_n: int = PROFILE_TOP_N) -> List[Tuple[str, float, float]]:
+        """Top functions as (label, cumulative seconds, self seconds), by cumulative time."""
+        if not self.samples:
+            return []
+        seconds_per_sample = self.duration / self.samples
+        cumulative: Counter = Counter()
+        own:        Counter = Counter()
+        for stack, n in self._stage_stacks().items():
+            for code in set(stack):
+                cumulative[code] += n
+            own[stack[-1]] += n
+        return [
+            (_label(code), n * seconds_per_sample, own[code] * seconds_per_sample)
+            for code, n in cumulative.most_common(top_n)
+        ]
+
+    def save(self, stage: str, run_id: Optional[str] = None, top_n: int = PROFILE_TOP_N) -> str:
+        """Write <stage>.folded and <stage>_hotspots.txt under PROFILE_DIR/<run_id>/; returns the directory."""
+        out_dir = os.path.join(PROFILE_DIR, run_id or "no_run_id")
+        os.makedirs(out_dir, exist_ok=True)
+
+        with open(os.path.join(out_dir, f"{stage}.folded"), "w", encoding="utf-8") as f:
+            for stack, n in self._stage_stacks().items():
+                f.write(";".join(_label(code) for code in stack) + f" {n}\n")
+
+        with open(os.path.join(out_dir, f"{stage}_hotspots.txt"), "w", encoding="utf-8") as f:
+            f.write(f"{stage}: {self.duration:.1f}s wall, {self.samples} samples every {self.interval * 1000:.0f} ms\n\n")
+            f.write(f"{'cum s':>9} {'cum %':>6} {'self s':>9}  function\n")
+            for label, cum_s, self_s in self.hotspots(top_n):
+                f.write(f"{cum_s:9.2f} {100 * cum_s / (self.duration or 1):5.1f}% {self_s:9.2f}  {label}\n")
+
+        return out_dir
+
+
+def _label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
@@ -0,0 +1,230 @@
+# src/resolvers/class_plan.py
+"""
+Per-class resolution plans.
+
+A plan is the ordered list of writes (and logger calls) that resolving one class wants to make.
+Planners only read from the DB, so they can run in worker processes on read-only connections;
+a single writer applies the plans in class order, each plan in its own savepoint.
+
+Rows created by a plan are referenced before they exist through pending ids
+(ClassPlan.new_id(), >= PENDING_ID_BASE); the writer maps them to real ids as it inserts.
+
+Used by resolve_tournament_class_entries and resolve_tournament_class_matches.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import inspect
+from itertools import repeat
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from db import get_readonly_conn
+from utils import OperationLogger
+
+PENDING_ID_BASE = 1 << 62
+
+Op = Tuple[str, Dict[str, Any]]
+
+
+class ClassPlan:
+    def __init__(self, class_ext: str, resolver: Optional[str] = None):
+        self.class_ext  = class_ext
+        self.resolver   = resolver      # public resolver the plan is made for (function_name of its logs)
+        self.ops:       List[Op] = []
+        self._pending   = 0
+        self.timing:    Optional[Tuple[float, float, int]] = None     # (started_at, seconds, pid) of the planner
+
+    def add(self, kind: str, **data) -> Dict[str, Any]:
+        self.ops.append((kind, data))
+        return data
+
+    def log(self, method: str, *args, caller: Optional[Tuple[str, str]] = None, **kwargs) -> None:
+        # Callers keep mutating their logger_keys dicts, so snapshot them now
+        args = tuple(dict(a) if isinstance(a, dict) else a for a in args)
+        self.ops.append(("log", {"method": method, "args": args, "kwargs": kwargs, "caller": caller}))
+
+    def new_id(self) -> int:
+        self._pending += 1
+        return PENDING_ID_BASE + self._pending
+
+    @contextmanager
+    def group(self, kind: str, **data):
+        """
+        Ops recorded inside the block become data["ops"] of a single op, so its handler
+        can apply them only if its own write succeeded.
+        """
+        outer, self.ops = self.ops, []
+        try:
+            yield data
+        finally:
+            data["ops"], self.ops = self.ops, outer
+            self.ops.append((kind, data))
+
+
+class PlanLogger:
+    """
+    OperationLogger stand-in: every call is recorded into the plan, together with the
+    function/file it was made from, and replayed on the real logger by the writer.
+    Calls from the _plan_* / _apply_* functions, which split the body of the public resolver,
+    are recorded under the resolver's name (plan.resolver), as before the split.
+    """
+
+    def __init__(self, plan: ClassPlan):
+        self.plan = plan
+
+    def _record(self, method: str, *args, **kwargs):
+        frame = inspect.currentframe().f_back.f_back
+        function_name = frame.f_code.co_name
+        if self.plan.resolver and function_name.startswith(("_plan_", "_apply_")):
+            function_name = self.plan.resolver
+        caller = (function_name, os.path.basename(frame.f_code.co_filename))
+        self.plan.log(method, *args, caller=caller, **kwargs)
+
+    def info(self, *args, **kwargs):
+        self._record("info", *args, **kwargs)
+
+    def success(self, *args, **kwargs):
+        self._record("success", *args, **kwargs)
+
+    def failed(self, *args, **kwargs):
+        self._record("failed", *args, **kwargs)
+
+    def skipped(self, *args, **kwargs):
+        self._record("skipped", *args, **kwargs)
+
+    def warning(self, *args, **kwargs):
+        self._record("warning", *args, **kwargs)
+
+    def inc_processed(self, n: int = 1):
+        self.plan.log("inc_processed", n)
+
+
+class PlanContext:
+    """
+    Writer-side state while applying one plan: the cursor, pending id → real id, and the
+    log calls made so far. OperationLogger commits on every DB log, which would end the
+    class savepoint, so logs (from the plan and from handlers via ctx.logger) are buffered
+    and only replayed once the class is released.
+
+    Handlers keeping state across classes (e.g. caches of rows they created) stage it in
+    ctx.state and register the update in ctx.on_release, which only runs if the class is
+    released; a rolled back class leaves no trace of its rows there.
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor, handlers: Dict[str, Callable], resolver: Optional[str] = None):
+        self.cursor     = cursor
+        self.handlers   = handlers
+        self.ids:       Dict[int, Optional[int]] = {}
+        self.logs       = ClassPlan("", resolver)
+        self.logger     = PlanLogger(self.logs)
+        self.state:     Dict[str, Any] = {}
+        self.on_release: List[Callable[[], None]] = []
+
+    def apply(self, ops: List[Op]) -> None:
+        for kind, data in ops:
+            if kind == "log":
+                self.logs.ops.append((kind, data))
+            else:
+                self.handlers[kind](self, data)
+
+    def id(self, value: Optional[int]) -> Optional[int]:
+        """Real id for a pending id (None if its insert failed); other values pass through."""
+        if value is not None and value >= PENDING_ID_BASE:
+            return self.ids.get(value)
+        return value
+
+
+def replay_logs(ops: List[Op], logger: OperationLogger) -> None:
+    for _, data in ops:
+        logger.caller = data["caller"]
+        try:
+            getattr(logger, data["method"])(*data["args"], **data["kwargs"])
+        finally:
+            logger.caller = None
+
+
+def apply_plan(cursor: sqlite3.Cursor, plan: ClassPlan, logger: OperationLogger, handlers: Dict[str, Callable]) -> bool:
+    """
+    Apply one plan inside a savepoint. On error the class is rolled back and logged as failed;
+    otherwise the handlers' on_release updates run and the buffered logs are replayed.
+    """
+    if plan.timing:
+        started_at, duration, pid = plan.timing
+        logger.add_span("plan", started_at, duration, pid=pid, tournament_class_id_ext=plan.class_ext)
+    ctx = PlanContext(cursor, handlers, plan.resolver)
+    with logger.span("apply", tournament_class_id_ext=plan.class_ext):
+        cursor.execute("SAVEPOINT class_plan")
+        try:
+            ctx.apply(plan.ops)
+            cursor.execute("RELEASE class_plan")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO class_plan")
+            cursor.execute("RELEASE class_plan")
+            logger.failed({"tournament_class_id_ext": plan.class_ext}, f"Failed to apply resolution plan: {e}")
+            return False
+    for update in ctx.on_release:
+        update()
+    replay_logs(ctx.logs.ops, logger)
+    return True
+
+
+def run_class_plans(
+    cursor:     sqlite3.Cursor,
+    units:      List[Any],
+    init_state: Callable[[sqlite3.Cursor], Any],
+    planner:    Callable[[sqlite3.Cursor, Any, Any], ClassPlan],
+    apply:      Callable[[ClassPlan], Any],
+    workers:    int = 1,
+) -> None:
+    """
+    Plan every unit (one class) and apply the plans in order.
+
+    workers <= 1: plan and apply one class at a time on the writer's cursor.
+    workers > 1:  worker processes open read-only connections, build their state once
+                  (init_state) and plan classes; the writer applies the plans in unit order
+                  as they arrive. Pending writes are committed first so workers see them.
+
+    init_state and planner must be module-level functions (they are sent to the workers).
+    """
+    if workers <= 1 or len(units) <= 1:
+        state = init_state(cursor)
+        for unit in units:
+            apply(_timed_plan(planner, cursor, state, unit))
+        return
+
+    cursor.connection.commit()
+    cursor.execute("PRAGMA database_list")
+    db_path = next(row[2] for row in cursor.fetchall() if row[1] == "main")
+
+    logging.info(f"Planning {len(units)} classes in {workers} worker processes")
+    with ProcessPoolExecutor(
+        max_workers = min(workers, len(units)),
+        initializer = _init_worker,
+        initargs    = (db_path, init_state),
+    ) as executor:
+        for plan in executor.map(_plan_in_worker, repeat(planner), units, chunksize=1):
+            apply(plan)
+
+
+# ────────────────────────────────────────────────────────────────────
+# Worker process
+# ────────────────────────────────────────────────────────────────────
+
+_worker: Dict[str, Any] = {}
+
+def _init_worker(db_path: str, init_state: Callable[[sqlite3.Cursor], Any]) -> None:
+    conn, cursor = get_readonly_conn(db_path)
+    _worker.update(conn=conn, cursor=cursor, state=init_state(cursor))
+
+def _plan_in_worker(planner: Callable, unit: Any) -> ClassPlan:
+    return _timed_plan(planner, _worker["cursor"], _worker["state"], unit)
+
+def _timed_plan(planner: Callable, cursor: sqlite3.Cursor, state: Any, unit: Any) -> ClassPlan:
+    started_at, t0 = time.time(), time.perf_counter()
+    plan = planner(cursor, state, unit)
+    plan.timing = (started_at, time.perf_counter() - t0, os.getpid())
+    return plan
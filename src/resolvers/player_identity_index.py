@@ -0,0 +1,239 @@
+# src/resolvers/player_identity_index.py
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from models.player import Player
+from models.player_license import LicenseIntervals, PlayerLicense
+from models.player_transition import PlayerTransition
+from utils import name_keys_for_lookup_all_splits, normalize_key
+
+# Strategy order used by resolve_tournament_class_entries.match_player (first unique hit wins)
+STRATEGY_ORDER = [
+    "license_exact",
+    "license_substring",
+    "any_season_exact",
+    "any_season_substring",
+    "transition_exact",
+    "transition_substring",
+    "name_exact_verified",
+    "unverified_with_club",
+]
+
+SUBSTRING_MIN_TOKENS = 3    # substring strategies only consider license names with 3+ tokens
+NGRAM_MAX = 3
+
+
+@dataclass
+class IdentityMatch:
+    player_id:      int
+    match_type:     str
+    provenance:     List[Dict[str, Any]] = field(default_factory=list)
+
+
+class PlayerIdentityIndex:
+    """
+    In-memory identity index for entry resolution, built once per run.
+
+    Holds:
+      - license intervals by (normalized name, club_id), as built by PlayerLicense.cache_name_club_map
+      - verified players by normalized name, unverified appearances by normalized name
+      - transitions by player_id
+      - an n-gram index (1..3 chars) over license names with 3+ tokens, for the substring strategies
+
+    lookup() computes the name key variants once and returns, per strategy, the unique
+    candidate (if any) together with the rows that produced it.
+    """
+
+    def __init__(
+        self,
+        license_name_club_map:      Dict[Tuple[str, Optional[int]], LicenseIntervals],
+        player_name_map:            Dict[str, List[int]],
+        unverified_appearance_map:  Dict[str, List[Dict[str, Any]]],
+        transitions:                Dict[int, List[tuple]],
+    ):
+        self.license_name_club_map      = license_name_club_map
+        self.player_name_map            = player_name_map
+        self.unverified_appearance_map  = unverified_appearance_map
+        self.transitions                = transitions
+
+        # Long license names → clubs, and n-gram postings over those names
+        self._long_keys: List[str] = []
+        self._long_key_clubs: Dict[str, List[Optional[int]]] = defaultdict(list)
+        for full_key, cid in license_name_club_map:
+            if len(full_key.split()) < SUBSTRING_MIN_TOKENS:
+                continue
+            if full_key not in self._long_key_clubs:
+                self._long_keys.append(full_key)
+            self._long_key_clubs[full_key].append(cid)
+
+        self._grams: Dict[str, Set[int]] = defaultdict(set)
+        for i, full_key in enumerate(self._long_keys):
+            for gram in _ngrams(full_key):
+                self._grams[gram].add(i)
+
+    @classmethod
+    def build(cls, cursor) -> "PlayerIdentityIndex":
+        return cls(
+            license_name_club_map       = PlayerLicense.cache_name_club_map(cursor),
+            player_name_map             = Player.cache_name_map_verified(cursor),
+            unverified_appearance_map   = Player.cache_unverified_appearances(cursor),
+            transitions                 = PlayerTransition.cache_by_player(cursor),
+        )
+
+    # ────────────────────────────────────────────────────────────────────
+    # Query
+    # ────────────────────────────────────────────────────────────────────
+
+    def lookup(self, fullname_raw: str, club_id: Optional[int], class_date: date) -> Dict[str, IdentityMatch]:
+        """Best (unique) candidate per strategy for one raw entry; strategies without a unique hit are omitted."""
+        return self.lookup_many([(fullname_raw, club_id)], class_date)[0]
+
+    def lookup_many(self, entries: List[Tuple[str, Optional[int]]], class_date: date) -> List[Dict[str, IdentityMatch]]:
+        """
+        lookup() for all (fullname_raw, club_id) entries of one class: license validity for every
+        name/club key involved is resolved against class_date in one PlayerLicense.find_valid_many call.
+        """
+        prepared = [self._prepare(fullname_raw, club_id) for fullname_raw, club_id in entries]
+        valid = PlayerLicense.find_valid_many(
+            self.license_name_club_map,
+            (key for p in prepared for key in p["exact_keys"] + p["substring_keys"]),
+            class_date
+        )
+        return [self._evaluate(p, club_id, class_date, valid) for p, (_, club_id) in zip(prepared, entries)]
+
+    def best(self, fullname_raw: str, club_id: Optional[int], class_date: date) -> Optional[IdentityMatch]:
+        """First hit in STRATEGY_ORDER, or None."""
+        return pick_best(self.lookup(fullname_raw, club_id, class_date))
+
+    # ────────────────────────────────────────────────────────────────────
+    # Helpers
+    # ────────────────────────────────────────────────────────────────────
+
+    def _prepare(self, fullname_raw: str, club_id: Optional[int]) -> Dict[str, Any]:
+        """Name key variants and the license keys (exact and substring) they hit."""
+        keys = name_keys_for_lookup_all_splits(fullname_raw)
+        clean = normalize_key(fullname_raw)
+        club_key = club_id if club_id else None     # club_id falsy → keys with club None
+        return {
+            "keys":             keys,
+            "clean":            clean,
+            "exact_keys":       [(k, club_key) for k in keys if (k, club_key) in self.license_name_club_map],
+            "substring_keys":   self._substring_keys(clean, club_id),
+        }
+
+    def _evaluate(self, prepared: Dict[str, Any], club_id: Optional[int], class_date: date, valid: Dict[Any, List[Dict[str, Any]]]) -> Dict[str, IdentityMatch]:
+        result: Dict[str, IdentityMatch] = {}
+
+        def hits(license_keys, valid_only):
+            return [
+                (lic["player_id"], _license_provenance(key[0], lic))
+                for key in license_keys
+                for lic in (valid.get(key, ()) if valid_only else self.license_name_club_map[key])
+            ]
+
+        # License by exact key variant
+        _add_unique(result, "license_exact", hits(prepared["exact_keys"], True))
+        _add_unique(result, "any_season_exact", hits(prepared["exact_keys"], False))
+
+        # License by token substring (names with at most two tokens vs. license names with 3+)
+        substring_hits = hits(prepared["substring_keys"], False)
+        _add_unique(result, "license_substring", hits(prepared["substring_keys"], True))
+        _add_unique(result, "any_season_substring", substring_hits)
+
+        # Verified players by exact key variant
+        name_hits = [(pid, {"source": "player", "key": k}) for k in prepared["keys"] for pid in self.player_name_map.get(k, ())]
+        _add_unique(result, "name_exact_verified", name_hits)
+
+        # Transitions to/from the club on or before the class date
+        if club_id:
+            _add_unique(result, "transition_exact", self._transition_hits({pid for pid, _ in name_hits}, club_id, class_date))
+            _add_unique(result, "transition_substring", self._transition_hits({pid for pid, _ in substring_hits}, club_id, class_date))
+
+        # Unverified player seen before in the same club (first appearance wins)
+        for entry in self.unverified_appearance_map.get(prepared["clean"], ()):
+            if entry["club_id"] == club_id or club_id is None:
+                result["unverified_with_club"] = IdentityMatch(entry["player_id"], "unverified_with_club", [{
+                    "source": "unverified_appearance", "club_id": entry["club_id"], "appearance_date": entry["appearance_date"],
+                }])
+                break
+
+        return result
+
+    def _substring_keys(self, clean: str, club_id: Optional[int]) -> List[Tuple[str, Optional[int]]]:
+        """License keys whose 3+ token name contains both the first and last query token."""
+        parts = clean.split()
+        if not parts or len(parts) > 2:
+            return []
+        first_tok, last_tok = parts[0], parts[-1]
+
+        candidates: Optional[Set[int]] = None
+        for tok in {first_tok, last_tok}:
+            for gram in _token_grams(tok):
+                posting = self._grams.get(gram)
+                if not posting:
+                    return []
+                candidates = set(posting) if candidates is None else candidates & posting
+                if not candidates:
+                    return []
+
+        license_keys = []
+        for i in sorted(candidates or ()):
+            full_key = self._long_keys[i]
+            if first_tok not in full_key or last_tok not in full_key:
+                continue
+            license_keys.extend((full_key, cid) for cid in self._long_key_clubs[full_key] if cid == club_id or club_id is None)
+        return license_keys
+
+    def _transition_hits(self, player_ids: Set[int], club_id: int, class_date: date) -> List[Tuple[int, Dict[str, Any]]]:
+        day = str(class_date)[:10]
+        hits = []
+        for pid in player_ids:
+            for club_from, club_to, transition_date in self.transitions.get(pid, ()):
+                if club_id in (club_from, club_to) and str(transition_date)[:10] <= day:
+                    hits.append((pid, {
+                        "source": "transition", "club_id_from": club_from, "club_id_to": club_to, "transition_date": transition_date,
+                    }))
+        return hits
+
+
+def pick_best(hits: Dict[str, IdentityMatch]) -> Optional[IdentityMatch]:
+    """First hit in STRATEGY_ORDER, or None."""
+    for strategy in STRATEGY_ORDER:
+        if strategy in hits:
+            return hits[strategy]
+    return None
+
+
+def _ngrams(text: str) -> Set[str]:
+    grams = set()
+    for token in text.split():
+        grams.update(_token_grams(token, all_lengths=True))
+    return grams
+
+
+def _token_grams(token: str, all_lengths: bool = False) -> Set[str]:
+    """n-grams of a single token: all lengths 1..3 for indexing, the longest available length for querying."""
+    if all_lengths:
+        return {token[i:i + n] for n in range(1, NGRAM_MAX + 1) for i in range(len(token) - n + 1)}
+    n = min(NGRAM_MAX, len(token))
+    return {token[i:i + n] for i in range(len(token) - n + 1)}
+
+
+def _license_provenance(key: str, lic: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "source":       "license",
+        "key":          key,
+        "license_id":   lic["license_id"],
+        "season_id":    lic["season_id"],
+        "club_id":      lic["club_id"],
+    }
+
+
+def _add_unique(result: Dict[str, IdentityMatch], strategy: str, hits: List[Tuple[int, Dict[str, Any]]]) -> None:
+    """Record the strategy only if its hits point to exactly one player."""
+    player_ids = {pid for pid, _ in hits}
+    if len(player_ids) == 1:
+        result[strategy] = IdentityMatch(player_ids.pop(), strategy, [prov for _, prov in hits])
@@ -8,12 +8,14 @@ from models.season import Season
 from models.club import Club
 from models.player import Player
 from models.license import License
+from models.raw_change_log import RawChanges
 from utils import OperationLogger, parse_date
 
-def resolve_player_licenses(cursor, run_id=None) -> List[PlayerLicense]:
+def resolve_player_licenses(cursor, run_id=None, full: bool = False) -> List[PlayerLicense]:
     """
     Resolve player_license_raw → player_license.
     Handles duplicate detection, parsing, validation, and insert.
+    Resolves the raw rows changed since the last run (see models/raw_change_log.py), all rows if full.
     """
 
     logger = OperationLogger(
@@ -40,10 +42,16 @@ def resolve_player_licenses(cursor, run_id=None) -> List[PlayerLicense]:
     # Cache duplicate licenses
     duplicate_map       = PlayerLicenseRaw.get_duplicates(cursor)
 
-    # Fetch all raw player license records
-    raw_objects         = PlayerLicenseRaw.get_all(cursor)
+    # Fetch the changed (or all) raw player license records
+    changes             = RawChanges.pending(cursor, "resolve_player_licenses", "player_license_raw", full=full)
+    logger.info(f"Resolving {changes.describe(cursor)}", to_console=True)
+    raw_objects         = PlayerLicenseRaw.get_all(cursor, changes)
     if not raw_objects:
-        logger.failed({}, "No player license data found in player_license_raw")
+        if changes.full:
+            logger.failed({}, "No player license data found in player_license_raw")
+        else:
+            changes.advance(cursor)
+            logger.info("No changed player licenses since the last run", to_console=True)
         return []
 
     # Allow missing date -- later set to season start and end dates if missing
@@ -207,5 +215,6 @@ def resolve_player_licenses(cursor, run_id=None) -> List[PlayerLicense]:
             logger.failed(logger_keys, "Upsert failed")
             continue
 
+    changes.advance(cursor)
     logger.summarize()
 
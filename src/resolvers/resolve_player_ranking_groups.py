@@ -7,12 +7,15 @@ from models.player import Player
 from models.player_ranking_group import PlayerRankingGroup
 from models.player_license_raw import PlayerLicenseRaw
 from models.ranking_group import RankingGroup
+from models.raw_change_log import RawChanges
 from utils import OperationLogger
 
-def resolve_player_ranking_groups(cursor, run_id=None) -> dict:
+def resolve_player_ranking_groups(cursor, run_id=None, full: bool = False) -> dict:
     """
     Build and APPLY the current (player_id, ranking_group_id) relations from the LATEST row per player
     in player_license_raw that has non-empty ranking_group_raw. Uses last_seen_at to determine latest.
+    Only players with a license row inserted, changed or seen again since the last run are refreshed
+    (see models/raw_change_log.py), all players if full.
 
     Side effects:
       - Deletes existing player_ranking_group rows for players we’re about to refresh
@@ -52,8 +55,10 @@ def resolve_player_ranking_groups(cursor, run_id=None) -> dict:
     # ranking group lookup: class_short -> id  (via model)
     rg_map: Dict[str, int] = RankingGroup.cache_map(cursor)
 
-    # Fetch ALL rows with non-empty ranking_group_raw, including last_seen_at
-    rows: List[Tuple[str, str, datetime]] = PlayerLicenseRaw.fetch_rows_with_ranking_groups(cursor)
+    # Fetch the rows with non-empty ranking_group_raw of the changed (or all) players, including last_seen_at
+    changes = RawChanges.pending(cursor, "resolve_player_ranking_groups", "player_license_raw", ops=("I", "U", "T"), full=full)
+    logger.info(f"Resolving ranking groups from {changes.describe(cursor)}", to_console=True)
+    rows: List[Tuple[str, str, datetime]] = PlayerLicenseRaw.fetch_rows_with_ranking_groups(cursor, changes)
     rows_scanned = len(rows)
 
     # Group by player_id_ext and select only the latest row (max last_seen_at)
@@ -138,6 +143,7 @@ def resolve_player_ranking_groups(cursor, run_id=None) -> dict:
                 f"deleted_rows={deleted_rows}, inserted={inserted}, skipped={skipped}, "
                 f"failed={failed}, unmapped={unmapped_players}, elapsed={stats['elapsed_sec']}s")
 
+    changes.advance(cursor)
     logger.summarize()
 
     return stats
\ No newline at end of file
@@ -1,14 +1,25 @@
 # src/resolvers/resolve_player_rankings.py
 
-from typing import List
+from typing import List, Optional
+from config import RESOLVE_RANKINGS_MODE
 from models.player_ranking_raw import PlayerRankingRaw
 from models.player_ranking import PlayerRanking
+from models.player_ranking_history import PlayerRankingHistory
 from models.player import Player
+from models.raw_change_log import RawChanges
 from utils import OperationLogger
 from db import get_conn
 
-def resolve_player_rankings(cursor, run_id=None) -> List[PlayerRanking]:
-    """Resolving player_ranking_raw to player_ranking. Handles mapping, validation, and upsert."""
+def resolve_player_rankings(cursor, run_id=None, full: bool = False, mode: Optional[str] = None) -> List[PlayerRanking]:
+    """
+    Resolving player_ranking_raw to player_ranking. Handles mapping, validation, and upsert.
+    Resolves the raw rows changed since the last run (see models/raw_change_log.py), all rows if full.
+    Mode (default RESOLVE_RANKINGS_MODE):
+      - "sql": set-based, one INSERT ... SELECT joined to player_id_ext; also picks up run dates not
+        in player_ranking yet and earlier rejects. Unresolvable rows go to player_ranking_reject.
+      - "rows": per-row validate/upsert, every row logged.
+    Afterwards the packed ranking history (player_ranking_history) of the resolved exts is rebuilt.
+    """
     # Initializing logger
     logger = OperationLogger(
         verbosity=2,
@@ -22,15 +33,22 @@ def resolve_player_rankings(cursor, run_id=None) -> List[PlayerRanking]:
 
     logger.info("Resolving player rankings...", to_console=True)
 
-    # Checking row count in player_ranking_raw
-    cursor.execute("SELECT COUNT(*) FROM player_ranking_raw")
-    row_count = cursor.fetchone()[0]
-    logger.info(f"Found {row_count} player ranking records in player_ranking_raw", to_console=True)
+    changes = RawChanges.pending(cursor, "resolve_player_rankings", "player_ranking_raw", full=full)
+    if (mode or RESOLVE_RANKINGS_MODE) == "sql":
+        _resolve_set_based(cursor, logger, changes, full)
+        return []
 
-    # Fetching all raw ranking records
-    raw_objects = PlayerRankingRaw.get_all(cursor)
+    # Fetching the changed (or all) raw ranking records
+    raw_objects = PlayerRankingRaw.get_all(cursor, changes)
+    row_count = len(raw_objects)
+    logger.info(f"Found {row_count:,} player ranking records to resolve: {changes.describe(cursor)}", to_console=True)
     if not raw_objects:
-        logger.failed({}, "No player ranking data found in player_ranking_raw")
+        if changes.full:
+            logger.failed({}, "No player ranking data found in player_ranking_raw")
+        else:
+            changes.advance(cursor)
+            _refresh_history(cursor, logger, [], full=False)
+        logger.summarize()
         return []
     
     # Caching valid player_id_ext + data_source_id combinations
@@ -43,6 +61,7 @@ def resolve_player_rankings(cursor, run_id=None) -> List[PlayerRanking]:
     total_unchanged = 0
     batch_size = 1000
     batch = []
+    changed_exts = set()
 
     # Processing raw rankings
     for raw in raw_objects:
@@ -101,6 +120,8 @@ def resolve_player_rankings(cursor, run_id=None) -> List[PlayerRanking]:
 
                 # Upserting ranking
                 result = ranking.upsert(cursor)
+                if result in ("inserted", "updated"):
+                    changed_exts.add(ranking.player_id_ext)
                 if result == "inserted":
                     total_inserted += 1
                     logger.success(keys.copy(), "Player ranking inserted")
@@ -128,6 +149,8 @@ def resolve_player_rankings(cursor, run_id=None) -> List[PlayerRanking]:
 
             # Upserting ranking
             result = ranking.upsert(cursor)
+            if result in ("inserted", "updated"):
+                changed_exts.add(ranking.player_id_ext)
             if result == "inserted":
                 total_inserted += 1
                 logger.success(keys.copy(), "Player ranking inserted")
@@ -143,6 +166,10 @@ def resolve_player_rankings(cursor, run_id=None) -> List[PlayerRanking]:
         # Committing final batch
         cursor.connection.commit()
 
+    changes.advance(cursor)
+    cursor.connection.commit()
+    _refresh_history(cursor, logger, changed_exts, full=full or changes.full)
+
     # Logging summary
     logger.info(
         f"Resolving completed — Total inserted: {total_inserted}, total updated: {total_updated}, total unchanged: {total_unchanged}",
@@ -152,6 +179,37 @@ def resolve_player_rankings(cursor, run_id=None) -> List[PlayerRanking]:
 
     return []
 
+def _resolve_set_based(cursor, logger: OperationLogger, changes: RawChanges, full: bool) -> None:
+    """Set-based mode of resolve_player_rankings (see PlayerRanking.resolve_from_raw)."""
+    scope_sql, params = PlayerRankingRaw.scope_sql(changes, full=full or changes.full)
+    stats = PlayerRanking.resolve_from_raw(cursor, scope_sql, params)
+
+    for reason, count in sorted(stats["rejected"].items()):
+        logger.warning("player_ranking_reject", f"{count:,} raw rows rejected: {reason}")
+
+    changes.advance(cursor)
+    cursor.connection.commit()
+    _refresh_history(cursor, logger, stats["player_id_exts"], full=full or changes.full)
+
+    logger.info(
+        f"Resolving completed (set-based) — {stats['scoped']:,} raw rows, inserted: {stats['inserted']:,}, "
+        f"updated: {stats['updated']:,}, unchanged: {stats['unchanged']:,}, "
+        f"rejected: {sum(stats['rejected'].values()):,} (see player_ranking_reject)",
+        to_console=True
+    )
+    logger.summarize()
+
+def _refresh_history(cursor, logger: OperationLogger, player_id_exts, full: bool) -> None:
+    """Rebuild player_ranking_history for the resolved exts (all exts if full or not built yet)."""
+    if full or PlayerRankingHistory.count(cursor) == 0:
+        written = PlayerRankingHistory.refresh(cursor)
+    elif player_id_exts:
+        written = PlayerRankingHistory.refresh(cursor, player_id_exts)
+    else:
+        return
+    cursor.connection.commit()
+    logger.info(f"Ranking history refreshed for {written:,} player_id_exts", to_console=True)
+
 def resolve_player_rankings_main():
     """Entry point for resolving player rankings."""
     # Opening database connection
@@ -8,12 +8,14 @@ from models.season import Season
 from models.club import Club
 from models.player import Player
 from models.player_license import PlayerLicense
+from models.raw_change_log import RawChanges
 from utils import OperationLogger, normalize_key, parse_date, sanitize_name
 
-def resolve_player_transitions(cursor, run_id=None) -> List[PlayerTransition]:
+def resolve_player_transitions(cursor, run_id=None, full: bool = False) -> List[PlayerTransition]:
     """
     Resolve player_transition_raw → player_transition.
     Handles duplicate detection, parsing, validation, and insert.
+    Resolves the raw rows changed since the last run (see models/raw_change_log.py), all rows if full.
     """
 
     logger = OperationLogger(
@@ -36,13 +38,27 @@ def resolve_player_transitions(cursor, run_id=None) -> List[PlayerTransition]:
 
     earliest_season_id = min(s.season_id for s in seasons_map.values() if s.season_id is not None)
 
-    # Fetch all raw player transition records
-    raw_objects = PlayerTransitionRaw.get_all(cursor)
+    # Fetch the changed (or all) raw player transition records
+    changes = RawChanges.pending(cursor, "resolve_player_transitions", "player_transition_raw", full=full)
+    logger.info(f"Resolving {changes.describe(cursor)}", to_console=True)
+    raw_objects = PlayerTransitionRaw.get_all(cursor, changes)
 
     if not raw_objects:
-        logger.skipped("global", "No player transition data found in player_transition_raw")
+        if changes.full:
+            logger.skipped("global", "No player transition data found in player_transition_raw")
+        else:
+            changes.advance(cursor)
+            logger.info("No changed player transitions since the last run", to_console=True)
         return []
 
+    # Name + year keys the cached map doesn't know: one batched DB search for all of them
+    missing_keys = sorted({
+        (sanitize_name(raw.firstname), sanitize_name(raw.lastname), raw.year_born)
+        for raw in raw_objects
+    } - player_name_year_map.keys(), key=str)
+    found = Player.search_by_name_and_year_batch(cursor, missing_keys) if missing_keys else {}
+    player_search_map = {missing_keys[i]: players for i, players in found.items()}
+
     transitions = []
     seen_final_keys = set()
 
@@ -108,16 +124,8 @@ def resolve_player_transitions(cursor, run_id=None) -> List[PlayerTransition]:
         logger_keys["season_id"] = season_id
 
         # --- Resolve player ---
-        # player_key = (firstname, lastname, raw.year_born)
-        # candidates = player_name_year_map.get(player_key)
-        # if not candidates:
-        #     candidates = Player.search_by_name_and_year(cursor, firstname, lastname, raw.year_born)
-        # if not candidates:
-        #     logger.failed(logger_keys.copy(), "No players found matching name and year born")
-        #     continue
-
         player_key = (firstname, lastname, raw.year_born)
-        candidates = player_name_year_map.get(player_key)
+        candidates = player_name_year_map.get(player_key) or player_search_map.get(player_key)
 
         if not candidates:
             # fallback to fullname-based lookup (verified only)
@@ -178,6 +186,7 @@ def resolve_player_transitions(cursor, run_id=None) -> List[PlayerTransition]:
         if result["status"] == "success":
             valid_transitions.append(t)
 
+    changes.advance(cursor)
     logger.summarize()
 
     return valid_transitions
\ No newline at end of file
@@ -1,4 +1,3 @@
-from asyncio.log import logger
 from multiprocessing.util import debug
 from models.tournament_class import TournamentClass
 from models.tournament_class_entry import TournamentClassEntry
@@ -8,19 +7,26 @@ from models.tournament_class_group import TournamentClassGroup  # Import new
 from models.tournament_class_group_member import TournamentClassGroupMember  # Import new
 from models.club import Club
 from models.player import Player
-from models.player_license import PlayerLicense
-from utils import OperationLogger, name_keys_for_lookup_all_splits, normalize_key, parse_date
+from resolvers.class_plan import ClassPlan, PlanContext, PlanLogger, apply_plan, run_class_plans
+from resolvers.player_identity_index import IdentityMatch, PlayerIdentityIndex, pick_best
+from utils import OperationLogger, normalize_key, parse_date
 from typing import List, Dict, Optional, Tuple
 import sqlite3
 from datetime import date
-from config import RESOLVE_ENTRIES_CUTOFF_DATE, RESOLVE_ENTRIES_CLASS_ID_EXTS
+from config import RESOLVE_ENTRIES_CUTOFF_DATE, RESOLVE_ENTRIES_CLASS_ID_EXTS, RESOLVE_CLASS_WORKERS
 import re  # For extracting sort_order
+from collections import ChainMap
 
 # RESOLVE_ENTRIES_CLASS_ID_EXTS = ['10044', '1007', '9972', '7875']
 # RESOLVE_ENTRIES_CLASS_ID_EXTS = ['31167']
 
-def resolve_tournament_class_entries(cursor: sqlite3.Cursor, run_id=None) -> None:
-    """Resolve raw entries into tournament_class_entry, tournament_class_player, tournament_class_group, and tournament_class_group_member tables."""
+def resolve_tournament_class_entries(cursor: sqlite3.Cursor, run_id=None, workers: int = RESOLVE_CLASS_WORKERS) -> None:
+    """
+    Resolve raw entries into tournament_class_entry, tournament_class_player, tournament_class_group, and tournament_class_group_member tables.
+
+    Each class is planned from reads only (_plan_class_entries) and the plan is applied by this
+    process (_apply_* handlers). With workers > 1 the classes are planned in worker processes.
+    """
 
     logger = OperationLogger(
         verbosity       = 2,
@@ -69,117 +75,137 @@ def resolve_tournament_class_entries(cursor: sqlite3.Cursor, run_id=None) -> Non
     logger.info({}, f"Filtered classes after cutoff: {len(filtered_classes)}")
     logger.info({}, f"Classes with raw entry rows: {len(groups)}")
 
-    # Build lookup caches (unchanged from old code)
-    player_name_map = Player.cache_name_map_verified(cursor)
+    # Unverified players are created by the writer, so the name map lives here (shared by all classes)
     player_unverified_name_map = Player.cache_name_map_unverified(cursor)
-    unverified_appearance_map = Player.cache_unverified_appearances(cursor)
-    license_name_club_map = PlayerLicense.cache_name_club_map(cursor)
-
-    for idx, (class_ext, class_groups) in enumerate(groups.items(), start=1):
-
-        logger_keys = {
-            'tournament_class_id_ext':      class_ext,
-            'tournament_class_shortname':   None,
-            'fullname_raw':                 None,
-            'clubname_raw':                 None,
-            'player_id':                    None,
-            'club_id':                      None,
-            'match_type':                   None
+    handlers = {
+        "remove_entries":   _apply_remove_entries,
+        "entry":            _apply_entry,
+        "player":           lambda ctx, data: _apply_player(ctx, data, player_unverified_name_map),
+        "sync_positions":   _apply_sync_positions,
+    }
+
+    units = [(idx, len(groups), class_ext, class_groups) for idx, (class_ext, class_groups) in enumerate(groups.items(), start=1)]
+    run_class_plans(
+        cursor,
+        units,
+        init_state  = _init_planner_state,
+        planner     = _plan_class_entries,
+        apply       = lambda plan: apply_plan(cursor, plan, logger, handlers),
+        workers     = workers,
+    )
+
+    logger.summarize()
+
+# ────────────────────────────────────────────────────────────────────
+# Planning (reads only)
+# ────────────────────────────────────────────────────────────────────
+
+def _init_planner_state(cursor: sqlite3.Cursor) -> Dict:
+    # Build lookup caches: identity index (licenses, names, transitions, appearances) once per run/worker
+    return {"identity_index": PlayerIdentityIndex.build(cursor)}
+
+def _plan_class_entries(cursor: sqlite3.Cursor, state: Dict, unit: Tuple) -> ClassPlan:
+    """Resolve one class into a plan: entries, group members and players to write, plus all log calls."""
+    idx, total, class_ext, class_groups = unit
+    identity_index: PlayerIdentityIndex = state["identity_index"]
+
+    plan = ClassPlan(class_ext, resolver="resolve_tournament_class_entries")
+    logger = PlanLogger(plan)
+
+    logger_keys = {
+        'tournament_class_id_ext':      class_ext,
+        'tournament_class_shortname':   None,
+        'fullname_raw':                 None,
+        'clubname_raw':                 None,
+        'player_id':                    None,
+        'club_id':                      None,
+        'match_type':                   None
+    }
+    try:
+        # Get internal tournament_class_id and start date
+        tc = TournamentClass.get_by_ext_id(cursor, class_ext)
+        if not tc:
+            logger.failed(logger_keys, "No matching tournament_class_id found")
+            return plan
+        tournament_class_id = tc.tournament_class_id
+        class_date = tc.startdate if tc.startdate else date.today()
+        logger_keys.update({'tournament_class_shortname': tc.shortname})
+
+        # ── CLEAR ALL EXISTING ENTRIES FOR THIS CLASS ──────────────────────────
+        # This ensures orphan entries (no longer in raw) are removed on re-resolve.
+        # With ON DELETE CASCADE, this also removes tournament_class_player,
+        # tournament_class_group_member, and match_side rows for these entries.
+        removed_count = TournamentClassEntry.count_for_class(cursor, tournament_class_id)
+        plan.add("remove_entries", tournament_class_id=tournament_class_id)
+        # ───────────────────────────────────────────────────────────────────────
+
+        logger.info(f"[{idx}/{total}] Resolving entries for tournament_class_id_ext={class_ext} (tournament_class_id={tournament_class_id}) with {len(class_groups)} groups (removed {removed_count} existing)...", to_console=True)
+
+        # Resolve clubs for all player rows, then look up every entry against class_date in one batch
+        player_rows = [
+            r for rows in class_groups.values() for r in rows
+            if r.fullname_raw is not None and r.clubname_raw is not None
+        ]
+        row_clubs: Dict[int, Tuple[Optional[Club], Optional[str]]] = {
+            r.row_id: Club.resolve(cursor, r.clubname_raw, allow_prefix=True, fallback_to_unknown=True)
+            for r in player_rows
         }
-        try:
-            # Get internal tournament_class_id and start date
-            tc = TournamentClass.get_by_ext_id(cursor, class_ext)
-            if not tc:
-                logger.failed(logger_keys, "No matching tournament_class_id found")
+        row_hits = dict(zip(
+            (r.row_id for r in player_rows),
+            identity_index.lookup_many(
+                [(r.fullname_raw, (row_clubs[r.row_id][0] or Club(club_id=9999)).club_id) for r in player_rows],
+                class_date
+            )
+        ))
+
+        for group_id, group_rows in class_groups.items():   
+            if not group_rows:
+                logger.skipped(logger_keys, f"Empty group of entries (group_id={group_id})")
                 continue
-            tournament_class_id = tc.tournament_class_id
-            class_date = tc.startdate if tc.startdate else date.today()
-            logger_keys.update({'tournament_class_shortname': tc.shortname})
-
-            # ── CLEAR ALL EXISTING ENTRIES FOR THIS CLASS ──────────────────────────
-            # This ensures orphan entries (no longer in raw) are removed on re-resolve.
-            # With ON DELETE CASCADE, this also removes tournament_class_player,
-            # tournament_class_group_member, and match_side rows for these entries.
-            removed_count = TournamentClassEntry.remove_for_class(cursor, tournament_class_id)
-            # ───────────────────────────────────────────────────────────────────────
-
-            logger.info(f"[{idx}/{len(groups)}] Resolving entries for tournament_class_id_ext={class_ext} (tournament_class_id={tournament_class_id}) with {len(class_groups)} groups (removed {removed_count} existing)...", to_console=True)
-
-            for group_id, group_rows in class_groups.items():   
-                if not group_rows:
-                    logger.skipped(logger_keys, f"Empty group of entries (group_id={group_id})")
-                    continue
-                
-                # Use first row for entry fields, including new group_id_raw and seed_in_group_raw
-                first_row = group_rows[0]        
-                if first_row.fullname_raw is None or first_row.clubname_raw is None:
-                    logger.failed(logger_keys, f"Missing required raw data in group (row_id={first_row.row_id})")
+            
+            # Use first row for entry fields, including new group_id_raw and seed_in_group_raw
+            first_row = group_rows[0]        
+            if first_row.fullname_raw is None or first_row.clubname_raw is None:
+                logger.failed(logger_keys, f"Missing required raw data in group (row_id={first_row.row_id})")
+                continue
+            
+            try:
+                entry_data = {
+                    "tournament_class_id":                  tournament_class_id,
+                    "tournament_class_entry_id_ext":        None,
+                    "tournament_class_entry_group_id_int":  group_id,
+                    "seed":                                 int(first_row.seed_raw) if first_row.seed_raw and first_row.seed_raw.isdigit() else None,
+                    # Final positions in the raw table may contain ordinals like "1:a".
+                    # Normalise to plain integers before storing in the resolved entry.
+                    "final_position":                       parse_final_position(first_row.final_position_raw)
+                }
+                entry = TournamentClassEntry.from_dict(entry_data)
+                is_valid, error_message = entry.validate()
+                if not is_valid:
+                    logger.failed(logger_keys, f"Entry validation failed for group {group_id} (row_id={first_row.row_id}): {error_message}")
                     continue
-                
-                try:
-                    entry_data = {
-                        "tournament_class_id":                  tournament_class_id,
-                        "tournament_class_entry_id_ext":        None,
-                        "tournament_class_entry_group_id_int":  group_id,
-                        "seed":                                 int(first_row.seed_raw) if first_row.seed_raw and first_row.seed_raw.isdigit() else None,
-                        # Final positions in the raw table may contain ordinals like "1:a".
-                        # Normalise to plain integers before storing in the resolved entry.
-                        "final_position":                       parse_final_position(first_row.final_position_raw)
-                    }
-                    entry = TournamentClassEntry.from_dict(entry_data)
-                    is_valid, error_message = entry.validate()
-                    if not is_valid:
-                        logger.failed(logger_keys, f"Entry validation failed for group {group_id} (row_id={first_row.row_id}): {error_message}")
-                        continue
-
-                    action = entry.upsert(cursor)
-                    if not action:
-                        logger.failed(logger_keys.copy(), f"Entry upsert failed for group {group_id} (row_id={first_row.row_id})")
-
-                        continue
-                    # Note: No need to remove players/members per-entry since we clear the whole class
-                    # at the start of resolution via TournamentClassEntry.remove_for_class().
-                    # The ON DELETE CASCADE handles cleanup of tournament_class_player and
-                    # tournament_class_group_member automatically.
+            except Exception as e:
+                logger.failed(logger_keys, f"Failed to create entry/group for group {group_id} (row_id={first_row.row_id}): {str(e)}")
+                continue
 
-                    logger_keys.update({
-                        'fullname_raw': first_row.fullname_raw,
-                        'clubname_raw': first_row.clubname_raw
-                    })
+            entry_keys = logger_keys.copy()
+            logger_keys.update({
+                'fullname_raw': first_row.fullname_raw,
+                'clubname_raw': first_row.clubname_raw
+            })
 
-                    # Handle group assignment if group_id_raw present
-                    group_id_raw = first_row.group_id_raw
-                    seed_in_group_raw = first_row.seed_in_group_raw
-                    tournament_class_group_id = None
-                    if group_id_raw:
-                        # Extract sort_order from group_id_raw (e.g., "Pool 3" -> 3)
-                        sort_order = extract_group_sort_order(group_id_raw)
-                        tcg = TournamentClassGroup.get_by_description(cursor, tournament_class_id, group_id_raw)
-                        if not tcg:
-                            tcg = TournamentClassGroup(
-                                tournament_class_id=tournament_class_id,
-                                description=group_id_raw,
-                                sort_order=sort_order
-                            )
-                            tcg.upsert(cursor)
-                        tournament_class_group_id = tcg.tournament_class_group_id
-
-                        # Assign member with seed_in_group
-                        seed_in_group = int(seed_in_group_raw) if seed_in_group_raw and seed_in_group_raw.isdigit() else None
-                        member = TournamentClassGroupMember(
-                            tournament_class_group_id=tournament_class_group_id,
-                            tournament_class_entry_id=entry.tournament_class_entry_id,
-                            seed_in_group=seed_in_group
-                        )
-                        is_valid, error_message = member.validate()
-                        if is_valid:
-                            member.insert(cursor)
-                        else:
-                            logger.warning(logger_keys, f"Group member validation failed: {error_message}")
-
-                except Exception as e:
-                    logger.failed(logger_keys, f"Failed to create entry/group for group {group_id} (row_id={first_row.row_id}): {str(e)}")
-                    continue
+            # Players (and the success log) are only applied if the entry could be written
+            with plan.group(
+                "entry",
+                entry               = entry,
+                entry_id            = plan.new_id(),
+                group_id            = group_id,
+                row_id              = first_row.row_id,
+                group_id_raw        = first_row.group_id_raw,
+                seed_in_group_raw   = first_row.seed_in_group_raw,
+                entry_keys          = entry_keys,
+                logger_keys         = logger_keys.copy(),
+            ) as entry_op:
 
                 for raw_row in group_rows:
 
@@ -196,11 +222,8 @@ def resolve_tournament_class_entries(cursor: sqlite3.Cursor, run_id=None) -> Non
                     if raw_row.fullname_raw is None or raw_row.clubname_raw is None:
                         logger.failed(logger_keys, f"Missing required raw data for player (row_id={raw_row.row_id})")
                         continue
-                    fullname_raw = raw_row.fullname_raw
-                    clubname_raw = raw_row.clubname_raw
-                    tournament_player_id_ext = raw_row.tournament_player_id_ext
 
-                    club, message = Club.resolve(cursor, clubname_raw, allow_prefix=True, fallback_to_unknown=True)
+                    club, message = row_clubs[raw_row.row_id]
                     if message:
                         logger.warning(logger_keys.copy(), message)
                     if not club:
@@ -209,275 +232,238 @@ def resolve_tournament_class_entries(cursor: sqlite3.Cursor, run_id=None) -> Non
                     club_id = club.club_id
                     logger_keys['club_id'] = club_id
 
+                    # No identity hit → the writer falls back to an unverified player
                     player_id, match_type = match_player(
-                        cursor,
-                        fullname_raw,
-                        clubname_raw,
+                        raw_row.fullname_raw,
+                        raw_row.clubname_raw,
                         class_date,
-                        license_name_club_map,
-                        player_name_map,
-                        player_unverified_name_map,
-                        unverified_appearance_map,
+                        identity_index,
                         logger,
                         logger_keys.copy(),
-                        club_id=club_id
+                        club_id=club_id,
+                        identity_hits=row_hits[raw_row.row_id]
+                    )
+                    if player_id is not None:
+                        logger_keys['player_id']    = player_id
+                        logger_keys['match_type']   = match_type
+                    plan.add(
+                        "player",
+                        entry_id                    = entry_op["entry_id"],
+                        tournament_player_id_ext    = raw_row.tournament_player_id_ext,
+                        fullname_raw                = raw_row.fullname_raw,
+                        clubname_raw                = raw_row.clubname_raw,
+                        player_id                   = player_id,
+                        match_type                  = match_type,
+                        club_id                     = club_id,
+                        class_date                  = class_date,
+                        logger_keys                 = logger_keys.copy(),
                     )
-                    if player_id is None:
-                        logger.failed(logger_keys, "No match for player")
-                        continue
-                    logger_keys['player_id']    = player_id
-                    logger_keys['match_type']   = match_type
-
-                    player_data = {
-                        "tournament_class_entry_id":    entry.tournament_class_entry_id,
-                        "tournament_player_id_ext":     tournament_player_id_ext,
-                        "player_id":                    player_id,
-                        "club_id":                      club_id
-                    }
-                    player = TournamentClassPlayer.from_dict(player_data)
-                    is_valid, error_message = player.validate()
-                    if not is_valid:
-                        logger.warning(logger_keys, f"Player validation failed: {error_message}")
-                        continue
-                    action = player.upsert(cursor)
-                    if action:
-                        pass
-                    else:
-                        logger.warning(logger_keys.copy(), "Player upsert failed (invalid or no change)")
-                        continue
-
-                    # Link unverified appearance if player is unverified
-                    if match_type and match_type.startswith("fallback_unverified"):
-                        status = Player.link_unverified_appearance(cursor, player_id, club_id, class_date)
-                        if status == "created":
-                            logger.info(logger_keys.copy(), "Created new unverified appearance", to_console=False)
-                        else:
-                            pass
-
 
                 logger.success(logger_keys.copy(), "Class entry resolved successfully")
 
-            # After processing every entry for the class, copy any parsed
-            # final_position_raw values from the raw table to the resolved rows.
-            synced_positions = sync_final_positions_from_raw(
-                cursor,
-                tournament_class_id=tournament_class_id,
-                tournament_class_id_ext=class_ext,
-            )
-            if synced_positions:
-                logger.info(
-                    logger_keys.copy(),
-                    f"Final positions updated for {synced_positions} entries",
-                    to_console=False,
-                )
+        # After processing every entry for the class, copy any parsed
+        # final_position_raw values from the raw table to the resolved rows.
+        plan.add(
+            "sync_positions",
+            tournament_class_id     = tournament_class_id,
+            tournament_class_id_ext = class_ext,
+            logger_keys             = logger_keys.copy(),
+        )
 
-        except Exception as e:
-            logger.failed(logger_keys.copy(), f"Exception during resolution: {str(e)}")
+    except Exception as e:
+        logger.failed(logger_keys.copy(), f"Exception during resolution: {str(e)}")
 
-    logger.summarize()
+    return plan
 
 def match_player(
-    cursor,
     fullname_raw: str,
     clubname_raw: str,
     class_date: date,
-    license_name_club_map,
-    player_name_map,
-    player_unverified_name_map,
-    unverified_appearance_map,
+    identity_index: PlayerIdentityIndex,
     logger: OperationLogger,
     item_keys: Dict,
-    club_id: Optional[int] = None
+    club_id: Optional[int] = None,
+    identity_hits: Optional[Dict[str, IdentityMatch]] = None
 ) -> Tuple[Optional[int], Optional[str]]:
     """
-    Match player using a series of strategies.
-    Returns (player_id, match_type) or (None, None).
+    Match player using the identity index (one lookup answers every strategy, see STRATEGY_ORDER).
+    identity_hits: precomputed lookup for this entry (from PlayerIdentityIndex.lookup_many).
+    Returns (player_id, match_type) or (None, None); the unverified fallback is done by the writer (_apply_player).
     """
-    strategies = [
-        match_by_license_exact,
-        match_by_license_substring,
-        match_by_any_season_exact,
-        match_by_any_season_substring,
-        match_by_transition_exact,
-        match_by_transition_substring,
-        match_by_name_exact,
-        match_by_unverified_with_club,
-    ]
-
-    for strategy in strategies:
-        outcome = strategy(
-            cursor,
-            fullname_raw,
-            clubname_raw,
-            class_date,
-            license_name_club_map,
-            player_name_map,
-            club_id,
-            logger,
-            item_keys.copy(),
-            unverified_appearance_map if strategy == match_by_unverified_with_club else None,
-        )
-        if outcome:
-            pid, match_type = outcome
-            # unified logging
-            log_keys = item_keys.copy()
-            log_keys.update({
-                "player_id": pid,
-                "match_type": match_type,
-                "fullname_raw": fullname_raw,
-                "clubname_raw": clubname_raw,
-                "club_id": club_id,
-            })
-            if debug:
-                logger.info(log_keys, f"Matched player via {strategy.__name__}", to_console=False)
-            return pid, match_type
+    if identity_hits is None:
+        identity_hits = identity_index.lookup(fullname_raw, club_id, class_date)
+    hit = pick_best(identity_hits)
+    if not hit:
+        return None, None
+
+    if hit.match_type == "any_season_exact":
+        logger.warning(item_keys.copy(), "Matched by name with license in club, but not necessarily valid on class date")
+    elif hit.match_type == "any_season_substring":
+        logger.warning(item_keys.copy(), "Matched by substring with license in club, but not necessarily valid on class date")
+
+    # unified logging
+    log_keys = item_keys.copy()
+    log_keys.update({
+        "player_id": hit.player_id,
+        "match_type": hit.match_type,
+        "fullname_raw": fullname_raw,
+        "clubname_raw": clubname_raw,
+        "club_id": club_id,
+    })
+    if debug:
+        logger.info(log_keys, f"Matched player via match_by_{hit.match_type} ({_format_provenance(hit.provenance)})", to_console=False)
+    return hit.player_id, hit.match_type
+
+# ────────────────────────────────────────────────────────────────────
+# Writing (applies plans, single process)
+# ────────────────────────────────────────────────────────────────────
+
+def _apply_remove_entries(ctx: PlanContext, data: Dict) -> None:
+    TournamentClassEntry.remove_for_class(ctx.cursor, data["tournament_class_id"])
+
+def _apply_entry(ctx: PlanContext, data: Dict) -> None:
+    """Upsert the entry and its group membership, then apply the entry's player ops."""
+    cursor, logger = ctx.cursor, ctx.logger
+    entry: TournamentClassEntry = data["entry"]
+    group_id, row_id = data["group_id"], data["row_id"]
+    logger_keys = data["entry_keys"]
+    try:
+        action = entry.upsert(cursor)
+        if not action:
+            logger.failed(logger_keys.copy(), f"Entry upsert failed for group {group_id} (row_id={row_id})")
+            return
+        # Note: No need to remove players/members per-entry since we clear the whole class
+        # at the start of resolution via TournamentClassEntry.remove_for_class().
+        # The ON DELETE CASCADE handles cleanup of tournament_class_player and
+        # tournament_class_group_member automatically.
+
+        logger_keys = data["logger_keys"]
+
+        # Handle group assignment if group_id_raw present
+        group_id_raw = data["group_id_raw"]
+        seed_in_group_raw = data["seed_in_group_raw"]
+        if group_id_raw:
+            # Extract sort_order from group_id_raw (e.g., "Pool 3" -> 3)
+            sort_order = extract_group_sort_order(group_id_raw)
+            tcg = TournamentClassGroup.get_by_description(cursor, entry.tournament_class_id, group_id_raw)
+            if not tcg:
+                tcg = TournamentClassGroup(
+                    tournament_class_id=entry.tournament_class_id,
+                    description=group_id_raw,
+                    sort_order=sort_order
+                )
+                tcg.upsert(cursor)
+
+            # Assign member with seed_in_group
+            seed_in_group = int(seed_in_group_raw) if seed_in_group_raw and seed_in_group_raw.isdigit() else None
+            member = TournamentClassGroupMember(
+                tournament_class_group_id=tcg.tournament_class_group_id,
+                tournament_class_entry_id=entry.tournament_class_entry_id,
+                seed_in_group=seed_in_group
+            )
+            is_valid, error_message = member.validate()
+            if is_valid:
+                member.insert(cursor)
+            else:
+                logger.warning(logger_keys, f"Group member validation failed: {error_message}")
+
+    except Exception as e:
+        logger.failed(logger_keys, f"Failed to create entry/group for group {group_id} (row_id={row_id}): {str(e)}")
+        return
+
+    ctx.ids[data["entry_id"]] = entry.tournament_class_entry_id
+    ctx.apply(data["ops"])
+
+def _apply_player(ctx: PlanContext, data: Dict, player_unverified_name_map: Dict[str, int]) -> None:
+    cursor, logger = ctx.cursor, ctx.logger
+    logger_keys = data["logger_keys"]
+    fullname_raw, clubname_raw, club_id = data["fullname_raw"], data["clubname_raw"], data["club_id"]
+    player_id, match_type = data["player_id"], data["match_type"]
 
     # fallback
-    outcome = fallback_unverified(cursor, fullname_raw, clubname_raw, player_unverified_name_map, logger, item_keys.copy())
-    if outcome:
-        pid, match_type = outcome
-        log_keys = item_keys.copy()
+    if player_id is None:
+        name_map = _class_unverified_name_map(ctx, player_unverified_name_map)
+        outcome = fallback_unverified(cursor, fullname_raw, clubname_raw, name_map, logger, logger_keys.copy())
+        if not outcome:
+            logger.failed(logger_keys, "No match for player")
+            return
+        player_id, match_type = outcome
+        log_keys = logger_keys.copy()
         log_keys.update({
-            "player_id": pid,
+            "player_id": player_id,
             "match_type": match_type,
             "fullname_raw": fullname_raw,
             "clubname_raw": clubname_raw,
             "club_id": club_id,
         })
         logger.info(log_keys, "Matched player via fallback_unverified", to_console=False)
-        return pid, match_type
-
-    return None, None
-
-
-def match_by_license_exact(cursor, fullname_raw: str, clubname_raw: str, class_date: date, license_name_club_map, player_name_map, club_id: Optional[int], logger: OperationLogger, item_keys: Dict, _):
-    keys = name_keys_for_lookup_all_splits(fullname_raw)
-    candidates = set()
-    for k in keys:
-        key = (k, club_id) if club_id else (k, None)
-        if key in license_name_club_map:
-            for lic in license_name_club_map[key]:
-                if lic["valid_from"] <= class_date <= lic["valid_to"]:
-                    candidates.add(lic["player_id"])
-    if len(candidates) == 1:
-        return list(candidates)[0], "license_exact"
-    return None
 
-def match_by_license_substring(cursor, fullname_raw: str, clubname_raw: str, class_date: date, license_name_club_map, player_name_map, club_id: Optional[int], logger: OperationLogger, item_keys: Dict, _):
-    clean = normalize_key(fullname_raw)
-    parts = clean.split()
-    if len(parts) > 2:
-        return None
-    first_tok, last_tok = parts[0], parts[-1]
-    candidates = set()
-    for (full_key, cid), rows in license_name_club_map.items():
-        if cid != club_id and club_id is not None:
-            continue
-        if len(full_key.split()) < 3:
-            continue
-        if first_tok in full_key and last_tok in full_key:
-            for row in rows:
-                if row["valid_from"] <= class_date <= row["valid_to"]:
-                    candidates.add(row["player_id"])
-    if len(candidates) == 1:
-        return list(candidates)[0], "license_substring"
-    return None
-
-def match_by_any_season_exact(cursor, fullname_raw: str, clubname_raw: str, class_date: date, license_name_club_map, player_name_map, club_id: Optional[int], logger: OperationLogger, item_keys: Dict, _):
-    keys = name_keys_for_lookup_all_splits(fullname_raw)
-    candidates = set()
-    for k in keys:
-        key = (k, club_id) if club_id else (k, None)
-        if key in license_name_club_map:
-            for lic in license_name_club_map[key]:
-                candidates.add(lic["player_id"])
-    if len(candidates) == 1:
-        logger.warning(item_keys.copy(), "Matched by name with license in club, but not necessarily valid on class date")
-        return list(candidates)[0], "any_season_exact"
-    return None
-
-def match_by_any_season_substring(cursor, fullname_raw: str, clubname_raw: str, class_date: date, license_name_club_map, player_name_map, club_id: Optional[int], logger: OperationLogger, item_keys: Dict, _):
-    clean = normalize_key(fullname_raw)
-    parts = clean.split()
-    if len(parts) > 2:
-        return None
-    first_tok, last_tok = parts[0], parts[-1]
-    candidates = set()
-    for (full_key, cid), rows in license_name_club_map.items():
-        if cid != club_id and club_id is not None:
-            continue
-        if len(full_key.split()) < 3:
-            continue
-        if first_tok in full_key and last_tok in full_key:
-            for row in rows:
-                candidates.add(row["player_id"])
-    if len(candidates) == 1:
-        logger.warning(item_keys.copy(), "Matched by substring with license in club, but not necessarily valid on class date")
-        return list(candidates)[0], "any_season_substring"
-    return None
+    logger_keys['player_id']    = player_id
+    logger_keys['match_type']   = match_type
+
+    player_data = {
+        "tournament_class_entry_id":    ctx.id(data["entry_id"]),
+        "tournament_player_id_ext":     data["tournament_player_id_ext"],
+        "player_id":                    player_id,
+        "club_id":                      club_id
+    }
+    player = TournamentClassPlayer.from_dict(player_data)
+    is_valid, error_message = player.validate()
+    if not is_valid:
+        logger.warning(logger_keys, f"Player validation failed: {error_message}")
+        return
+    action = player.upsert(cursor)
+    if not action:
+        logger.warning(logger_keys.copy(), "Player upsert failed (invalid or no change)")
+        return
 
-def match_by_transition_exact(cursor, fullname_raw: str, clubname_raw: str, class_date: date, license_name_club_map, player_name_map, club_id: Optional[int], logger: OperationLogger, item_keys: Dict, _):
-    pids = get_name_candidates(fullname_raw, player_name_map)
-    if not pids:
-        return None
-    placeholders = ",".join("?" for _ in pids)
-    try:
-        cursor.execute(f"SELECT DISTINCT player_id FROM player_transition WHERE (club_id_to = ? OR club_id_from = ?) AND transition_date <= ? AND player_id IN ({placeholders})", [club_id, club_id, class_date] + pids if club_id else [None, None, class_date] + pids)
-    except Exception as e:
-        logger.failed(item_keys.copy(), f"Error executing SQL for transition_exact: {e}")
-        return None
-    trans = [r[0] for r in cursor.fetchall()]
-    if len(trans) == 1:
-        return trans[0], "transition_exact"
-    return None
+    # Link unverified appearance if player is unverified
+    if match_type and match_type.startswith("fallback_unverified"):
+        status = Player.link_unverified_appearance(cursor, player_id, club_id, data["class_date"])
+        if status == "created":
+            logger.info(logger_keys.copy(), "Created new unverified appearance", to_console=False)
 
-def match_by_transition_substring(cursor, fullname_raw: str, clubname_raw: str, class_date: date, license_name_club_map, player_name_map, club_id: Optional[int], logger: OperationLogger, item_keys: Dict, _):
-    clean = normalize_key(fullname_raw)
-    parts = clean.split()
-    if len(parts) > 2:
-        return None
-    first_tok, last_tok = parts[0], parts[-1]
-    candidates = set()
-    for (full_key, cid), rows in license_name_club_map.items():
-        if cid != club_id and club_id is not None:
-            continue
-        if len(full_key.split()) < 3:
-            continue
-        if first_tok in full_key and last_tok in full_key:
-            for row in rows:
-                candidates.add(row["player_id"])
-    if not candidates:
-        return None
-    placeholders = ",".join("?" for _ in candidates)
-    cursor.execute(f"SELECT DISTINCT player_id FROM player_transition WHERE (club_id_to = ? OR club_id_from = ?) AND transition_date <= ? AND player_id IN ({placeholders})", [club_id, club_id, class_date] + list(candidates) if club_id else [None, None, class_date] + list(candidates))
-    trans = [r[0] for r in cursor.fetchall()]
-    if len(trans) == 1:
-        return trans[0], "transition_substring"
-    return None
+def _class_unverified_name_map(ctx: PlanContext, player_unverified_name_map: Dict[str, int]) -> ChainMap:
+    """
+    Unverified name map for the class being applied: players it creates go to a class overlay,
+    merged into the shared map only once the class is released (a rolled back class's players
+    never existed, so later classes must not link to them).
+    """
+    if "unverified_names" not in ctx.state:
+        created: Dict[str, int] = {}
+        ctx.state["unverified_names"] = ChainMap(created, player_unverified_name_map)
+        ctx.on_release.append(lambda: player_unverified_name_map.update(created))
+    return ctx.state["unverified_names"]
+
+def _apply_sync_positions(ctx: PlanContext, data: Dict) -> None:
+    synced_positions = sync_final_positions_from_raw(
+        ctx.cursor,
+        tournament_class_id=data["tournament_class_id"],
+        tournament_class_id_ext=data["tournament_class_id_ext"],
+    )
+    if synced_positions:
+        ctx.logger.info(
+            data["logger_keys"],
+            f"Final positions updated for {synced_positions} entries",
+            to_console=False,
+        )
 
-def match_by_unverified_with_club(cursor, fullname_raw: str, clubname_raw: str, class_date: date, license_name_club_map, player_name_map, club_id: Optional[int], logger: OperationLogger, item_keys: Dict, unverified_appearance_map):
-    clean = normalize_key(fullname_raw)
-    if clean in unverified_appearance_map:
-        for entry in unverified_appearance_map[clean]:
-            if entry["club_id"] == club_id or club_id is None:
-                # logger.warning(item_keys.copy(), "Matched unverified player with prior apperance for same club")
-                return entry["player_id"], "unverified_with_club"
-    return None
 
-def match_by_name_exact(cursor, fullname_raw: str, clubname_raw: str, class_date: date, license_name_club_map, player_name_map, club_id: Optional[int], logger: OperationLogger, item_keys: Dict, _):
-    """Match player by exact name in player_name_map, ignoring club_id."""
-    # print(f"Matching by exact name: {fullname_raw}")
-    keys = name_keys_for_lookup_all_splits(fullname_raw)
-    candidates = set()
-    for k in keys:
-        if k in player_name_map:
-            candidates.update(player_name_map[k])
-    # logger.info(item_keys.copy(), f"match_by_name_exact: found {len(candidates)} candidates: {candidates}")
-    if len(candidates) == 1:
-        pid = list(candidates)[0]
-        # logger.info(item_keys.copy(), f"match_by_name_exact: matched player_id={pid}")
-        return pid, "name_exact_verified"
-    return None
+def _format_provenance(provenance: List[Dict]) -> str:
+    """Short provenance text for the match log, e.g. 'license 123 (season 14)'."""
+    parts = []
+    for p in provenance[:3]:
+        if p["source"] == "license":
+            parts.append(f"license {p['license_id']} (season {p['season_id']})")
+        elif p["source"] == "transition":
+            parts.append(f"transition {p['club_id_from']}→{p['club_id_to']} {p['transition_date']}")
+        elif p["source"] == "unverified_appearance":
+            parts.append(f"appearance {p['appearance_date']}")
+        else:
+            parts.append(f"{p['source']} '{p['key']}'")
+    if len(provenance) > 3:
+        parts.append(f"+{len(provenance) - 3} more")
+    return ", ".join(parts)
 
 def fallback_unverified(
     cursor,
@@ -521,13 +507,6 @@ def fallback_unverified(
     return None
 
 
-def get_name_candidates(fullname_raw: str, player_name_map: Dict[str, List[int]]) -> List[int]:
-    keys = name_keys_for_lookup_all_splits(fullname_raw)
-    matches = set()
-    for k in keys:
-        matches.update(player_name_map.get(k, []))
-    return list(matches)
-
 def extract_group_sort_order(group_id_raw: str) -> Optional[int]:
     match = re.search(r'\d+', group_id_raw)
     return int(match.group()) if match else None
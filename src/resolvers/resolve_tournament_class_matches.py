@@ -31,6 +31,7 @@ from models.match_side import MatchSide
 from models.match_player import MatchPlayer
 from models.tournament_class_match import TournamentClassMatch
 from models.tournament_class_group import TournamentClassGroup
+from resolvers.class_plan import ClassPlan, PlanContext, PlanLogger, apply_plan, run_class_plans
 from utils import OperationLogger, normalize_key, parse_date
 from typing import List, Dict, Optional, Tuple, Any
 import sqlite3
@@ -43,6 +44,7 @@ from config import (
     SCRAPE_PARTICIPANTS_ORDER,
     SCRAPE_PARTICIPANTS_CUTOFF_DATE,
     RESOLVE_MATCHES_CUTOFF_DATE,
+    RESOLVE_CLASS_WORKERS,
     PLACEHOLDER_PLAYER_ID,
     PLACEHOLDER_PLAYER_NAME,
     PLACEHOLDER_CLUB_ID,
@@ -73,8 +75,13 @@ def _format_table(headers: List[str], rows: List[List[str]]) -> List[str]:
     lines.append(separator)
     return lines
 
-def resolve_tournament_class_matches(cursor: sqlite3.Cursor, run_id=None) -> None:
-    """Resolve raw matches into match-related tables."""
+def resolve_tournament_class_matches(cursor: sqlite3.Cursor, run_id=None, workers: int = RESOLVE_CLASS_WORKERS) -> None:
+    """
+    Resolve raw matches into match-related tables.
+
+    Each class is planned from reads only (_plan_class_matches) and the plan is applied by this
+    process (_apply_* handlers). With workers > 1 the classes are planned in worker processes.
+    """
 
     logger = OperationLogger(
         verbosity       = 2,
@@ -122,369 +129,468 @@ def resolve_tournament_class_matches(cursor: sqlite3.Cursor, run_id=None) -> Non
 
     logger.info({}, f"Classes with raw match rows: {len(groups)}")
 
-    for idx, (class_ext, class_raws) in enumerate(groups.items(), start=1):
-        logger_keys = {
-            'tournament_class_id_ext': class_ext,
-            'match_id_ext': None,
-            'group_id_ext': None,
-            's1_fullname_raw': None,
-            's2_fullname_raw': None,
-        }
+    # Writer side: apply each class plan in order (see resolvers/class_plan.py)
+    handlers = {
+        "remove_matches":   _apply_remove_matches,
+        "synthetic_entry":  _apply_synthetic_entry,
+        "match":            _apply_match,
+        "match_group":      _apply_match_group,
+    }
 
-        logger.inc_processed()
+    units = [(idx, len(groups), class_ext, class_raws) for idx, (class_ext, class_raws) in enumerate(groups.items(), start=1)]
+    run_class_plans(
+        cursor,
+        units,
+        init_state  = _init_planner_state,
+        planner     = _plan_class_matches,
+        apply       = lambda plan: apply_plan(cursor, plan, logger, handlers),
+        workers     = workers,
+    )
 
-        try:
+    logger.summarize()
 
-            tc = TournamentClass.get_by_ext_id(cursor, class_ext)
-            if not tc:
-                logger.failed(logger_keys.copy(), "No matching tournament_class found")
-                continue
+# ────────────────────────────────────────────────────────────────────
+# Planning (reads only)
+# ────────────────────────────────────────────────────────────────────
 
-            tournament_class_id = tc.tournament_class_id
-            match_date = tc.startdate if tc.startdate else None
+def _init_planner_state(cursor: sqlite3.Cursor) -> Dict:
+    return {}
 
-            # ── per-class stats ────────────────────────────────────────────────
-            removed_count      = TournamentClassMatch.remove_for_class(cursor, tournament_class_id)
-            raws_count         = len(class_raws)
-            inserted_count     = 0
-            failed_count       = 0
-            garbage_count      = 0
-            no_participants    = 0
-            unmatched_sides    = 0
+def _plan_class_matches(cursor: sqlite3.Cursor, state: Dict, unit: Tuple) -> ClassPlan:
+    """Resolve one class into a plan: matches (and synthetic entries) to write, plus all log calls."""
+    idx, total, class_ext, class_raws = unit
 
-            # Build participant cache/index for this class
-            entry_index = build_entry_index_for_class(cursor, tournament_class_id)
-            if not entry_index.get("entries"):
-                # we'll still walk raws to count doubles/garbage, but resolution will fail
-                pass
-
-            # Build parent/sibling entry index if this is a B-playoff class
-            # This allows us to find players who are in the parent class but not in the B-class entry list
-            parent_entry_index: Optional[Dict[str, Any]] = None
-            parent_class_shortname: Optional[str] = None
-            if tc.tournament_class_id_parent:
-                parent_class = TournamentClass.get_by_id(cursor, tc.tournament_class_id_parent)
-                if parent_class:
-                    parent_entry_index = build_entry_index_for_class(cursor, parent_class.tournament_class_id)
-                    parent_class_shortname = parent_class.shortname
-                    if debug and parent_entry_index.get("entries"):
-                        logger.info(
-                            logger_keys.copy(),
-                            f"Built parent entry index from '{parent_class.shortname}' with {len(parent_entry_index.get('entries', []))} entries"
-                        )
-
-            # Group raws by stage and group (for group_id update after insert)
-            stage_group_matches: Dict[int, Dict[str, List[TournamentClassMatchRaw]]] = {}
-            for raw in class_raws:
-                stage_id  = raw.tournament_class_stage_id
-                group_ext = raw.group_id_ext or ""
-                stage_group_matches.setdefault(stage_id, {}).setdefault(group_ext, []).append(raw)
-
-            # ── process each raw ───────────────────────────────────────────────
-            debug_rows: List[List[str]] = [] if debug else []
-            headers = [
-                "Stage","P1 id","P1 name","P1 club","VS","P2 id","P2 name","P2 club","Winner","Tokens/BYE","Resolved","Matched","Issue"
-            ]
-            
-            # Cache for stage descriptions
-            stage_desc_cache: Dict[int, str] = {}
-            def get_stage_desc(stage_id: Optional[int]) -> str:
-                if stage_id is None:
-                    return "?"
-                if stage_id not in stage_desc_cache:
-                    cursor.execute("SELECT shortname FROM tournament_class_stage WHERE tournament_class_stage_id = ?", (stage_id,))
-                    row = cursor.fetchone()
-                    stage_desc_cache[stage_id] = row[0] if row else "?"
-                return stage_desc_cache[stage_id]
-            
-            # Track resolved matches for KO sanity check (stage_id -> round_no -> set of player_ids)
-            ko_round_players: Dict[int, Dict[Optional[int], Dict[int, str]]] = {}
-            for raw in class_raws:
-                logger_keys.update({
-                    'match_id_ext':      raw.match_id_ext,
-                    'group_id_ext':      raw.group_id_ext,
-                    's1_fullname_raw':   raw.s1_fullname_raw,
-                    's2_fullname_raw':   raw.s2_fullname_raw,
-                })
-
-                # Get stage description for debug output
-                stage_desc = get_stage_desc(raw.tournament_class_stage_id) if raw.tournament_class_stage_id else "?"
-                if raw.group_id_ext:
-                    stage_desc = f"{stage_desc}:{raw.group_id_ext}"
-
-                # Prepare debug row context (raw values)
-                raw_p1_id  = str(raw.s1_player_id_ext or "")
-                raw_p1_nm  = raw.s1_fullname_raw or ""
-                raw_p1_clb = raw.s1_clubname_raw or ""
-                raw_p2_id  = str(raw.s2_player_id_ext or "")
-                raw_p2_nm  = raw.s2_fullname_raw or ""
-                raw_p2_clb = raw.s2_clubname_raw or ""
-                tokens = (raw.game_point_tokens or "").strip()
-                early_games, early_winner, early_wo = parse_scores(tokens, raw.best_of)
-                winner_text = "Unknown"
-                if early_winner == 1:
-                    winner_text = raw_p1_nm or "Unknown"
-                elif early_winner == 2:
-                    winner_text = raw_p2_nm or "Unknown"
-                tokens_text = tokens if tokens else ""
-                # Check if player_id_ext exists in the participant index
-                by_ext_index = entry_index.get("by_ext", {})
-                method_s1 = ("placeholder" if _is_placeholder(raw_p1_nm) else ("by_ext" if (raw.s1_player_id_ext and raw.s1_player_id_ext in by_ext_index) else "name_score"))
-                method_s2 = ("placeholder" if _is_placeholder(raw_p2_nm) else ("by_ext" if (raw.s2_player_id_ext and raw.s2_player_id_ext in by_ext_index) else "name_score"))
-                method_summary = f"S1:{method_s1}; S2:{method_s2}"
-                issue_msg = ""
-                resolved_ok = False
-
-                # Garbage?
-                if is_garbage_match(raw):
-                    garbage_count += 1
-                    if debug:
-                        debug_rows.append([stage_desc,raw_p1_id,raw_p1_nm,raw_p1_clb,"vs",raw_p2_id,raw_p2_nm,raw_p2_clb,winner_text,tokens_text,"N",method_summary,"garbage (both placeholders)"])
-                    continue
-
-                # Previously: skipped rows with '/' (assumed doubles). Disabled.
+    plan = ClassPlan(class_ext, resolver="resolve_tournament_class_matches")
+    logger = PlanLogger(plan)
 
-                # No participants cached?
-                if not entry_index.get("entries"):
-                    no_participants += 1
-                    failed_count += 1
-                    if debug:
-                        debug_rows.append([stage_desc,raw_p1_id,raw_p1_nm,raw_p1_clb,"vs",raw_p2_id,raw_p2_nm,raw_p2_clb,winner_text,tokens_text,"N",method_summary,"no participants cached for class"])
-                    continue
+    logger_keys = {
+        'tournament_class_id_ext': class_ext,
+        'match_id_ext': None,
+        'group_id_ext': None,
+        's1_fullname_raw': None,
+        's2_fullname_raw': None,
+    }
 
-                # Already exists guard (paranoia, since we cleared)
-                if TournamentClassMatch.exists(cursor, tournament_class_id, raw.match_id_ext):
-                    # shouldn't happen after remove_for_class, but don't insert again
-                    continue
+    logger.inc_processed()
 
-                # Resolve sides (always pick best candidate within the class)
-                # If parent_entry_index is available (B-playoff class), we'll fallback to it
-                side1 = resolve_side(
-                    raw.s1_player_id_ext, raw.s1_fullname_raw, raw.s1_clubname_raw,
-                    entry_index, cursor, logger, logger_keys, side=1,
-                    tournament_class_id=tournament_class_id, group_desc_hint=raw.group_id_ext,
-                    parent_entry_index=parent_entry_index, parent_class_shortname=parent_class_shortname
-                )
-                side2 = resolve_side(
-                    raw.s2_player_id_ext, raw.s2_fullname_raw, raw.s2_clubname_raw,
-                    entry_index, cursor, logger, logger_keys, side=2,
-                    tournament_class_id=tournament_class_id, group_desc_hint=raw.group_id_ext,
-                    parent_entry_index=parent_entry_index, parent_class_shortname=parent_class_shortname
-                )
+    try:
 
-                if not side1 or not side2:
-                    unmatched_sides += 1
-                    failed_count += 1
-                    if debug:
-                        parts = []
-                        if not side1:
-                            parts.append("S1 unmatched")
-                        if not side2:
-                            parts.append("S2 unmatched")
-                        issue_msg = ", ".join(parts) or "unmatched side(s)"
-                        debug_rows.append([stage_desc,raw_p1_id,raw_p1_nm,raw_p1_clb,"vs",raw_p2_id,raw_p2_nm,raw_p2_clb,winner_text,tokens_text,"N",method_summary,issue_msg])
-                    continue
+        tc = TournamentClass.get_by_ext_id(cursor, class_ext)
+        if not tc:
+            logger.failed(logger_keys.copy(), "No matching tournament_class found")
+            return plan
+
+        tournament_class_id = tc.tournament_class_id
+        match_date = tc.startdate if tc.startdate else None
+
+        # ── per-class stats ────────────────────────────────────────────────
+        removed_count      = TournamentClassMatch.count_for_class(cursor, tournament_class_id)
+        plan.add("remove_matches", tournament_class_id=tournament_class_id)
+        raws_count         = len(class_raws)
+        inserted_count     = 0
+        failed_count       = 0
+        garbage_count      = 0
+        no_participants    = 0
+        unmatched_sides    = 0
+
+        # Build participant cache/index for this class
+        entry_index = build_entry_index_for_class(cursor, tournament_class_id)
+        if not entry_index.get("entries"):
+            # we'll still walk raws to count doubles/garbage, but resolution will fail
+            pass
+
+        # Build parent/sibling entry index if this is a B-playoff class
+        # This allows us to find players who are in the parent class but not in the B-class entry list
+        parent_entry_index: Optional[Dict[str, Any]] = None
+        parent_class_shortname: Optional[str] = None
+        if tc.tournament_class_id_parent:
+            parent_class = TournamentClass.get_by_id(cursor, tc.tournament_class_id_parent)
+            if parent_class:
+                parent_entry_index = build_entry_index_for_class(cursor, parent_class.tournament_class_id)
+                parent_class_shortname = parent_class.shortname
+                if debug and parent_entry_index.get("entries"):
+                    logger.info(
+                        logger_keys.copy(),
+                        f"Built parent entry index from '{parent_class.shortname}' with {len(parent_entry_index.get('entries', []))} entries"
+                    )
+
+        # Group raws by stage and group (for group_id update after insert)
+        stage_group_matches: Dict[int, Dict[str, List[TournamentClassMatchRaw]]] = {}
+        for raw in class_raws:
+            stage_id  = raw.tournament_class_stage_id
+            group_ext = raw.group_id_ext or ""
+            stage_group_matches.setdefault(stage_id, {}).setdefault(group_ext, []).append(raw)
+
+        # ── process each raw ───────────────────────────────────────────────
+        debug_rows: List[List[str]] = [] if debug else []
+        headers = [
+            "Stage","P1 id","P1 name","P1 club","VS","P2 id","P2 name","P2 club","Winner","Tokens/BYE","Resolved","Matched","Issue"
+        ]
+    
+        # Cache for stage descriptions
+        stage_desc_cache: Dict[int, str] = {}
+        def get_stage_desc(stage_id: Optional[int]) -> str:
+            if stage_id is None:
+                return "?"
+            if stage_id not in stage_desc_cache:
+                cursor.execute("SELECT shortname FROM tournament_class_stage WHERE tournament_class_stage_id = ?", (stage_id,))
+                row = cursor.fetchone()
+                stage_desc_cache[stage_id] = row[0] if row else "?"
+            return stage_desc_cache[stage_id]
+    
+        # Track resolved matches for KO sanity check (stage_id -> round_no -> set of player_ids)
+        ko_round_players: Dict[int, Dict[Optional[int], Dict[int, str]]] = {}
+        planned_match_exts: set = set()
+        for raw in class_raws:
+            logger_keys.update({
+                'match_id_ext':      raw.match_id_ext,
+                'group_id_ext':      raw.group_id_ext,
+                's1_fullname_raw':   raw.s1_fullname_raw,
+                's2_fullname_raw':   raw.s2_fullname_raw,
+            })
+
+            # Get stage description for debug output
+            stage_desc = get_stage_desc(raw.tournament_class_stage_id) if raw.tournament_class_stage_id else "?"
+            if raw.group_id_ext:
+                stage_desc = f"{stage_desc}:{raw.group_id_ext}"
+
+            # Prepare debug row context (raw values)
+            raw_p1_id  = str(raw.s1_player_id_ext or "")
+            raw_p1_nm  = raw.s1_fullname_raw or ""
+            raw_p1_clb = raw.s1_clubname_raw or ""
+            raw_p2_id  = str(raw.s2_player_id_ext or "")
+            raw_p2_nm  = raw.s2_fullname_raw or ""
+            raw_p2_clb = raw.s2_clubname_raw or ""
+            tokens = (raw.game_point_tokens or "").strip()
+            early_games, early_winner, early_wo = parse_scores(tokens, raw.best_of)
+            winner_text = "Unknown"
+            if early_winner == 1:
+                winner_text = raw_p1_nm or "Unknown"
+            elif early_winner == 2:
+                winner_text = raw_p2_nm or "Unknown"
+            tokens_text = tokens if tokens else ""
+            # Check if player_id_ext exists in the participant index
+            by_ext_index = entry_index.get("by_ext", {})
+            method_s1 = ("placeholder" if _is_placeholder(raw_p1_nm) else ("by_ext" if (raw.s1_player_id_ext and raw.s1_player_id_ext in by_ext_index) else "name_score"))
+            method_s2 = ("placeholder" if _is_placeholder(raw_p2_nm) else ("by_ext" if (raw.s2_player_id_ext and raw.s2_player_id_ext in by_ext_index) else "name_score"))
+            method_summary = f"S1:{method_s1}; S2:{method_s2}"
+            issue_msg = ""
+            resolved_ok = False
+
+            # Garbage?
+            if is_garbage_match(raw):
+                garbage_count += 1
+                if debug:
+                    debug_rows.append([stage_desc,raw_p1_id,raw_p1_nm,raw_p1_clb,"vs",raw_p2_id,raw_p2_nm,raw_p2_clb,winner_text,tokens_text,"N",method_summary,"garbage (both placeholders)"])
+                continue
 
-                entry_id1, players1, clubs1, resolve_info1 = side1
-                entry_id2, players2, clubs2, resolve_info2 = side2
-                
-                # Get resolved player names for debug output
-                resolved_p1_name = resolve_info1.get("player_name", "?")
-                resolved_p2_name = resolve_info2.get("player_name", "?")
-                resolved_p1_id = str(resolve_info1.get("tpid_ext", ""))
-                resolved_p2_id = str(resolve_info2.get("tpid_ext", ""))
-                resolved_p1_club = resolve_info1.get("club_key", "") or ""
-                resolved_p2_club = resolve_info2.get("club_key", "") or ""
-                
-                # Update method summary with actual method and scores used
-                actual_method1 = resolve_info1.get("method", method_s1)
-                actual_method2 = resolve_info2.get("method", method_s2)
-                score1 = resolve_info1.get("score")
-                score2 = resolve_info2.get("score")
-                
-                if actual_method1 == "name_score":
-                    method_s1 = f"name({score1 if score1 is not None else '?'})"
-                elif actual_method1 == "sibling":
-                    parent1 = resolve_info1.get("parent_class", "?")
-                    method_s1 = f"sibling({score1 if score1 is not None else ''}←{parent1})"
-                elif actual_method1 in ("by_ext", "placeholder"):
-                    method_s1 = actual_method1
-                    
-                if actual_method2 == "name_score":
-                    method_s2 = f"name({score2 if score2 is not None else '?'})"
-                elif actual_method2 == "sibling":
-                    parent2 = resolve_info2.get("parent_class", "?")
-                    method_s2 = f"sibling({score2 if score2 is not None else ''}←{parent2})"
-                elif actual_method2 in ("by_ext", "placeholder"):
-                    method_s2 = actual_method2
-                    
-                method_summary = f"S1:{method_s1}; S2:{method_s2}"
-                
-                # Sanity check: same player cannot be on both sides
-                if players1 and players2 and set(players1) & set(players2):
-                    failed_count += 1
-                    issue_msg = f"SAME PLAYER BOTH SIDES: {resolved_p1_name}"
-                    if debug:
-                        debug_rows.append([stage_desc,resolved_p1_id,resolved_p1_name,resolved_p1_club,"vs",resolved_p2_id,resolved_p2_name,resolved_p2_club,winner_text,tokens_text,"N",method_summary,issue_msg])
-                    logger.warning(logger_keys, issue_msg)
-                    continue
+            # Previously: skipped rows with '/' (assumed doubles). Disabled.
 
-                # Parse scores
+            # No participants cached?
+            if not entry_index.get("entries"):
+                no_participants += 1
+                failed_count += 1
+                if debug:
+                    debug_rows.append([stage_desc,raw_p1_id,raw_p1_nm,raw_p1_clb,"vs",raw_p2_id,raw_p2_nm,raw_p2_clb,winner_text,tokens_text,"N",method_summary,"no participants cached for class"])
+                continue
 
-                games, winner_side, walkover_side = parse_scores(raw.game_point_tokens, raw.best_of)
-                side1_placeholder = players1 and players1[0] == PLACEHOLDER_PLAYER_ID
-                side2_placeholder = players2 and players2[0] == PLACEHOLDER_PLAYER_ID
+            # Already planned guard (duplicate match_id_ext in raw, e.g. 2-page PDFs)
+            if raw.match_id_ext is not None and raw.match_id_ext in planned_match_exts:
+                continue
 
-                # Backfill missing winner info when WO tokens specify the forfeiting side.
-                if walkover_side in (1, 2) and winner_side is None:
-                    winner_side = 2 if walkover_side == 1 else 1
+            # Resolve sides (always pick best candidate within the class)
+            # If parent_entry_index is available (B-playoff class), we'll fallback to it
+            side1 = resolve_side(
+                raw.s1_player_id_ext, raw.s1_fullname_raw, raw.s1_clubname_raw,
+                entry_index, cursor, logger, logger_keys, side=1,
+                tournament_class_id=tournament_class_id, group_desc_hint=raw.group_id_ext,
+                parent_entry_index=parent_entry_index, parent_class_shortname=parent_class_shortname,
+                plan=plan
+            )
+            side2 = resolve_side(
+                raw.s2_player_id_ext, raw.s2_fullname_raw, raw.s2_clubname_raw,
+                entry_index, cursor, logger, logger_keys, side=2,
+                tournament_class_id=tournament_class_id, group_desc_hint=raw.group_id_ext,
+                parent_entry_index=parent_entry_index, parent_class_shortname=parent_class_shortname,
+                plan=plan
+            )
 
-                tokens_upper = (raw.game_point_tokens or "").strip().upper()
-                # Some PDFs only output "WO" with no :S1/:S2 marker. If exactly one side
-                # is the placeholder entry we infer the walkover direction automatically.
-                if (
-                    walkover_side is None
-                    and winner_side is None
-                    and tokens_upper == "WO"
-                    and (side1_placeholder ^ side2_placeholder)
-                ):
-                    walkover_side = 1 if side1_placeholder else 2
-                    winner_side = 2 if walkover_side == 1 else 1
+            if not side1 or not side2:
+                unmatched_sides += 1
+                failed_count += 1
+                if debug:
+                    parts = []
+                    if not side1:
+                        parts.append("S1 unmatched")
+                    if not side2:
+                        parts.append("S2 unmatched")
+                    issue_msg = ", ".join(parts) or "unmatched side(s)"
+                    debug_rows.append([stage_desc,raw_p1_id,raw_p1_nm,raw_p1_clb,"vs",raw_p2_id,raw_p2_nm,raw_p2_clb,winner_text,tokens_text,"N",method_summary,issue_msg])
+                continue
 
+            entry_id1, players1, clubs1, resolve_info1 = side1
+            entry_id2, players2, clubs2, resolve_info2 = side2
+        
+            # Get resolved player names for debug output
+            resolved_p1_name = resolve_info1.get("player_name", "?")
+            resolved_p2_name = resolve_info2.get("player_name", "?")
+            resolved_p1_id = str(resolve_info1.get("tpid_ext", ""))
+            resolved_p2_id = str(resolve_info2.get("tpid_ext", ""))
+            resolved_p1_club = resolve_info1.get("club_key", "") or ""
+            resolved_p2_club = resolve_info2.get("club_key", "") or ""
+        
+            # Update method summary with actual method and scores used
+            actual_method1 = resolve_info1.get("method", method_s1)
+            actual_method2 = resolve_info2.get("method", method_s2)
+            score1 = resolve_info1.get("score")
+            score2 = resolve_info2.get("score")
+        
+            if actual_method1 == "name_score":
+                method_s1 = f"name({score1 if score1 is not None else '?'})"
+            elif actual_method1 == "sibling":
+                parent1 = resolve_info1.get("parent_class", "?")
+                method_s1 = f"sibling({score1 if score1 is not None else ''}←{parent1})"
+            elif actual_method1 in ("by_ext", "placeholder"):
+                method_s1 = actual_method1
+            
+            if actual_method2 == "name_score":
+                method_s2 = f"name({score2 if score2 is not None else '?'})"
+            elif actual_method2 == "sibling":
+                parent2 = resolve_info2.get("parent_class", "?")
+                method_s2 = f"sibling({score2 if score2 is not None else ''}←{parent2})"
+            elif actual_method2 in ("by_ext", "placeholder"):
+                method_s2 = actual_method2
+            
+            method_summary = f"S1:{method_s1}; S2:{method_s2}"
+        
+            # Sanity check: same player cannot be on both sides
+            if players1 and players2 and set(players1) & set(players2):
+                failed_count += 1
+                issue_msg = f"SAME PLAYER BOTH SIDES: {resolved_p1_name}"
                 if debug:
-                    logger.info(logger_keys.copy(),f"Parsed games for match_id_ext={raw.match_id_ext}: side1={raw.s1_fullname_raw}, side2={raw.s2_fullname_raw}, winner_side={winner_side}, walkover_side={walkover_side}, games={games}")
-
-                # Create match
-                match = Match(best_of=raw.best_of, date=match_date, winner_side=winner_side, walkover_side=walkover_side)
-                is_valid, msg = match.validate()
-                if not is_valid:
-                    failed_count += 1
-                    if debug:
-                        debug_rows.append([stage_desc,resolved_p1_id,resolved_p1_name,resolved_p1_club,"vs",resolved_p2_id,resolved_p2_name,resolved_p2_club,winner_text,tokens_text,"N",method_summary,f"invalid match: {msg}"])
-                    continue
+                    debug_rows.append([stage_desc,resolved_p1_id,resolved_p1_name,resolved_p1_club,"vs",resolved_p2_id,resolved_p2_name,resolved_p2_club,winner_text,tokens_text,"N",method_summary,issue_msg])
+                logger.warning(logger_keys, issue_msg)
+                continue
 
-                match_id = match.insert(cursor)
+            # Parse scores
 
-                # Games
-                for g in games:
-                    g.match_id = match_id
-                    g.insert(cursor)
+            games, winner_side, walkover_side = parse_scores(raw.game_point_tokens, raw.best_of)
+            side1_placeholder = players1 and players1[0] == PLACEHOLDER_PLAYER_ID
+            side2_placeholder = players2 and players2[0] == PLACEHOLDER_PLAYER_ID
 
-                # Sides
-                MatchSide(match_id=match_id, side_no=1, represented_entry_id=entry_id1).insert(cursor)
-                MatchSide(match_id=match_id, side_no=2, represented_entry_id=entry_id2).insert(cursor)
+            # Backfill missing winner info when WO tokens specify the forfeiting side.
+            if walkover_side in (1, 2) and winner_side is None:
+                winner_side = 2 if walkover_side == 1 else 1
 
-                # Players on each side
-                insert_match_players(match_id, 1, players1, clubs1, cursor)
-                insert_match_players(match_id, 2, players2, clubs2, cursor)
+            tokens_upper = (raw.game_point_tokens or "").strip().upper()
+            # Some PDFs only output "WO" with no :S1/:S2 marker. If exactly one side
+            # is the placeholder entry we infer the walkover direction automatically.
+            if (
+                walkover_side is None
+                and winner_side is None
+                and tokens_upper == "WO"
+                and (side1_placeholder ^ side2_placeholder)
+            ):
+                walkover_side = 1 if side1_placeholder else 2
+                winner_side = 2 if walkover_side == 1 else 1
 
-                # tournament_class_match (group set after loop)
-                tcm = TournamentClassMatch(
+            if debug:
+                logger.info(logger_keys.copy(),f"Parsed games for match_id_ext={raw.match_id_ext}: side1={raw.s1_fullname_raw}, side2={raw.s2_fullname_raw}, winner_side={winner_side}, walkover_side={walkover_side}, games={games}")
+
+            # Create match
+            match = Match(best_of=raw.best_of, date=match_date, winner_side=winner_side, walkover_side=walkover_side)
+            is_valid, msg = match.validate()
+            if not is_valid:
+                failed_count += 1
+                if debug:
+                    debug_rows.append([stage_desc,resolved_p1_id,resolved_p1_name,resolved_p1_club,"vs",resolved_p2_id,resolved_p2_name,resolved_p2_club,winner_text,tokens_text,"N",method_summary,f"invalid match: {msg}"])
+                continue
+
+            # Match, games, sides, players and tournament_class_match (group set after loop)
+            plan.add(
+                "match",
+                match   = match,
+                games   = games,
+                sides   = [(1, entry_id1, players1, clubs1), (2, entry_id2, players2, clubs2)],
+                tcm     = TournamentClassMatch(
                     tournament_class_id=tournament_class_id,
-                    match_id=match_id,
                     tournament_class_match_id_ext=raw.match_id_ext,
                     tournament_class_stage_id=raw.tournament_class_stage_id,
                     stage_round_no=None,
                     draw_pos=None
-                )
-                tcm.insert(cursor)
-                
-                # Track for KO sanity check
-                stage_id = raw.tournament_class_stage_id
-                round_no = None  # Could be populated from draw analysis later
-                if stage_id and stage_id not in (1, 11):  # Not GROUP stages
-                    ko_round_players.setdefault(stage_id, {}).setdefault(round_no, {})
-                    for pid in players1:
-                        if pid != PLACEHOLDER_PLAYER_ID:
-                            ko_round_players[stage_id][round_no][pid] = resolved_p1_name
-                    for pid in players2:
-                        if pid != PLACEHOLDER_PLAYER_ID:
-                            ko_round_players[stage_id][round_no][pid] = resolved_p2_name
-
-                inserted_count += 1
-                resolved_ok = True
-                if debug:
-                    debug_rows.append([stage_desc,resolved_p1_id,resolved_p1_name,resolved_p1_club,"vs",resolved_p2_id,resolved_p2_name,resolved_p2_club,winner_text,tokens_text,"Y",method_summary,""])
+                ),
+            )
+            if raw.match_id_ext is not None:
+                planned_match_exts.add(raw.match_id_ext)
+        
+            # Track for KO sanity check
+            stage_id = raw.tournament_class_stage_id
+            round_no = None  # Could be populated from draw analysis later
+            if stage_id and stage_id not in (1, 11):  # Not GROUP stages
+                ko_round_players.setdefault(stage_id, {}).setdefault(round_no, {})
+                for pid in players1:
+                    if pid != PLACEHOLDER_PLAYER_ID:
+                        ko_round_players[stage_id][round_no][pid] = resolved_p1_name
+                for pid in players2:
+                    if pid != PLACEHOLDER_PLAYER_ID:
+                        ko_round_players[stage_id][round_no][pid] = resolved_p2_name
+
+            inserted_count += 1
+            resolved_ok = True
+            if debug:
+                debug_rows.append([stage_desc,resolved_p1_id,resolved_p1_name,resolved_p1_club,"vs",resolved_p2_id,resolved_p2_name,resolved_p2_club,winner_text,tokens_text,"Y",method_summary,""])
 
-            # ── post-process: fill tcm.group_id for group stage ───────────────
-            for stage_id, group_matches in stage_group_matches.items():
-                if stage_id not in (1, 11):  # 1 = GROUP, 11 = GROUP_STG2
+        # ── post-process: fill tcm.group_id for group stage ───────────────
+        for stage_id, group_matches in stage_group_matches.items():
+            if stage_id not in (1, 11):  # 1 = GROUP, 11 = GROUP_STG2
+                continue
+            for group_ext, gmatches in group_matches.items():
+                if not group_ext:
                     continue
-                for group_ext, gmatches in group_matches.items():
-                    if not group_ext:
-                        continue
-                    tcg = TournamentClassGroup.get_by_description(cursor, tournament_class_id, group_ext)
-                    if not tcg:
-                        tcg = TournamentClassGroup(
-                            tournament_class_id=tournament_class_id,
-                            description=group_ext,
-                            sort_order=extract_group_sort_order(group_ext) if group_ext else None,
-                        )
-                        tcg.upsert(cursor)
-                    group_id = tcg.tournament_class_group_id
-                    for raw in gmatches:
-                        cursor.execute("""
-                            UPDATE tournament_class_match
-                            SET tournament_class_group_id = ?
-                            WHERE tournament_class_id = ? AND tournament_class_match_id_ext = ?;
-                        """, (group_id, tournament_class_id, raw.match_id_ext)) 
-            
-            # ── KO sanity check: detect players in multiple matches of same stage ──
-            # ko_round_players is: {stage_id: {round_no: {player_id: player_name}}}
-            # In KO, each stage should have unique players (no player can appear twice in same stage)
-            ko_duplicates_found = 0
-            for stage_id, rounds in ko_round_players.items():
-                # For each stage, collect ALL player appearances
-                stage_player_counts: Dict[int, List[str]] = {}  # player_id -> list of appearances
-                for round_no, players in rounds.items():
-                    for pid, pname in players.items():
-                        stage_player_counts.setdefault(pid, []).append(pname)
-                
-                # Check for duplicates
-                for pid, appearances in stage_player_counts.items():
-                    if len(appearances) > 1:
-                        ko_duplicates_found += 1
-                        stage_name = get_stage_desc(stage_id)
-                        logger.warning(
-                            {'tournament_class_id': tournament_class_id, 'tournament_class_id_ext': class_ext},
-                            f"KO SANITY FAIL: Player '{appearances[0]}' (id={pid}) appears in {len(appearances)} matches of stage {stage_name}"
-                        )
-            
-            if ko_duplicates_found > 0:
-                logger.warning(
-                    {'tournament_class_id': tournament_class_id, 'tournament_class_id_ext': class_ext},
-                    f"Found {ko_duplicates_found} player(s) appearing in multiple matches of same KO stage - data may be corrupted"
+                plan.add(
+                    "match_group",
+                    tournament_class_id = tournament_class_id,
+                    group_ext           = group_ext,
+                    match_id_exts       = [raw.match_id_ext for raw in gmatches],
                 )
-            
-            # Status icon: ✅ if perfect, ❌ if failures
-            status_icon = "✅" if failed_count == 0 else "❌"
-
-            # Print debug table per class (mirrors scraper style plus extra columns)
-            if debug and debug_rows:
-                title = f"Class {class_ext} — Raw matches and resolution"
-                table_lines = _format_table(headers, debug_rows)
-                if table_lines:
-                    logger.info({'tournament_class_id': tournament_class_id, 'tournament_class_id_ext': class_ext}, title, to_console=True)
-                    logger.info({"tournament_class_id_ext": class_ext}, "\n".join(table_lines), to_console=True)
-
-            logger.info(
+    
+        # ── KO sanity check: detect players in multiple matches of same stage ──
+        # ko_round_players is: {stage_id: {round_no: {player_id: player_name}}}
+        # In KO, each stage should have unique players (no player can appear twice in same stage)
+        ko_duplicates_found = 0
+        for stage_id, rounds in ko_round_players.items():
+            # For each stage, collect ALL player appearances
+            stage_player_counts: Dict[int, List[str]] = {}  # player_id -> list of appearances
+            for round_no, players in rounds.items():
+                for pid, pname in players.items():
+                    stage_player_counts.setdefault(pid, []).append(pname)
+        
+            # Check for duplicates
+            for pid, appearances in stage_player_counts.items():
+                if len(appearances) > 1:
+                    ko_duplicates_found += 1
+                    stage_name = get_stage_desc(stage_id)
+                    logger.warning(
+                        {'tournament_class_id': tournament_class_id, 'tournament_class_id_ext': class_ext},
+                        f"KO SANITY FAIL: Player '{appearances[0]}' (id={pid}) appears in {len(appearances)} matches of stage {stage_name}"
+                    )
+    
+        if ko_duplicates_found > 0:
+            logger.warning(
                 {'tournament_class_id': tournament_class_id, 'tournament_class_id_ext': class_ext},
-                f"{status_icon} [{idx}/{len(groups)}] Class resolved: "
-                f"removed={removed_count}, raws={raws_count}, inserted={inserted_count}, "
-                f"failed={failed_count}, garbage={garbage_count}, "
-                f"no_participants={no_participants}, unmatched_sides={unmatched_sides}",
-                to_console=True
+                f"Found {ko_duplicates_found} player(s) appearing in multiple matches of same KO stage - data may be corrupted"
             )
+    
+        # Status icon: ✅ if perfect, ❌ if failures
+        status_icon = "✅" if failed_count == 0 else "❌"
+
+        # Print debug table per class (mirrors scraper style plus extra columns)
+        if debug and debug_rows:
+            title = f"Class {class_ext} — Raw matches and resolution"
+            table_lines = _format_table(headers, debug_rows)
+            if table_lines:
+                logger.info({'tournament_class_id': tournament_class_id, 'tournament_class_id_ext': class_ext}, title, to_console=True)
+                logger.info({"tournament_class_id_ext": class_ext}, "\n".join(table_lines), to_console=True)
+
+        logger.info(
+            {'tournament_class_id': tournament_class_id, 'tournament_class_id_ext': class_ext},
+            f"{status_icon} [{idx}/{total}] Class resolved: "
+            f"removed={removed_count}, raws={raws_count}, inserted={inserted_count}, "
+            f"failed={failed_count}, garbage={garbage_count}, "
+            f"no_participants={no_participants}, unmatched_sides={unmatched_sides}",
+            to_console=True
+        )
 
-            if failed_count == 0:
-                logger.success(logger_keys, "Class matches resolved successfully")
-            else: 
-                logger.failed(logger_keys, f"Class matches resolved with failures")
+        if failed_count == 0:
+            logger.success(logger_keys, "Class matches resolved successfully")
+        else: 
+            logger.failed(logger_keys, f"Class matches resolved with failures")
 
-        except Exception as e:
-            logger.failed(logger_keys, f"Exception: {str(e)}")
+    except Exception as e:
+        logger.failed(logger_keys, f"Exception: {str(e)}")
 
-    logger.summarize()
+    return plan
+
+# ────────────────────────────────────────────────────────────────────
+# Writing (applies plans, single process)
+# ────────────────────────────────────────────────────────────────────
+
+def _apply_remove_matches(ctx: PlanContext, data: Dict) -> None:
+    TournamentClassMatch.remove_for_class(ctx.cursor, data["tournament_class_id"])
+
+def _apply_synthetic_entry(ctx: PlanContext, data: Dict) -> None:
+    """Insert a placeholder/sibling entry planned by ensure_placeholder_participant / create_synthetic_entry_from_sibling."""
+    cursor = ctx.cursor
+    tournament_class_id = data["tournament_class_id"]
+
+    # Allocate a new negative group ID for synthetic entries
+    entry_group_id = _allocate_placeholder_entry_group(cursor, tournament_class_id)
+
+    # Use NULL for entry_id_ext (like regular entries) - the player is identified
+    # by tournament_player_id_ext which is set at tournament level, not class level
+    cursor.execute("""
+        INSERT INTO tournament_class_entry (
+            tournament_class_entry_id_ext,
+            tournament_class_entry_group_id_int,
+            tournament_class_id,
+            seed,
+            final_position
+        ) VALUES (NULL, ?, ?, NULL, NULL)
+    """, (entry_group_id, tournament_class_id))
+    entry_id = cursor.lastrowid
+
+    cursor.execute("""
+        INSERT OR IGNORE INTO tournament_class_player (
+            tournament_class_entry_id,
+            tournament_player_id_ext,
+            player_id,
+            club_id
+        ) VALUES (?, ?, ?, ?)
+    """, (entry_id, data["tpid_ext"], data["player_id"], data["club_id"]))
+
+    ctx.ids[data["entry_id"]] = entry_id
+
+def _apply_match(ctx: PlanContext, data: Dict) -> None:
+    cursor = ctx.cursor
+    match_id = data["match"].insert(cursor)
+
+    # Games
+    for g in data["games"]:
+        g.match_id = match_id
+        g.insert(cursor)
+
+    # Sides
+    for side_no, entry_id, players, clubs in data["sides"]:
+        MatchSide(match_id=match_id, side_no=side_no, represented_entry_id=ctx.id(entry_id)).insert(cursor)
+
+    # Players on each side
+    for side_no, entry_id, players, clubs in data["sides"]:
+        insert_match_players(match_id, side_no, players, clubs, cursor)
+
+    # tournament_class_match (group set after loop)
+    tcm = data["tcm"]
+    tcm.match_id = match_id
+    tcm.insert(cursor)
+
+def _apply_match_group(ctx: PlanContext, data: Dict) -> None:
+    """Fill tcm.group_id for the group-stage matches of one group."""
+    cursor = ctx.cursor
+    tournament_class_id, group_ext = data["tournament_class_id"], data["group_ext"]
+    tcg = TournamentClassGroup.get_by_description(cursor, tournament_class_id, group_ext)
+    if not tcg:
+        tcg = TournamentClassGroup(
+            tournament_class_id=tournament_class_id,
+            description=group_ext,
+            sort_order=extract_group_sort_order(group_ext) if group_ext else None,
+        )
+        tcg.upsert(cursor)
+    group_id = tcg.tournament_class_group_id
+    for match_id_ext in data["match_id_exts"]:
+        cursor.execute("""
+            UPDATE tournament_class_match
+            SET tournament_class_group_id = ?
+            WHERE tournament_class_id = ? AND tournament_class_match_id_ext = ?;
+        """, (group_id, tournament_class_id, match_id_ext)) 
 
 # Helper functions
 
@@ -576,11 +682,14 @@ def resolve_side(
     tournament_class_id: int,
     group_desc_hint: Optional[str] = None,
     parent_entry_index: Optional[Dict[str, Any]] = None,
-    parent_class_shortname: Optional[str] = None
+    parent_class_shortname: Optional[str] = None,
+    plan: Optional[ClassPlan] = None
 ) -> Optional[Tuple[int, List[int], List[int], Dict[str, Any]]]:
     """
     Resolve a match side to (entry_id, [player_id], [club_id], resolve_info) using ONLY 
     participants of the current class (entry_index). 
+
+    Entries that have to be created (placeholder/sibling) are added to plan and get a pending entry_id.
     
     If resolution fails (player not found or score too low) and parent_entry_index is provided,
     falls back to searching the parent class entries. If found there, creates a synthetic
@@ -612,7 +721,7 @@ def resolve_side(
     # Replace placeholder names ("Vakant", "WO") with the Unknown Player entry.
     # This lets us keep WO rows while still producing valid match_side rows.
     if _is_placeholder(fullname_raw):
-        return ensure_placeholder_participant(cursor, tournament_class_id, entry_index)
+        return ensure_placeholder_participant(cursor, tournament_class_id, entry_index, plan)
 
     # ---- 1) hard key: tournament_player_id_ext -------------------------------
     by_ext = entry_index.get("by_ext", {})
@@ -780,7 +889,7 @@ def resolve_side(
             sibling_result = _try_sibling_resolution(
                 player_id_ext, fullname_raw, clubname_raw, 
                 parent_entry_index, cursor, logger, logger_keys, side,
-                tournament_class_id, entry_index, parent_class_shortname
+                tournament_class_id, entry_index, parent_class_shortname, plan
             )
             if sibling_result:
                 return sibling_result
@@ -805,7 +914,7 @@ def resolve_side(
             sibling_result = _try_sibling_resolution(
                 player_id_ext, fullname_raw, clubname_raw, 
                 parent_entry_index, cursor, logger, logger_keys, side,
-                tournament_class_id, entry_index, parent_class_shortname
+                tournament_class_id, entry_index, parent_class_shortname, plan
             )
             if sibling_result:
                 return sibling_result
@@ -835,6 +944,7 @@ def _try_sibling_resolution(
     tournament_class_id: int,
     entry_index: Dict[str, Any],
     parent_class_shortname: Optional[str],
+    plan: ClassPlan,
 ) -> Optional[Tuple[int, List[int], List[int], Dict[str, Any]]]:
     """
     Try to resolve a player from the parent/sibling class entries.
@@ -861,6 +971,7 @@ def _try_sibling_resolution(
         tournament_class_id: Current (child/B-class) tournament class ID
         entry_index: Entry index for current class (for caching synthetic entries)
         parent_class_shortname: Parent class shortname for logging
+        plan: Class plan the synthetic entry is added to
     
     Returns:
         Tuple of (entry_id, player_ids, club_ids, resolve_info) or None if not found
@@ -878,7 +989,7 @@ def _try_sibling_resolution(
             logger.info(logger_keys, f"Side {side}: Found '{fullname_raw}' by ext '{ext_key}' in parent class {parent_class_shortname}")
             return create_synthetic_entry_from_sibling(
                 cursor, tournament_class_id, entry_index, parent_entry,
-                parent_class_shortname, logger, logger_keys
+                parent_class_shortname, logger, logger_keys, plan
             )
     
     # ---- Try name scoring in parent ----
@@ -926,7 +1037,7 @@ def _try_sibling_resolution(
     
     result = create_synthetic_entry_from_sibling(
         cursor, tournament_class_id, entry_index, parent_entry,
-        parent_class_shortname, logger, logger_keys
+        parent_class_shortname, logger, logger_keys, plan
     )
     
     # Update resolve_info with the score
@@ -1009,12 +1120,13 @@ def ensure_placeholder_participant(
     cursor: sqlite3.Cursor,
     tournament_class_id: int,
     entry_index: Dict[str, Any],
+    plan: ClassPlan,
 ) -> Tuple[int, List[int], List[int]]:
     """
     Ensure the placeholder player (Unknown Player) has a tournament_class_entry
     in this class so matches can reference a valid entry_id.
 
-    We lazily insert a synthetic entry/tournament_class_player the first time we
+    We lazily plan a synthetic entry/tournament_class_player the first time we
     encounter a Vakant/WO side in this class, then reuse it for subsequent matches.
     """
     placeholder_resolve_info = {
@@ -1041,26 +1153,15 @@ def ensure_placeholder_participant(
     if row:
         entry_id = row[0]
     else:
-        entry_group_id = _allocate_placeholder_entry_group(cursor, tournament_class_id)
-        cursor.execute("""
-            INSERT INTO tournament_class_entry (
-                tournament_class_entry_id_ext,
-                tournament_class_entry_group_id_int,
-                tournament_class_id,
-                seed,
-                final_position
-            ) VALUES (NULL, ?, ?, NULL, NULL)
-        """, (entry_group_id, tournament_class_id))
-        entry_id = cursor.lastrowid
-
-        cursor.execute("""
-            INSERT OR IGNORE INTO tournament_class_player (
-                tournament_class_entry_id,
-                tournament_player_id_ext,
-                player_id,
-                club_id
-            ) VALUES (?, NULL, ?, ?)
-        """, (entry_id, PLACEHOLDER_PLAYER_ID, PLACEHOLDER_CLUB_ID))
+        entry_id = plan.new_id()
+        plan.add(
+            "synthetic_entry",
+            entry_id            = entry_id,
+            tournament_class_id = tournament_class_id,
+            tpid_ext            = None,
+            player_id           = PLACEHOLDER_PLAYER_ID,
+            club_id             = PLACEHOLDER_CLUB_ID,
+        )
 
     placeholder_entry = {
         "entry_id": entry_id,
@@ -1101,6 +1202,7 @@ def create_synthetic_entry_from_sibling(
     parent_class_shortname: Optional[str],
     logger: OperationLogger,
     logger_keys: Dict,
+    plan: ClassPlan,
 ) -> Tuple[int, List[int], List[int], Dict[str, Any]]:
     """
     Create a synthetic tournament_class_entry in the current (B-playoff) class
@@ -1124,6 +1226,7 @@ def create_synthetic_entry_from_sibling(
         parent_class_shortname: Parent class name for logging/resolve_info
         logger: Operation logger
         logger_keys: Current logging context
+        plan: Class plan the entry insert is added to (entry_id is pending until applied)
     
     Returns:
         Tuple of (entry_id, [player_id], [club_id], resolve_info)
@@ -1164,30 +1267,15 @@ def create_synthetic_entry_from_sibling(
     if row:
         entry_id = row[0]
     else:
-        # Allocate a new negative group ID for synthetic entries
-        entry_group_id = _allocate_placeholder_entry_group(cursor, tournament_class_id)
-        
-        # Use NULL for entry_id_ext (like regular entries) - the player is identified
-        # by tournament_player_id_ext which is set at tournament level, not class level
-        cursor.execute("""
-            INSERT INTO tournament_class_entry (
-                tournament_class_entry_id_ext,
-                tournament_class_entry_group_id_int,
-                tournament_class_id,
-                seed,
-                final_position
-            ) VALUES (NULL, ?, ?, NULL, NULL)
-        """, (entry_group_id, tournament_class_id))
-        entry_id = cursor.lastrowid
-        
-        cursor.execute("""
-            INSERT OR IGNORE INTO tournament_class_player (
-                tournament_class_entry_id,
-                tournament_player_id_ext,
-                player_id,
-                club_id
-            ) VALUES (?, ?, ?, ?)
-        """, (entry_id, tpid_ext or None, player_id, club_id))
+        entry_id = plan.new_id()
+        plan.add(
+            "synthetic_entry",
+            entry_id            = entry_id,
+            tournament_class_id = tournament_class_id,
+            tpid_ext            = tpid_ext or None,
+            player_id           = player_id,
+            club_id             = club_id,
+        )
         
         logger.info(logger_keys, f"Created synthetic entry for player '{player_name}' (id={player_id}) from parent class {parent_class_shortname}")
     
@@ -14,11 +14,13 @@ Parent-Child Relationship Detection (added 2025-11-28):
     players in the parent class when they're not found in the B-class entry list.
 """
 
+import hashlib
 import sqlite3
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import re
-import pdfplumber
-from utils import OperationLogger, parse_date, _download_pdf_ondata_by_tournament_class_and_stage
+from utils import OperationLogger, parse_date
+from pdf_session import class_pdf_session, release_pdf_sessions
+from pdf_store import pdf_store
 from models.tournament_class import TournamentClass
 from models.tournament_class_raw import TournamentClassRaw
 from models.tournament import Tournament
@@ -38,6 +40,8 @@ from config import RESOLVE_CLASSES_CUTOFF_DATE, RESOLVE_CLASS_ID_EXTS
 
 debug = False
 
+REFINE_STRUCTURE_VERSION = 1    # Bump when _refine_group_structure changes (invalidates tournament_class_structure_cache)
+
 POOL_HEADING_KEYWORDS = ("pool", "pulje", "poule", "grupp", "gruppe", "group")
 FINAL_GROUP_HEADING_KEYWORDS = (
     "slutspel",
@@ -185,7 +189,8 @@ def resolve_tournament_classes(cursor, run_id=None) -> List[TournamentClass]:
         if debug:
             logger.info(logger_keys.copy(), f"Inferred structure_id={structure_id} for tournament_class_id_ext={raw.tournament_class_id_ext}")
         if structure_id == 2:
-            structure_id = _refine_group_structure(
+            structure_id = _cached_group_structure(
+                cursor,
                 raw,
                 tournament_id_ext,
                 logger=logger,
@@ -317,6 +322,8 @@ def resolve_tournament_classes(cursor, run_id=None) -> List[TournamentClass]:
     if parent_links_set > 0:
         logger.info(f"Set {parent_links_set} parent class relationships")
 
+    release_pdf_sessions()
+
     logger.summarize()
 
     return valid_classes
@@ -454,38 +461,104 @@ def _infer_structure_id(raw_stages: Optional[str]) -> int:
     
     return 9
 
-def _refine_group_structure(
+def _group_stages(raw: TournamentClassRaw) -> List[int]:
+    """Group stages (4 before 3) whose PDFs _refine_group_structure inspects."""
+    if not raw.raw_stages:
+        return []
+    try:
+        stages = {int(s) for s in raw.raw_stages.split(",") if s.strip().isdigit()}
+    except ValueError:
+        return []
+    return [st for st in (4, 3) if st in stages]
+
+def _group_pdfs_hash(tournament_id_ext: str, cid_ext: str, stages: List[int]) -> Optional[str]:
+    """
+    sha256 of the given group stage PDFs from the PDF store manifest (no PDF is opened), as
+    'stage:sha256,...'. Stages recorded as unavailable count as '-'; None while a stage has no
+    manifest entry yet.
+    """
+    store = pdf_store()
+    parts = []
+    for stage in stages:
+        pdf = store.get(tournament_id_ext, cid_ext, stage)
+        if pdf is None:
+            return None
+        parts.append(f"{stage}:{pdf.sha256 or '-'}")
+    return ",".join(parts)
+
+def _cached_group_structure(
+    cursor,
     raw: TournamentClassRaw,
     tournament_id_ext: str,
     *,
     logger: OperationLogger,
     logger_keys: dict,
 ) -> int:
+    """
+    _refine_group_structure, reused from tournament_class_structure_cache while the raw stage
+    fields and the group stage PDFs it read (content hash in the PDF store) are unchanged.
+    The cached pdf_hash names those stages, so a refinement that stopped at stage 4 is not
+    invalidated by a stage 3 PDF it never looked at.
+    """
+    cid_ext = str(raw.tournament_class_id_ext or "")
+    raw_hash = hashlib.sha256(
+        f"{REFINE_STRUCTURE_VERSION}|{raw.raw_stages or ''}|{raw.raw_stage_hrefs or ''}".encode("utf-8")
+    ).hexdigest()
+
+    cursor.execute("""
+        SELECT raw_hash, pdf_hash, tournament_class_structure_id
+        FROM tournament_class_structure_cache
+        WHERE tournament_class_id_ext = ? AND data_source_id = ?
+    """, (cid_ext, raw.data_source_id))
+    row = cursor.fetchone()
+    if row and row[0] == raw_hash:
+        cached_stages = [int(part.split(":", 1)[0]) for part in row[1].split(",") if part]
+        if _group_pdfs_hash(tournament_id_ext, cid_ext, cached_stages) == row[1]:
+            return row[2]
+
+    structure_id, stages_read = _refine_group_structure(raw, tournament_id_ext, logger=logger, logger_keys=logger_keys)
+
+    # Hashed after the refinement, which may have downloaded the PDFs
+    pdf_hash = _group_pdfs_hash(tournament_id_ext, cid_ext, stages_read)
+    if pdf_hash is not None:
+        cursor.execute("""
+            INSERT INTO tournament_class_structure_cache (
+                tournament_class_id_ext, data_source_id, raw_hash, pdf_hash, tournament_class_structure_id
+            )
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (tournament_class_id_ext, data_source_id) DO UPDATE SET
+                raw_hash                        = excluded.raw_hash,
+                pdf_hash                        = excluded.pdf_hash,
+                tournament_class_structure_id   = excluded.tournament_class_structure_id,
+                row_updated                     = CURRENT_TIMESTAMP
+        """, (cid_ext, raw.data_source_id, raw_hash, pdf_hash, structure_id))
+    return structure_id
+
+def _refine_group_structure(
+    raw: TournamentClassRaw,
+    tournament_id_ext: str,
+    *,
+    logger: OperationLogger,
+    logger_keys: dict,
+) -> Tuple[int, List[int]]:
     """
     Distinguish between plain groups-only (2) and groups→groups (4) structures
     by inspecting the group-stage PDFs for 'Slutspel' sections.
 
     Falls back to 2 on any parsing/download issues.
+    Returns (structure_id, stages whose PDFs were looked at, in order).
     """
     # We only know how to refine when stage 3 or 4 exists.
-    if not raw.raw_stages:
-        return 2
-    try:
-        stages = {int(s) for s in raw.raw_stages.split(",") if s.strip().isdigit()}
-    except ValueError:
-        return 2
-    candidate_stages = [st for st in (4, 3) if st in stages]
+    candidate_stages = _group_stages(raw)
     if not candidate_stages:
-        return 2
+        return 2, []
 
     cid_ext = str(raw.tournament_class_id_ext or "")
+    pdfs = class_pdf_session(tournament_id_ext, cid_ext)
+    stages_read: List[int] = []
     for stage in candidate_stages:
-        pdf_path, _downloaded, msg = _download_pdf_ondata_by_tournament_class_and_stage(
-            tournament_id_ext=tournament_id_ext,
-            class_id_ext=cid_ext,
-            stage=stage,
-            force_download=False,
-        )
+        stages_read.append(stage)
+        pdf_path, _downloaded, msg = pdfs.download(stage)
         if not pdf_path:
             if msg:
                 logger.warning(
@@ -495,8 +568,7 @@ def _refine_group_structure(
             continue
 
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                texts = [page.extract_text() or "" for page in pdf.pages]
+            texts = pdfs.text(stage)
         except Exception as exc:
             logger.warning(
                 logger_keys,
@@ -545,7 +617,7 @@ def _refine_group_structure(
             )
 
         if got_heading and carried_with_star > 0 and new_without_star > 0:
-            return 4  # STRUCT_GROUPS_AND_GROUPS
+            return 4, stages_read  # STRUCT_GROUPS_AND_GROUPS
 
         if stage == 4:
             pool_players: set[str] = set()
@@ -595,6 +667,6 @@ def _refine_group_structure(
                 # this strongly suggests a groups→groups structure.
                 threshold = max(4, int(0.7 * len(slutspel_players)))
                 if overlap >= threshold:
-                    return 4  # STRUCT_GROUPS_AND_GROUPS
+                    return 4, stages_read  # STRUCT_GROUPS_AND_GROUPS
 
-    return 2
+    return 2, stages_read
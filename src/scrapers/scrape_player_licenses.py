@@ -13,7 +13,7 @@ from config import (
     SCRAPE_LICENSES_NBR_OF_SEASONS, 
     SCRAPE_LICENSES_ORDER
     )
-from utils import OperationLogger, setup_driver
+from utils import OperationLogger, driver_pool
 
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -57,47 +57,48 @@ def scrape_player_licenses(cursor, run_id=None):
         run_id          = run_id
     )
     
-    driver = setup_driver()
-    driver.get(LICENSES_URL)
-
     logger.info("Scraping player licenses...", to_console=True)
 
-    # Wait for the page elements to load
-    WebDriverWait(driver, 0.25).until(EC.element_to_be_clickable((By.LINK_TEXT, "Spelklarlistor"))).click()
-    WebDriverWait(driver, 0.25).until(EC.presence_of_element_located((By.NAME, "periode")))
-
-    # Also keep a simple cookies dict for thread-local sessions
-    selenium_cookies = {c["name"]: c["value"] for c in driver.get_cookies()}
-
-    # Season dropdown + map (build once)
-    period_dropdown = Select(driver.find_element(By.NAME, "periode"))
-    season_opts = [
-        opt for opt in period_dropdown.options
-        if opt.get_attribute("value") and opt.get_attribute("value").isdigit()
-    ]
-
-    season_value_to_label = {
-        opt.get_attribute("value"): opt.text.strip()
-        for opt in season_opts
-    }
-
-    reverse = SCRAPE_LICENSES_ORDER.lower() != "oldest"
-    all_seasons = sorted(
-        [opt.get_attribute("value") for opt in season_opts],
-        key=int,
-        reverse=reverse,
-    )
-    seasons_to_process = (
-        all_seasons[:SCRAPE_LICENSES_NBR_OF_SEASONS]
-        if SCRAPE_LICENSES_NBR_OF_SEASONS > 0 else all_seasons
-    )
-    # Club dropdown
-    club_dropdown = Select(driver.find_element(By.NAME, "klubbid"))
-    club_map = [{
-        "club_name":    opt.text.strip(), 
-        "club_id_ext":  int(opt.get_attribute("value"))
-        } for opt in club_dropdown.options if opt.text.strip() and opt.get_attribute("value").isdigit()
-    ]
+    # The browser is only needed for the session cookies and the season/club dropdowns
+    with driver_pool.lease() as driver:
+        driver.get(LICENSES_URL)
+
+        # Wait for the page elements to load
+        WebDriverWait(driver, 0.25).until(EC.element_to_be_clickable((By.LINK_TEXT, "Spelklarlistor"))).click()
+        WebDriverWait(driver, 0.25).until(EC.presence_of_element_located((By.NAME, "periode")))
+
+        # Also keep a simple cookies dict for thread-local sessions
+        selenium_cookies = {c["name"]: c["value"] for c in driver.get_cookies()}
+
+        # Season dropdown + map (build once)
+        period_dropdown = Select(driver.find_element(By.NAME, "periode"))
+        season_opts = [
+            opt for opt in period_dropdown.options
+            if opt.get_attribute("value") and opt.get_attribute("value").isdigit()
+        ]
+
+        season_value_to_label = {
+            opt.get_attribute("value"): opt.text.strip()
+            for opt in season_opts
+        }
+
+        reverse = SCRAPE_LICENSES_ORDER.lower() != "oldest"
+        all_seasons = sorted(
+            [opt.get_attribute("value") for opt in season_opts],
+            key=int,
+            reverse=reverse,
+        )
+        seasons_to_process = (
+            all_seasons[:SCRAPE_LICENSES_NBR_OF_SEASONS]
+            if SCRAPE_LICENSES_NBR_OF_SEASONS > 0 else all_seasons
+        )
+        # Club dropdown
+        club_dropdown = Select(driver.find_element(By.NAME, "klubbid"))
+        club_map = [{
+            "club_name":    opt.text.strip(), 
+            "club_id_ext":  int(opt.get_attribute("value"))
+            } for opt in club_dropdown.options if opt.text.strip() and opt.get_attribute("value").isdigit()
+        ]
     clubs = club_map[:SCRAPE_LICENSES_MAX_CLUBS] if SCRAPE_LICENSES_MAX_CLUBS > 0 else club_map
 
     logger.info(f"Scraping {len(clubs)} clubs for {len(seasons_to_process)} season(s) in {SCRAPE_LICENSES_ORDER.lower()} order.", to_console=True)
@@ -111,7 +112,7 @@ def scrape_player_licenses(cursor, run_id=None):
     def fetch_club_html(club, season_id_ext, selenium_cookies):
         """
         Thread worker: reuse a per-thread Session (keeps TCP/TLS alive).
-        Returns: (club, html, step1_time_seconds)
+        Returns: (club, html, started_at, step1_time_seconds)
         """
         # small random jitter to be polite
         time.sleep(random.uniform(0.0, 0.25))
@@ -135,13 +136,13 @@ def scrape_player_licenses(cursor, run_id=None):
         step1_time = time.time() - t0
         r.raise_for_status()
 
-        return club, r.text, step1_time
+        return club, r.text, t0, step1_time
 
     for season_value in seasons_to_process:
 
-        season_time_start = time.perf_counter()
         season_id_ext = int(season_value)
         season_label  = season_value_to_label.get(str(season_value), str(season_value))
+        season_span   = logger.span("season", season_label=season_label).start()
 
         logger.info(f"Scraping raw license data for season {season_label}...", to_console=True)
 
@@ -157,19 +158,20 @@ def scrape_player_licenses(cursor, run_id=None):
 
                 for fut in as_completed(futures):
                     try:
-                        club, html, step1_time = fut.result()
+                        club, html, step1_start, step1_time = fut.result()
                     except Exception as e:
                         logger.failed({"club": None}, f"Fetch failed: {e}")
                         continue
 
                     club_name   = club["club_name"]
                     club_id_ext = club["club_id_ext"]
+                    logger.add_span("fetch", step1_start, step1_time, club_id_ext=club_id_ext)
 
                     # Parse
-                    step2_start = time.time()
-                    soup = BeautifulSoup(html, "html.parser")
-                    table = soup.find("table", class_="table-condensed my-4 shadow-xl")
-                    step2_time = time.time() - step2_start
+                    with logger.span("parse", club_id_ext=club_id_ext) as parse_span:
+                        soup = BeautifulSoup(html, "html.parser")
+                        table = soup.find("table", class_="table-condensed my-4 shadow-xl")
+                    step2_time = parse_span.duration
 
                     club_season_inserted = 0
                     club_season_updated  = 0
@@ -196,7 +198,7 @@ def scrape_player_licenses(cursor, run_id=None):
                         continue
 
                     # Insert (main thread)
-                    step3_start = time.time()
+                    upsert_span = logger.span("upsert", club_id_ext=club_id_ext).start()
                     for row in table.select("tbody tr"):
                         cols = row.find_all("td")
                         if len(cols) < 9:
@@ -267,7 +269,8 @@ def scrape_player_licenses(cursor, run_id=None):
 
 
                     cursor.connection.commit()
-                    step3_time = time.time() - step3_start
+                    upsert_span.end()
+                    step3_time = upsert_span.duration
 
                     remaining -= 1
                     total_time = step1_time + step2_time + step3_time
@@ -280,12 +283,11 @@ def scrape_player_licenses(cursor, run_id=None):
                         flush=True
                     )
         
-        season_time = time.perf_counter() - season_time_start
+        season_span.end()
         current_season_count += 1
-        logger.info(f"Completed season {season_label} in {season_time:.2f} seconds.", to_console=True)
+        logger.info(f"Completed season {season_label} in {season_span.duration:.2f} seconds.", to_console=True)
 
     logger.info(f"Scraping completed — Total inserted: {total_inserted}, total updated: {total_updated}, total unchanged: {total_unchanged}", to_console=True)
-    driver.quit()
     logger.summarize()
 
 
@@ -8,7 +8,7 @@ from selenium.webdriver.support.ui import Select
 from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
 from models.player_ranking_raw import PlayerRankingRaw
-from utils import OperationLogger, setup_driver, parse_date
+from utils import OperationLogger, driver_pool, parse_date
 from config import SCRAPE_RANKINGS_NBR_OF_RUNS, SCRAPE_RANKINGS_ORDER
 from db import get_conn
 
@@ -29,8 +29,8 @@ def scrape_player_rankings(cursor, run_id=None):
         run_id          = run_id
     )
 
-    # Setting up Selenium driver
-    driver = setup_driver()
+    # Leasing a warm Selenium driver
+    driver = driver_pool.acquire()
     try:
         logger.info("Scraping player rankings...", to_console=True)
 
@@ -80,6 +80,13 @@ def scrape_player_rankings(cursor, run_id=None):
 
                 logger.info(f"Scraping ranking run: {run_id_str} (Date: {run_date_str}) for {gender}...", to_console=True)
 
+                # Recycling the browser once it has loaded WEBDRIVER_MAX_PAGES pages (the new one reopens the ranking page)
+                renewed = driver_pool.renew(driver)
+                if renewed is not driver:
+                    driver = renewed
+                    driver.get(url)
+                    wait = WebDriverWait(driver, 10)
+
                 # Selecting run from dropdown
                 select_element = wait.until(EC.presence_of_element_located((By.NAME, "rid")))
                 select = Select(select_element)
@@ -290,8 +297,8 @@ def scrape_player_rankings(cursor, run_id=None):
         # Logging global error
         logger.failed({}, f"An error occurred while scraping player rankings: {e}")
     finally:
-        # Closing driver
-        driver.quit()
+        # Returning driver to the pool
+        driver_pool.release(driver)
 
 def upd_player_rankings_raw():
     """
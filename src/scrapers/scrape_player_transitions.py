@@ -12,7 +12,7 @@ from config import (
     SCRAPE_TRANSITIONS_NBR_OF_SEASONS, 
     SCRAPE_TRANSITIONS_ORDER
     )
-from utils import OperationLogger, setup_driver, parse_date
+from utils import OperationLogger, driver_pool, parse_date
 
 LICENSES_URL = "https://www.profixio.com/fx/ranking_sbtf/ranking_sbtf_public.php"
 
@@ -32,54 +32,55 @@ def scrape_player_transitions(cursor, run_id=None):
         run_id          = run_id
     )
     
-    driver = setup_driver()
-    driver.get(LICENSES_URL)
-
     logger.info("Scraping player transitions...", to_console=True)
 
-    # Wait for the page elements to load
-    WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.LINK_TEXT, "Spelklarlistor"))).click()
-    WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.LINK_TEXT, "Övergångar"))).click()
-    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "periode")))
-
-    # Season dropdown
-    period_dropdown = Select(driver.find_element(By.ID, "periode"))
-    all_seasons = [
-        opt.get_attribute("value")
-        for opt in period_dropdown.options
-        if opt.get_attribute("value").isdigit() and opt.get_attribute("value") != "0"
-    ]
-
-    # if SCRAPE_TRANSITIONS_ORDER.lower() == 'oldest':
-    #     reverse = False
-    # else:
-    #     reverse = True
-
-    reverse = SCRAPE_TRANSITIONS_ORDER.lower() != 'oldest'
-    all_seasons = sorted(all_seasons, key=int, reverse=reverse)
-
-    seasons_to_process = (
-        all_seasons[:SCRAPE_TRANSITIONS_NBR_OF_SEASONS]
-        if SCRAPE_TRANSITIONS_NBR_OF_SEASONS > 0
-        else all_seasons
-    )
-
-    logger.info(f"Scraping {len(seasons_to_process)} season(s) in {SCRAPE_TRANSITIONS_ORDER.lower()} order.", to_console=True)
-
-    # Counting
-    total_inserted = 0
-    total_skipped = 0
-    total_updated = 0
-    total_unchanged = 0
-    season_inserted = 0
-    season_updated = 0
-    season_unchanged = 0
-    season_skipped = 0
-    current_season_count = 0
-
+    driver = driver_pool.acquire()
     try:
+        _open_transitions_page(driver)
+
+        # Season dropdown
+        period_dropdown = Select(driver.find_element(By.ID, "periode"))
+        all_seasons = [
+            opt.get_attribute("value")
+            for opt in period_dropdown.options
+            if opt.get_attribute("value").isdigit() and opt.get_attribute("value") != "0"
+        ]
+
+        # if SCRAPE_TRANSITIONS_ORDER.lower() == 'oldest':
+        #     reverse = False
+        # else:
+        #     reverse = True
+
+        reverse = SCRAPE_TRANSITIONS_ORDER.lower() != 'oldest'
+        all_seasons = sorted(all_seasons, key=int, reverse=reverse)
+
+        seasons_to_process = (
+            all_seasons[:SCRAPE_TRANSITIONS_NBR_OF_SEASONS]
+            if SCRAPE_TRANSITIONS_NBR_OF_SEASONS > 0
+            else all_seasons
+        )
+
+        logger.info(f"Scraping {len(seasons_to_process)} season(s) in {SCRAPE_TRANSITIONS_ORDER.lower()} order.", to_console=True)
+
+        # Counting
+        total_inserted = 0
+        total_skipped = 0
+        total_updated = 0
+        total_unchanged = 0
+        season_inserted = 0
+        season_updated = 0
+        season_unchanged = 0
+        season_skipped = 0
+        current_season_count = 0
+
         for season_value in seasons_to_process:
 
+            # Recycling the browser once it has loaded WEBDRIVER_MAX_PAGES pages (the new one reopens the page)
+            renewed = driver_pool.renew(driver)
+            if renewed is not driver:
+                driver = renewed
+                _open_transitions_page(driver)
+
             # Select the season (this reloads the DOM)
             Select(driver.find_element(By.NAME, "periode")).select_by_value(season_value)
 
@@ -204,4 +205,13 @@ def scrape_player_transitions(cursor, run_id=None):
         raise
     finally:
         logger.summarize()
-        driver.quit()
\ No newline at end of file
+        driver_pool.release(driver)
+
+
+def _open_transitions_page(driver) -> None:
+    driver.get(LICENSES_URL)
+
+    # Wait for the page elements to load
+    WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.LINK_TEXT, "Spelklarlistor"))).click()
+    WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.LINK_TEXT, "Övergångar"))).click()
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "periode")))
@@ -3,7 +3,8 @@
 from datetime import date
 import logging
 from models.tournament import Tournament
-from utils import _download_pdf_ondata_by_tournament_class_and_stage, normalize_key
+from utils import normalize_key
+from pdf_session import ClassPdfSession, class_pdf_session, release_pdf_sessions
 from models.tournament_class import TournamentClass
 from models.tournament_class_entry_raw import TournamentClassEntryRaw
 from utils import OperationLogger, parse_date
@@ -14,10 +15,8 @@ from config import (
     SCRAPE_PARTICIPANTS_TNMT_ID_EXTS,
     SCRAPE_PARTICIPANTS_ORDER
 )
-import pdfplumber
 import re
 import unicodedata
-from pathlib import Path
 from typing import Optional, Tuple, List, Dict, Any, Set
 import time
 
@@ -102,213 +101,224 @@ def scrape_tournament_class_entries_ondata(cursor, include_positions: bool = Tru
     total_expected = 0
 
     for i, tc in enumerate(classes, 1):
+        with logger.span("class", tournament_class_id_ext=tc.tournament_class_id_ext):
 
-        debug = False
-
-        logger.inc_processed()
-
-        logger_keys = {
-            'tournament_id':            str(tc.tournament_id or 'N/A'),
-            'tournament_id_ext':        'N/A',
-            'tournament_shortname':     'N/A',
-            'tournament_class_shortname': tc.shortname or 'N/A',
-            'tournament_class_id': str(tc.tournament_class_id or 'N/A'),
-            'tournament_class_id_ext': str(tc.tournament_class_id_ext or 'N/A'),
-            'tournament_url': 'N/A',
-            'stage_1_url': 'N/A'
-        }
-
-        # Lookup using dict
-        tournament = tournaments_dict.get(tc.tournament_id)
-        tid_ext = str(tournament.tournament_id_ext).zfill(6) if tournament and tournament.tournament_id_ext else None
-        tournament_shortname = tournament.shortname if tournament else "N/A"
-        logger_keys['tournament_id_ext'] = tid_ext
-        logger_keys['tournament_shortname'] = tournament_shortname or "N/A"
-        logger_keys['tournament_url'] = tournament.url if tournament and tournament.url else "N/A"
-        logger_keys['stage_1_url'] = f"https://resultat.ondata.se/ViewClassPDF.php?tournamentID={tid_ext}&classID={tc.tournament_class_id_ext}&stage=1"
-
-        # Remove existing raw data for this class
-        deleted_count = TournamentClassEntryRaw.remove_for_class(cursor, tc.tournament_class_id_ext)
-        if deleted_count > 0:
-            # logger.info(logger_keys, f"Removed {deleted_count} existing raw player participants", to_console=False)
-            pass
-
-        # Download and parse initial participants (stage=1)
-
-        # Force refresh if the tournament ended within the last 90 days
-        today = date.today()
-        ref_date = (tc.startdate or today)
-        force_refresh = False
-        if ref_date:
-            try:
-                ref_date = ref_date.date() if hasattr(ref_date, "date") else ref_date
-                if (today - ref_date).days <= 90:
-                    force_refresh = True
-            except Exception:
-                pass
-
-        # Currently disable force refresh
-        force_refresh = False
+            debug = False
 
+            logger.inc_processed()
 
-        pdf_path, was_downloaded, message = _download_pdf_ondata_by_tournament_class_and_stage(
-            tid_ext, tc.tournament_class_id_ext, stage=1, force_download=force_refresh
-        )
-        initial_success = False
-        if message:
-            if not ("Cached" in message or "Downloaded" in message):
-                logger.failed(logger_keys.copy(), message)
-                total_failures += 1
-                continue
-
-        if pdf_path:
-            participants, effective_expected_count = _parse_initial_participants_pdf(
-                pdf_path, tc.tournament_class_id_ext, tid_ext, 1, tc.tournament_class_type_id
-            )
-            if not participants:
-                logger.failed(logger_keys.copy(), "No participants parsed from initial PDF")
-                total_failures += 1
-                continue
+            logger_keys = {
+                'tournament_id':            str(tc.tournament_id or 'N/A'),
+                'tournament_id_ext':        'N/A',
+                'tournament_shortname':     'N/A',
+                'tournament_class_shortname': tc.shortname or 'N/A',
+                'tournament_class_id': str(tc.tournament_class_id or 'N/A'),
+                'tournament_class_id_ext': str(tc.tournament_class_id_ext or 'N/A'),
+                'tournament_url': 'N/A',
+                'stage_1_url': 'N/A'
+            }
 
-            else:
+            # Lookup using dict
+            tournament = tournaments_dict.get(tc.tournament_id)
+            tid_ext = str(tournament.tournament_id_ext).zfill(6) if tournament and tournament.tournament_id_ext else None
+            tournament_shortname = tournament.shortname if tournament else "N/A"
+            logger_keys['tournament_id_ext'] = tid_ext
+            logger_keys['tournament_shortname'] = tournament_shortname or "N/A"
+            logger_keys['tournament_url'] = tournament.url if tournament and tournament.url else "N/A"
+            logger_keys['stage_1_url'] = f"https://resultat.ondata.se/ViewClassPDF.php?tournamentID={tid_ext}&classID={tc.tournament_class_id_ext}&stage=1"
+
+            # Stage PDFs of this class, shared with the other parsers in this run
+            pdfs = class_pdf_session(tid_ext, tc.tournament_class_id_ext)
+
+            # Remove existing raw data for this class
+            deleted_count = TournamentClassEntryRaw.remove_for_class(cursor, tc.tournament_class_id_ext)
+            if deleted_count > 0:
+                # logger.info(logger_keys, f"Removed {deleted_count} existing raw player participants", to_console=False)
+                pass
 
-                if debug:
-                    print(f"DEBUG: Participants parsed for tid_ext: {tid_ext}, tcid_ext: {tc.tournament_class_id_ext}:")
-                    for p in participants:
-                        print(p.get("fullname_raw"), "-", p.get("clubname_raw"), "- seed:", p.get("seed_raw"))
-                    print("DEBUG: End of participants list")
-
-                total_expected += effective_expected_count if effective_expected_count is not None else 0
-                total_participants += effective_expected_count
-                for participant_data in participants:
-                    raw_entry = TournamentClassEntryRaw.from_dict(participant_data)
-                    is_valid, error_message = raw_entry.validate()
-                    if is_valid:
-                        raw_entry.compute_hash()
-                        raw_entry.insert(cursor)
-                    else:
-                        logger.failed(logger_keys.copy(), f"Validation failed: {error_message}")
-                        continue
+            # Download and parse initial participants (stage=1)
+
+            # Force refresh if the tournament ended within the last 90 days
+            today = date.today()
+            ref_date = (tc.startdate or today)
+            force_refresh = False
+            if ref_date:
+                try:
+                    ref_date = ref_date.date() if hasattr(ref_date, "date") else ref_date
+                    if (today - ref_date).days <= 90:
+                        force_refresh = True
+                except Exception:
+                    pass
+
+            # Currently disable force refresh
+            force_refresh = False
+
+
+            with logger.span("download", stage=1):
+                pdf_path, was_downloaded, message = pdfs.download(1, force_download=force_refresh)
+            initial_success = False
+            if message:
+                if not ("Cached" in message or "Downloaded" in message):
+                    logger.failed(logger_keys.copy(), message)
+                    total_failures += 1
+                    continue
 
-                initial_success = True
-                found = len(participants)
-                seeded_count = sum(1 for p in participants if p.get("seed_raw") is not None)
-
-                # Determine icon based on effective expected vs found count
-                icon = "✅" if effective_expected_count is not None and found == effective_expected_count else "❌" if effective_expected_count is not None else "—"
-
-                if effective_expected_count is not None and found != effective_expected_count:
-                    partial_classes += 1
-                    partial_participants += abs(found - effective_expected_count)
-                    logger.warning(logger_keys.copy(), f"Scraped participants did not match expected count")
-
-        # parse stage=2 (groups) for class types that include group play ----
-        groups_found = 0
-        group_seeds_found = 0
-        if (
-            initial_success
-            and tc.tournament_class_type_id in (1, 2)
-            and tc.tournament_class_structure_id != 3
-        ):
-            stage2_pdf_path, downloaded2, msg2 = _download_pdf_ondata_by_tournament_class_and_stage(
-                tid_ext, tc.tournament_class_id_ext, stage=2, force_download=force_refresh
-            )
-            if msg2 and not ("Cached" in msg2 or "Downloaded" in msg2):
-                logger.warning(logger_keys.copy(), f"Failed to fetch groups (stage=2): {msg2}")
-            if stage2_pdf_path:
-                group_rows = _parse_groups_stage_pdf_using_stage1(stage2_pdf_path, participants, log_prefix=f"STG2[{tc.tournament_class_id_ext}]")
-
-                if group_rows:
-                    # Count groups and seeds
-                    groups_found = len({g["group_id_raw"] for g in group_rows if g.get("group_id_raw")})
-                    group_seeds_found = sum(1 for g in group_rows if g.get("seed_in_group_raw"))
-
-                    updated, err = TournamentClassEntryRaw.batch_update_groups(
-                        cursor,
-                        tournament_class_id_ext=tc.tournament_class_id_ext,
-                        data_source_id=1,
-                        groups=group_rows
+            if pdf_path:
+                with logger.span("parse", stage=1):
+                    participants, effective_expected_count = _parse_initial_participants_pdf(
+                        pdfs, 1, tc.tournament_class_id_ext, tid_ext, 1, tc.tournament_class_type_id
                     )
-                    if err:
-                        logger.warning(logger_keys.copy(), f"Group update error: {err}")
+                if not participants:
+                    logger.failed(logger_keys.copy(), "No participants parsed from initial PDF")
+                    total_failures += 1
+                    continue
+
                 else:
-                    logger.warning(logger_keys.copy(), "No groups parsed from stage=2 PDF")
 
+                    if debug:
+                        print(f"DEBUG: Participants parsed for tid_ext: {tid_ext}, tcid_ext: {tc.tournament_class_id_ext}:")
+                        for p in participants:
+                            print(p.get("fullname_raw"), "-", p.get("clubname_raw"), "- seed:", p.get("seed_raw"))
+                        print("DEBUG: End of participants list")
+
+                    total_expected += effective_expected_count if effective_expected_count is not None else 0
+                    total_participants += effective_expected_count
+                    with logger.span("upsert", stage=1):
+                        for participant_data in participants:
+                            raw_entry = TournamentClassEntryRaw.from_dict(participant_data)
+                            is_valid, error_message = raw_entry.validate()
+                            if is_valid:
+                                raw_entry.compute_hash()
+                                raw_entry.insert(cursor)
+                            else:
+                                logger.failed(logger_keys.copy(), f"Validation failed: {error_message}")
+                                continue
+
+                    initial_success = True
+                    found = len(participants)
+                    seeded_count = sum(1 for p in participants if p.get("seed_raw") is not None)
+
+                    # Determine icon based on effective expected vs found count
+                    icon = "✅" if effective_expected_count is not None and found == effective_expected_count else "❌" if effective_expected_count is not None else "—"
+
+                    if effective_expected_count is not None and found != effective_expected_count:
+                        partial_classes += 1
+                        partial_participants += abs(found - effective_expected_count)
+                        logger.warning(logger_keys.copy(), f"Scraped participants did not match expected count")
+
+            # parse stage=2 (groups) for class types that include group play ----
+            groups_found = 0
+            group_seeds_found = 0
+            if (
+                initial_success
+                and tc.tournament_class_type_id in (1, 2)
+                and tc.tournament_class_structure_id != 3
+            ):
+                with logger.span("download", stage=2):
+                    stage2_pdf_path, downloaded2, msg2 = pdfs.download(2, force_download=force_refresh)
+                if msg2 and not ("Cached" in msg2 or "Downloaded" in msg2):
+                    logger.warning(logger_keys.copy(), f"Failed to fetch groups (stage=2): {msg2}")
+                if stage2_pdf_path:
+                    with logger.span("parse", stage=2):
+                        group_rows = _parse_groups_stage_pdf_using_stage1(pdfs, 2, participants, log_prefix=f"STG2[{tc.tournament_class_id_ext}]")
+
+                    if group_rows:
+                        # Count groups and seeds
+                        groups_found = len({g["group_id_raw"] for g in group_rows if g.get("group_id_raw")})
+                        group_seeds_found = sum(1 for g in group_rows if g.get("seed_in_group_raw"))
+
+                        with logger.span("upsert", stage=2):
+                            updated, err = TournamentClassEntryRaw.batch_update_groups(
+                                cursor,
+                                tournament_class_id_ext=tc.tournament_class_id_ext,
+                                data_source_id=1,
+                                groups=group_rows
+                            )
+                        if err:
+                            logger.warning(logger_keys.copy(), f"Group update error: {err}")
+                    else:
+                        logger.warning(logger_keys.copy(), "No groups parsed from stage=2 PDF")
 
-        # Handle final positions if requested
-        final_positions_found = 0
-        final_success = True
-        if include_positions and initial_success:
-            final_stage = tc.get_final_stage()
-            if final_stage is None:
-                logger.warning(logger_keys.copy(), "No valid final stage determined")
-                final_success = False
-            else:
-                final_pdf_path, downloaded, message = _download_pdf_ondata_by_tournament_class_and_stage(
-                    tid_ext, tc.tournament_class_id_ext, final_stage, force_download=force_refresh
-                )
-                if message:
-                    if not ("Cached" in message or "Downloaded" in message):
-                        logger.warning(logger_keys.copy(), f"Failed to scrape final positions: {message}")
-                        final_success = False
-                if final_pdf_path and final_success:
-                    if tc.tournament_class_structure_id == 4:
-                        positions = _parse_final_positions_groups_and_groups(
-                            final_pdf_path,
-                            tc.tournament_class_id_ext,
-                            tid_ext,
-                            1,
+
+            # Handle final positions if requested
+            final_positions_found = 0
+            final_success = True
+            if include_positions and initial_success:
+                final_stage = tc.get_final_stage()
+                if final_stage is None:
+                    logger.warning(logger_keys.copy(), "No valid final stage determined")
+                    final_success = False
+                else:
+                    with logger.span("download", stage=final_stage):
+                        final_pdf_path, downloaded, message = pdfs.download(final_stage, force_download=force_refresh)
+                    if message:
+                        if not ("Cached" in message or "Downloaded" in message):
+                            logger.warning(logger_keys.copy(), f"Failed to scrape final positions: {message}")
+                            final_success = False
+                    if final_pdf_path and final_success:
+                        with logger.span("parse", stage=final_stage):
+                            if tc.tournament_class_structure_id == 4:
+                                positions = _parse_final_positions_groups_and_groups(
+                                    pdfs,
+                                    final_stage,
+                                    tc.tournament_class_id_ext,
+                                    tid_ext,
+                                    1,
+                                )
+                            else:
+                                positions = _parse_final_positions_pdf(
+                                    pdfs,
+                                    final_stage,
+                                    tc.tournament_class_id_ext,
+                                    tid_ext,
+                                    1,
+                                )
+
+                        if positions:
+                            with logger.span("upsert", stage=final_stage):
+                                updated_count, unmatched = _apply_final_positions_updates(
+                                    cursor,
+                                    tournament_class_id_ext=tc.tournament_class_id_ext,
+                                    data_source_id=1,
+                                    positions=positions,
+                                )
+                            final_positions_found = updated_count
+                            if unmatched > 0:
+                                logger.warning(
+                                    logger_keys.copy(),
+                                    f"Final positions parsed but {unmatched} row(s) could not be matched to entries",
+                                )
+                        else:
+                            logger.warning(logger_keys.copy(), "No positions parsed from final PDF")
+                            final_success = False
+                    elif not final_success:
+                        pass  # No additional failure increment here
+                
+                if initial_success:
+                    if final_success and final_positions_found > 0:
+                        logger.success(
+                            logger_keys.copy(),
+                            "All expected participants inserted, including seeds, groups, group seeds and final positions"
                         )
                     else:
-                        positions = _parse_final_positions_pdf(
-                            final_pdf_path,
-                            tc.tournament_class_id_ext,
-                            tid_ext,
-                            1,
+                        logger.success(
+                            logger_keys.copy(),
+                            "All expected participants inserted (could not resolve seeds and/or final positions)"
                         )
 
-                    if positions:
-                        updated_count, unmatched = _apply_final_positions_updates(
-                            cursor,
-                            tournament_class_id_ext=tc.tournament_class_id_ext,
-                            data_source_id=1,
-                            positions=positions,
-                        )
-                        final_positions_found = updated_count
-                        if unmatched > 0:
-                            logger.warning(
-                                logger_keys.copy(),
-                                f"Final positions parsed but {unmatched} row(s) could not be matched to entries",
-                            )
-                    else:
-                        logger.warning(logger_keys.copy(), "No positions parsed from final PDF")
-                        final_success = False
-                elif not final_success:
-                    pass  # No additional failure increment here
-                
-            if initial_success:
-                if final_success and final_positions_found > 0:
-                    logger.success(
-                        logger_keys.copy(),
-                        "All expected participants inserted, including seeds, groups, group seeds and final positions"
-                    )
-                else:
-                    logger.success(
+                    # Add groups + group seeds to the trailing summary
+                    logger.info(
                         logger_keys.copy(),
-                        "All expected participants inserted (could not resolve seeds and/or final positions)"
+                        f"[{i}/{len(classes)}] Parsed class {tc.shortname or 'N/A'}, {tournament_shortname}, {tc.startdate or 'N/A'} "
+                        f"(tcid: {tc.tournament_class_id}, tcid_ext: {tc.tournament_class_id_ext}, tid: {tc.tournament_id}, tid_ext: {tid_ext}). "
+                        f"Expected {effective_expected_count if effective_expected_count is not None else '—'}, "
+                        f"found {found}, seeded: {seeded_count}, deleted: {deleted_count} old participants, "
+                        f"final positions found: {final_positions_found}, "
+                        f"groups found: {groups_found}, group seeds found: {group_seeds_found}",
+                        emoji=icon, to_console=True, show_key=False
                     )
 
-                # Add groups + group seeds to the trailing summary
-                logger.info(
-                    logger_keys.copy(),
-                    f"[{i}/{len(classes)}] Parsed class {tc.shortname or 'N/A'}, {tournament_shortname}, {tc.startdate or 'N/A'} "
-                    f"(tcid: {tc.tournament_class_id}, tcid_ext: {tc.tournament_class_id_ext}, tid: {tc.tournament_id}, tid_ext: {tid_ext}). "
-                    f"Expected {effective_expected_count if effective_expected_count is not None else '—'}, "
-                    f"found {found}, seeded: {seeded_count}, deleted: {deleted_count} old participants, "
-                    f"final positions found: {final_positions_found}, "
-                    f"groups found: {groups_found}, group seeds found: {group_seeds_found}",
-                    emoji=icon, to_console=True, show_key=False
-                )
+    release_pdf_sessions()
 
     logger.info(f"Participants update completed in {time.time() - start_time:.2f} seconds. Total participants processed: {total_participants} vs expected: {total_expected}. Total failures: {total_failures}.")
     if partial_classes > 0:
@@ -317,7 +327,8 @@ def scrape_tournament_class_entries_ondata(cursor, include_positions: bool = Tru
     return classes
 
 def _parse_initial_participants_pdf(
-        pdf_path: Path, 
+        pdfs: ClassPdfSession,
+        stage: int,
         tournament_class_id_ext: str, 
         tournament_id_ext: str, 
         data_source_id: int, 
@@ -368,7 +379,7 @@ def _parse_initial_participants_pdf(
         return block, None
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        with pdfs.open(stage) as pdf:
             for page in pdf.pages:
                 w, h = page.width, page.height
                 
@@ -520,7 +531,7 @@ def _parse_initial_participants_pdf(
                             })
 
     except Exception as e:
-        logging.error({"pdf_path": str(pdf_path), "error": str(e)}, "Exception during PDF parsing")
+        logging.error({"pdf_path": str(pdfs.path(stage)), "error": str(e)}, "Exception during PDF parsing")
         return [], None
     
     # Assign entry_group_id_int based on tournament class type (singles-only for now)
@@ -545,7 +556,7 @@ def _parse_initial_participants_pdf(
     effective_expected_count = expected_count - placeholder_skips if expected_count is not None else None
     return participants, effective_expected_count
 
-def _parse_final_positions_pdf(pdf_path: Path, tournament_class_id_ext: str, tournament_id_ext: str, data_source_id: int) -> List[Dict[str, Any]]:
+def _parse_final_positions_pdf(pdfs: ClassPdfSession, stage: int, tournament_class_id_ext: str, tournament_id_ext: str, data_source_id: int) -> List[Dict[str, Any]]:
     """Parse final positions from a PDF (e.g., stage=6 or 4).
     Returns a list of dicts with raw position data.
     """
@@ -556,54 +567,53 @@ def _parse_final_positions_pdf(pdf_path: Path, tournament_class_id_ext: str, tou
     POSITION_RE = re.compile(r'^\s*(?P<pos>\d+)\.?\s+(?P<name>[^,]+?)\s*,\s*(?P<club>\S.*\S)\s*$', re.M)
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                for line in text.splitlines():
-                    line = line.strip()
-                    if not line:
-                        continue
+        for text in pdfs.text(stage):
+            for line in text.splitlines():
+                line = line.strip()
+                if not line:
+                    continue
 
-                    m = POSITION_RE.match(line)
-                    if not m:
-                        continue
+                m = POSITION_RE.match(line)
+                if not m:
+                    continue
 
-                    raw_name = m.group('name').strip()
-                    club_name = m.group('club').strip()
-                    position_raw = m.group('pos').strip()
+                raw_name = m.group('name').strip()
+                club_name = m.group('club').strip()
+                position_raw = m.group('pos').strip()
 
-                    raw_name = _clean_final_name(raw_name)
+                raw_name = _clean_final_name(raw_name)
 
-                    # Skip placeholders
-                    if FINAL_POSITION_PLACEHOLDER_RE.search(raw_name):
-                        continue
-                    if len(raw_name) < 3 or not any(unicodedata.category(ch).startswith("L") for ch in club_name):
-                        continue
+                # Skip placeholders
+                if FINAL_POSITION_PLACEHOLDER_RE.search(raw_name):
+                    continue
+                if len(raw_name) < 3 or not any(unicodedata.category(ch).startswith("L") for ch in club_name):
+                    continue
 
-                    key = (raw_name.lower(), club_name.lower())
-                    if key in unique_entries:
-                        continue
-                    unique_entries.add(key)
-
-                    positions.append({
-                        "tournament_id_ext":            tournament_id_ext,
-                        "tournament_class_id_ext":      tournament_class_id_ext,
-                        "tournament_player_id_ext":     None,  # Can be enhanced with TPID if present
-                        "data_source_id":               data_source_id,
-                        "fullname_raw":                 raw_name,
-                        "clubname_raw":                 club_name,
-                        "final_position_raw":           position_raw
-                    })
+                key = (raw_name.lower(), club_name.lower())
+                if key in unique_entries:
+                    continue
+                unique_entries.add(key)
+
+                positions.append({
+                    "tournament_id_ext":            tournament_id_ext,
+                    "tournament_class_id_ext":      tournament_class_id_ext,
+                    "tournament_player_id_ext":     None,  # Can be enhanced with TPID if present
+                    "data_source_id":               data_source_id,
+                    "fullname_raw":                 raw_name,
+                    "clubname_raw":                 club_name,
+                    "final_position_raw":           position_raw
+                })
 
     except Exception as e:
-        logging.error({"pdf_path": str(pdf_path), "error": str(e)}, "Exception during PDF parsing")
+        logging.error({"pdf_path": str(pdfs.path(stage)), "error": str(e)}, "Exception during PDF parsing")
         return []
 
     return positions
 
 
 def _parse_final_positions_groups_and_groups(
-    pdf_path: Path,
+    pdfs: ClassPdfSession,
+    stage: int,
     tournament_class_id_ext: str,
     tournament_id_ext: str,
     data_source_id: int,
@@ -619,62 +629,60 @@ def _parse_final_positions_groups_and_groups(
     )
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            in_slutspel = False
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                for line in text.splitlines():
-                    stripped = line.strip()
-                    if not stripped:
-                        continue
-                    lower = stripped.lower()
+        in_slutspel = False
+        for text in pdfs.text(stage):
+            for line in text.splitlines():
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                lower = stripped.lower()
 
-                    if lower.startswith("slutspel"):
-                        in_slutspel = True
-                        continue
-                    if lower.startswith("pool "):
-                        # A new pool header after Slutspel means we are done with finals.
-                        if in_slutspel:
-                            in_slutspel = False
-                        continue
-                    if not in_slutspel:
-                        continue
+                if lower.startswith("slutspel"):
+                    in_slutspel = True
+                    continue
+                if lower.startswith("pool "):
+                    # A new pool header after Slutspel means we are done with finals.
+                    if in_slutspel:
+                        in_slutspel = False
+                    continue
+                if not in_slutspel:
+                    continue
 
-                    match = position_re.match(stripped)
-                    if not match:
-                        continue
+                match = position_re.match(stripped)
+                if not match:
+                    continue
 
-                    raw_name = match.group("name").strip()
-                    club_name = match.group("club").strip()
-                    position_raw = match.group("pos").strip()
+                raw_name = match.group("name").strip()
+                club_name = match.group("club").strip()
+                position_raw = match.group("pos").strip()
 
-                    raw_name = _clean_final_name(raw_name)
+                raw_name = _clean_final_name(raw_name)
 
-                    if FINAL_POSITION_PLACEHOLDER_RE.search(raw_name):
-                        continue
-                    if len(raw_name) < 3 or len(club_name) < 2:
-                        continue
+                if FINAL_POSITION_PLACEHOLDER_RE.search(raw_name):
+                    continue
+                if len(raw_name) < 3 or len(club_name) < 2:
+                    continue
 
-                    key = (raw_name.lower(), club_name.lower())
-                    if key in unique_entries:
-                        continue
-                    unique_entries.add(key)
-
-                    positions.append(
-                        {
-                            "tournament_id_ext": tournament_id_ext,
-                            "tournament_class_id_ext": tournament_class_id_ext,
-                            "tournament_player_id_ext": None,
-                            "data_source_id": data_source_id,
-                            "fullname_raw": raw_name,
-                            "clubname_raw": club_name,
-                            "final_position_raw": position_raw,
-                        }
-                    )
+                key = (raw_name.lower(), club_name.lower())
+                if key in unique_entries:
+                    continue
+                unique_entries.add(key)
+
+                positions.append(
+                    {
+                        "tournament_id_ext": tournament_id_ext,
+                        "tournament_class_id_ext": tournament_class_id_ext,
+                        "tournament_player_id_ext": None,
+                        "data_source_id": data_source_id,
+                        "fullname_raw": raw_name,
+                        "clubname_raw": club_name,
+                        "final_position_raw": position_raw,
+                    }
+                )
     except Exception as exc:
         logging.error(
             {
-                "pdf_path": str(pdf_path),
+                "pdf_path": str(pdfs.path(stage)),
                 "error": str(exc),
                 "context": "parse_final_positions_groups_and_groups",
             },
@@ -780,7 +788,8 @@ def _clean_final_name(name: str) -> str:
     return cleaned
 
 def _parse_groups_stage_pdf_using_stage1(
-    pdf_path: Path,
+    pdfs: ClassPdfSession,
+    stage: int,
     stage1_entries: List[Dict[str, Any]],
     *,
     log_prefix: str = "STG2",
@@ -800,7 +809,7 @@ def _parse_groups_stage_pdf_using_stage1(
         "seed_in_group_raw": "1|2|..." or None
       }
     """
-    import pdfplumber, re, unicodedata, difflib
+    import re, unicodedata, difflib
     from collections import defaultdict
 
     debug = False
@@ -1140,7 +1149,7 @@ def _parse_groups_stage_pdf_using_stage1(
 
     # ----------------------------- PDF parse -----------------------------
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        with pdfs.open(stage) as pdf:
             current_group: Optional[str] = None
             y_tol = 2.0
             small_gap = 4.5        # tokenization inside a line
@@ -1393,7 +1402,7 @@ def _parse_groups_stage_pdf_using_stage1(
                                 })
 
     except Exception as e:
-        logging.error("[%s] TXT pass failed for %s: %s", log_prefix, str(pdf_path), str(e), exc_info=True)
+        logging.error("[%s] TXT pass failed for %s: %s", log_prefix, str(pdfs.path(stage)), str(e), exc_info=True)
 
     if not results:
         _log_unmatched_stage1(stage1_entries, matched_keys, log_prefix, debug)
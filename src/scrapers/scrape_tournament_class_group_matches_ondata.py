@@ -4,14 +4,13 @@ from __future__ import annotations
 from datetime import date
 import logging
 from typing import List, Optional
-import io, re
+import re
 import unicodedata
-import pdfplumber
 from utils import (
     parse_date,
     OperationLogger,
-    _download_pdf_ondata_by_tournament_class_and_stage,
 )
+from pdf_session import ClassPdfSession, class_pdf_session, release_pdf_sessions
 from config import (
     SCRAPE_PARTICIPANTS_MAX_CLASSES,
     SCRAPE_PARTICIPANTS_CLASS_ID_EXTS,
@@ -30,6 +29,9 @@ debug = False
 # Stage ids used when scraping pools (group stage + stage 2 pools)
 GROUP_STAGE_IDS = (1, 11)
 
+# extract_words() options for the pool PDFs (stage 3 and 4)
+POOL_WORD_OPTIONS = {"x_tolerance": 2, "y_tolerance": 3, "keep_blank_chars": False}
+
 def scrape_tournament_class_group_matches_ondata(cursor, run_id=None):
     """
     Scrape GROUP stage match rows (stage=3) from OnData, store into tournament_class_match_raw.
@@ -117,12 +119,9 @@ def scrape_tournament_class_group_matches_ondata(cursor, run_id=None):
         # Currently disable force refresh
         force_refresh = False
 
-        pdf_path, downloaded, msg = _download_pdf_ondata_by_tournament_class_and_stage(
-            tournament_id_ext=tid_ext or "",
-            class_id_ext=cid_ext or "",
-            stage=3,
-            force_download=force_refresh,
-        )
+        # Stage PDFs of this class, shared with the other parsers in this run
+        pdfs = class_pdf_session(tid_ext or "", cid_ext or "")
+        pdf_path, downloaded, msg = pdfs.download(3, force_download=force_refresh)
         if msg:
             # logger.info(logger_keys.copy(), msg)
             pass
@@ -134,9 +133,7 @@ def scrape_tournament_class_group_matches_ondata(cursor, run_id=None):
 
         # Parse groups
         try:
-            with open(pdf_path, "rb") as f:
-                pdf_bytes = f.read()
-            groups = _parse_groups_pdf(pdf_bytes)
+            groups = _parse_groups_pdf(pdfs.words(3, **POOL_WORD_OPTIONS))
             before = sum(len(g.get("matches", [])) for g in groups)
             groups = _dedupe_groups(groups)
             after  = sum(len(g.get("matches", [])) for g in groups)
@@ -162,7 +159,7 @@ def scrape_tournament_class_group_matches_ondata(cursor, run_id=None):
         wo_flags_by_group: dict[str, set[str]] = {}
         if any_wo:
             wo_flags_by_group = _load_stage4_break_flags(
-                tid_ext, cid_ext, names_by_group, logger=logger, logger_keys=logger_keys, force_refresh=force_refresh
+                pdfs, names_by_group, logger=logger, logger_keys=logger_keys, force_refresh=force_refresh
             )
 
         kept = 0
@@ -304,6 +301,8 @@ def scrape_tournament_class_group_matches_ondata(cursor, run_id=None):
 
         logger.info(logger_keys.copy(), f"Removed: {removed}   Inserted: {kept}   Skipped: {skipped}")
 
+    release_pdf_sessions()
+
     logger.info(f"Scraping complete. Inserted: {total_inserted}, Skipped: {total_skipped}, Matches seen: {total_matches}")
     logger.summarize()
 
@@ -379,8 +378,7 @@ def _infer_group_best_of(groups: list[dict]) -> dict[str, int]:
     return best_of_by_group
 
 def _load_stage4_break_flags(
-    tournament_id_ext: str | None,
-    class_id_ext: str | None,
+    pdfs: ClassPdfSession,
     names_by_group: dict[str, set[str]],
     *,
     logger,
@@ -388,77 +386,67 @@ def _load_stage4_break_flags(
     force_refresh: bool = False
 ) -> dict[str, set[str]]:
     """
-    Download+parse stage=4 PDF and return { 'Pool X': {normalized_name, ...}, ... }
+    Load+parse stage=4 PDF from the class session and return { 'Pool X': {normalized_name, ...}, ... }
     for players marked broken/withdrawn ('*' or 'Bröt').
     """
     flagged_by_group: dict[str, set[str]] = {}
 
-    pdf_path, downloaded, msg = _download_pdf_ondata_by_tournament_class_and_stage(
-        tournament_id_ext=tournament_id_ext or "",
-        class_id_ext=class_id_ext or "",
-        stage=4,
-        force_download=force_refresh,
-    )
+    pdf_path, downloaded, msg = pdfs.download(4, force_download=force_refresh)
     if msg:
         # logger.info(logger_keys.copy(), msg)
         pass
     if not pdf_path:
         return flagged_by_group
 
-    with open(pdf_path, "rb") as f:
-        pdf_bytes = f.read()
-
     # Parse like stage=3: group into rows, track current pool header
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        for page in pdf.pages:
-            words = page.extract_words(x_tolerance=2, y_tolerance=3, keep_blank_chars=False) or []
-            if not words:
-                continue
+    for words in pdfs.words(4, **POOL_WORD_OPTIONS):
+        if not words:
+            continue
 
-            row_map: dict[int, list[dict]] = {}
-            rid, last_top = 0, None
-            for w in sorted(words, key=lambda w: (round(w["top"], 1), w["x0"])):
-                top = round(w["top"], 1)
-                if last_top is None or abs(top - last_top) > 3.0:
-                    rid += 1
-                    last_top = top
-                    row_map[rid] = []
-                row_map[rid].append(w)
-
-            current_group: str | None = None
-            for row_words in row_map.values():
-                row_text = " ".join(w["text"] for w in sorted(row_words, key=lambda w: w["x0"])).strip()
-                if not row_text:
-                    continue
+        row_map: dict[int, list[dict]] = {}
+        rid, last_top = 0, None
+        for w in sorted(words, key=lambda w: (round(w["top"], 1), w["x0"])):
+            top = round(w["top"], 1)
+            if last_top is None or abs(top - last_top) > 3.0:
+                rid += 1
+                last_top = top
+                row_map[rid] = []
+            row_map[rid].append(w)
+
+        current_group: str | None = None
+        for row_words in row_map.values():
+            row_text = " ".join(w["text"] for w in sorted(row_words, key=lambda w: w["x0"])).strip()
+            if not row_text:
+                continue
 
-                m_pool = _RE_POOL.search(row_text)
-                if m_pool:
-                    current_group = m_pool.group(0)
-                    continue
-                if not current_group:
-                    continue
+            m_pool = _RE_POOL.search(row_text)
+            if m_pool:
+                current_group = m_pool.group(0)
+                continue
+            if not current_group:
+                continue
 
-                lt = row_text.lower()
-                if "*" not in row_text and "bröt" not in lt:
-                    continue
+            lt = row_text.lower()
+            if "*" not in row_text and "bröt" not in lt:
+                continue
 
-                # disambiguate: match the row against known names from this group
-                group_names = names_by_group.get(current_group, set())
-                if not group_names:
-                    continue
+            # disambiguate: match the row against known names from this group
+            group_names = names_by_group.get(current_group, set())
+            if not group_names:
+                continue
 
-                norm_row = _norm(row_text)
-                candidates: list[str] = []
-                for nm in group_names:
-                    parts = nm.split()
-                    reversed_nm = " ".join(reversed(parts)) if len(parts) >= 2 else nm
-                    if nm and nm in norm_row:
-                        candidates.append(nm)
-                    elif reversed_nm and reversed_nm in norm_row:
-                        candidates.append(nm)
+            norm_row = _norm(row_text)
+            candidates: list[str] = []
+            for nm in group_names:
+                parts = nm.split()
+                reversed_nm = " ".join(reversed(parts)) if len(parts) >= 2 else nm
+                if nm and nm in norm_row:
+                    candidates.append(nm)
+                elif reversed_nm and reversed_nm in norm_row:
+                    candidates.append(nm)
 
-                if len(candidates) == 1:
-                    flagged_by_group.setdefault(current_group, set()).add(candidates[0])
+            if len(candidates) == 1:
+                flagged_by_group.setdefault(current_group, set()).add(candidates[0])
 
     return flagged_by_group
 
@@ -555,54 +543,53 @@ def _infer_best_of_from_sign(tokens: list[str]) -> int | None:
         return None
     return 2 * max(p1_games, p2_games) - 1
 
-def _extract_rows_group_stage_with_attrs(pdf_bytes: bytes) -> list[dict]:
+def _extract_rows_group_stage_with_attrs(pages_words: list[list[dict]]) -> list[dict]:
     """
+    Groups the page words (POOL_WORD_OPTIONS) into rows.
     Returns rows with attrs:
       { "text": "...", "words": [..], "bold_mid": "123" or None, "tail_text": "..." }
     """
     rows: list[dict] = []
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        for page in pdf.pages:
-            words = page.extract_words(x_tolerance=2, y_tolerance=3, keep_blank_chars=False) or []
-            if not words:
-                continue
+    for words in pages_words:
+        if not words:
+            continue
 
-            row_map: dict[int, list[dict]] = {}
-            rid, last_top = 0, None
-            for w in sorted(words, key=lambda w: (round(w["top"], 1), w["x0"])):
-                top = round(w["top"], 1)
-                if last_top is None or abs(top - last_top) > 3.0:
-                    rid += 1
-                    last_top = top
-                    row_map[rid] = []
-                row_map[rid].append(w)
-
-            for words_in_row in row_map.values():
-                words_in_row.sort(key=lambda w: w["x0"])
-                row_text = " ".join(w["text"] for w in words_in_row).strip()
-                if not row_text:
-                    continue
+        row_map: dict[int, list[dict]] = {}
+        rid, last_top = 0, None
+        for w in sorted(words, key=lambda w: (round(w["top"], 1), w["x0"])):
+            top = round(w["top"], 1)
+            if last_top is None or abs(top - last_top) > 3.0:
+                rid += 1
+                last_top = top
+                row_map[rid] = []
+            row_map[rid].append(w)
+
+        for words_in_row in row_map.values():
+            words_in_row.sort(key=lambda w: w["x0"])
+            row_text = " ".join(w["text"] for w in words_in_row).strip()
+            if not row_text:
+                continue
 
-                bold_mid = None
-                tail_words = words_in_row[:]
-                if tail_words:
-                    w0 = tail_words[0]
-                    font = w0.get("fontname", "")
-                    if w0["text"].isdigit() and 1 <= len(w0["text"]) <= 4 and ("Bold" in font or "bold" in font.lower()):
-                        bold_mid = w0["text"]
-                        tail_words = tail_words[1:]
-
-                tail_text = " ".join(w["text"] for w in tail_words).strip()
-                rows.append({
-                    "text": row_text,
-                    "words": words_in_row,
-                    "bold_mid": bold_mid,
-                    "tail_text": tail_text,
-                })
+            bold_mid = None
+            tail_words = words_in_row[:]
+            if tail_words:
+                w0 = tail_words[0]
+                font = w0.get("fontname", "")
+                if w0["text"].isdigit() and 1 <= len(w0["text"]) <= 4 and ("Bold" in font or "bold" in font.lower()):
+                    bold_mid = w0["text"]
+                    tail_words = tail_words[1:]
+
+            tail_text = " ".join(w["text"] for w in tail_words).strip()
+            rows.append({
+                "text": row_text,
+                "words": words_in_row,
+                "bold_mid": bold_mid,
+                "tail_text": tail_text,
+            })
     return rows
 
-def _parse_groups_pdf(pdf_bytes: bytes) -> list[dict]:
-    rows = _extract_rows_group_stage_with_attrs(pdf_bytes)
+def _parse_groups_pdf(pages_words: list[list[dict]]) -> list[dict]:
+    rows = _extract_rows_group_stage_with_attrs(pages_words)
     groups: list[dict] = []
     current: dict | None = None
 
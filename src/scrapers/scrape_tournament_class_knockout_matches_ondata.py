@@ -3,14 +3,13 @@
 from __future__ import annotations
 
 from datetime import date
-import hashlib
-import io
 import re
 import unicodedata
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Sequence, Set, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
 
-import pdfplumber
+import numpy as np
 
 """
 Utility script for parsing knockout brackets from resultat.ondata.se PDFs.
@@ -39,6 +38,9 @@ Important guardrails for contributors (incl. AI agents)
   localized fixes guarded by explicit flags/heuristics.
 - Always test in the venv (e.g., `source ../.venv/bin/activate` and run the
   scraper for the target `SCRAPE_PARTICIPANTS_CLASS_ID_EXTS`).
+- Take parser snapshots of the cached PDFs before a change
+  (`python utils_scripts/check_parser_goldens.py --update ko`) and check every
+  format against them after it (`python utils_scripts/check_parser_goldens.py ko`).
 - Keep the verbose debug prints/checks intact; they are the safety net when
   adding heuristics for new PDFs.
 - When in doubt, bias toward not consuming tokens/winners rather than forcing
@@ -59,10 +61,10 @@ from config import (
 from utils import (
     parse_date,
     OperationLogger,
-    _download_pdf_ondata_by_tournament_class_and_stage,
     sanitize_name,
     normalize_key,
 )
+from pdf_session import ClassPdfSession, class_pdf_session, release_pdf_sessions
 from models.tournament import Tournament
 from models.tournament_class import TournamentClass
 from models.tournament_class_match_raw import TournamentClassMatchRaw
@@ -271,12 +273,9 @@ def scrape_tournament_class_knockout_matches_ondata(cursor, run_id=None):
         # Currently disable force refresh
         force_refresh = False
 
-        pdf_path, downloaded, msg = _download_pdf_ondata_by_tournament_class_and_stage(
-            tournament_id_ext=tid_ext or "",
-            class_id_ext=cid_ext or "",
-            stage=5,
-            force_download=force_refresh,
-        )
+        # Stage PDFs of this class, shared with the other parsers in this run
+        pdfs = class_pdf_session(tid_ext or "", cid_ext or "")
+        pdf_path, downloaded, msg = pdfs.download(5, force_download=force_refresh)
         if msg and DEBUG_OUTPUT:
             _debug_print(msg)
             _debug_print(f"URL: https://resultat.ondata.se/ViewClassPDF.php?tournamentID={tid_ext}&classID={cid_ext}&stage=5")
@@ -286,20 +285,14 @@ def scrape_tournament_class_knockout_matches_ondata(cursor, run_id=None):
             continue
 
         try:
-            with open(pdf_path, "rb") as handle:
-                pdf_bytes = handle.read()
-
             pdf_hash_key = f"{cid_ext or ''}:{tid_ext or ''}:stage5"
-            words = _extract_words(pdf_bytes, pdf_hash_key)
+            words = _extract_words(pdfs, 5, pdf_hash_key)
             pdf_pages_words: List[List[dict]] = []
             pdf_page_boxes: List[Tuple[float, float]] = []
             wo_words_all: List[dict] = []
             try:
-                with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf_doc:
-                    pdf_pages_words = [
-                        page.extract_words(keep_blank_chars=True) for page in pdf_doc.pages
-                    ]
-                    pdf_page_boxes = [(page.width, page.height) for page in pdf_doc.pages]
+                pdf_pages_words = pdfs.words(5, keep_blank_chars=True)
+                pdf_page_boxes = pdfs.page_sizes(5)
             except Exception:
                 pdf_pages_words = [words]
                 pdf_page_boxes = []
@@ -983,6 +976,8 @@ def scrape_tournament_class_knockout_matches_ondata(cursor, run_id=None):
             logger.failed(logger_keys.copy(), f"KO PDF parsing failed: {exc}")
             continue
 
+    release_pdf_sessions()
+
     logger.info(
         f"Scraping completed. Inserted: {total_inserted}, Skipped: {total_skipped}, Matches seen: {total_seen}"
     )
@@ -990,13 +985,11 @@ def scrape_tournament_class_knockout_matches_ondata(cursor, run_id=None):
 
 
 
-def _extract_words(pdf_bytes: bytes, hash_key: str) -> List[dict]:
+def _extract_words(pdfs: ClassPdfSession, stage: int, hash_key: str) -> List[dict]:
     """Extract words from the first PDF page and retain a content hash."""
 
-    LAST_PDF_HASHES[hash_key] = hashlib.md5(pdf_bytes).hexdigest()
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        page = pdf.pages[0]
-        return page.extract_words(keep_blank_chars=True)
+    LAST_PDF_HASHES[hash_key] = pdfs.md5(stage)
+    return pdfs.words(stage, keep_blank_chars=True)[0]
 
 
 def _contains_double_wo(words: Sequence[dict]) -> bool:
@@ -1272,128 +1265,231 @@ def _build_name_aliases(full_name: str) -> Set[str]:
     return aliases
 
 
-def _extract_players(words: Sequence[dict]) -> List[Player]:
-    players: List[Player] = []
-    for word in words:
-        if float(word["x0"]) < 200 and "," in word["text"]:
-            raw_text = _strip_draw_prefix(word["text"])
-            name_segment = raw_text.split(",", 1)[0]
-            if not re.search(r"[A-Za-zÅÄÖåäö]", name_segment):
-                continue
-            match = re.match(
-                r"\s*(?:(\d{1,3})\s+)?([^,(]+?(?:\s+[^,(]+?)*)(?:\s*\(([^)]+)\))?,\s*(.+)",
-                raw_text,
-            )
-            if not match:
-                continue
-            player_id_ext, raw_name, player_suffix_id, raw_club = match.groups()
-            if player_id_ext:
-                player_id_ext = player_id_ext.strip()
-            full_name = unicodedata.normalize('NFC', raw_name.strip())
-            club = unicodedata.normalize('NFC', raw_club.strip())
+def _parse_player_word(word: dict) -> Optional[Tuple[str, str, float, Optional[str], Optional[str]]]:
+    """(full_name, club, x1, player_id_ext, player_suffix_id) if the word is a player line of the left-most column."""
+    if not (float(word["x0"]) < 200 and "," in word["text"]):
+        return None
+    raw_text = _strip_draw_prefix(word["text"])
+    name_segment = raw_text.split(",", 1)[0]
+    if not re.search(r"[A-Za-zÅÄÖåäö]", name_segment):
+        return None
+    match = re.match(
+        r"\s*(?:(\d{1,3})\s+)?([^,(]+?(?:\s+[^,(]+?)*)(?:\s*\(([^)]+)\))?,\s*(.+)",
+        raw_text,
+    )
+    if not match:
+        return None
+    player_id_ext, raw_name, player_suffix_id, raw_club = match.groups()
+    if player_id_ext:
+        player_id_ext = player_id_ext.strip()
+    full_name = unicodedata.normalize('NFC', raw_name.strip())
+    club = unicodedata.normalize('NFC', raw_club.strip())
+    return (
+        full_name,
+        club,
+        float(word["x1"]),
+        player_id_ext,
+        player_suffix_id.strip() if player_suffix_id else None,
+    )
+
+
+def _parse_score_word(word: dict) -> Optional[Tuple[int, ...]]:
+    raw = word["text"].strip().replace("−", "-")
+    if not raw:
+        return None
+    score_text, _ = _split_score_and_label(raw)
+    target = score_text or _strip_draw_prefix(raw)
+    if not target:
+        return None
+    if not score_text and re.search(r"[A-Za-zÅÄÖåäö]", target):
+        return None
+    m = re.fullmatch(r"-?\d+(?:\s*,\s*-?\d+)+", target)
+    if not m:
+        return None
+    nums = [int(tok) for tok in re.findall(r"-?\d+", m.group(0))]
+    if not nums:
+        return None
+    return tuple(nums)
+
+
+def _parse_winner_word(word: dict) -> Optional[Tuple[Optional[str], str, bool]]:
+    """(player_id_ext, label, is_double_wo) if the word is a winner label."""
+    text = word["text"].replace(" ", " ").strip()
+    _score_text, text = _split_score_and_label(text)
+    if not text:
+        return None
+    wo_prefix = re.match(r"^wo\s+(.+)$", text, flags=re.IGNORECASE)
+    if wo_prefix:
+        candidate = wo_prefix.group(1).strip()
+        if candidate and re.search(r"[A-Za-zÅÄÖåäö]", candidate):
+            text = candidate
+    if any(
+        token in text
+        for token in (
+            "Slutspel",
+            "Höstpool",
+            "program",
+            "Kvalifikation",
+            "Kvalificering",
+            "Qualification",
+            "Qualifying",
+            # Qual headers handled elsewhere
+            "Vinderen",
+            "Mesterskaberne",
+            "Senior Elite",
+        )
+    ):
+        return None
+    normalized_text = text.lower()
+    if any(instr in normalized_text for instr in WINNER_INSTRUCTION_PHRASES):
+        return None
+    m = WINNER_LABEL_PATTERN.match(text)
+    if not m:
+        alt = re.match(r"^(\d{1,3})\s+([\wÅÄÖåäö.\-]+)$", text)
+        if not alt:
+            return None
+        m = alt
+    player_id_ext, label = m.groups()
+    if any(ch.isdigit() for ch in label):
+        return None
+    label = unicodedata.normalize('NFC', label.strip())
+    is_double_wo = _is_double_wo_label(label)
+    if " " not in label and not player_id_ext and not is_double_wo:
+        return None
+    return player_id_ext, label, is_double_wo
+
+
+class _PageWordIndex:
+    """
+    Word geometry of one page, classified once.
+
+    Every word is parsed at most once as a player line, score token and winner label
+    (token class bits in `kind`); score/winner words are kept sorted by x0 so an x-band
+    is two searchsorted calls instead of a regex pass over the whole page.
+    The extractors build fresh Player/ScoreEntry/WinnerEntry objects per call, since
+    callers pop, mutate and compare them by id.
+    """
+
+    PLAYER, SCORE, WINNER = 1, 2, 4
+
+    def __init__(self, words: Sequence[dict]):
+        self.words  = words
+        self.size   = len(words)
+        self.kind   = np.zeros(self.size, dtype=np.int8)
+        self.x0     = np.zeros(self.size)
+        self.center = np.zeros(self.size)
+        self._players: Dict[int, Tuple] = {}
+        self._scores:  Dict[int, Tuple[int, ...]] = {}
+        self._winners: Dict[int, Tuple] = {}
+
+        for i, word in enumerate(words):
+            self.x0[i] = float(word["x0"])
+            player = _parse_player_word(word)
+            if player:
+                self.kind[i] |= self.PLAYER
+                self._players[i] = player
+            scores = _parse_score_word(word)
+            if scores:
+                self.kind[i] |= self.SCORE
+                self._scores[i] = scores
+            winner = _parse_winner_word(word)
+            if winner:
+                self.kind[i] |= self.WINNER
+                self._winners[i] = winner
+            if self.kind[i]:
+                self.center[i] = _to_center(word)
+
+        # Python floats for the entries, numpy only for the index
+        self._x0_list     = self.x0.tolist()
+        self._center_list = self.center.tolist()
+
+        player_idx = np.flatnonzero(self.kind & self.PLAYER)
+        self._player_order = player_idx[np.argsort(self.center[player_idx], kind="stable")].tolist()
+        self._score_by_x,  self._score_x  = self._sorted_by_x0(self.SCORE)
+        self._winner_by_x, self._winner_x = self._sorted_by_x0(self.WINNER)
+
+    def _sorted_by_x0(self, kind: int) -> Tuple[np.ndarray, np.ndarray]:
+        idx = np.flatnonzero(self.kind & kind)
+        idx = idx[np.argsort(self.x0[idx], kind="stable")]
+        return idx, self.x0[idx]
+
+    def _band(self, idx_by_x: np.ndarray, xs: np.ndarray, x_range: Tuple[float, float]) -> List[int]:
+        """Word indices with start <= x0 <= stop, ordered by center (ties in word order)."""
+        start, stop = x_range
+        sel = np.sort(idx_by_x[np.searchsorted(xs, start, "left"):np.searchsorted(xs, stop, "right")])
+        return sel[np.argsort(self.center[sel], kind="stable")].tolist()
+
+    def players(self) -> List[Player]:
+        players: List[Player] = []
+        for i in self._player_order:
+            full_name, club, x1, player_id_ext, player_suffix_id = self._players[i]
             player = Player(
                 full_name=full_name,
                 club=club,
                 short=_make_short(full_name),
-                center=_to_center(word),
-                x=float(word["x0"]),
-                x1=float(word["x1"]),
+                center=self._center_list[i],
+                x=self._x0_list[i],
+                x1=x1,
                 player_id_ext=player_id_ext,
-                player_suffix_id=player_suffix_id.strip() if player_suffix_id else None,
+                player_suffix_id=player_suffix_id,
             )
             player.aliases = _build_name_aliases(full_name)
             players.append(player)
-    players.sort(key=lambda p: p.center)
-    return players
+        return players
+
+    def score_entries(self, x_range: Tuple[float, float]) -> List[ScoreEntry]:
+        return [
+            ScoreEntry(scores=self._scores[i], center=self._center_list[i], x=self._x0_list[i])
+            for i in self._band(self._score_by_x, self._score_x, x_range)
+        ]
+
+    def winner_entries(self, x_range: Tuple[float, float]) -> List[WinnerEntry]:
+        entries: List[WinnerEntry] = []
+        for i in self._band(self._winner_by_x, self._winner_x, x_range):
+            player_id_ext, label, is_double_wo = self._winners[i]
+            entries.append(
+                WinnerEntry(
+                    short=label,
+                    center=self._center_list[i],
+                    x=self._x0_list[i],
+                    player_id_ext=player_id_ext,
+                    is_double_wo=is_double_wo,
+                )
+            )
+        return entries
+
+
+_WORD_INDEXES: Dict[int, _PageWordIndex] = {}
+
+
+def _word_index(words: Sequence[dict]) -> _PageWordIndex:
+    """Index for a page's word list, built on first use (the index keeps the list alive, so ids stay unique)."""
+    index = _WORD_INDEXES.get(id(words))
+    if index is not None and index.words is words and index.size == len(words):
+        return index
+    if len(_WORD_INDEXES) >= 16:
+        _WORD_INDEXES.clear()
+    index = _WORD_INDEXES[id(words)] = _PageWordIndex(words)
+    return index
+
+
+def _extract_players(words: Sequence[dict]) -> List[Player]:
+    return _word_index(words).players()
 
 
 def _extract_score_entries(words: Sequence[dict], x_range: Tuple[float, float]) -> List[ScoreEntry]:
-    start, stop = x_range
-    entries: List[ScoreEntry] = []
-    for word in words:
-        x0 = float(word["x0"])
-        if not (start <= x0 <= stop):
-            continue
-        raw = word["text"].strip().replace("−", "-")
-        if not raw:
-            continue
-        score_text, _ = _split_score_and_label(raw)
-        target = score_text or _strip_draw_prefix(raw)
-        if not target:
-            continue
-        if not score_text and re.search(r"[A-Za-zÅÄÖåäö]", target):
-            continue
-        m = re.fullmatch(r"-?\d+(?:\s*,\s*-?\d+)+", target)
-        if not m:
-            continue
-        nums = [int(tok) for tok in re.findall(r"-?\d+", m.group(0))]
-        if not nums:
-            continue
-        entries.append(ScoreEntry(scores=tuple(nums), center=_to_center(word), x=x0))
-    entries.sort(key=lambda e: e.center)
-    return entries
+    return _word_index(words).score_entries(x_range)
 
 
 def _extract_winner_entries(words: Sequence[dict], x_range: Tuple[float, float]) -> List[WinnerEntry]:
-    start, stop = x_range
-    winners: List[WinnerEntry] = []
-    for word in words:
-        x0 = float(word["x0"])
-        if not (start <= x0 <= stop):
-            continue
-        text = word["text"].replace(" ", " ").strip()
-        _score_text, text = _split_score_and_label(text)
-        if not text:
-            continue
-        wo_prefix = re.match(r"^wo\s+(.+)$", text, flags=re.IGNORECASE)
-        if wo_prefix:
-            candidate = wo_prefix.group(1).strip()
-            if candidate and re.search(r"[A-Za-zÅÄÖåäö]", candidate):
-                text = candidate
-        if any(
-            token in text
-            for token in (
-                "Slutspel",
-                "Höstpool",
-                "program",
-                "Kvalifikation",
-                "Kvalificering",
-                "Qualification",
-                "Qualifying",
-                # Qual headers handled elsewhere
-                "Vinderen",
-                "Mesterskaberne",
-                "Senior Elite",
-            )
-        ):
-            continue
-        normalized_text = text.lower()
-        if any(instr in normalized_text for instr in WINNER_INSTRUCTION_PHRASES):
-            continue
-        m = WINNER_LABEL_PATTERN.match(text)
-        if not m:
-            alt = re.match(r"^(\d{1,3})\s+([\wÅÄÖåäö.\-]+)$", text)
-            if not alt:
-                continue
-            m = alt
-        player_id_ext, label = m.groups()
-        if any(ch.isdigit() for ch in label):
-            continue
-        label = unicodedata.normalize('NFC', label.strip())
-        is_double_wo = _is_double_wo_label(label)
-        if " " not in label and not player_id_ext and not is_double_wo:
-            continue
-        winners.append(
-            WinnerEntry(
-                short=label,
-                center=_to_center(word),
-                x=x0,
-                player_id_ext=player_id_ext,
-                is_double_wo=is_double_wo,
-            )
-        )
-    winners.sort(key=lambda w: w.center)
-    return winners
+    return _word_index(words).winner_entries(x_range)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_label(short: str) -> Tuple[str, str]:
+    """(NFC label, normalized key); winner matching normalizes the same labels over and over."""
+    short = unicodedata.normalize('NFC', short)
+    return short, normalize_key(short, preserve_diacritics=True, preserve_nordic=True)
 
 
 def _match_short_to_full(
@@ -1402,8 +1498,7 @@ def _match_short_to_full(
     players: Sequence[Player],
     player_id_ext: Optional[str] = None,
 ) -> Player:
-    short = unicodedata.normalize('NFC', short)
-    normalized = normalize_key(short, preserve_diacritics=True, preserve_nordic=True)
+    short, normalized = _normalize_label(short)
     if not normalized.strip():
         raise ValueError(f"Empty label {short!r}")
 
@@ -1572,81 +1667,118 @@ def _assign_nearest_winner(
     return pool.pop(best_index)
 
 
-def _pop_matching_winner(
-    center: float,
-    participants: Sequence[Player],
-    pool: List[WinnerEntry],
-    tolerance: float,
-) -> Optional[WinnerEntry]:
-    best_idx: Optional[int] = None
-    best_delta: Optional[float] = None
-    best_x: Optional[float] = None
-    for idx, entry in enumerate(pool):
-        try:
-            matched = _match_short_to_full(
-                entry.short,
-                entry.center,
-                participants,
-                entry.player_id_ext,
-            )
-        except ValueError:
-            continue
-        if matched not in participants:
-            continue
-        delta = abs(entry.center - center)
-        if best_delta is None or delta < best_delta:
-            best_delta = delta
-            best_idx = idx
-            best_x = entry.x
-        elif best_delta is not None and delta == best_delta:
-            if best_x is None or entry.x > best_x:
-                best_idx = idx
-                best_x = entry.x
-    if best_idx is not None:
-        return pool.pop(best_idx)
-    return _assign_nearest_winner(center, pool, tolerance)
-
-
-def _pop_matching_winner_strict(
-    center: float,
-    participants: Sequence[Player],
-    pool: List[WinnerEntry],
-    tolerance: float,
-) -> Optional[WinnerEntry]:
+class _CenterPool:
     """
-    Variant of _pop_matching_winner that only returns labels that match participants.
+    Score entries or winner labels not yet assigned in a round, for nearest-by-center lookups.
 
-    If no matching label is found, we leave the pool untouched so later matches
-    can still use the remaining winner entries (useful when brackets have many
-    BYEs or missing underlined labels).
+    Centers are sorted once; a lookup starts at searchsorted(center) and walks outwards in
+    order of distance, stopping once nothing closer (or within tolerance) can follow.
+    Taken entries are only flagged; remaining() returns the rest in the original order.
+    Picks are the same as the list helpers (_pop_score_aligned, _assign_nearest_score,
+    _assign_nearest_winner): closest first, then their tie-breaks, then list position.
     """
-    best_idx: Optional[int] = None
-    best_delta: Optional[float] = None
-    best_x: Optional[float] = None
-    for idx, entry in enumerate(pool):
-        try:
-            matched = _match_short_to_full(
-                entry.short,
-                entry.center,
-                participants,
-                entry.player_id_ext,
-            )
-        except ValueError:
-            continue
-        if matched not in participants:
-            continue
-        delta = abs(entry.center - center)
-        if best_delta is None or delta < best_delta:
-            best_delta = delta
-            best_idx = idx
-            best_x = entry.x
-        elif best_delta is not None and delta == best_delta:
-            if best_x is None or entry.x > best_x:
-                best_idx = idx
-                best_x = entry.x
-    if best_idx is not None:
-        return pool.pop(best_idx)
-    return None
+
+    def __init__(self, entries: Sequence):
+        self.entries = list(entries)
+        centers = np.array([entry.center for entry in self.entries], dtype=float)
+        self._order = np.argsort(centers, kind="stable")
+        self._centers = centers[self._order]
+        self._order_list = self._order.tolist()
+        self._centers_list = self._centers.tolist()
+        self._taken = [False] * len(self.entries)
+        self._left = len(self.entries)
+
+    def __len__(self) -> int:
+        return self._left
+
+    def remaining(self) -> List:
+        return [entry for entry, taken in zip(self.entries, self._taken) if not taken]
+
+    def take(self, pos: int):
+        self._taken[pos] = True
+        self._left -= 1
+        return self.entries[pos]
+
+    def nearest(
+        self,
+        center: float,
+        tiebreak: Optional[Callable] = None,
+        accept: Optional[Callable] = None,
+        tolerance: Optional[float] = None,
+    ) -> Optional[int]:
+        """Position of the untaken, accepted entry minimizing (|Δcenter|, tiebreak(entry), position)."""
+        centers = self._centers_list
+        right = int(np.searchsorted(self._centers, center, "left"))
+        left = right - 1
+        best_key = None
+        best_pos = None
+        while left >= 0 or right < len(centers):
+            d_left = abs(centers[left] - center) if left >= 0 else float("inf")
+            d_right = abs(centers[right] - center) if right < len(centers) else float("inf")
+            if d_left <= d_right:
+                i, delta = left, d_left
+                left -= 1
+            else:
+                i, delta = right, d_right
+                right += 1
+            if (tolerance is not None and delta > tolerance) or (best_key is not None and delta > best_key[0]):
+                break
+            pos = self._order_list[i]
+            if self._taken[pos]:
+                continue
+            entry = self.entries[pos]
+            if accept is not None and not accept(entry):
+                continue
+            key = (delta, tiebreak(entry) if tiebreak else 0, pos)
+            if best_key is None or key < best_key:
+                best_key = key
+                best_pos = pos
+        return best_pos
+
+    def pop_score(
+        self,
+        center: float,
+        tolerance: float,
+        *,
+        min_x: Optional[float] = None,
+        max_x: Optional[float] = None,
+        target_x: Optional[float] = None,
+    ) -> Optional[Tuple[int, ...]]:
+        """_pop_score_aligned (or _assign_nearest_score without x arguments) on the pool."""
+        pos = self.nearest(
+            center,
+            tiebreak=lambda e: (abs(e.x - target_x) if target_x is not None else 0.0, len(e.scores)),
+            accept=lambda e: (min_x is None or e.x >= min_x) and (max_x is None or e.x <= max_x),
+            tolerance=tolerance,
+        )
+        return self.take(pos).scores if pos is not None else None
+
+    def pop_winner(
+        self,
+        center: float,
+        participants: Sequence[Player],
+        tolerance: float,
+        *,
+        strict: bool = False,
+    ) -> Optional[WinnerEntry]:
+        """
+        Nearest label that matches one of the participants (right-most on ties); otherwise,
+        unless strict, the nearest label within tolerance. If strict and nothing matches, the
+        pool is left untouched so later matches can still use the remaining labels (useful
+        when brackets have many BYEs or missing underlined labels).
+        """
+
+        def matches_participant(entry: WinnerEntry) -> bool:
+            try:
+                matched = _match_short_to_full(entry.short, entry.center, participants, entry.player_id_ext)
+            except ValueError:
+                return False
+            return matched in participants
+
+        pos = self.nearest(center, tiebreak=lambda e: -e.x, accept=matches_participant)
+        if pos is None and not strict:
+            pos = self.nearest(center, tiebreak=lambda e: -e.x, tolerance=tolerance)
+        return self.take(pos) if pos is not None else None
 
 
 def _build_first_round(
@@ -1657,7 +1789,7 @@ def _build_first_round(
     tree_size: int,
 ) -> Tuple[List[Match], List[ScoreEntry]]:
     score_min, score_max = score_window
-    remaining_scores = list(scores)
+    score_pool = _CenterPool(scores)
     matches: List[Match] = []
 
     sorted_players = sorted(players, key=lambda p: p.center)
@@ -1823,8 +1955,7 @@ def _build_first_round(
             target_x = None
             if score_min is not None and score_max is not None:
                 target_x = (score_min + score_max) / 2.0
-            match_scores = _pop_score_aligned(
-                remaining_scores,
+            match_scores = score_pool.pop_score(
                 winner_entry.center,
                 tolerance=30.0,
                 min_x=score_min,
@@ -1832,11 +1963,7 @@ def _build_first_round(
                 target_x=target_x,
             )
             if match_scores is None:
-                match_scores = _assign_nearest_score(
-                    winner_entry.center,
-                    remaining_scores,
-                    tolerance=30.0,
-                )
+                match_scores = score_pool.pop_score(winner_entry.center, tolerance=30.0)
 
         matches.append(
             Match(
@@ -1848,7 +1975,7 @@ def _build_first_round(
         )
 
     matches.sort(key=lambda m: m.center)
-    return matches, remaining_scores
+    return matches, score_pool.remaining()
 
 
 def _build_next_round(
@@ -1862,8 +1989,8 @@ def _build_next_round(
     strict_participant_matching: bool = False,
 ) -> Tuple[List[Match], List[WinnerEntry], List[ScoreEntry]]:
     score_min, score_max = score_window
-    remaining_scores = list(scores)
-    remaining_winners = sorted(winners, key=lambda w: w.center)
+    score_pool = _CenterPool(scores)
+    winner_pool = _CenterPool(sorted(winners, key=lambda w: w.center))
     matches: List[Match] = []
 
     ordered_prev = sorted(previous_round, key=lambda m: m.center)
@@ -1906,12 +2033,11 @@ def _build_next_round(
         center = sum(centers) / len(centers) if centers else participants[0].center
 
         if strict_participant_matching:
-            winner_entry = _pop_matching_winner_strict(center, participants, remaining_winners, winner_tolerance)
+            winner_entry = winner_pool.pop_winner(center, participants, winner_tolerance, strict=True)
         else:
-            winner_entry = _pop_matching_winner(center, participants, remaining_winners, winner_tolerance)
-            if winner_entry is None and remaining_winners:
-                winner_entry = min(remaining_winners, key=lambda w: abs(w.center - center))
-                remaining_winners.remove(winner_entry)
+            winner_entry = winner_pool.pop_winner(center, participants, winner_tolerance)
+            if winner_entry is None and winner_pool:
+                winner_entry = winner_pool.take(winner_pool.nearest(center))
 
         winner: Optional[Player] = None
         if winner_entry is not None:
@@ -1947,8 +2073,7 @@ def _build_next_round(
         if winner is None and participants and (winner_entry is None or not winner_entry.short.strip()):
             winner = participants[0]
 
-        match_scores = _pop_score_aligned(
-            remaining_scores,
+        match_scores = score_pool.pop_score(
             center,
             score_tolerance,
             min_x=score_min,
@@ -1956,12 +2081,12 @@ def _build_next_round(
             target_x=(score_min + score_max) / 2.0 if score_min is not None and score_max is not None else None,
         )
         if match_scores is None:
-            match_scores = _assign_nearest_score(center, remaining_scores, tolerance=score_tolerance)
+            match_scores = score_pool.pop_score(center, score_tolerance)
 
         matches.append(Match(players=participants, winner=winner, scores=match_scores, center=center))
 
     matches.sort(key=lambda m: m.center)
-    return matches, remaining_winners, remaining_scores
+    return matches, winner_pool.remaining(), score_pool.remaining()
 
 
 def _fill_missing_winners(previous_round: Sequence[Match], next_round: Sequence[Match]) -> None:
@@ -2195,13 +2320,12 @@ def _reassign_scores_small_bracket(
     """
     if tree_size > 16 and len(scores) > 32:
         return
-    pool = list(scores)
-    pool.sort(key=lambda s: s.center)
+    pool = _CenterPool(sorted(scores, key=lambda s: s.center))
     for matches in rounds:
         for match in matches:
             if getattr(match, "walkover", False) or len(match.players) != 2:
                 continue
-            assigned = _assign_nearest_score(match.center, pool, tolerance=tolerance)
+            assigned = pool.pop_score(match.center, tolerance)
             if assigned is not None:
                 match.scores = assigned
 
@@ -2,8 +2,6 @@
 
 from db import get_conn
 
-from scrapers.scrape_leagues_profixio                           import scrape_all_league_data_profixio
-
 def upd_league_data(
         run_id,
         do_scrape_all_league_data_profixio = False
@@ -20,6 +18,7 @@ def upd_league_data(
             # Scrape and resolve the tournament list before doing any downstream work.
             try:
                 # Refresh the tournament catalog from OnData.
+                from scrapers.scrape_leagues_profixio import scrape_all_league_data_profixio
                 scrape_all_league_data_profixio(cursor, run_id=run_id)
             except Exception as e:
                 print(f"Error in do_scrape_leagues: {e}")
@@ -0,0 +1,386 @@
+import logging
+
+from utils import OperationLogger
+
+# ────────────────────────────────────────────────────────────────────────────
+# Materialized player caches (plyr_profile_cache, plyr_match_history_cache, player_h2h)
+#
+# The v_plyr_profile / v_plyr_match_history views are thin wrappers over the first
+# two tables; player_h2h holds head-to-head stats per ordered player pair. Triggers (db.create_triggers) mark affected players in plyr_cache_dirty
+# whenever resolvers touch match/game/license/ranking/... rows; this module only
+# recomputes rows for those players.
+#
+# Not tracked by triggers: renames of tournaments, classes, stages, clubs and
+# ranking groups. Run refresh_player_caches(cursor, full=True) after such edits.
+# ────────────────────────────────────────────────────────────────────────────
+
+TMP_IDS = "tmp_plyr_cache_ids"
+
+PROFILE_SQL = '''
+    INSERT INTO plyr_profile_cache (
+        player_id, player_name, year_born, is_verified, id_exts, id_ext_count,
+        recent_club, recent_tournament_class, ranking_groups, ranking_points, recent_transition
+    )
+    WITH recent_license AS (
+        SELECT pl.player_id,
+            c.shortname || ' (' || s.label || ')' AS club_with_season,
+            ROW_NUMBER() OVER (PARTITION BY pl.player_id ORDER BY s.start_date DESC) AS rn
+        FROM player_license pl
+        JOIN season s ON pl.season_id = s.season_id
+        JOIN club c ON pl.club_id = c.club_id
+        WHERE 1 = 1 {filter_pl}
+    ),
+    recent_tournament AS (
+        SELECT tcp.player_id,
+            t.shortname AS tournament_name,
+            tc.shortname AS class_shortname,
+            tc.startdate AS class_startdate,
+            ROW_NUMBER() OVER (PARTITION BY tcp.player_id ORDER BY tc.startdate DESC) AS rn
+        FROM tournament_class_player tcp
+        JOIN tournament_class_entry tce
+            ON tcp.tournament_class_entry_id = tce.tournament_class_entry_id
+        JOIN tournament_class tc
+            ON tce.tournament_class_id = tc.tournament_class_id
+        JOIN tournament t
+            ON tc.tournament_id = t.tournament_id
+        WHERE 1 = 1 {filter_tcp}
+    ),
+    recent_transition AS (
+        SELECT pt.player_id,
+            cf.shortname || ' → ' || ct.shortname || ' (' || s.label || ')' AS transition_text,
+            ROW_NUMBER() OVER (PARTITION BY pt.player_id ORDER BY s.start_date DESC) AS rn
+        FROM player_transition pt
+        JOIN club cf ON pt.club_id_from = cf.club_id
+        JOIN club ct ON pt.club_id_to = ct.club_id
+        JOIN season s ON pt.season_id = s.season_id
+        WHERE 1 = 1 {filter_pt}
+    ),
+    id_exts AS (
+        SELECT pie.player_id,
+            GROUP_CONCAT(pie.player_id_ext) AS id_ext_list,
+            COUNT(*) AS id_ext_count
+        FROM player_id_ext pie
+        WHERE 1 = 1 {filter_pie}
+        GROUP BY pie.player_id
+    ),
+    ranking_groups AS (
+        SELECT prg.player_id,
+            GROUP_CONCAT(rg.class_short, ', ') AS ranking_groups
+        FROM player_ranking_group prg
+        JOIN ranking_group rg ON prg.ranking_group_id = rg.ranking_group_id
+        WHERE 1 = 1 {filter_prg}
+        GROUP BY prg.player_id
+    ),
+    -- Latest run per ext from player_ranking_history (one row per ext, not the full ranking history)
+    recent_ranking_points AS (
+        SELECT
+            pie.player_id,
+            prh.last_points AS points,
+            prh.last_run_date AS run_date,
+            ROW_NUMBER() OVER (PARTITION BY pie.player_id ORDER BY prh.last_run_date DESC, prh.last_points DESC) AS rn
+        FROM player_id_ext pie
+        JOIN player_ranking_history prh
+            ON prh.player_id_ext = pie.player_id_ext
+        WHERE 1 = 1 {filter_pie}
+    )
+    SELECT
+        p.player_id,
+        CASE
+            WHEN p.is_verified = 1 THEN p.firstname || ' ' || p.lastname
+            ELSE p.fullname_raw
+        END AS player_name,
+        p.year_born,
+        p.is_verified,
+        COALESCE(id_exts.id_ext_list, '') AS id_exts,
+        COALESCE(id_exts.id_ext_count, 0) AS id_ext_count,
+        rl.club_with_season AS recent_club,
+        rt.tournament_name || ' - ' || rt.class_shortname || ' (' || rt.class_startdate || ')' AS recent_tournament_class,
+        COALESCE(rg.ranking_groups, '') AS ranking_groups,
+        CASE
+            WHEN rpp.points IS NOT NULL
+            THEN rpp.points || ' (' || rpp.run_date || ')'
+            ELSE ''
+        END AS ranking_points,
+        tr.transition_text AS recent_transition
+    FROM player p
+    LEFT JOIN id_exts
+        ON p.player_id = id_exts.player_id
+    LEFT JOIN recent_license rl
+        ON p.player_id = rl.player_id AND rl.rn = 1
+    LEFT JOIN recent_tournament rt
+        ON p.player_id = rt.player_id AND rt.rn = 1
+    LEFT JOIN ranking_groups rg
+        ON p.player_id = rg.player_id
+    LEFT JOIN recent_transition tr
+        ON p.player_id = tr.player_id AND tr.rn = 1
+    LEFT JOIN recent_ranking_points rpp
+        ON p.player_id = rpp.player_id AND rpp.rn = 1
+    WHERE 1 = 1 {filter_p}
+'''
+
+MATCH_HISTORY_SQL = '''
+    INSERT INTO plyr_match_history_cache (
+        player_id, match_id, player_side_no, tournament_id, tournament_shortname, tournament_startdate,
+        tournament_class_id, class_longname, class_date, stage_description, result,
+        opponent_name, opponent_player_id, opponent_club, player_club,
+        best_of, match_date, match_status, winner_side, walkover_side,
+        games_score, games_won_side1, games_won_side2, match_score_summary
+    )
+    WITH
+        player_side AS (
+            SELECT mp.match_id, mp.player_id, mp.side_no, mp.club_id
+            FROM match_player mp
+            WHERE 1 = 1 {filter_mp}
+        ),
+        game_summary AS (
+            SELECT
+                g.match_id,
+                GROUP_CONCAT(g.points_side1 || '-' || g.points_side2, ', ') AS games_score,
+                SUM(CASE WHEN g.points_side1 > g.points_side2 THEN 1 ELSE 0 END) AS games_won_side1,
+                SUM(CASE WHEN g.points_side2 > g.points_side1 THEN 1 ELSE 0 END) AS games_won_side2
+            FROM game g
+            WHERE 1 = 1 {filter_g}
+            GROUP BY g.match_id
+        )
+    SELECT
+        ps.player_id,
+        m.match_id,
+        ps.side_no,
+        t.tournament_id,
+        t.shortname,
+        t.startdate,
+        tc.tournament_class_id,
+        tc.longname,
+        tc.startdate,
+        tcs.description,
+        CASE
+            WHEN m.winner_side = ps.side_no THEN 'WIN'
+            WHEN m.winner_side IS NOT NULL AND m.winner_side != ps.side_no THEN 'LOSS'
+            ELSE NULL
+        END,
+        CASE
+            WHEN p_opp.is_verified = 1
+            THEN TRIM(p_opp.firstname || ' ' || p_opp.lastname)
+            ELSE TRIM(
+                CASE
+                    WHEN INSTR(p_opp.fullname_raw, ' ') > 0
+                    THEN SUBSTR(p_opp.fullname_raw, INSTR(p_opp.fullname_raw, ' ') + 1)
+                        || ' ' || SUBSTR(p_opp.fullname_raw, 1, INSTR(p_opp.fullname_raw, ' ') - 1)
+                    ELSE p_opp.fullname_raw
+                END
+            )
+        END,
+        p_opp.player_id,
+        c_opp.shortname,
+        c_player.shortname,
+        m.best_of,
+        m.date,
+        m.status,
+        m.winner_side,
+        m.walkover_side,
+        gs.games_score,
+        gs.games_won_side1,
+        gs.games_won_side2,
+        CASE
+            WHEN gs.games_won_side1 IS NOT NULL AND gs.games_won_side2 IS NOT NULL
+            THEN gs.games_won_side1 || '-' || gs.games_won_side2
+            ELSE NULL
+        END
+    FROM player_side ps
+    JOIN match m
+        ON m.match_id = ps.match_id
+    JOIN tournament_class_match tcm
+        ON tcm.match_id = m.match_id
+    JOIN tournament_class tc
+        ON tc.tournament_class_id = tcm.tournament_class_id
+    JOIN tournament t
+        ON t.tournament_id = tc.tournament_id
+    LEFT JOIN club c_player
+        ON c_player.club_id = ps.club_id
+    LEFT JOIN tournament_class_stage tcs
+        ON tcs.tournament_class_stage_id = tcm.tournament_class_stage_id
+    LEFT JOIN game_summary gs
+        ON gs.match_id = m.match_id
+    LEFT JOIN match_player mp_opp
+        ON mp_opp.match_id = m.match_id
+        AND mp_opp.side_no != ps.side_no
+        AND mp_opp.player_order = 1
+    LEFT JOIN player p_opp
+        ON p_opp.player_id = mp_opp.player_id
+    LEFT JOIN club c_opp
+        ON c_opp.club_id = mp_opp.club_id
+'''
+
+# One row per ordered pair (player_id_a < player_id_b) of opponents in completed, non-walkover
+# matches. Every opposing pair of a doubles match counts as a meeting too.
+H2H_SQL = '''
+    INSERT INTO player_h2h (
+        player_id_a, player_id_b, matches, wins_a, wins_b, sets_a, sets_b,
+        last_match_id, last_match_date, match_ids
+    )
+    WITH meetings AS (
+        SELECT
+            MIN(mp1.player_id, mp2.player_id)   AS player_id_a,
+            MAX(mp1.player_id, mp2.player_id)   AS player_id_b,
+            CASE WHEN mp1.player_id < mp2.player_id THEN mp1.side_no ELSE mp2.side_no END AS side_a,
+            m.match_id,
+            m.winner_side,
+            COALESCE(m.date, (
+                SELECT MIN(tc.startdate)
+                FROM tournament_class_match tcm
+                JOIN tournament_class tc ON tc.tournament_class_id = tcm.tournament_class_id
+                WHERE tcm.match_id = m.match_id
+            )) AS match_date
+        FROM match_player mp1
+        JOIN match_player mp2
+            ON mp2.match_id = mp1.match_id
+            AND mp2.side_no > mp1.side_no
+            AND mp2.player_id != mp1.player_id
+        JOIN match m
+            ON m.match_id = mp1.match_id
+        WHERE m.status = 'completed' AND m.walkover_side IS NULL {filter_h2h}
+    ),
+    sets AS (
+        SELECT
+            g.match_id,
+            SUM(CASE WHEN g.points_side1 > g.points_side2 THEN 1 ELSE 0 END) AS sets_side1,
+            SUM(CASE WHEN g.points_side2 > g.points_side1 THEN 1 ELSE 0 END) AS sets_side2
+        FROM game g
+        WHERE g.match_id IN (SELECT match_id FROM meetings)
+        GROUP BY g.match_id
+    ),
+    ordered AS (
+        SELECT
+            mt.*,
+            CASE mt.side_a WHEN 1 THEN COALESCE(s.sets_side1, 0) ELSE COALESCE(s.sets_side2, 0) END AS sets_a,
+            CASE mt.side_a WHEN 1 THEN COALESCE(s.sets_side2, 0) ELSE COALESCE(s.sets_side1, 0) END AS sets_b,
+            ROW_NUMBER() OVER (
+                PARTITION BY mt.player_id_a, mt.player_id_b
+                ORDER BY mt.match_date DESC, mt.match_id DESC
+            ) AS rn
+        FROM meetings mt
+        LEFT JOIN sets s ON s.match_id = mt.match_id
+        ORDER BY mt.player_id_a, mt.player_id_b, rn
+    )
+    SELECT
+        player_id_a,
+        player_id_b,
+        COUNT(*),
+        SUM(CASE WHEN winner_side = side_a THEN 1 ELSE 0 END),
+        SUM(CASE WHEN winner_side = 3 - side_a THEN 1 ELSE 0 END),
+        SUM(sets_a),
+        SUM(sets_b),
+        MAX(CASE WHEN rn = 1 THEN match_id END),
+        MAX(CASE WHEN rn = 1 THEN match_date END),
+        GROUP_CONCAT(match_id)
+    FROM ordered
+    GROUP BY player_id_a, player_id_b
+'''
+
+
+def refresh_player_caches(cursor, run_id=None, full: bool = False):
+    """
+    Refresh plyr_profile_cache, plyr_match_history_cache and player_h2h.
+      - Incremental (default): recompute rows for players in plyr_cache_dirty.
+      - Full: rebuild all caches from scratch (also used when the caches are empty).
+    Dirty markers are cleared together with the refresh. The refresh runs in a savepoint: on
+    error only its own changes are rolled back, and the caller owns (and commits) the transaction.
+    """
+    logger = OperationLogger(
+        verbosity       = 2,
+        print_output    = False,
+        log_to_db       = True,
+        cursor          = cursor,
+        object_type     = "player_cache",
+        run_type        = "refresh",
+        run_id          = run_id
+    )
+
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM plyr_profile_cache)")
+    if not cursor.fetchone()[0]:
+        full = True
+
+    if full:
+        logger.info("Rebuilding player caches (full)...")
+    else:
+        cursor.execute("SELECT COUNT(*) FROM plyr_cache_dirty")
+        n_dirty = cursor.fetchone()[0]
+        if n_dirty == 0:
+            logger.info("Player caches up to date, nothing to refresh")
+            logger.summarize()
+            return
+        logger.info(f"Refreshing player caches for {n_dirty:,} dirty players...")
+
+    cursor.execute("SAVEPOINT player_caches")
+    try:
+        n_players = _refresh_full(cursor) if full else _refresh_dirty(cursor)
+        cursor.execute("RELEASE player_caches")
+
+    except Exception as e:
+        cursor.execute("ROLLBACK TO player_caches")
+        cursor.execute("RELEASE player_caches")
+        logging.error(f"Error in refresh_player_caches: {e}")
+        print(f"❌ Error refreshing player caches: {e}")
+        return
+
+    logger.info(f"Player caches refreshed for {n_players:,} players ({'full' if full else 'incremental'})")
+    logger.summarize()
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ────────────────────────────────────────────────────────────────────────────
+
+def _filters(incremental: bool) -> dict:
+    """Per-CTE player filters; empty strings for a full rebuild."""
+    if not incremental:
+        return {k: "" for k in ("filter_pl", "filter_tcp", "filter_pt", "filter_pie", "filter_prg", "filter_p", "filter_mp", "filter_g", "filter_h2h")}
+    in_ids = f"IN (SELECT player_id FROM {TMP_IDS})"
+    return {
+        "filter_pl":    f"AND pl.player_id {in_ids}",
+        "filter_tcp":   f"AND tcp.player_id {in_ids}",
+        "filter_pt":    f"AND pt.player_id {in_ids}",
+        "filter_pie":   f"AND pie.player_id {in_ids}",
+        "filter_prg":   f"AND prg.player_id {in_ids}",
+        "filter_p":     f"AND p.player_id {in_ids}",
+        "filter_mp":    f"AND mp.player_id {in_ids}",
+        # Only summarize games of matches the dirty players took part in
+        "filter_g":     f"AND g.match_id IN (SELECT match_id FROM match_player WHERE player_id {in_ids})",
+        # All meetings of every pair that involves a dirty player
+        "filter_h2h":   f"AND (mp1.player_id {in_ids} OR mp2.player_id {in_ids})",
+    }
+
+def _refresh_full(cursor) -> int:
+    cursor.execute("DELETE FROM plyr_profile_cache")
+    cursor.execute("DELETE FROM plyr_match_history_cache")
+    cursor.execute("DELETE FROM player_h2h")
+    cursor.execute("DELETE FROM plyr_cache_dirty")
+    f = _filters(incremental=False)
+    cursor.execute(PROFILE_SQL.format(**f))
+    n_players = cursor.rowcount
+    cursor.execute(MATCH_HISTORY_SQL.format(**f))
+    cursor.execute(H2H_SQL.format(**f))
+    return n_players
+
+def _refresh_dirty(cursor) -> int:
+    cursor.execute(f"DROP TABLE IF EXISTS temp.{TMP_IDS}")
+    cursor.execute(f"CREATE TEMP TABLE {TMP_IDS} (player_id INTEGER PRIMARY KEY)")
+    cursor.execute(f"INSERT INTO {TMP_IDS} (player_id) SELECT player_id FROM plyr_cache_dirty")
+    n_players = cursor.rowcount
+
+    cursor.execute(f"DELETE FROM plyr_profile_cache WHERE player_id IN (SELECT player_id FROM {TMP_IDS})")
+    cursor.execute(f"DELETE FROM plyr_match_history_cache WHERE player_id IN (SELECT player_id FROM {TMP_IDS})")
+    cursor.execute(f"""
+        DELETE FROM player_h2h
+        WHERE player_id_a IN (SELECT player_id FROM {TMP_IDS})
+           OR player_id_b IN (SELECT player_id FROM {TMP_IDS})
+    """)
+
+    f = _filters(incremental=True)
+    cursor.execute(PROFILE_SQL.format(**f))
+    cursor.execute(MATCH_HISTORY_SQL.format(**f))
+    cursor.execute(H2H_SQL.format(**f))
+
+    cursor.execute(f"DELETE FROM plyr_cache_dirty WHERE player_id IN (SELECT player_id FROM {TMP_IDS})")
+    cursor.execute(f"DROP TABLE IF EXISTS temp.{TMP_IDS}")
+    return n_players
@@ -1,20 +1,23 @@
 # src/upd_player_data.py
 
 import logging
+from config                                     import RESOLVE_PLAYERS_FULL
 from db                                         import get_conn
 from resolvers.resolve_player_ranking_groups    import resolve_player_ranking_groups
 from resolvers.resolve_player_licenses          import resolve_player_licenses
 from resolvers.resolve_player_rankings          import resolve_player_rankings
 from resolvers.resolve_player_transitions       import resolve_player_transitions
-from scrapers.scrape_player_licenses            import scrape_player_licenses
-from scrapers.scrape_player_transitions         import scrape_player_transitions
-from scrapers.scrape_player_rankings            import scrape_player_rankings
 from upd_players_verified                       import upd_players_verified
+from upd_player_caches                          import refresh_player_caches
+from utils                                      import driver_pool
+
+# Scrapers (Selenium, BeautifulSoup) and the rating engine (numpy) are imported where they are used
 
 def upd_player_data (
         do_scrape_player_licenses     = False, 
         do_scrape_player_rankings     = False, 
         do_scrape_player_transitions  = False,
+        resolve_full                  = RESOLVE_PLAYERS_FULL,
         run_id                        = None
     ):
 
@@ -26,6 +29,7 @@ def upd_player_data (
         if do_scrape_player_licenses:
             try: 
 
+                from scrapers.scrape_player_licenses import scrape_player_licenses
                 scrape_player_licenses(cursor, run_id = run_id)
 
             except Exception as e:
@@ -36,6 +40,7 @@ def upd_player_data (
         if do_scrape_player_rankings:
             try:
 
+                from scrapers.scrape_player_rankings import scrape_player_rankings
                 scrape_player_rankings(cursor, run_id=run_id)
 
             except Exception as e:
@@ -46,6 +51,7 @@ def upd_player_data (
         if do_scrape_player_transitions:
             try:
                 
+                from scrapers.scrape_player_transitions import scrape_player_transitions
                 scrape_player_transitions(cursor, run_id=run_id)
 
             except Exception as e:
@@ -53,13 +59,20 @@ def upd_player_data (
                 print(f"Error in scrape_player_transitions: {e}")
                 pass
 
+        # The scrapers above share warm browsers; free them before resolving
+        driver_pool.close()
+
         # Resolving
         try:
             upd_players_verified(cursor, run_id=run_id)
-            resolve_player_rankings(cursor, run_id=run_id)
-            resolve_player_ranking_groups(cursor, run_id=run_id)
-            resolve_player_licenses(cursor, run_id=run_id)
-            resolve_player_transitions(cursor, run_id=run_id)
+            resolve_player_rankings(cursor, run_id=run_id, full=resolve_full)
+            resolve_player_ranking_groups(cursor, run_id=run_id, full=resolve_full)
+            resolve_player_licenses(cursor, run_id=run_id, full=resolve_full)
+            resolve_player_transitions(cursor, run_id=run_id, full=resolve_full)
+            refresh_player_caches(cursor, run_id=run_id)
+
+            from upd_player_ratings import upd_player_ratings
+            upd_player_ratings(cursor, run_id=run_id)
             pass
 
         except Exception as e:
@@ -0,0 +1,135 @@
+import logging
+
+import numpy as np
+
+from utils import OperationLogger
+from player_rating_engine import (
+    RatingState, apply_matches, checksum, history_rows, load_matches, to_day, to_dates,
+)
+
+# ────────────────────────────────────────────────────────────────────────────
+# Glicko-2 player ratings (player_rating, player_rating_history)
+#
+# Two modes:
+#   - Backfill (full=True, or no watermark yet): rate every singles match in date order
+#     from scratch and rewrite both tables.
+#   - Incremental (default): resume from player_rating and rate only matches dated after
+#     the watermark. If the matches rated up to the watermark changed since the last run
+#     (re-resolved classes, player merges, late-dated results), falls back to a backfill.
+# ────────────────────────────────────────────────────────────────────────────
+
+
+def upd_player_ratings(cursor, run_id=None, full: bool = False):
+    """
+    Update player ratings from resolved singles matches.
+    """
+    logger = OperationLogger(
+        verbosity       = 2,
+        print_output    = False,
+        log_to_db       = True,
+        cursor          = cursor,
+        object_type     = "player_rating",
+        run_type        = "update",
+        run_id          = run_id
+    )
+
+    try:
+        matches = load_matches(cursor.connection)
+
+        cursor.execute("SELECT last_date, match_count, checksum FROM player_rating_watermark WHERE id = 1")
+        watermark = cursor.fetchone()
+
+        if not full and watermark is None:
+            full = True
+
+        if not full:
+            last_day = to_day(watermark[0])
+            rated = matches["day"] <= last_day
+            if int(rated.sum()) != watermark[1] or checksum(matches, rated) != watermark[2]:
+                logger.warning("player_rating", "Matches before the watermark changed, recomputing full history")
+                full = True
+
+        if full:
+            logger.info(f"Backfilling ratings from {len(matches['day']):,} singles matches...")
+            n_players, n_matches = _backfill(cursor, matches)
+        else:
+            new = ~rated
+            if not new.any():
+                logger.info(f"Ratings up to date (watermark {watermark[0]})")
+                logger.summarize()
+                return
+            logger.info(f"Rating {int(new.sum()):,} matches after {watermark[0]}...")
+            n_players, n_matches = _apply_incremental(cursor, {k: v[new] for k, v in matches.items()})
+
+        _write_watermark(cursor, matches)
+        cursor.connection.commit()
+
+        logger.info(f"Ratings updated for {n_players:,} players from {n_matches:,} matches ({'backfill' if full else 'incremental'})")
+        logger.summarize()
+
+    except Exception as e:
+        logging.error(f"Error in upd_player_ratings: {e}")
+        print(f"❌ Error updating player ratings: {e}")
+        cursor.connection.rollback()
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ────────────────────────────────────────────────────────────────────────────
+
+def _backfill(cursor, matches) -> tuple:
+    state = RatingState()
+    history = apply_matches(state, matches)
+
+    cursor.execute("DELETE FROM player_rating_history")
+    cursor.execute("DELETE FROM player_rating")
+    cursor.executemany(
+        "INSERT INTO player_rating_history (player_id, date, rating, rd) VALUES (?, ?, ?, ?)",
+        history_rows(history)
+    )
+    cursor.executemany('''
+        INSERT INTO player_rating (player_id, rating, rd, volatility, matches, last_date)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', state.rows(np.arange(len(state.player_ids))))
+    return len(state.player_ids), len(matches["day"])
+
+
+def _apply_incremental(cursor, matches) -> tuple:
+    cursor.execute("SELECT player_id, rating, rd, volatility, matches, last_date FROM player_rating")
+    state = RatingState.from_rows(cursor.fetchall())
+    history = apply_matches(state, matches)
+
+    touched = np.unique(state.index(history["player_id"].astype(np.int64)))
+
+    cursor.executemany(
+        "INSERT OR REPLACE INTO player_rating_history (player_id, date, rating, rd) VALUES (?, ?, ?, ?)",
+        history_rows(history)
+    )
+    cursor.executemany('''
+        INSERT INTO player_rating (player_id, rating, rd, volatility, matches, last_date)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(player_id) DO UPDATE SET
+            rating      = excluded.rating,
+            rd          = excluded.rd,
+            volatility  = excluded.volatility,
+            matches     = excluded.matches,
+            last_date   = excluded.last_date,
+            row_updated = CURRENT_TIMESTAMP
+    ''', state.rows(touched))
+    return len(touched), len(matches["day"])
+
+
+def _write_watermark(cursor, matches) -> None:
+    if len(matches["day"]) == 0:
+        cursor.execute("DELETE FROM player_rating_watermark")
+        return
+    rated = np.ones(len(matches["day"]), dtype=bool)
+    cursor.execute('''
+        INSERT INTO player_rating_watermark (id, last_date, match_count, checksum)
+        VALUES (1, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            last_date   = excluded.last_date,
+            match_count = excluded.match_count,
+            checksum    = excluded.checksum,
+            row_updated = CURRENT_TIMESTAMP
+    ''', (to_dates(matches["day"][-1:])[0], int(rated.sum()), checksum(matches, rated)))
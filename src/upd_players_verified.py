@@ -66,7 +66,7 @@ def upd_players_verified(cursor, run_id=None):
         logger.info(f"Found {len(player_data):,} unique external players in license and ranking tables")
 
         # 2) merge manual groups
-        m_groups = _merge_manual_groups(cursor, logger, player_data)
+        m_groups = _merge_manual_groups(cursor, logger, player_data, run_id=run_id)
 
         # 3) insert remaining
         nondup_count = _insert_non_duplicates(cursor, logger, player_data)
@@ -100,14 +100,6 @@ def _pick_survivor(player_ids: Set[int]) -> int:
     """Deterministic survivor policy."""
     return min(player_ids)
 
-def _repoint_children(cursor, loser_id: int, survivor_id: int) -> int:
-    """Repoint all FK children from loser → survivor. Returns rows updated."""
-    total = 0
-    for table, col in DEPENDENT_TABLES:
-        cursor.execute(f"UPDATE {table} SET {col} = ? WHERE {col} = ?", (survivor_id, loser_id))
-        total += cursor.rowcount
-    return total
-
 def _print_player_summary(metrics: Dict[str, int]):
     print("\n📊 Operation Summary:")
     print(f"   👥 Manual groups total:          {metrics.get('groups_total', 0)}")
@@ -125,29 +117,198 @@ def _print_player_summary(metrics: Dict[str, int]):
     print(f"      • Appearances deleted:        {metrics.get('purged_appearances', 0)}")
     print()
 
-def _delete_player_if_orphan(cursor, player_id: int) -> bool:
+def _orphan_condition(alias: str = "p") -> str:
     """
-    Delete a player if:
-      - no ext rows
-      - no deps in the "real" dependent tables
-    If only unverified appearances exist, delete them together with the player.
-    Returns True if the player was deleted.
+    SQL condition: player has no ext rows and no deps in the "real" dependent tables
+    (unverified appearances do not count; they are deleted together with the player).
     """
-    # Any ext rows? Then keep the player
-    cursor.execute("SELECT COUNT(*) FROM player_id_ext WHERE player_id = ?", (player_id,))
-    if cursor.fetchone()[0] > 0:
-        return False
+    clauses = [f"NOT EXISTS (SELECT 1 FROM player_id_ext x WHERE x.player_id = {alias}.player_id)"]
+    for table, col in DEPENDENT_TABLES:
+        if table == "player_unverified_appearance":
+            continue
+        clauses.append(f"NOT EXISTS (SELECT 1 FROM {table} d WHERE d.{col} = {alias}.player_id)")
+    return "\n      AND ".join(clauses)
+
+def _table_columns(cursor, table: str) -> List[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+def _json_row_sql(cursor, table: str, alias: str) -> str:
+    """json_object(...) over all columns of table (plus rowid), for the merge log."""
+    cols = ["rowid"] + _table_columns(cursor, table)
+    return "json_object(" + ", ".join(f"'{c}', {alias}.{c}" for c in cols) + ")"
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Merge engine (set-based, reversible)
+# ────────────────────────────────────────────────────────────────────────────
+
+MERGE_TABLES = DEPENDENT_TABLES + [("player_id_ext", "player_id")]
+
+def merge_players(cursor, mapping: Dict[int, int], run_id=None) -> Dict[str, object]:
+    """
+    Merge players old → new in one pass:
+      - the mapping is loaded into a TEMP table and every dependent table is repointed
+        with a single UPDATE ... FROM
+      - rows that would violate a unique key on the survivor are logged as JSON and deleted
+      - losers left without references are deleted (their row is logged as JSON)
+    Everything is recorded in player_merge_log / player_merge_log_row under one batch_id,
+    so the batch can be reverted with undo_player_merges().
+    Chains (a → b, b → c) are flattened to a → c. Does not commit.
+    """
+    mapping = _flatten_mapping(mapping)
+    result = {"batch_id": None, "repointed": {}, "collisions": {}, "deleted_players": set()}
+    if not mapping:
+        return result
+
+    cursor.execute("SELECT COALESCE(MAX(batch_id), 0) + 1 FROM player_merge_log")
+    batch_id = cursor.fetchone()[0]
+    result["batch_id"] = batch_id
+
+    cursor.executemany(
+        "INSERT INTO player_merge_log (batch_id, run_id, old_player_id, new_player_id) VALUES (?, ?, ?, ?)",
+        [(batch_id, run_id, old, new) for old, new in sorted(mapping.items())]
+    )
+
+    cursor.execute("DROP TABLE IF EXISTS temp.tmp_player_merge_map")
+    cursor.execute("""
+        CREATE TEMP TABLE tmp_player_merge_map (
+            old_player_id   INTEGER PRIMARY KEY,
+            new_player_id   INTEGER NOT NULL,
+            merge_id        INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO tmp_player_merge_map (old_player_id, new_player_id, merge_id)
+        SELECT old_player_id, new_player_id, merge_id
+        FROM player_merge_log
+        WHERE batch_id = ?
+    """, (batch_id,))
+
+    for table, col in MERGE_TABLES:
+        # Log every row about to move, then move them (rows hitting a unique key stay behind)
+        cursor.execute(f"""
+            INSERT INTO player_merge_log_row (merge_id, table_name, row_id, action)
+            SELECT m.merge_id, ?, t.rowid, 'repointed'
+            FROM {table} t
+            JOIN tmp_player_merge_map m ON m.old_player_id = t.{col}
+        """, (table,))
+        cursor.execute(f"""
+            UPDATE OR IGNORE {table} SET {col} = m.new_player_id
+            FROM tmp_player_merge_map m
+            WHERE {table}.{col} = m.old_player_id
+        """)
+        result["repointed"][table] = cursor.rowcount
+
+        # Collisions: keep a JSON copy for undo, then delete
+        cursor.execute(f"""
+            UPDATE player_merge_log_row
+            SET action = 'deleted',
+                row_data = (SELECT {_json_row_sql(cursor, table, "t")} FROM {table} t WHERE t.rowid = player_merge_log_row.row_id)
+            WHERE table_name = ?
+              AND merge_id IN (SELECT merge_id FROM tmp_player_merge_map)
+              AND row_id IN (SELECT rowid FROM {table} WHERE {col} IN (SELECT old_player_id FROM tmp_player_merge_map))
+        """, (table,))
+        cursor.execute(f"DELETE FROM {table} WHERE {col} IN (SELECT old_player_id FROM tmp_player_merge_map)")
+        result["collisions"][table] = cursor.rowcount
+
+    # Delete losers that are now unreferenced
+    cursor.execute(f"""
+        UPDATE player_merge_log
+        SET player_row = (SELECT {_json_row_sql(cursor, "player", "p")} FROM player p WHERE p.player_id = player_merge_log.old_player_id)
+        WHERE batch_id = ?
+          AND old_player_id IN (SELECT p.player_id FROM tmp_player_merge_map m JOIN player p ON p.player_id = m.old_player_id
+                                WHERE {_orphan_condition("p")})
+    """, (batch_id,))
+    cursor.execute(
+        "SELECT old_player_id FROM player_merge_log WHERE batch_id = ? AND player_row IS NOT NULL",
+        (batch_id,)
+    )
+    result["deleted_players"] = {row[0] for row in cursor.fetchall()}
+    cursor.execute("""
+        DELETE FROM player
+        WHERE player_id IN (
+            SELECT old_player_id FROM player_merge_log WHERE batch_id = ? AND player_row IS NOT NULL
+        )
+    """, (batch_id,))
 
-    # Check other dependent tables EXCEPT unverified appearances
-    for table, col in [t for t in DEPENDENT_TABLES if t[0] != "player_unverified_appearance"]:
-        cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {col} = ?", (player_id,))
-        if cursor.fetchone()[0] > 0:
-            return False
+    cursor.execute("DROP TABLE IF EXISTS temp.tmp_player_merge_map")
+    return result
 
-    # At this point, only appearances may exist → delete them as well
-    cursor.execute("DELETE FROM player_unverified_appearance WHERE player_id = ?", (player_id,))
-    cursor.execute("DELETE FROM player WHERE player_id = ?", (player_id,))
-    return cursor.rowcount > 0
+def undo_player_merges(cursor, batch_id: int) -> int:
+    """
+    Revert one merge batch recorded by merge_players(): re-create deleted losers,
+    re-insert collided rows (same rowid) and point repointed rows back at the old player.
+    Returns the number of merges undone. Does not commit.
+    """
+    cursor.execute("""
+        SELECT COUNT(*) FROM player_merge_log
+        WHERE batch_id = ? AND undone_at IS NULL
+    """, (batch_id,))
+    n = cursor.fetchone()[0]
+    if not n:
+        return 0
+
+    # Later batches may have moved the same rows again; undo those first
+    cursor.execute("""
+        SELECT 1 FROM player_merge_log
+        WHERE batch_id > ? AND undone_at IS NULL
+        LIMIT 1
+    """, (batch_id,))
+    if cursor.fetchone():
+        raise ValueError(f"Cannot undo merge batch {batch_id}: later batches are still applied")
+
+    # 1) Deleted losers
+    cols = _table_columns(cursor, "player")
+    cursor.execute(f"""
+        INSERT INTO player ({", ".join(cols)})
+        SELECT {", ".join(f"json_extract(player_row, '$.{c}')" for c in cols)}
+        FROM player_merge_log
+        WHERE batch_id = ? AND player_row IS NOT NULL
+    """, (batch_id,))
+
+    for table, col in MERGE_TABLES:
+        # 2) Rows pointing at the survivor go back to the old player
+        cursor.execute(f"""
+            UPDATE {table} SET {col} = l.old_player_id
+            FROM player_merge_log_row r
+            JOIN player_merge_log l ON l.merge_id = r.merge_id
+            WHERE l.batch_id = ?
+              AND r.table_name = ?
+              AND r.action = 'repointed'
+              AND r.row_id = {table}.rowid
+              AND {table}.{col} = l.new_player_id
+        """, (batch_id, table))
+
+        # 3) Collided rows are re-inserted as they were
+        cols = ["rowid"] + _table_columns(cursor, table)
+        cursor.execute(f"""
+            INSERT INTO {table} ({", ".join(cols)})
+            SELECT {", ".join(f"json_extract(r.row_data, '$.{c}')" for c in cols)}
+            FROM player_merge_log_row r
+            JOIN player_merge_log l ON l.merge_id = r.merge_id
+            WHERE l.batch_id = ?
+              AND r.table_name = ?
+              AND r.action = 'deleted'
+        """, (batch_id, table))
+
+    cursor.execute("""
+        UPDATE player_merge_log SET undone_at = CURRENT_TIMESTAMP
+        WHERE batch_id = ? AND undone_at IS NULL
+    """, (batch_id,))
+    return n
+
+def _flatten_mapping(mapping: Dict[int, int]) -> Dict[int, int]:
+    """Resolve chains so every old id points at its final survivor; drops self-maps."""
+    flat = {}
+    for old in mapping:
+        new, seen = mapping[old], {old}
+        while new in mapping and new not in seen:
+            seen.add(new)
+            new = mapping[new]
+        if new != old:
+            flat[old] = new
+    return flat
 
 
 # ────────────────────────────────────────────────────────────────────────────
@@ -191,8 +352,11 @@ def _groups_from_manual() -> Dict[int, Set[int]]:
         groups.setdefault(can, set()).update(grp)
     return groups
 
-def _merge_manual_groups(cursor, logger: OperationLogger, player_data: Dict[int, Tuple[str, str, int]]) -> Dict[str, int]:
-    """Process manual groups with per-group savepoints. Returns metrics."""
+def _merge_manual_groups(cursor, logger: OperationLogger, player_data: Dict[int, Tuple[str, str, int]], run_id=None) -> Dict[str, int]:
+    """
+    Resolve manual groups to one survivor each, then merge all losers in one set-based pass
+    (merge_players). Groups sharing a player are merged together. Returns metrics.
+    """
     m = dict(
         groups_total=0, groups_skipped_no_data=0, groups_with_existing=0, groups_created_survivor=0,
         groups_merged=0, ext_aliases_added=0, ext_repointed=0, losers_total=0, losers_deleted=0, losers_kept_with_refs=0
@@ -202,34 +366,46 @@ def _merge_manual_groups(cursor, logger: OperationLogger, player_data: Dict[int,
     m["groups_total"] = len(groups)
     logger.info(f"Processing {m['groups_total']} manual duplicate group(s)")
 
-    for can_ext, all_exts in sorted(groups.items()):
-        cursor.execute("SAVEPOINT merge_group")
+    # Existing ext → player_id for every ext in any group (one query)
+    all_exts = sorted({str(e) for exts in groups.values() for e in exts})
+    cursor.execute("DROP TABLE IF EXISTS temp.tmp_merge_ext")
+    cursor.execute("CREATE TEMP TABLE tmp_merge_ext (player_id_ext TEXT PRIMARY KEY)")
+    cursor.executemany("INSERT INTO tmp_merge_ext (player_id_ext) VALUES (?)", [(e,) for e in all_exts])
+    cursor.execute("""
+        SELECT pie.player_id_ext, pie.player_id
+        FROM player_id_ext pie
+        JOIN tmp_merge_ext t ON t.player_id_ext = pie.player_id_ext
+        WHERE pie.data_source_id = ?
+    """, (DATA_SOURCE_ID,))
+    ext_player: Dict[str, int] = dict(cursor.fetchall())
+    cursor.execute("DROP TABLE IF EXISTS temp.tmp_merge_ext")
+
+    # Survivor per group; union groups that share players
+    parent: Dict[int, int] = {}
+
+    def find(pid: int) -> int:
+        while parent.setdefault(pid, pid) != pid:
+            parent[pid] = parent[parent[pid]]
+            pid = parent[pid]
+        return pid
+
+    merged_groups: List[Tuple[int, Set[int], int]] = []
+    for can_ext, exts in sorted(groups.items()):
 
         # Pick canonical tuple (prefer can_ext, else any ext in group)
         can_tuple = player_data.get(can_ext)
         if not can_tuple:
-            for e in sorted(all_exts):
+            for e in sorted(exts):
                 if e in player_data:
                     can_tuple = player_data[e]
                     break
         if not can_tuple:
             m["groups_skipped_no_data"] += 1
-            logger.failed({"canonical_ext": can_ext, "exts": sorted(all_exts)}, "No source data for group; skipping")
-            cursor.execute("RELEASE merge_group")
+            logger.failed({"canonical_ext": can_ext, "exts": sorted(exts)}, "No source data for group; skipping")
             continue
 
         fn, ln, yb = can_tuple
-
-        # Collect existing player_ids linked to this group
-        linked_ids: Set[int] = set()
-        for ext in all_exts:
-            cursor.execute(
-                "SELECT player_id FROM player_id_ext WHERE player_id_ext = ? AND data_source_id = ?",
-                (str(ext), DATA_SOURCE_ID)
-            )
-            row = cursor.fetchone()
-            if row:
-                linked_ids.add(row[0])
+        linked_ids = {ext_player[str(e)] for e in exts if str(e) in ext_player}
 
         # Decide/insert survivor
         if linked_ids:
@@ -247,59 +423,50 @@ def _merge_manual_groups(cursor, logger: OperationLogger, player_data: Dict[int,
                 survivor_id = res["player_id"]
                 logger.success(res["player"], res["reason"])
                 m["groups_created_survivor"] += 1
-            elif res["status"] == "skipped":
-                survivor_id = res.get("player_id")
-                if not survivor_id:
-                    m["groups_skipped_no_data"] += 1
-                    logger.failed({"player": f"{fn} {ln}"}, "Insert skipped without player_id; skipping group")
-                    cursor.execute("RELEASE merge_group")
-                    continue
+            elif res["status"] == "skipped" and res.get("player_id"):
+                survivor_id = res["player_id"]
             else:
                 m["groups_skipped_no_data"] += 1
-                logger.failed(res["player"], res["reason"])
-                cursor.execute("ROLLBACK TO merge_group")
-                cursor.execute("RELEASE merge_group")
+                logger.failed(res.get("player", {"player": f"{fn} {ln}"}), res.get("reason", "Insert skipped without player_id; skipping group"))
                 continue
+            ext_player[str(can_ext)] = survivor_id
+
+        for pid in linked_ids:
+            a, b = find(pid), find(survivor_id)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+        find(survivor_id)
+        merged_groups.append((can_ext, exts, survivor_id))
+        m["groups_merged"] += 1
 
-        # Repoint/add ext_ids
-        loser_ids: Set[int] = set()
-        for ext in all_exts:
-            cursor.execute(
-                "SELECT player_id FROM player_id_ext WHERE player_id_ext = ? AND data_source_id = ?",
-                (str(ext), DATA_SOURCE_ID)
-            )
-            row = cursor.fetchone()
-            if row:
-                old_id = row[0]
-                if old_id != survivor_id:
-                    loser_ids.add(old_id)
-                    cursor.execute("""
-                        UPDATE player_id_ext SET player_id = ?
-                        WHERE player_id_ext = ? AND data_source_id = ?
-                    """, (survivor_id, str(ext), DATA_SOURCE_ID))
-                    m["ext_repointed"] += 1
+    mapping = {pid: find(pid) for pid in list(parent) if find(pid) != pid}
+
+    # Add missing ext aliases to the (final) survivor
+    aliases = [
+        (find(survivor_id), str(ext), DATA_SOURCE_ID)
+        for _, exts, survivor_id in merged_groups
+        for ext in sorted(exts) if str(ext) not in ext_player
+    ]
+    cursor.executemany("INSERT INTO player_id_ext (player_id, player_id_ext, data_source_id) VALUES (?, ?, ?)", aliases)
+    for survivor, ext, _ in aliases:
+        logger.success({"ext": ext, "survivor": survivor}, "Added player_id_ext alias")
+    m["ext_aliases_added"] = len(aliases)
+
+    # Repoint children and try deleting losers (set-based)
+    if mapping:
+        result = merge_players(cursor, mapping, run_id=run_id)
+        m["losers_total"] = len(mapping)
+        m["ext_repointed"] = result["repointed"].get("player_id_ext", 0)
+        m["losers_deleted"] = len(result["deleted_players"])
+        m["losers_kept_with_refs"] = len(mapping) - len(result["deleted_players"])
+        for loser, survivor in sorted(mapping.items()):
+            if loser in result["deleted_players"]:
+                logger.info({"loser": loser, "survivor": survivor}, "Deleted merged loser")
             else:
-                cursor.execute("""
-                    INSERT INTO player_id_ext (player_id, player_id_ext, data_source_id)
-                    VALUES (?, ?, ?)
-                """, (survivor_id, str(ext), DATA_SOURCE_ID))
-                m["ext_aliases_added"] += 1
-                logger.success({"ext": ext, "survivor": survivor_id}, "Added player_id_ext alias")
-
-        # Repoint children and try deleting losers
-        if loser_ids:
-            m["losers_total"] += len(loser_ids)
-            for loser in sorted(loser_ids):
-                _repoint_children(cursor, loser, survivor_id)
-                if _delete_player_if_orphan(cursor, loser):
-                    m["losers_deleted"] += 1
-                    logger.info({"loser": loser, "survivor": survivor_id}, "Deleted merged loser")
-                else:
-                    m["losers_kept_with_refs"] += 1
-                    logger.warning({"loser": loser}, "Loser still has references; not deleting")
-
-        m["groups_merged"] += 1
-        cursor.execute("RELEASE merge_group")
+                logger.warning({"loser": loser}, "Loser still has references; not deleting")
+        for table, n in result["collisions"].items():
+            if n:
+                logger.warning({"table": table, "rows": n}, "Merge collisions: duplicate rows of losers deleted (logged for undo)")
 
     return m
 
@@ -329,20 +496,19 @@ def _purge_unverified_orphans(cursor, logger: OperationLogger) -> int:
     Also deletes any unverified_appearance rows tied to them.
     Returns the number of players deleted.
     """
-    cursor.execute("SELECT player_id FROM player WHERE is_verified = 0")
-    candidate_ids = [row[0] for row in cursor.fetchall()]
-
-    purged_players = 0
-    purged_appearances = 0
-
-    for pid in candidate_ids:
-        # Count appearances before attempting delete
-        cursor.execute("SELECT COUNT(*) FROM player_unverified_appearance WHERE player_id = ?", (pid,))
-        app_count = cursor.fetchone()[0]
-
-        if _delete_player_if_orphan(cursor, pid):
-            purged_players += 1
-            purged_appearances += app_count
+    cursor.execute("DROP TABLE IF EXISTS temp.tmp_orphan_players")
+    cursor.execute(f"""
+        CREATE TEMP TABLE tmp_orphan_players AS
+        SELECT p.player_id
+        FROM player p
+        WHERE p.is_verified = 0
+          AND {_orphan_condition("p")}
+    """)
+    cursor.execute("DELETE FROM player_unverified_appearance WHERE player_id IN (SELECT player_id FROM tmp_orphan_players)")
+    purged_appearances = cursor.rowcount
+    cursor.execute("DELETE FROM player WHERE player_id IN (SELECT player_id FROM tmp_orphan_players)")
+    purged_players = cursor.rowcount
+    cursor.execute("DROP TABLE IF EXISTS temp.tmp_orphan_players")
 
     if purged_players:
         logger.info(
@@ -2,17 +2,15 @@
 
 from db import get_conn
 
-from scrapers.scrape_tournaments_ondata_listed                  import scrape_tournaments_ondata_listed
-from scrapers.scrape_tournament_classes_ondata                  import scrape_tournament_classes_ondata
-from scrapers.scrape_tournament_class_entries_ondata            import scrape_tournament_class_entries_ondata
-from scrapers.scrape_tournament_class_group_matches_ondata      import scrape_tournament_class_group_matches_ondata
-from scrapers.scrape_tournament_class_knockout_matches_ondata   import scrape_tournament_class_knockout_matches_ondata
-
+# Scrapers (Selenium, pdfplumber, BeautifulSoup) and the rating engine (numpy) are imported
+# where they are used, so runs with every do_scrape_* flag off start without them.
 from resolvers.resolve_tournaments                              import resolve_tournaments
 from resolvers.resolve_tournament_classes                       import resolve_tournament_classes
 from resolvers.resolve_tournament_class_entries                 import resolve_tournament_class_entries
 from resolvers.resolve_tournament_class_matches                 import resolve_tournament_class_matches
 
+from upd_player_caches                                          import refresh_player_caches
+
 
 def upd_tournament_data(
         run_id,
@@ -38,6 +36,7 @@ def upd_tournament_data(
             # Scrape and resolve the tournament list before doing any downstream work.
             try:
                 # Refresh the tournament catalog from OnData.
+                from scrapers.scrape_tournaments_ondata_listed import scrape_tournaments_ondata_listed
                 scrape_tournaments_ondata_listed(cursor, run_id=run_id)
             except Exception as e:
                 print(f"Error in do_scrape_tournaments: {e}")
@@ -50,6 +49,7 @@ def upd_tournament_data(
             # Fetch tournament class metadata tied to the tournaments from the previous step.
             try:
 
+                from scrapers.scrape_tournament_classes_ondata import scrape_tournament_classes_ondata
                 scrape_tournament_classes_ondata(cursor, run_id=run_id)
                 
             except Exception as e:
@@ -62,6 +62,7 @@ def upd_tournament_data(
             # Load stage 3 (entries/positions) so the resolver knows which players are registered.
             try:
 
+                from scrapers.scrape_tournament_class_entries_ondata import scrape_tournament_class_entries_ondata
                 scrape_tournament_class_entries_ondata(cursor, include_positions=True, run_id=run_id)
 
             except Exception as e:
@@ -74,6 +75,7 @@ def upd_tournament_data(
             # Collect group-stage match data so raw rows are ready for resolving.
             try:
 
+               from scrapers.scrape_tournament_class_group_matches_ondata import scrape_tournament_class_group_matches_ondata
                scrape_tournament_class_group_matches_ondata(cursor, run_id=run_id) 
             
             except Exception as e:
@@ -84,6 +86,7 @@ def upd_tournament_data(
             # Scrape and store KO bracket results (stage 5) for resolver later.
             try:
 
+               from scrapers.scrape_tournament_class_knockout_matches_ondata import scrape_tournament_class_knockout_matches_ondata
                scrape_tournament_class_knockout_matches_ondata(cursor, run_id=run_id)
 
             except Exception as e:
@@ -101,11 +104,15 @@ def upd_tournament_data(
     # Resolving
     try:
 
-        # No extra resolver hooks today – keep block for future expansion.
-        pass
+        # Refresh materialized player profile / match history for players touched above.
+        refresh_player_caches(cursor, run_id=run_id)
+
+        # Rate matches dated after the rating watermark (falls back to a backfill if history changed).
+        from upd_player_ratings import upd_player_ratings
+        upd_player_ratings(cursor, run_id=run_id)
 
     except Exception as e:
-        print(f"Error in resolve_tournaments: {e}")
+        print(f"Error in refresh_player_caches / upd_player_ratings: {e}")
 
     # Persist all changes and release the connection once scraping/resolving is done.
     conn.commit()
@@ -1,31 +1,34 @@
 
 # src/utils.py
 # Contains reusable functions like WebDriver setup, waiting mechanisms, and HTML parsing helpers.
+# Heavy dependencies (pandas, requests, selenium) are imported inside the functions that use them,
+# so resolver-only runs don't pay for them at startup (see utils_scripts/check_startup_time.py).
 
+import atexit
 from dataclasses import fields
 import hashlib
 import inspect
 import json
 from pathlib import Path
 import time
-import pandas as pd
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
 from collections import defaultdict
+from contextlib import contextmanager
 import logging
 import os
 import re
 import unicodedata
 from datetime import datetime, date
-from config import LOG_FILE, LOG_LEVEL, PDF_CACHE_DIR, DB_NAME
+from config import (
+    LOG_FILE, LOG_LEVEL, PDF_CACHE_DIR, DB_NAME,
+    WEBDRIVER_POOL_SIZE, WEBDRIVER_MAX_PAGES, WEBDRIVER_PATH_CACHE, WEBDRIVER_PATH_CACHE_DAYS
+)
 from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 import sqlite3
+import threading
 import uuid
 from db import get_conn
+from profiler import SamplingProfiler, profiling_enabled
 
 CACHE_DIR = Path(PDF_CACHE_DIR)
 
@@ -98,10 +101,11 @@ def setup_logging():
 #     return driver
 
 def setup_driver():
+    """Launch a headless Chrome. Scrapers should lease one from driver_pool instead."""
     from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
     from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
     import platform, os, logging
 
     chrome_options = Options()
@@ -128,12 +132,173 @@ def setup_driver():
         else:
             logging.warning("⚠️ Chrome binary not found — make sure it's installed in Docker!")
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    try:
+        driver = webdriver.Chrome(service=Service(_resolve_chromedriver()), options=chrome_options)
+    except SessionNotCreatedException:
+        # Cached chromedriver no longer matches the installed Chrome
+        driver = webdriver.Chrome(service=Service(_resolve_chromedriver(refresh=True)), options=chrome_options)
     logging.info("✅ WebDriver initialized")
     return driver
 
 
+_chromedriver_path: Optional[str] = None
+
+def _resolve_chromedriver(refresh: bool = False) -> str:
+    """
+    Path to the chromedriver binary. webdriver_manager (a version lookup online) runs at most
+    once per process, and only when the path cached in WEBDRIVER_PATH_CACHE is missing,
+    older than WEBDRIVER_PATH_CACHE_DAYS or refresh is set.
+    """
+    global _chromedriver_path
+    cache = Path(WEBDRIVER_PATH_CACHE)
+    if not refresh:
+        if _chromedriver_path and os.path.exists(_chromedriver_path):
+            return _chromedriver_path
+        if cache.exists() and time.time() - cache.stat().st_mtime < WEBDRIVER_PATH_CACHE_DAYS * 86400:
+            path = cache.read_text(encoding="utf-8").strip()
+            if path and os.path.exists(path):
+                _chromedriver_path = path
+                return path
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    cache.write_text(path, encoding="utf-8")
+    _chromedriver_path = path
+    return path
+
+
+class DriverPool:
+    """
+    Warm headless browsers shared by the Profixio scrapers.
+
+    acquire() hands out an idle browser reset to a clean state (cookies, cache, storage,
+    extra tabs), or launches a new one; release() returns it to the pool. Browsers that
+    have loaded max_pages pages, or stopped responding, are quit instead of reused.
+    Scrapers holding a browser for a long run call renew() between steps, which swaps in
+    a fresh browser once max_pages is reached.
+    A browser is used by one scraper at a time; idle browsers are quit at exit or close().
+
+    Pages are counted by get() and, for navigations by clicks or submitted forms, whenever
+    renew()/release() find the browser on a new document.
+    """
+
+    def __init__(self, size: int = WEBDRIVER_POOL_SIZE, max_pages: int = WEBDRIVER_MAX_PAGES):
+        self.size       = size
+        self.max_pages  = max_pages
+        self._idle      = []
+        self._lock      = threading.Lock()
+        atexit.register(self.close)
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                return self._launch()
+            try:
+                self._reset(driver)
+                return driver
+            except Exception as e:
+                logging.warning(f"Discarding unresponsive browser: {e}")
+                self._quit(driver)
+
+    def renew(self, driver):
+        """
+        Between steps of a long lease: once the browser has loaded max_pages pages it is quit
+        and a new one returned, which the caller navigates again (and releases instead).
+        """
+        self._count_page(driver)
+        if driver.pages_loaded < self.max_pages:
+            return driver
+        logging.info(f"Recycling browser after {driver.pages_loaded} pages")
+        self._quit(driver)
+        return self._launch()
+
+    def release(self, driver) -> None:
+        if driver is None:
+            return
+        self._count_page(driver)
+        if driver.pages_loaded >= self.max_pages:
+            logging.info(f"Recycling browser after {driver.pages_loaded} pages")
+            self._quit(driver)
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(driver)
+                return
+        self._quit(driver)
+
+    @contextmanager
+    def lease(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self) -> None:
+        """Quit all idle browsers (e.g. once scraping is done and only resolvers follow)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._quit(driver)
+
+    def _launch(self):
+        driver = setup_driver()
+        driver.pages_loaded = 0
+        driver.document     = None
+        get = driver.get
+
+        def counted_get(url):
+            driver.pages_loaded += 1
+            try:
+                return get(url)
+            finally:
+                driver.document = self._document(driver)
+
+        driver.get = counted_get
+        return driver
+
+    @classmethod
+    def _count_page(cls, driver) -> None:
+        # Clicked links and submitted forms load a new document without going through get()
+        document = cls._document(driver)
+        if document is not None and document != driver.document:
+            driver.pages_loaded += 1
+            driver.document = document
+
+    @staticmethod
+    def _document(driver) -> Optional[float]:
+        # Every loaded document has its own timeOrigin (also a form posted back to the same URL)
+        try:
+            return driver.execute_script("return performance.timeOrigin")
+        except Exception:
+            return None
+
+    @staticmethod
+    def _reset(driver) -> None:
+        # Isolate scrapers from each other: one tab, no cookies/cache/storage from the last lease
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": "*", "storageTypes": "all"})
+
+    @staticmethod
+    def _quit(driver) -> None:
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Failed to quit browser: {e}")
+
+
+driver_pool = DriverPool()
+
+
 def parse_date(date_str, context=None, return_iso=False):
     """
     Parse a date string in 'YYYY-MM-DD', 'YYYY.MM.DD', or ISO variants into a datetime.date object.
@@ -403,30 +568,67 @@ def _download_pdf_ondata_by_tournament_class_and_stage(tournament_id_ext: str, c
     - path: Path to the PDF or None if failed
     - downloaded: True if newly downloaded, False if cached or skipped
     - message: Status or error message for logging (None if no special message)
+    Cached PDFs are looked up in the PDF store's manifest (see pdf_store.py); a file cached
+    before the manifest existed is validated once and taken into the store, and a manifest
+    entry whose file was deleted is downloaded again.
     """
-    pdf_path = _get_pdf_path(tournament_id_ext, class_id_ext, stage)
+    from pdf_store import pdf_store
 
-    # If file exists but is invalid, remove it
-    if pdf_path.exists() and not _is_valid_pdf(pdf_path):
-        pdf_path.unlink()
+    store = pdf_store()
+    if not force_download:
+        pdf_path = store.path(tournament_id_ext, class_id_ext, stage) or store.adopt(tournament_id_ext, class_id_ext, stage)
+        if pdf_path is not None:
+            return pdf_path, False, f"Cached PDF used: {pdf_path}"
 
-    if pdf_path.exists() and not force_download:
-        return pdf_path, False, f"Cached PDF used: {pdf_path}"
+    return store.fetch(tournament_id_ext, class_id_ext, stage)
 
-    url = f"https://resultat.ondata.se/ViewClassPDF.php?tournamentID={tournament_id_ext}&classID={class_id_ext}&stage={stage}"
-    pdf_path.parent.mkdir(parents=True, exist_ok=True)
+SPAN_BATCH_SIZE = 500     # buffered spans written to log_spans per batch
 
-    try:
-        resp = requests.get(url, timeout=20)
-        if resp.status_code != 200 or not resp.content.startswith(b"%PDF-"):
-            return None, False, f"No valid PDF for stage {stage} (status: {resp.status_code})"
 
-        with open(pdf_path, "wb") as f:
-            f.write(resp.content)
-        return pdf_path, True, f"Downloaded PDF: {pdf_path} ({_format_size(pdf_path.stat().st_size)})"
+class Span:
+    """
+    One timed block of an OperationLogger run (see OperationLogger.span()).
+    Use as a context manager, or start()/end() where a with-block does not fit.
+    duration (seconds) is set when the span ends.
+    """
+
+    def __init__(self, logger: "OperationLogger", name: str, context: Dict[str, Any]):
+        self.logger         = logger
+        self.name           = name
+        self.context        = context
+        self.span_id        = uuid.uuid4().hex[:16]
+        self.parent_span_id = None
+        self.started_at     = None
+        self.duration       = None
+        self._t0            = None
+
+    def start(self) -> "Span":
+        stack = self.logger._span_stack
+        self.parent_span_id = stack[-1].span_id if stack else None
+        self.started_at     = time.time()
+        self._t0            = time.perf_counter()
+        stack.append(self)
+        return self
+
+    def end(self) -> None:
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._t0
+        stack = self.logger._span_stack
+        if self in stack:
+            # Close children left open (e.g. a loop body that bailed out early) first
+            while stack[-1] is not self:
+                stack[-1].end()
+            stack.pop()
+        self.logger._record_span(self.span_id, self.parent_span_id, self.name, self.context, self.started_at, self.duration)
+
+    def __enter__(self) -> "Span":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end()
+        return False
 
-    except Exception as e:
-        return None, False, f"Failed to download PDF from {url}: {e}"
 
 class OperationLogger:
     """
@@ -453,6 +655,16 @@ class OperationLogger:
     - cursor (sqlite3.Cursor): DB cursor for logging to table (required if log_to_db=True).
 
     The class generates a unique run_id per instance for grouping logs in DB.
+
+    Timing:
+    - The logger's lifetime (init → summarize) is the stage span, e.g. 'scrape:tournament_entry'.
+    - Nested spans time parts of the stage:
+      with logger.span("class", tournament_class_id_ext=ext):
+          with logger.span("download"):
+              ...
+    - Spans are written in batches to log_spans (see export_spans() for flamegraph/trace output).
+    - Stages listed in config.PROFILE_STAGES (by the function creating the logger, or the stage
+      name) are sample-profiled as well; summarize() lists the hotspots (see profiler.py).
     """
     def __init__(
         self,
@@ -477,14 +689,92 @@ class OperationLogger:
         self.processed          = 0
         self.start_time         = time.time()
         self.run_remark         = None
+        self.caller             = None          # (function_name, filename) to record instead of the calling frame, see _caller()
+        self._spans             = []            # finished spans not yet written to log_spans
+        self._span_totals       = defaultdict(lambda: [0.0, 0])     # name → [seconds, count], all spans below the stage span
+        self._span_stack        = []
 
         if log_to_db and not cursor:
             raise ValueError("Cursor required if log_to_db is True")
 
+        # Stage span, closed by summarize()
+        stage = Span(self, f"{run_type or 'run'}:{object_type or 'unknown'}", {}).start()
+
+        # Sampling profiler if the creating function or the stage is listed in PROFILE_STAGES, saved by summarize()
+        self.profiler       = None
+        self.profile_stage  = None
+        creator = inspect.currentframe().f_back.f_code.co_name
+        if profiling_enabled(creator, stage.name):
+            self.start_profiler(creator if profiling_enabled(creator) else stage.name.replace(":", "_"))
+
+    def _caller(self, frame) -> Tuple[str, str]:
+        """Function name and filename of the logging call site; self.caller wins when replaying recorded calls."""
+        if self.caller:
+            return self.caller
+        return frame.f_code.co_name, os.path.basename(inspect.getfile(frame))
+
     def inc_processed(self, n: int = 1):
         """Increment number of processed records (used for overhead tracking)."""
         self.processed += n
 
+    # ────────────────────────────────────────────────────────────────────
+    # Timing spans
+    # ────────────────────────────────────────────────────────────────────
+
+    def span(self, name: str, **context) -> Span:
+        """Time a block as a child of the innermost open span (main thread only)."""
+        return Span(self, name, context)
+
+    def add_span(self, name: str, started_at: float, duration: float, pid: Optional[int] = None, **context) -> None:
+        """Record a block timed elsewhere (worker thread/process) as a child of the innermost open span."""
+        parent = self._span_stack[-1].span_id if self._span_stack else None
+        self._record_span(uuid.uuid4().hex[:16], parent, name, context, started_at, duration, pid)
+
+    def _record_span(self, span_id, parent_span_id, name, context, started_at, duration, pid=None) -> None:
+        if parent_span_id is not None:
+            totals = self._span_totals[name]
+            totals[0] += duration
+            totals[1] += 1
+        self._spans.append((
+            self.run_id, span_id, parent_span_id, name, self.object_type, self.run_type,
+            json.dumps(context, ensure_ascii=False, default=str) if context else None,
+            started_at, duration * 1000.0, pid or os.getpid()
+        ))
+        # Only flush between top-level blocks, never inside a caller's savepoint
+        if len(self._spans) >= SPAN_BATCH_SIZE and len(self._span_stack) <= 1:
+            self.flush_spans()
+
+    def start_profiler(self, stage: str) -> None:
+        """Sample-profile this thread until summarize(), which saves the profile and lists the hotspots."""
+        self.profile_stage = stage
+        self.profiler      = SamplingProfiler().start()
+
+    def _finish_profiler(self) -> List[str]:
+        self.profiler.stop()
+        out_dir  = self.profiler.save(self.profile_stage, self.run_id)
+        hotspots = self.profiler.hotspots()
+        self.profiler = None
+        lines = ["", f"   🔥 Hotspots ({self.profile_stage}, cumulative / self), profile saved to {out_dir}:"]
+        for label, cum_s, self_s in hotspots:
+            lines.append(f"      • {label}: {cum_s:.1f}s / {self_s:.1f}s")
+        if hotspots:
+            remark = "Hotspots: " + ", ".join(f"{label} {cum_s:.1f}s" for label, cum_s, _ in hotspots)
+            self.run_remark = f"{self.run_remark} [{remark}]" if self.run_remark else remark
+        return lines
+
+    def flush_spans(self) -> None:
+        """Write buffered spans to log_spans (committed with the next log/run summary)."""
+        if not self._spans:
+            return
+        if self.cursor:
+            self.cursor.executemany("""
+                INSERT INTO log_spans (
+                    run_id, span_id, parent_span_id, name, object_type, process_type,
+                    context_json, started_at, duration_ms, pid
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, self._spans)
+        self._spans = []
+
     def _format_msg(self, context: dict, reason: str) -> str:
         return f"({', '.join(f'{k}: {v}' for k,v in context.items())}): {reason}"
         
@@ -700,9 +990,7 @@ class OperationLogger:
         self.reasons["success"][reason] += 1
         
         # Get caller info
-        frame = inspect.currentframe().f_back
-        function_name = frame.f_code.co_name
-        filename = os.path.basename(inspect.getfile(frame))
+        function_name, filename = self._caller(inspect.currentframe().f_back)
         
         # Enrich context
         enriched_context = self._enrich_context(context)
@@ -771,9 +1059,7 @@ class OperationLogger:
         self.reasons["failed"][reason] += 1
         
         # Get caller info (like log_error_to_db)
-        frame = inspect.currentframe().f_back
-        function_name = frame.f_code.co_name
-        filename = os.path.basename(inspect.getfile(frame))
+        function_name, filename = self._caller(inspect.currentframe().f_back)
         
         # Enrich context
         enriched_context = self._enrich_context(context)
@@ -844,9 +1130,7 @@ class OperationLogger:
         self.reasons["skipped"][reason] += 1
         
         # Get caller info
-        frame = inspect.currentframe().f_back
-        function_name = frame.f_code.co_name
-        filename = os.path.basename(inspect.getfile(frame))
+        function_name, filename = self._caller(inspect.currentframe().f_back)
         
         # Enrich context
         enriched_context = self._enrich_context(context)
@@ -914,9 +1198,7 @@ class OperationLogger:
             context = self._parse_context_str(context)
         self.reasons["warning"][reason] += 1  # Keep for total counts
         
-        frame = inspect.currentframe().f_back
-        function_name = frame.f_code.co_name
-        filename = os.path.basename(inspect.getfile(frame))
+        function_name, filename = self._caller(inspect.currentframe().f_back)
         
         enriched_context = self._enrich_context(context)
         context_json = json.dumps(enriched_context)
@@ -1030,6 +1312,12 @@ class OperationLogger:
                 if runtime_seconds > 0:
                     throughput = self.processed / runtime_seconds
                     lines.append(f"   ⚡ Throughput: {throughput:.1f} records/sec")
+            if self.verbosity >= 1:
+                for name, (seconds, count) in sorted(self._span_totals.items(), key=lambda kv: -kv[1][0]):
+                    lines.append(f"      • {name}: {seconds:.1f}s ({count}×)")
+
+        if self.profiler:
+            lines.extend(self._finish_profiler())
 
         # if hasattr(self, "start_time"):
         #     runtime_seconds = time.time() - self.start_time
@@ -1052,8 +1340,14 @@ class OperationLogger:
         logging.info("")
         print("")
 
+        # Close the stage span (and anything left open) and write all spans
+        if self._span_stack:
+            self._span_stack[0].end()
         if self.cursor:
+            self.flush_spans()
             self.commit_run_summary()
+        else:
+            self._spans = []
 
     def set_run_remark(self, remark: Optional[str]):
         """Set a remark for the run, to be included in log_runs during summarize()."""
@@ -1101,6 +1395,8 @@ def export_logs_to_excel(run_id=None):
     Export the latest run's record-level logs (log_details) to logs.xlsx.
     Always rewrites the file, so it only contains the most recent run.
     """
+    import pandas as pd
+
     conn, cursor = get_conn()
     if run_id:
         df = pd.read_sql_query(
@@ -1154,6 +1450,8 @@ def export_runs_to_excel(export_latest_only: bool = False):
     - export_latest_only (bool): If True, exports only the latest run (overwrites file).
                                   If False, exports full history from DB.
     """
+    import pandas as pd
+
     conn, cursor = get_conn()
     
     if export_latest_only:
@@ -1182,12 +1480,121 @@ def export_runs_to_excel(export_latest_only: bool = False):
     logging.info(f"Exported {mode_msg} to run_log.xlsx")
 
 
+@contextmanager
+def profile_stage(stage: str, run_id: Optional[str] = None):
+    """
+    Sample-profile a block (e.g. an upd_* call in main.py) if stage is listed in PROFILE_STAGES.
+    Stored like a run: hotspots in log_runs (process_type 'profile'), profile under PROFILE_DIR/<run_id>/.
+    """
+    if not profiling_enabled(stage):
+        yield
+        return
+
+    conn, cursor = get_conn()
+    logger = OperationLogger(
+        verbosity       = 0,
+        print_output    = False,
+        log_to_db       = True,
+        cursor          = cursor,
+        object_type     = stage,
+        run_type        = "profile",
+        run_id          = run_id
+    )
+    logger.start_profiler(stage)
+    try:
+        yield
+    finally:
+        logger.summarize()
+        conn.close()
+
+
+def export_spans(run_id: Optional[str] = None, fmt: str = "chrome", out_file: Optional[str] = None) -> Optional[str]:
+    """
+    Export a run's timing spans (log_spans) for flamegraph/trace viewers.
+
+    Parameters:
+    - run_id (str): Run to export; latest run with spans if None.
+    - fmt (str): "chrome"    → Chrome trace JSON (chrome://tracing, Perfetto, speedscope)
+                 "collapsed" → collapsed stacks 'stage;class;parse <self ms>' summed over all classes (flamegraph.pl, speedscope)
+    - out_file (str): Defaults to spans.json / spans.folded.
+
+    Returns the written path, or None if there was nothing to export.
+    """
+    if fmt not in ("chrome", "collapsed"):
+        raise ValueError(f"Unknown span export format: {fmt}")
+
+    conn, cursor = get_conn()
+    if run_id is None:
+        cursor.execute("SELECT run_id FROM log_spans ORDER BY id DESC LIMIT 1")
+        row = cursor.fetchone()
+        run_id = row[0] if row else None
+    cursor.execute("""
+        SELECT span_id, parent_span_id, name, object_type, process_type, context_json, started_at, duration_ms, pid
+        FROM log_spans
+        WHERE run_id = ?
+        ORDER BY started_at
+    """, (run_id,))
+    columns = [col[0] for col in cursor.description]
+    spans = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    conn.close()
+
+    if not spans:
+        print("ℹ️  No spans to export.")
+        logging.info("No spans to export.")
+        return None
+
+    for sp in spans:
+        sp["context"] = json.loads(sp["context_json"]) if sp["context_json"] else {}
+
+    out_file = out_file or ("spans.json" if fmt == "chrome" else "spans.folded")
+
+    if fmt == "chrome":
+        t0 = min(sp["started_at"] for sp in spans)
+        events = [{
+            "name":     sp["name"],
+            "cat":      f"{sp['process_type'] or ''}:{sp['object_type'] or ''}",
+            "ph":       "X",
+            "ts":       round((sp["started_at"] - t0) * 1e6),
+            "dur":      round(sp["duration_ms"] * 1e3),
+            "pid":      sp["pid"] or 0,
+            "tid":      sp["pid"] or 0,
+            "args":     sp["context"],
+        } for sp in spans]
+        with open(out_file, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"run_id": run_id}}, f, ensure_ascii=False, default=str)
+    else:
+        by_id = {sp["span_id"]: sp for sp in spans}
+        child_ms = defaultdict(float)
+        for sp in spans:
+            if sp["parent_span_id"] in by_id:
+                child_ms[sp["parent_span_id"]] += sp["duration_ms"]
+
+        def stack(sp):
+            frames = []
+            while sp is not None:
+                frames.append(sp["name"].replace(";", ","))
+                sp = by_id.get(sp["parent_span_id"])
+            return ";".join(reversed(frames))
+
+        folded = defaultdict(float)
+        for sp in spans:
+            folded[stack(sp)] += max(sp["duration_ms"] - child_ms[sp["span_id"]], 0.0)
+        with open(out_file, "w", encoding="utf-8") as f:
+            for path, self_ms in folded.items():
+                if round(self_ms) > 0:
+                    f.write(f"{path} {round(self_ms)}\n")
+
+    print(f"ℹ️  Exported {len(spans)} spans ({fmt}) to {out_file}")
+    logging.info(f"Exported {len(spans)} spans ({fmt}) for run {run_id} to {out_file}")
+    return out_file
+
+
 def clear_debug_tables(cursor: sqlite3.Cursor, clear_logs: bool = True, clear_runs: bool = False):
     """
     Clear debug tables based on flags.
 
     - clear_logs=True  → clears log_details table (record-level logs).
-    - clear_runs=True  → clears log_runs table (run-level summaries).
+    - clear_runs=True  → clears log_runs table (run-level summaries) and log_spans (timing spans).
 
     Typical usage:
     - clear only logs between runs, but keep run history:
@@ -1203,8 +1610,9 @@ def clear_debug_tables(cursor: sqlite3.Cursor, clear_logs: bool = True, clear_ru
 
         if clear_runs:
             cursor.execute("DELETE FROM log_runs")
-            logging.info("log_runs table cleared.")
-            print("ℹ️  log_runs table cleared.")
+            cursor.execute("DELETE FROM log_spans")
+            logging.info("log_runs and log_spans tables cleared.")
+            print("ℹ️  log_runs and log_spans tables cleared.")
 
         cursor.connection.commit()
     except Exception as e:
@@ -1285,6 +1693,8 @@ def export_db_dictionary(out_file: str = "BTstats_DB_Dictionary.xlsx") -> None:
             )
         return results
 
+    import pandas as pd
+
     try:
         conn = sqlite3.connect(DB_NAME)
         cursor = conn.cursor()
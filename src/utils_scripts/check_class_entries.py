@@ -0,0 +1,108 @@
+# src/utils_scripts/check_class_entries.py
+"""
+Per-row identity check for resolve_tournament_class_entries.
+
+Builds an in-memory database with the real schema (db.create_*_tables) holding one singles class
+whose raw entries come from different clubs, each player licensed in their own club on the class
+date, and resolves it. Fails (exit code 1) unless every entry keeps the player and club of its own
+raw row (the club and identity lookups are keyed by raw row_id).
+
+Usage (from src/):  python utils_scripts/check_class_entries.py
+"""
+import contextlib
+import io
+import logging
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+# ==================== CONFIG ====================
+SRC_ROOT = Path(__file__).resolve().parent.parent
+os.chdir(SRC_ROOT)
+sys.path.insert(0, str(SRC_ROOT))
+
+import db
+import resolvers.resolve_tournament_class_entries as rtce
+
+CLASS_DATE = "2024-05-01"
+# (player_id, firstname, lastname, club_id, clubname)
+PLAYERS = [
+    (1, "Anna",  "Svensson",  10, "Alpha BTK"),
+    (2, "Erik",  "Berg",      11, "Beta SK"),
+    (3, "Maria", "Lind",      12, "Gamma IF"),
+]
+# ================================================
+
+
+def make_db() -> sqlite3.Connection:
+    db._register_sqlite_date_time_adapters()
+    conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+    cursor = conn.cursor()
+    # create_tables stops at league_team_player (its primary key names a column the table lacks),
+    # before the club tables; an existing table makes that statement a no-op
+    cursor.execute("CREATE TABLE league_team_player (league_team_id INTEGER, player_id INTEGER)")
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.create_and_populate_static_tables(cursor, logging.getLogger(__name__))
+        db.create_raw_tables(cursor, logging.getLogger(__name__))
+        db.create_tables(cursor)
+    return conn
+
+
+def populate(cursor) -> None:
+    cursor.execute("SELECT season_id FROM season WHERE ? BETWEEN start_date AND end_date", (CLASS_DATE,))
+    season_id = cursor.fetchone()[0]
+    cursor.execute("SELECT license_id FROM license LIMIT 1")
+    license_id = cursor.fetchone()[0]
+    cursor.execute("INSERT OR IGNORE INTO club (club_id, shortname, longname, club_type) VALUES (9999, 'Unknown', 'Unknown', 1)")
+    for player_id, firstname, lastname, club_id, clubname in PLAYERS:
+        cursor.execute("INSERT INTO club (club_id, shortname, longname, club_type) VALUES (?, ?, ?, 1)", (club_id, clubname, clubname))
+        cursor.execute("INSERT INTO player (player_id, firstname, lastname, is_verified) VALUES (?, ?, ?, 1)", (player_id, firstname, lastname))
+        cursor.execute("""
+            INSERT INTO player_license (player_id, club_id, valid_from, valid_to, license_id, season_id)
+            VALUES (?, ?, '2023-07-01', '2024-06-30', ?, ?)
+        """, (player_id, club_id, license_id, season_id))
+    cursor.execute("""
+        INSERT INTO tournament (tournament_id, tournament_id_ext, shortname, startdate, enddate, tournament_status_id)
+        VALUES (1, 'T1', 'Cup', ?, ?, 3)
+    """, (CLASS_DATE, CLASS_DATE))
+    cursor.execute("""
+        INSERT INTO tournament_class (tournament_class_id, tournament_class_id_ext, tournament_id, tournament_class_type_id,
+                                      tournament_class_structure_id, startdate, shortname, longname)
+        VALUES (1, 'C1', 1, 1, 1, ?, 'P1', 'Class 1')
+    """, (CLASS_DATE,))
+    cursor.executemany("""
+        INSERT INTO tournament_class_entry_raw (tournament_id_ext, tournament_class_id_ext, tournament_player_id_ext,
+                                                fullname_raw, clubname_raw, entry_group_id_int, data_source_id)
+        VALUES ('T1', 'C1', ?, ?, ?, ?, 1)
+    """, [(str(100 + player_id), f"{firstname} {lastname}", clubname, player_id)
+          for player_id, firstname, lastname, _, clubname in PLAYERS])
+    cursor.connection.commit()
+
+
+def check_class_entries() -> bool:
+    conn = make_db()
+    cursor = conn.cursor()
+    populate(cursor)
+    rtce.resolve_tournament_class_entries(cursor, workers=1)
+    conn.commit()
+
+    cursor.execute("SELECT tournament_player_id_ext, player_id, club_id FROM tournament_class_player")
+    resolved = {tp_ext: (player_id, club_id) for tp_ext, player_id, club_id in cursor.fetchall()}
+    ok = True
+    for player_id, firstname, lastname, club_id, clubname in PLAYERS:
+        got = resolved.get(str(100 + player_id))
+        name = f"{firstname} {lastname} ({clubname})"
+        if got == (player_id, club_id):
+            print(f"✅ {name:<28} player {player_id}, club {club_id}")
+        else:
+            print(f"❌ {name:<28} got (player, club) {got}, expected {(player_id, club_id)}")
+            ok = False
+
+    conn.close()
+    return ok
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    sys.exit(0 if check_class_entries() else 1)
@@ -0,0 +1,298 @@
+# src/utils_scripts/check_parser_goldens.py
+"""
+Golden-output regression run of the PDF parsers over the cached PDF corpus.
+
+Every class with cached stage PDFs (data/pdfs/tournament_*/class_*/stage_*.pdf) is parsed by
+- entries:          stage 1 participants, stage 2 pool assignment (scrape_tournament_class_entries_ondata)
+- group:            stage 3 pool matches (scrape_tournament_class_group_matches_ondata)
+- ko:               stage 5 bracket, per page (scrape_tournament_class_knockout_matches_ondata)
+- final_positions:  final stage positions (scrape_tournament_class_entries_ondata)
+in a process pool, and the parsed output is compared with the snapshot in
+PARSER_GOLDENS_DIR/<parser>/tournament_<tid>/class_<cid>.json. Parser exceptions are part of
+the output. Class type, structure and KO tree size come from the database when there is one
+(singles, unknown structure and a detected tree size otherwise).
+
+Run it with --update before changing a parser to take the snapshots, then without arguments to
+see which classes parse differently (first difference per class) and the per-parser throughput.
+Exit code 1 if any output changed.
+
+Usage (from src/):  python utils_scripts/check_parser_goldens.py [--update] [parser ...]
+"""
+import contextlib
+import dataclasses
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# ==================== CONFIG ====================
+SRC_ROOT = Path(__file__).resolve().parent.parent
+os.chdir(SRC_ROOT)
+sys.path.insert(0, str(SRC_ROOT))
+
+from config import DB_NAME, PARSER_GOLDENS_DIR, PDF_CACHE_DIR
+
+PARSERS = ["entries", "group", "ko", "final_positions"]
+
+FLOAT_DIGITS = 2                # coordinates in the output are compared rounded
+MAX_WORKERS = os.cpu_count()
+SHOW_CHANGED = 20               # changed classes listed per parser
+# ================================================
+
+
+def find_classes() -> list[tuple[str, str, list[int]]]:
+    """(tournament_id_ext, class_id_ext, cached stages) of every class in the PDF cache."""
+    classes = []
+    for class_dir in sorted(Path(PDF_CACHE_DIR).glob("tournament_*/class_*")):
+        stages = []
+        for path in class_dir.glob("stage_*.pdf"):
+            with open(path, "rb") as f:
+                if f.read(5) == b"%PDF-":
+                    stages.append(int(path.stem.split("_", 1)[1]))
+        if stages:
+            tid_ext = class_dir.parent.name.split("_", 1)[1]
+            cid_ext = class_dir.name.split("_", 1)[1]
+            classes.append((tid_ext, cid_ext, sorted(stages)))
+    return classes
+
+
+def load_class_meta() -> dict[str, dict]:
+    """class_id_ext → type, structure and KO tree size from the database (empty without one)."""
+    if not Path(DB_NAME).exists():
+        return {}
+    from db import get_readonly_conn
+
+    conn, cursor = get_readonly_conn()
+    try:
+        cursor.execute("""
+            SELECT tournament_class_id_ext, tournament_class_type_id, tournament_class_structure_id, ko_tree_size
+            FROM tournament_class
+            WHERE data_source_id = 1 AND tournament_class_id_ext IS NOT NULL
+        """)
+        return {
+            str(cid_ext): {"type": type_id, "structure": structure_id, "ko_tree_size": ko_tree_size}
+            for cid_ext, type_id, structure_id, ko_tree_size in cursor.fetchall()
+        }
+    finally:
+        conn.close()
+
+
+# ────────────────────────────────────────────────────────────────────
+# Parsers (as the scrapers call them, output keyed by stage)
+# ────────────────────────────────────────────────────────────────────
+
+def _parse_entries(pdfs, stages: list[int], meta: dict) -> dict:
+    from scrapers.scrape_tournament_class_entries_ondata import (
+        _parse_groups_stage_pdf_using_stage1,
+        _parse_initial_participants_pdf,
+    )
+
+    output = {}
+    if 1 in stages:
+        participants, expected_count = _parse_initial_participants_pdf(
+            pdfs, 1, pdfs.class_id_ext, pdfs.tournament_id_ext, 1, meta.get("type") or 1
+        )
+        output[1] = {"participants": participants, "expected_count": expected_count}
+        if 2 in stages and participants:
+            output[2] = _parse_groups_stage_pdf_using_stage1(pdfs, 2, participants, debug=False)
+    return output
+
+
+def _parse_group(pdfs, stages: list[int], meta: dict) -> dict:
+    from scrapers.scrape_tournament_class_group_matches_ondata import POOL_WORD_OPTIONS, _parse_groups_pdf
+
+    if 3 not in stages:
+        return {}
+    return {3: _parse_groups_pdf(pdfs.words(3, **POOL_WORD_OPTIONS))}
+
+
+def _parse_ko(pdfs, stages: list[int], meta: dict) -> dict:
+    from scrapers.scrape_tournament_class_knockout_matches_ondata import _parse_single_page_bracket
+    from utils import OperationLogger
+
+    if 5 not in stages:
+        return {}
+    logger = OperationLogger(verbosity=0, print_output=False, log_to_db=False)
+    pages_words = pdfs.words(5, keep_blank_chars=True)
+    tree_size = int(meta.get("ko_tree_size") or 0)
+    split_ro128 = tree_size >= 128 and len(pages_words) > 1    # two RO64 halves, as the scraper reads them
+
+    pages = []
+    for page_words in (pages_words[:2] if split_ro128 else pages_words[:1]):
+        rounds, players, _scores, _winners = _parse_single_page_bracket(
+            page_words,
+            64 if split_ro128 else tree_size,
+            logger                  = logger,
+            logger_keys             = {},
+            strict_winner_matching  = split_ro128,
+        )
+        pages.append({"rounds": rounds, "players": players})
+    return {5: pages}
+
+
+def _parse_final_positions(pdfs, stages: list[int], meta: dict) -> dict:
+    from scrapers.scrape_tournament_class_entries_ondata import (
+        _parse_final_positions_groups_and_groups,
+        _parse_final_positions_pdf,
+    )
+
+    structure = meta.get("structure")
+    final_stages = {1: [6], 2: [4], 3: [6], 4: [4]}.get(structure, [4, 6])     # TournamentClass.get_final_stage()
+    parse = _parse_final_positions_groups_and_groups if structure == 4 else _parse_final_positions_pdf
+    return {
+        stage: parse(pdfs, stage, pdfs.class_id_ext, pdfs.tournament_id_ext, 1)
+        for stage in final_stages if stage in stages
+    }
+
+
+PARSE_FUNCTIONS = {
+    "entries":          _parse_entries,
+    "group":            _parse_group,
+    "ko":               _parse_ko,
+    "final_positions":  _parse_final_positions,
+}
+
+
+def _snapshot(value):
+    """JSON-able form of a parser result: dataclasses as dicts, sets sorted, floats rounded."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: _snapshot(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, dict):
+        return {str(k): _snapshot(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_snapshot(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(_snapshot(v) for v in value)
+    if isinstance(value, float):
+        return round(value, FLOAT_DIGITS)
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    return str(value)
+
+
+def run_parser(args) -> dict:
+    """Parse one class with one parser (worker process)."""
+    parser, tid_ext, cid_ext, stages, meta = args
+    from pdf_session import ClassPdfSession
+
+    pdfs = ClassPdfSession(tid_ext, cid_ext)
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):         # the parsers' debug prints
+            output = _snapshot(PARSE_FUNCTIONS[parser](pdfs, stages, meta))
+        error = None
+    except Exception as e:
+        output, error = {"error": f"{type(e).__name__}: {e}"}, e
+    seconds = time.perf_counter() - start
+    pdfs.release()
+    return {
+        "parser":   parser,
+        "tid_ext":  tid_ext,
+        "cid_ext":  cid_ext,
+        "output":   output,
+        "pdfs":     0 if error else len(output),
+        "error":    error is not None,
+        "seconds":  seconds,
+    }
+
+
+# ────────────────────────────────────────────────────────────────────
+# Goldens
+# ────────────────────────────────────────────────────────────────────
+
+def golden_path(parser: str, tid_ext: str, cid_ext: str) -> Path:
+    return Path(PARSER_GOLDENS_DIR) / parser / f"tournament_{tid_ext}" / f"class_{cid_ext}.json"
+
+
+def first_difference(expected, actual, path: str = "$"):
+    """Path and values of the first difference between two snapshots, None if equal."""
+    if type(expected) is not type(actual):
+        return f"{path}: {expected!r:.80} → {actual!r:.80}"
+    if isinstance(expected, dict):
+        for key in sorted(set(expected) | set(actual)):
+            if key not in actual:
+                return f"{path}.{key}: missing"
+            if key not in expected:
+                return f"{path}.{key}: new"
+            diff = first_difference(expected[key], actual[key], f"{path}.{key}")
+            if diff:
+                return diff
+        return None
+    if isinstance(expected, list):
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            diff = first_difference(a, b, f"{path}[{i}]")
+            if diff:
+                return diff
+        if len(expected) != len(actual):
+            return f"{path}: {len(expected)} items → {len(actual)}"
+        return None
+    return None if expected == actual else f"{path}: {expected!r:.80} → {actual!r:.80}"
+
+
+def main() -> int:
+    update = "--update" in sys.argv[1:]
+    parsers = [arg for arg in sys.argv[1:] if not arg.startswith("--")] or PARSERS
+    unknown = [p for p in parsers if p not in PARSE_FUNCTIONS]
+    if unknown:
+        print(f"❌ Unknown parser(s) {unknown}, expected some of {PARSERS}")
+        return 2
+
+    classes = find_classes()
+    if not classes:
+        print(f"No cached PDFs in {SRC_ROOT / PDF_CACHE_DIR}")
+        return 0
+    meta_by_class = load_class_meta()
+    print(f"{'Updating' if update else 'Checking'} {', '.join(parsers)} on {len(classes)} classes "
+          f"({len(meta_by_class)} with class data)...\n")
+
+    tasks = [
+        (parser, tid_ext, cid_ext, stages, meta_by_class.get(cid_ext, {}))
+        for parser in parsers
+        for tid_ext, cid_ext, stages in classes
+    ]
+    stats = {p: {"classes": 0, "pdfs": 0, "seconds": 0.0, "errors": 0, "changed": [], "new": 0} for p in parsers}
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(run_parser, task) for task in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            s = stats[result["parser"]]
+            s["classes"] += 1
+            s["pdfs"] += result["pdfs"]
+            s["seconds"] += result["seconds"]
+            s["errors"] += result["error"]
+
+            path = golden_path(result["parser"], result["tid_ext"], result["cid_ext"])
+            if update:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(result["output"], ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+            elif not path.exists():
+                s["new"] += 1
+            else:
+                diff = first_difference(json.loads(path.read_text(encoding="utf-8")), result["output"])
+                if diff:
+                    s["changed"].append(f"tid_ext {result['tid_ext']} cid_ext {result['cid_ext']}  {diff}")
+    wall = time.perf_counter() - wall_start
+
+    for parser in parsers:
+        for line in sorted(stats[parser]["changed"])[:SHOW_CHANGED]:
+            print(f"❌ {parser:<16} {line}")
+    if any(s["changed"] for s in stats.values()):
+        print()
+
+    print(f"{'parser':<16} {'classes':>8} {'pdfs':>6} {'cpu s':>8} {'pdfs/s':>8} {'changed':>8} {'new':>5} {'errors':>7}")
+    for parser in parsers:
+        s = stats[parser]
+        rate = s["pdfs"] / s["seconds"] if s["seconds"] else 0.0
+        print(f"{parser:<16} {s['classes']:>8} {s['pdfs']:>6} {s['seconds']:>8.2f} {rate:>8.1f} "
+              f"{len(s['changed']):>8} {s['new']:>5} {s['errors']:>7}")
+    print(f"\nWall time {wall:.2f}s on {MAX_WORKERS} workers" + (f", goldens written to {PARSER_GOLDENS_DIR}" if update else ""))
+
+    return 1 if any(s["changed"] for s in stats.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
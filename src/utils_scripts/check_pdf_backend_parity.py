@@ -0,0 +1,193 @@
+# src/utils_scripts/check_pdf_backend_parity.py
+"""
+Parity check of a PDF backend (pdf_backend.py) against pdfplumber over the cached PDFs.
+
+For every cached stage PDF (data/pdfs/tournament_*/class_*/stage_*.pdf) both backends
+- extract words with the options the parsers use: the word texts must be identical and the
+  coordinates within MAX_COORD_DELTA points,
+- extract page text (final positions, group structure refinement),
+- run the parser of the stage on their own words/text: stage 1 participants, stage 3 pool
+  matches, stage 4/6 final positions, stage 5 KO bracket (first page). The parsed results must
+  be identical (coordinates left out).
+
+Prints the differing files with the first differences, the extraction times and the speedup.
+Exit code 1 if any file differs.
+
+Usage (from src/):  python utils_scripts/check_pdf_backend_parity.py [backend] [max_files]
+"""
+import dataclasses
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# ==================== CONFIG ====================
+SRC_ROOT = Path(__file__).resolve().parent.parent
+os.chdir(SRC_ROOT)
+sys.path.insert(0, str(SRC_ROOT))
+
+from config import PDF_CACHE_DIR
+
+BACKEND = "pdfium"                      # backend checked against REFERENCE
+REFERENCE = "pdfplumber"
+
+WORD_OPTIONS = {                        # extract_words() options of the parsers
+    "ko":       {"keep_blank_chars": True},
+    "pools":    {"x_tolerance": 2, "y_tolerance": 3, "keep_blank_chars": False},
+    "entries":  {"use_text_flow": True, "keep_blank_chars": False, "extra_attrs": ["fontname"]},
+}
+
+MAX_COORD_DELTA = 0.5                   # points
+MAX_FILES = 0                           # 0 = all cached PDFs
+SHOW_DIFFS = 3                          # differences printed per file
+MAX_WORKERS = os.cpu_count()
+# ================================================
+
+
+def find_pdfs() -> list[tuple[str, str, int, Path]]:
+    pdfs = []
+    for path in sorted(Path(PDF_CACHE_DIR).glob("tournament_*/class_*/stage_*.pdf")):
+        try:
+            stage = int(path.stem.split("_", 1)[1])
+        except ValueError:
+            continue
+        with open(path, "rb") as f:
+            if f.read(5) != b"%PDF-":
+                continue
+        tid_ext = path.parent.parent.name.split("_", 1)[1]
+        cid_ext = path.parent.name.split("_", 1)[1]
+        pdfs.append((tid_ext, cid_ext, stage, path))
+    return pdfs
+
+
+def _strip_coordinates(value):
+    """Parsed results without floats (centers, x positions), which may differ a little per backend."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        value = {f.name: getattr(value, f.name) for f in dataclasses.fields(value) if f.name != "aliases"}
+    if isinstance(value, dict):
+        return {k: _strip_coordinates(v) for k, v in value.items() if not isinstance(v, float)}
+    if isinstance(value, (list, tuple)):
+        return [_strip_coordinates(v) for v in value if not isinstance(v, float)]
+    return value
+
+
+def _parse(pdfs, stage: int):
+    """Result of the stage's parser, run on the session's words/text."""
+    if stage == 1:
+        from scrapers.scrape_tournament_class_entries_ondata import _parse_initial_participants_pdf
+        return _parse_initial_participants_pdf(pdfs, stage, pdfs.class_id_ext, pdfs.tournament_id_ext, 1, 1)
+    if stage == 3:
+        from scrapers.scrape_tournament_class_group_matches_ondata import POOL_WORD_OPTIONS, _parse_groups_pdf
+        return _parse_groups_pdf(pdfs.words(stage, **POOL_WORD_OPTIONS))
+    if stage in (4, 6):
+        from scrapers.scrape_tournament_class_entries_ondata import _parse_final_positions_pdf
+        return _parse_final_positions_pdf(pdfs, stage, pdfs.class_id_ext, pdfs.tournament_id_ext, 1)
+    if stage == 5:
+        from scrapers.scrape_tournament_class_knockout_matches_ondata import _parse_single_page_bracket
+        from utils import OperationLogger
+        logger = OperationLogger(verbosity=0, print_output=False, log_to_db=False)
+        rounds, players, _scores, _winners = _parse_single_page_bracket(
+            pdfs.words(stage, **WORD_OPTIONS["ko"])[0], 0, logger=logger, logger_keys={},
+        )
+        return rounds, players
+    return None
+
+
+def _extract(tid_ext: str, cid_ext: str, stage: int, backend: str) -> dict:
+    from pdf_session import ClassPdfSession
+
+    pdfs = ClassPdfSession(tid_ext, cid_ext, backend)
+    start = time.perf_counter()
+    words = {name: pdfs.words(stage, **options) for name, options in WORD_OPTIONS.items()}
+    text = pdfs.text(stage)
+    seconds = time.perf_counter() - start
+    try:
+        parsed = _strip_coordinates(_parse(pdfs, stage))
+    except Exception as e:
+        parsed = f"{type(e).__name__}: {e}"
+    pdfs.release()
+    return {"words": words, "text": text, "parsed": parsed, "seconds": seconds}
+
+
+def _word_diffs(name: str, pages_ref: list, pages_new: list) -> tuple[list[str], float]:
+    diffs, max_delta = [], 0.0
+    if len(pages_ref) != len(pages_new):
+        return [f"{name}: {len(pages_ref)} pages vs {len(pages_new)}"], max_delta
+    for page_no, (ref, new) in enumerate(zip(pages_ref, pages_new), start=1):
+        texts_ref = [w["text"] for w in ref]
+        texts_new = [w["text"] for w in new]
+        if texts_ref != texts_new:
+            at = next((i for i, (a, b) in enumerate(zip(texts_ref, texts_new)) if a != b), min(len(texts_ref), len(texts_new)))
+            diffs.append(f"{name} p{page_no} word {at}: {texts_ref[at:at + 3]!r} vs {texts_new[at:at + 3]!r}")
+            continue
+        for w_ref, w_new in zip(ref, new):
+            delta = max(abs(w_ref[k] - w_new[k]) for k in ("x0", "x1", "top", "bottom"))
+            max_delta = max(max_delta, delta)
+            if delta > MAX_COORD_DELTA:
+                diffs.append(f"{name} p{page_no} '{w_ref['text']}': off by {delta:.2f} pt")
+                break
+    return diffs, max_delta
+
+
+def check_pdf(args) -> dict:
+    tid_ext, cid_ext, stage, path, backend = args
+    ref = _extract(tid_ext, cid_ext, stage, REFERENCE)
+    new = _extract(tid_ext, cid_ext, stage, backend)
+
+    diffs, max_delta = [], 0.0
+    for name in WORD_OPTIONS:
+        name_diffs, delta = _word_diffs(name, ref["words"][name], new["words"][name])
+        diffs.extend(name_diffs)
+        max_delta = max(max_delta, delta)
+    if ref["text"] != new["text"]:
+        diffs.append("page text differs")
+    if ref["parsed"] != new["parsed"]:
+        diffs.append(f"stage {stage} parse result differs")
+
+    return {
+        "path":         str(path),
+        "diffs":        diffs,
+        "max_delta":    max_delta,
+        "seconds_ref":  ref["seconds"],
+        "seconds_new":  new["seconds"],
+    }
+
+
+def main() -> int:
+    backend = sys.argv[1] if len(sys.argv) > 1 else BACKEND
+    max_files = int(sys.argv[2]) if len(sys.argv) > 2 else MAX_FILES
+
+    pdfs = find_pdfs()
+    if max_files:
+        pdfs = pdfs[:max_files]
+    if not pdfs:
+        print(f"No cached PDFs in {SRC_ROOT / PDF_CACHE_DIR}")
+        return 0
+
+    print(f"Checking {backend} against {REFERENCE} on {len(pdfs)} PDFs...\n")
+    results = []
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(check_pdf, (*pdf, backend)) for pdf in pdfs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result["diffs"]:
+                print(f"❌ {result['path']}")
+                for diff in result["diffs"][:SHOW_DIFFS]:
+                    print(f"     {diff}")
+
+    differing = sum(1 for r in results if r["diffs"])
+    seconds_ref = sum(r["seconds_ref"] for r in results)
+    seconds_new = sum(r["seconds_new"] for r in results)
+    max_delta = max(r["max_delta"] for r in results)
+    print()
+    print(f"PDFs:             {len(results)} ({differing} differing)")
+    print(f"Max coord delta:  {max_delta:.3f} pt (identical word streams)")
+    print(f"Extraction time:  {REFERENCE} {seconds_ref:.2f}s, {backend} {seconds_new:.2f}s "
+          f"({seconds_ref / max(seconds_new, 1e-9):.1f}x)")
+    return 1 if differing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
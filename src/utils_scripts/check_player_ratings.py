@@ -0,0 +1,128 @@
+# src/utils_scripts/check_player_ratings.py
+"""
+Backfill / incremental consistency check for upd_player_ratings.
+
+Builds an in-memory database with the real schema (db.create_*_tables) and the connection's type
+parsing (PARSE_DECLTYPES, so DATE columns come back as datetime.date, as in get_conn), then
+- backfills the ratings from the first half of a synthetic singles history,
+- adds the second half (all dated after the watermark) and runs an incremental update,
+- runs a second backfill over everything and compares it with the incremental result.
+Fails (exit code 1) if the incremental run did not advance the watermark or if player_rating /
+player_rating_history differ from the backfill.
+
+Usage (from src/):  python utils_scripts/check_player_ratings.py [n_matches]
+"""
+import contextlib
+import datetime
+import io
+import logging
+import os
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+# ==================== CONFIG ====================
+SRC_ROOT = Path(__file__).resolve().parent.parent
+os.chdir(SRC_ROOT)
+sys.path.insert(0, str(SRC_ROOT))
+
+import db
+from upd_player_ratings import upd_player_ratings
+
+N_PLAYERS = 200
+N_MATCHES = 5000
+N_DAYS = 400
+FIRST_DAY = datetime.date(2020, 1, 1)
+SEED = 31
+TOLERANCE = 1e-6                # rating / rd / volatility difference allowed between the runs
+# ================================================
+
+
+def make_db() -> sqlite3.Connection:
+    db._register_sqlite_date_time_adapters()
+    conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+    # create_tables reports errors of tables the ratings don't use; keep the output to the check
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.create_and_populate_static_tables(conn.cursor(), logging.getLogger(__name__))
+        db.create_tables(conn.cursor())
+    return conn
+
+
+def insert_matches(cursor, matches: list) -> None:
+    cursor.executemany(
+        "INSERT INTO match (match_id, best_of, date, status, winner_side) VALUES (?, 5, ?, 'completed', ?)",
+        [(match_id, day, winner) for match_id, day, _, _, winner in matches]
+    )
+    cursor.executemany(
+        "INSERT INTO match_player (match_id, side_no, player_id, player_order) VALUES (?, ?, ?, 1)",
+        [row for match_id, _, p1, p2, _ in matches for row in ((match_id, 1, p1), (match_id, 2, p2))]
+    )
+    cursor.connection.commit()
+
+
+def ratings(cursor) -> tuple:
+    cursor.execute("SELECT player_id, rating, rd, volatility, matches, last_date FROM player_rating ORDER BY player_id")
+    current = cursor.fetchall()
+    cursor.execute("SELECT player_id, date, rating, rd FROM player_rating_history ORDER BY player_id, date")
+    return current, cursor.fetchall()
+
+
+def same(a: list, b: list) -> bool:
+    return len(a) == len(b) and all(
+        all(abs(x - y) <= TOLERANCE if isinstance(x, float) else x == y for x, y in zip(ra, rb))
+        for ra, rb in zip(a, b)
+    )
+
+
+def check_player_ratings(n_matches: int = N_MATCHES) -> bool:
+    rng = random.Random(SEED)
+    matches = []
+    for match_id, day in enumerate(sorted(rng.randrange(N_DAYS) for _ in range(n_matches)), start=1):
+        p1, p2 = rng.sample(range(1, N_PLAYERS + 1), 2)
+        matches.append((match_id, FIRST_DAY + datetime.timedelta(days=day), p1, p2, rng.choice((1, 2))))
+    split_day = matches[len(matches) // 2][1]
+    before = [m for m in matches if m[1] < split_day]
+    after = [m for m in matches if m[1] >= split_day]
+
+    conn = make_db()
+    cursor = conn.cursor()
+    ok = True
+
+    insert_matches(cursor, before)
+    upd_player_ratings(cursor)
+    cursor.execute("SELECT last_date FROM player_rating_watermark")
+    watermark = cursor.fetchone()
+    if watermark is None or watermark[0] != before[-1][1]:
+        print(f"❌ backfill:     watermark {watermark}, expected {before[-1][1]}")
+        ok = False
+    else:
+        print(f"✅ backfill:     {len(before):,} matches, watermark {watermark[0]}")
+
+    insert_matches(cursor, after)
+    upd_player_ratings(cursor)
+    cursor.execute("SELECT last_date FROM player_rating_watermark")
+    watermark = cursor.fetchone()
+    if watermark is None or watermark[0] != after[-1][1]:
+        print(f"❌ incremental:  watermark {watermark}, expected {after[-1][1]}")
+        ok = False
+    else:
+        print(f"✅ incremental:  {len(after):,} matches, watermark {watermark[0]}")
+    incremental = ratings(cursor)
+
+    upd_player_ratings(cursor, full=True)
+    backfill = ratings(cursor)
+    for name, inc, full in zip(("player_rating", "player_rating_history"), incremental, backfill):
+        if same(inc, full):
+            print(f"✅ {name:<22} incremental equals backfill ({len(full):,} rows)")
+        else:
+            print(f"❌ {name:<22} incremental ({len(inc):,} rows) differs from backfill ({len(full):,} rows)")
+            ok = False
+
+    conn.close()
+    return ok
+
+
+if __name__ == "__main__":
+    n_matches = int(sys.argv[1]) if len(sys.argv) >= 2 else N_MATCHES
+    sys.exit(0 if check_player_ratings(n_matches) else 1)
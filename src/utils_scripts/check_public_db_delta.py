@@ -0,0 +1,151 @@
+# src/utils_scripts/check_public_db_delta.py
+"""
+Delta / full consistency check for public_db_migration.
+
+Builds a small source DB with the real schema (db.create_*_tables) in a temporary directory,
+publishes it with a full build, then merges two players that both have matches
+(upd_players_verified.merge_players; the repointed rows keep their row_updated) and publishes
+the change with a delta build. A second full build of the same source is the reference.
+Fails (exit code 1) for either SUMMARY_ENGINE if a public cache table of the delta build differs
+from the full build, or if the delta build left source_db_hash empty.
+
+Usage (from src/):  python utils_scripts/check_public_db_delta.py
+"""
+import contextlib
+import io
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# ==================== CONFIG ====================
+SRC_ROOT = Path(__file__).resolve().parent.parent
+os.chdir(SRC_ROOT)
+sys.path.insert(0, str(SRC_ROOT))
+
+import db
+import utils_scripts.public_db_migration as pubdb
+from upd_players_verified import merge_players
+
+N_PLAYERS = 6                   # all play each other; one more player without matches sets the high-water mark
+MERGE = {3: 2}                  # loser → survivor, both with matches of their own
+SOURCE_TIMESTAMP = "2024-01-01 00:00:00"
+HIGH_WATER_MARK = "2024-02-01 00:00:00"
+ENGINES = ("numpy", "sql")
+CACHE_TABLES = [
+    "player_profile_cache",
+    "player_results_summary_cache",
+    "player_matches_cache",
+    "player_h2h_cache",
+    "player_name_fts",
+]
+# ================================================
+
+
+def make_source(path: str) -> None:
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    # create_tables stops at league_team_player (its primary key names a column the table lacks),
+    # before the club tables; an existing table makes that statement a no-op
+    cursor.execute("CREATE TABLE league_team_player (league_team_id INTEGER, player_id INTEGER)")
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.create_and_populate_static_tables(cursor, logging.getLogger(__name__))
+        db.create_raw_tables(cursor, logging.getLogger(__name__))
+        db.create_tables(cursor)
+
+    cursor.executemany(
+        "INSERT INTO player (player_id, firstname, lastname, fullname_raw, is_verified) VALUES (?, ?, ?, ?, 1)",
+        [(p, f"First{p}", f"Last{p}", f"Last{p} First{p}") for p in range(1, N_PLAYERS + 2)]
+    )
+    cursor.execute("INSERT INTO club (club_id, shortname, longname, club_type) VALUES (10, 'K1', 'K1', 1), (11, 'K2', 'K2', 1)")
+    cursor.execute("INSERT INTO tournament (tournament_id, shortname, startdate) VALUES (5, 'Cup', '2024-01-01')")
+    cursor.execute("""
+        INSERT INTO tournament_class (tournament_class_id, tournament_id, shortname, longname, startdate)
+        VALUES (7, 5, 'H', 'Herrar', '2024-01-02')
+    """)
+    # Every pair plays once; side 1 wins 11-5, 12-10
+    pairs = [(a, b) for a in range(1, N_PLAYERS + 1) for b in range(a + 1, N_PLAYERS + 1)]
+    for match_id, (p1, p2) in enumerate(pairs, start=100):
+        cursor.execute("INSERT INTO match (match_id, best_of, winner_side, status) VALUES (?, 5, 1, 'completed')", (match_id,))
+        cursor.execute("""
+            INSERT INTO match_player (match_id, side_no, player_id, player_order, club_id)
+            VALUES (?, 1, ?, 1, 10), (?, 2, ?, 1, 11)
+        """, (match_id, p1, match_id, p2))
+        cursor.execute("""
+            INSERT INTO game (match_id, game_no, points_side1, points_side2)
+            VALUES (?, 1, 11, 5), (?, 2, 12, 10)
+        """, (match_id, match_id))
+        cursor.execute("""
+            INSERT INTO tournament_class_match (tournament_class_id, match_id, tournament_class_stage_id)
+            VALUES (7, ?, 1)
+        """, (match_id,))
+
+    # Backdate all rows below the high-water mark (a delta recomputes rows stamped at the mark itself),
+    # so only what the merge touches is newer than the first build
+    for (table,) in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        for column in ("row_created", "row_updated") if table != "player_merge_log" else ():
+            if column in columns:
+                cursor.execute(f"UPDATE {table} SET {column} = ?", (SOURCE_TIMESTAMP,))
+    cursor.execute("UPDATE player SET row_updated = ? WHERE player_id = ?", (HIGH_WATER_MARK, N_PLAYERS + 1))
+    conn.commit()
+    conn.close()
+
+
+def dump(path: str) -> dict:
+    conn = sqlite3.connect(path)
+    tables = {t: sorted(map(repr, conn.execute(f"SELECT * FROM {t}").fetchall())) for t in CACHE_TABLES}
+    tables["source_db_hash"] = conn.execute("SELECT source_db_hash FROM cache_metadata").fetchone()[0]
+    conn.close()
+    return tables
+
+
+def check_engine(engine: str, tmp: str) -> bool:
+    source = os.path.join(tmp, f"source_{engine}.db")
+    make_source(source)
+    pubdb.SOURCE_DB         = source
+    pubdb.LOG_FILE          = os.path.join(tmp, "logs", "public_db_migration.log")
+    pubdb.SUMMARY_ENGINE    = engine
+    pubdb.MATCHES_WORKERS   = 1
+
+    delta_db = os.path.join(tmp, f"delta_{engine}.db")
+    full_db  = os.path.join(tmp, f"full_{engine}.db")
+    pubdb.OUT_DB = delta_db
+    pubdb.run_public_db_build("full")
+
+    conn = sqlite3.connect(source)
+    merge_players(conn.cursor(), MERGE)
+    conn.commit()
+    conn.close()
+
+    pubdb.run_public_db_build("delta")
+    pubdb.OUT_DB = full_db
+    pubdb.run_public_db_build("full")
+
+    delta, full = dump(delta_db), dump(full_db)
+    ok = True
+    for table in CACHE_TABLES:
+        if delta[table] == full[table]:
+            print(f"✅ {engine:<6} {table:<30} delta equals full ({len(full[table])} rows)")
+        else:
+            print(f"❌ {engine:<6} {table:<30} delta ({len(delta[table])} rows) differs from full ({len(full[table])} rows)")
+            ok = False
+    if delta["source_db_hash"]:
+        print(f"✅ {engine:<6} {'source_db_hash':<30} {delta['source_db_hash'][:16]}…")
+    else:
+        print(f"❌ {engine:<6} {'source_db_hash':<30} empty after the delta build")
+        ok = False
+    return ok
+
+
+def check_public_db_delta() -> bool:
+    with tempfile.TemporaryDirectory(prefix="pubdb_") as tmp:
+        results = [check_engine(engine, tmp) for engine in ENGINES]
+    return all(results)
+
+
+if __name__ == "__main__":
+    pubdb.LOG_LEVEL = "WARNING"
+    sys.exit(0 if check_public_db_delta() else 1)
@@ -0,0 +1,96 @@
+# src/utils_scripts/check_ranking_modes.py
+"""
+Parity check between the "rows" and "sql" modes of resolve_player_rankings.
+
+Builds an in-memory database with the real schema (db.create_*_tables) holding ranking rows that
+are valid or that each miss one field in a different way (NULL, '', year_born 0, no player_id_ext
+mapping), resolves them in full with both modes and compares player_ranking.
+Fails (exit code 1) if the modes resolve a different set of rows.
+
+Usage (from src/):  python utils_scripts/check_ranking_modes.py
+"""
+import contextlib
+import io
+import logging
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+# ==================== CONFIG ====================
+SRC_ROOT = Path(__file__).resolve().parent.parent
+os.chdir(SRC_ROOT)
+sys.path.insert(0, str(SRC_ROOT))
+
+import db
+from resolvers.resolve_player_rankings import resolve_player_rankings
+
+RUN_DATE = "2024-05-01"
+# (case, player_id_ext, firstname, year_born, points, mapped)
+ROWS = [
+    ("valid",                    "1",    "Anna",     "1990",     1200,   True),
+    ("valid, year_born integer", "2",    "Erik",     1985,       900,    True),
+    ("year_born NULL",           "3",    "Maria",    None,       800,    True),
+    ("year_born ''",             "4",    "Per",      "",         700,    True),
+    ("year_born 0",              "5",    "Olof",     0,          600,    True),
+    ("firstname ''",             "6",    "",         "1992",     500,    True),
+    ("points NULL",              "7",    "Karl",     "1993",     None,   True),
+    ("no player mapping",        "8",    "Eva",      "1994",     400,    False),
+]
+# ================================================
+
+
+def make_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    # create_tables reports errors of tables the rankings don't use; keep the output to the check
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.create_and_populate_static_tables(cursor, logging.getLogger(__name__))
+        db.create_raw_tables(cursor, logging.getLogger(__name__))
+        db.create_tables(cursor)
+    cursor.executemany(
+        "INSERT INTO player_id_ext (player_id, player_id_ext, data_source_id) VALUES (?, ?, 3)",
+        [(int(player_id_ext), player_id_ext) for _, player_id_ext, _, _, _, mapped in ROWS if mapped]
+    )
+    cursor.executemany("""
+        INSERT INTO player_ranking_raw (run_id_ext, run_date, player_id_ext, firstname, lastname, year_born,
+                                        club_name, points, points_change_since_last, position_world, position)
+        VALUES ('1', ?, ?, ?, 'L', ?, 'Club', ?, 0, 0, ?)
+    """, [(RUN_DATE, player_id_ext, firstname, year_born, points, position)
+          for position, (_, player_id_ext, firstname, year_born, points, _) in enumerate(ROWS, start=1)])
+    conn.commit()
+    return conn
+
+
+def resolved(mode: str) -> set:
+    conn = make_db()
+    cursor = conn.cursor()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resolve_player_rankings(cursor, full=True, mode=mode)
+    conn.commit()
+    cursor.execute("SELECT player_id_ext, points, position FROM player_ranking")
+    rows = set(cursor.fetchall())
+    conn.close()
+    return rows
+
+
+def check_ranking_modes() -> bool:
+    by_mode = {mode: resolved(mode) for mode in ("rows", "sql")}
+    ok = True
+    for case, player_id_ext, *_ in ROWS:
+        outcome = {mode: any(r[0] == player_id_ext for r in rows) for mode, rows in by_mode.items()}
+        text = ", ".join(f"{mode}: {'resolved' if hit else 'rejected'}" for mode, hit in outcome.items())
+        if len(set(outcome.values())) == 1:
+            print(f"✅ {case:<26} {text}")
+        else:
+            print(f"❌ {case:<26} {text}")
+            ok = False
+    if ok and by_mode["rows"] != by_mode["sql"]:
+        print(f"❌ player_ranking differs: rows {sorted(by_mode['rows'])}, sql {sorted(by_mode['sql'])}")
+        ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    sys.exit(0 if check_ranking_modes() else 1)
@@ -0,0 +1,89 @@
+# src/utils_scripts/check_startup_time.py
+"""
+Startup-time budget check for resolver-only / health-check runs.
+
+Imports each entry module in a fresh interpreter and fails (exit code 1) if
+- the import takes longer than BUDGET_SECONDS (best of RUNS), or
+- any heavy dependency in HEAVY_MODULES gets imported at module level.
+
+Heavy dependencies belong inside the functions that need them (setup_driver(), the
+scrapers imported in the do_scrape_* branches of upd_*, the Excel exports).
+
+Usage (from src/):  python utils_scripts/check_startup_time.py [budget_seconds]
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# ==================== CONFIG ====================
+SRC_ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_MODULES = [
+    "main",
+    "upd_tournament_data",
+    "upd_player_data",
+    "upd_league_data",
+]
+
+HEAVY_MODULES = [
+    "pandas",
+    "openpyxl",
+    "numpy",
+    "requests",
+    "selenium",
+    "webdriver_manager",
+    "pdfplumber",
+    "pypdfium2",
+    "bs4",
+]
+
+BUDGET_SECONDS = 1.0
+RUNS = 3                                             # best of N, first run also warms the .pyc cache
+# ================================================
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(module: str) -> dict:
+    code = PROBE.format(src=str(SRC_ROOT), module=module, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], cwd=SRC_ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{out.stderr.strip()}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check_startup_time(budget: float = BUDGET_SECONDS) -> bool:
+    ok = True
+    for module in ENTRY_MODULES:
+        try:
+            results = [probe(module) for _ in range(RUNS)]
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            ok = False
+            continue
+
+        seconds = min(r["seconds"] for r in results)
+        heavy   = sorted({m for r in results for m in r["heavy"]})
+
+        if seconds > budget or heavy:
+            ok = False
+            print(f"❌ {module:<22} {seconds:.3f}s (budget {budget:.2f}s)" + (f"  heavy imports: {', '.join(heavy)}" if heavy else ""))
+        else:
+            print(f"✅ {module:<22} {seconds:.3f}s")
+
+    if not ok:
+        print("ℹ️  Find the offending import with: python -X importtime -c 'import main' 2>&1 | sort -t'|' -k2 -n | tail")
+    return ok
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) >= 2 else BUDGET_SECONDS
+    sys.exit(0 if check_startup_time(budget) else 1)
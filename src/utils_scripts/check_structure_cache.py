@@ -0,0 +1,114 @@
+# src/utils_scripts/check_structure_cache.py
+"""
+Reuse check for the refined group structure cache (tournament_class_structure_cache).
+
+Runs resolve_tournament_classes._cached_group_structure for a groups-only class with stages 3
+and 4 against a temporary PDF store, with class_pdf_session replaced by a counting stand-in that
+serves fixed stage texts (the refinement settles on stage 4 and never reads stage 3). Fails
+(exit code 1) unless
+- the second resolve returns the cached structure without opening a PDF session,
+- a stage 3 PDF showing up later (not read by the refinement) keeps the cache,
+- a changed stage 4 PDF refines again.
+
+Usage (from src/):  python utils_scripts/check_structure_cache.py
+"""
+import contextlib
+import io
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# ==================== CONFIG ====================
+SRC_ROOT = Path(__file__).resolve().parent.parent
+os.chdir(SRC_ROOT)
+sys.path.insert(0, str(SRC_ROOT))
+
+import db
+import pdf_store
+import resolvers.resolve_tournament_classes as rtc
+from models.tournament_class_raw import TournamentClassRaw
+from utils import OperationLogger
+
+TOURNAMENT_ID_EXT = "000042"
+CLASS_ID_EXT = "4711"
+
+# Stage 4 has a 'Slutspel' section with carried (starred) and new results: groups → groups (4)
+STAGE_TEXTS = {
+    4: ["Pool 1\n1 Anna A 3\n2 Bert B 1\nSlutspel\nAnna A - Carl C 11-5 *3-1\nBert B - Dan D 3-1\n"],
+    3: ["Pool 1\n1 Anna A 3\n2 Bert B 1\n"],
+}
+# ================================================
+
+
+class CountingSession:
+    """Stand-in for ClassPdfSession: PDFs from the store, texts from STAGE_TEXTS."""
+    opened = 0
+
+    def __init__(self, tournament_id_ext: str, class_id_ext: str):
+        CountingSession.opened += 1
+        self.tournament_id_ext = tournament_id_ext
+        self.class_id_ext = class_id_ext
+
+    def download(self, stage: int):
+        path = pdf_store.pdf_store().path(self.tournament_id_ext, self.class_id_ext, stage)
+        return (path, False, None) if path else (None, False, f"No stage {stage} PDF")
+
+    def text(self, stage: int, **options):
+        return STAGE_TEXTS[stage]
+
+
+def check_structure_cache() -> bool:
+    pdf_store._store = pdf_store.PdfStore(tempfile.mkdtemp(prefix="pdf_store_"))
+    rtc.class_pdf_session = CountingSession
+    store = pdf_store.pdf_store()
+    store.put(TOURNAMENT_ID_EXT, CLASS_ID_EXT, 4, b"%PDF-1.4 stage 4")
+
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    # create_tables reports errors of tables the check doesn't use; keep the output to the check
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.create_and_populate_static_tables(cursor, logging.getLogger(__name__))
+        db.create_tables(cursor)
+    logger = OperationLogger(
+        verbosity       = 0,
+        print_output    = False,
+        log_to_db       = False,
+        cursor          = cursor,
+        object_type     = "tournament_class",
+        run_type        = "check",
+    )
+    raw = TournamentClassRaw.from_dict({
+        "tournament_class_id_ext":  CLASS_ID_EXT,
+        "data_source_id":           1,
+        "raw_stages":               "1,3,4",
+        "raw_stage_hrefs":          {"3": "stage3", "4": "stage4"},
+    })
+
+    def resolve() -> int:
+        return rtc._cached_group_structure(cursor, raw, TOURNAMENT_ID_EXT, logger=logger, logger_keys={})
+
+    ok = True
+    steps = [
+        ("first resolve refines",                   lambda: None,                                                                   1),
+        ("second resolve uses the cache",           lambda: None,                                                                   1),
+        ("unread stage 3 PDF keeps the cache",      lambda: store.put(TOURNAMENT_ID_EXT, CLASS_ID_EXT, 3, b"%PDF-1.4 stage 3"),     1),
+        ("changed stage 4 PDF refines again",       lambda: store.put(TOURNAMENT_ID_EXT, CLASS_ID_EXT, 4, b"%PDF-1.4 stage 4 v2"),  2),
+    ]
+    for name, change, expected_sessions in steps:
+        change()
+        structure_id = resolve()
+        if structure_id == 4 and CountingSession.opened == expected_sessions:
+            print(f"✅ {name:<40} structure {structure_id}, {CountingSession.opened} PDF session(s)")
+        else:
+            print(f"❌ {name:<40} structure {structure_id}, {CountingSession.opened} PDF session(s) (expected 4, {expected_sessions})")
+            ok = False
+
+    conn.close()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_structure_cache() else 1)
@@ -4,17 +4,18 @@
 # Run from the repo root with `PYTHONPATH=src python -m utils_scripts.download_pdf`.
 
 import time
-import requests
 from pathlib import Path
 from db import get_conn
+from pdf_store import PdfStore
 from models.tournament import Tournament
 from models.tournament_class import TournamentClass
 from utils import parse_date, OperationLogger
 
-PDF_BASE = "https://resultat.ondata.se/ViewClassPDF.php"
 CACHE_DIR = Path("data/pdfs")
 STAGES = range(1, 7)  # Always try stages 1–6
 FORCE_DOWNLOAD = True  # Toggle to force re-downloading every PDF even if cached.
+REFETCH_AFTER_DAYS = None  # Re-download cached PDFs fetched longer ago than this, None = keep them
+RECHECK_UNAVAILABLE_DAYS = 7  # Ask OnData again for stages it had no PDF for after this many days, None = every run
 
 ENABLE_STAGE_PAUSE = True
 STAGE_PAUSE_SECONDS = 0.1
@@ -86,47 +87,65 @@ def main():
         to_console=True,
     )
 
+    store = PdfStore(CACHE_DIR)
+    sync_stats = store.sync()
+    logger.info(
+        "sync",
+        f"Manifest synced with {CACHE_DIR}: {sync_stats['files']} files | adopted: {sync_stats['adopted']}, "
+        f"invalid removed: {sync_stats['invalid_removed']}, forgotten: {sync_stats['forgotten']}, "
+        f"unused objects removed: {sync_stats['objects_removed']}",
+        show_key=False,
+        to_console=True,
+    )
+
+    # What to fetch, from the manifest in bulk
+    targets = [(tournament_ext, class_ext, stage) for _, tournament_ext, class_ext, stage_targets in class_rows for stage in stage_targets]
+    present = set(store.present(targets))
+    if FORCE_DOWNLOAD:
+        to_fetch = set(targets)
+    else:
+        to_fetch = set(store.missing(targets, recheck_after_days=RECHECK_UNAVAILABLE_DAYS))
+        if REFETCH_AFTER_DAYS is not None:
+            to_fetch |= set(store.stale(targets, REFETCH_AFTER_DAYS))
+
     overall_stats = {
         "stages": 0,
         "downloaded": 0,
         "redownloaded": 0,
         "cached": 0,
+        "unavailable": 0,
         "failed": 0,
     }
 
     for tc, tournament_ext, class_ext, stage_targets in class_rows:
-        stats = {"cached": 0, "downloaded": 0, "redownloaded": 0, "failed": 0}
+        stats = {"cached": 0, "downloaded": 0, "redownloaded": 0, "unavailable": 0, "failed": 0}
         failure_notes: list[str] = []
         for stage in stage_targets:
             overall_stats["stages"] += 1
-            _, status, reason = _fetch_stage_pdf(
-                tournament_ext,
-                class_ext,
-                stage,
-                force_download=FORCE_DOWNLOAD,
-            )
+            target = (tournament_ext, class_ext, stage)
+            if target not in to_fetch:
+                status = "cached" if target in present else "unavailable"
+                reason = None
+            else:
+                _, status, reason = _fetch_stage_pdf(store, tournament_ext, class_ext, stage, cached_before=target in present)
 
             logger.inc_processed()
 
+            stats[status] += 1
+            overall_stats[status] += 1
             if status == "cached":
-                stats["cached"] += 1
-                overall_stats["cached"] += 1
                 logger.success("PDF already cached")
             elif status == "downloaded":
-                stats["downloaded"] += 1
-                overall_stats["downloaded"] += 1
                 logger.success("PDF downloaded")
             elif status == "redownloaded":
-                stats["redownloaded"] += 1
-                overall_stats["redownloaded"] += 1
                 logger.success("PDF re-downloaded")
+            elif status == "unavailable":
+                logger.success("No PDF at last check")
             else:
-                stats["failed"] += 1
-                overall_stats["failed"] += 1
                 failure_notes.append(f"Stage {stage}: {reason}")
                 logger.failed(f"PDF download failed: {reason}")
 
-            if ENABLE_STAGE_PAUSE and STAGE_PAUSE_SECONDS > 0:
+            if target in to_fetch and ENABLE_STAGE_PAUSE and STAGE_PAUSE_SECONDS > 0:
                 time.sleep(STAGE_PAUSE_SECONDS)
 
         context = {
@@ -135,7 +154,7 @@ def main():
         }
         summary = (
             f"cached={stats['cached']}, downloaded={stats['downloaded']}, "
-            f"redownloaded={stats['redownloaded']}, failed={stats['failed']}"
+            f"redownloaded={stats['redownloaded']}, unavailable={stats['unavailable']}, failed={stats['failed']}"
         )
         if failure_notes:
             summary += " | errors: " + "; ".join(failure_notes)
@@ -147,7 +166,8 @@ def main():
         "class_summary",
         f"{len(class_rows)} classes processed | "
         f"Cached stages: {overall_stats['cached']}, Downloaded: {overall_stats['downloaded']}, "
-        f"Re-downloaded: {overall_stats['redownloaded']}, Failed: {overall_stats['failed']}",
+        f"Re-downloaded: {overall_stats['redownloaded']}, Unavailable: {overall_stats['unavailable']}, "
+        f"Failed: {overall_stats['failed']}",
         show_key=False,
         to_console=True,
     )
@@ -155,7 +175,7 @@ def main():
         "totals",
         f"Stages attempted: {overall_stats['stages']}, cached: {overall_stats['cached']}, "
         f"downloaded: {overall_stats['downloaded']}, redownloaded: {overall_stats['redownloaded']}, "
-        f"failed: {overall_stats['failed']}",
+        f"unavailable: {overall_stats['unavailable']}, failed: {overall_stats['failed']}",
         show_key=False,
         to_console=True,
     )
@@ -165,57 +185,20 @@ def main():
 
 
 
-def get_pdf_path(tournament_id_ext: str, class_id_ext: str, stage: int) -> Path:
-    return CACHE_DIR / f"tournament_{tournament_id_ext}" / f"class_{class_id_ext}" / f"stage_{stage}.pdf"
-
-
-
-def is_valid_pdf(path: Path) -> bool:
-    """Check if file starts with %PDF- header."""
-    try:
-        with open(path, "rb") as f:
-            header = f.read(5)
-            return header == b"%PDF-"
-    except Exception:
-        return False
-
-
-def _fetch_stage_pdf(tournament_id_ext: str, class_id_ext: str, stage: int, force_download: bool) -> tuple[Path | None, str, str]:
+def _fetch_stage_pdf(store: PdfStore, tournament_id_ext: str, class_id_ext: str, stage: int, cached_before: bool) -> tuple[Path | None, str, str]:
     """
-    Ensure a PDF for the given stage exists. Returns (path, status, reason).
-    Status is one of {'cached', 'downloaded', 'redownloaded', 'failed'}.
+    Download the PDF of a stage into the store. Returns (path, status, reason).
+    Status is one of {'cached', 'downloaded', 'redownloaded', 'unavailable', 'failed'}.
     """
-    pdf_path = get_pdf_path(tournament_id_ext, class_id_ext, stage)
-    cached_before = pdf_path.exists() and is_valid_pdf(pdf_path)
-    if pdf_path.exists() and not cached_before:
-        try:
-            pdf_path.unlink()
-        except Exception:
-            pass
-        cached_before = False
-
-    if cached_before and not force_download:
-        return pdf_path, "cached", "Cached PDF available"
-
-    if cached_before and force_download and pdf_path.exists():
-        try:
-            pdf_path.unlink()
-        except Exception:
-            pass
-
-    url = f"{PDF_BASE}?tournamentID={tournament_id_ext}&classID={class_id_ext}&stage={stage}"
-    pdf_path.parent.mkdir(parents=True, exist_ok=True)
-
     last_reason = "Failed to download"
     for attempt in range(1, MAX_STAGE_ATTEMPTS + 1):
         try:
-            resp = requests.get(url, timeout=20)
-            if resp.status_code == 200 and resp.content.startswith(b"%PDF-"):
-                with open(pdf_path, "wb") as handle:
-                    handle.write(resp.content)
-                status = "redownloaded" if cached_before and force_download else "downloaded"
-                return pdf_path, status, "Downloaded PDF"
-            last_reason = f"Stage {stage} responded with status {resp.status_code}"
+            pdf_path, downloaded, message = store.fetch(tournament_id_ext, class_id_ext, stage, raise_errors=True)
+            if pdf_path is not None:
+                if not downloaded:
+                    return pdf_path, "cached", message
+                return pdf_path, "redownloaded" if cached_before else "downloaded", message
+            last_reason = message
         except Exception as exc:
             last_reason = f"Stage {stage} download error (attempt {attempt}): {exc}"
 
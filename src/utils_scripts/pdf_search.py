@@ -1,15 +1,19 @@
 # src/utils_scripts/pdf_search.py   ←  FINAL + shows active filters
 import os
-import re
 import time
 import sys
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from pypdf import PdfReader
 
 # ==================== CONFIG & FILTERS ====================
 SCRIPT_PATH = Path(__file__).resolve()
 PROJECT_ROOT = SCRIPT_PATH.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import PDF_BACKEND
+from pdf_store import PdfStore
+from pdf_text_index import PdfTextIndex
+
+BACKEND = PDF_BACKEND                                # Text extraction when indexing new PDFs, "pdfium" (fast) or "pdfplumber"
 ROOT_FOLDER = PROJECT_ROOT / "data" / "pdfs"
 
 KEYWORD = "hamren"                                   # default if no CLI argument
@@ -24,49 +28,15 @@ TOURNAMENT_MAX = 999999
 # TOURNAMENT_MAX = 1400
 
 MAX_MATCHES = 10
-MAX_WORKERS = os.cpu_count() * 2
+MAX_WORKERS = os.cpu_count()                         # Indexing processes
 # ========================================================
 
-def extract_ids(pdf_path: Path):
-    path_str = str(pdf_path)
-    tour_match = re.search(r"tournament_(\d+)", path_str)
-    class_match = re.search(r"class_(\d+)", path_str)
-    stage_match = re.search(r"stage_(\d+)\.pdf", path_str)
-
-    if not (tour_match and class_match and stage_match):
-        return None, None, None, None
-
-    tournament_raw = tour_match.group(1)
-    tournament_id_padded = tournament_raw.zfill(6)
-    tournament_id_int = int(tournament_raw)
-    class_id = class_match.group(1)
-    stage = int(stage_match.group(1))
-
-    return tournament_id_padded, tournament_id_int, class_id, stage
-
-
 def build_links(tournament_id: str, class_id: str, stage: int):
     tournament_url = f"https://resultat.ondata.se/{tournament_id}/"
     class_pdf_url = f"https://resultat.ondata.se/ViewClassPDF.php?classID={class_id}&stage={stage}"
     return tournament_url, class_pdf_url
 
 
-def search_single_pdf(args):
-    pdf_path, keyword = args
-    try:
-        reader = PdfReader(pdf_path)
-        if reader.is_encrypted:
-            try: reader.decrypt("")
-            except: return None
-        for page in reader.pages:
-            text = page.extract_text() or ""
-            if keyword.lower() in text.lower():
-                return str(pdf_path)
-    except:
-        pass
-    return None
-
-
 def get_active_filters_description():
     filters = []
     if ALLOWED_STAGES:
@@ -84,61 +54,50 @@ def find_pdfs_with_keyword(keyword: str):
         print(f"ERROR: Folder not found → {root_path}")
         return
 
-    filtered_pdfs = []
-    for p in root_path.rglob("*.pdf"):
-        tid_pad, tid_int, cid, stage = extract_ids(p)
-        if tid_pad is None:
-            continue
-        if ALLOWED_STAGES and stage not in ALLOWED_STAGES:
-            continue
-        if tid_int < TOURNAMENT_MIN or tid_int > TOURNAMENT_MAX:
-            continue
-        filtered_pdfs.append(p)
-
-    total = len(filtered_pdfs)
-    if total == 0:
-        print("No PDFs match the current filters.")
-        return
-
-    filtered_pdfs.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    # Files come from the PDF manifest, text from the full-text index (new/changed PDFs indexed first)
+    store = PdfStore(root_path)
+    if store.count() == 0:
+        print("Building the PDF manifest (first run)...")
+        store.sync()
+    index = PdfTextIndex(store)
+    index_start = time.time()
+    stats = index.update(backend=BACKEND, max_workers=MAX_WORKERS)
+    if stats["indexed"] or stats["removed"]:
+        print(f"Indexed {stats['indexed']:,} new/changed PDFs ({stats['pages']:,} pages, {stats['failed']} failed), "
+              f"removed {stats['removed']:,} in {time.time() - index_start:.2f} seconds")
 
     filter_desc = get_active_filters_description()
-    print(f"Searching for '{keyword}' in {total:,} PDFs")
+    print(f"Searching for '{keyword}' in {index.count():,} indexed PDFs")
     if filter_desc != "no filters":
         print(f"   Active filters → {filter_desc}")
     print()
 
     start_time = time.time()
-    matches = []
-
-    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(search_single_pdf, (p, keyword)): p for p in filtered_pdfs}
-
-        for future in as_completed(futures):
-            result = future.result()
-            if result:
-                matches.append(result)
-                if len(matches) >= MAX_MATCHES:
-                    for f in futures:
-                        f.cancel()
-                    break
-
+    hits = index.search(
+        keyword,
+        stages          = ALLOWED_STAGES or None,
+        tournament_min  = TOURNAMENT_MIN if TOURNAMENT_MIN > 0 else None,
+        tournament_max  = TOURNAMENT_MAX if TOURNAMENT_MAX < 999999 else None,
+    )
     elapsed = time.time() - start_time
-    scanned = sum(f.done() for f in futures)
+
+    matches: dict[str, list] = {}                    # path → hits (pages), newest first
+    for hit in hits:
+        matches.setdefault(hit.path, []).append(hit)
 
     print("═" * 80)
     if matches:
-        print(f"Done! Found {len(matches)} match(es) in {elapsed:.2f} seconds")
-        if len(matches) == MAX_MATCHES:
-            print(f"   (stopped early after ~{scanned:,} of {total:,} filtered PDFs)\n")
-
-        for m in matches:
-            tid_pad, tid_int, cid, stage = extract_ids(Path(m))
-            print(m)
-            if tid_pad and cid is not None and stage is not None:
-                t_url, c_url = build_links(tid_pad, cid, stage)
-                print(f"   → Class PDF : {c_url}")
-                print(f"   → Tournament: {t_url}")
+        print(f"Done! Found {len(matches)} matching PDF(s) in {elapsed * 1000:.1f} ms")
+        if len(matches) > MAX_MATCHES:
+            print(f"   (showing the {MAX_MATCHES} most recently fetched)\n")
+
+        for path, page_hits in list(matches.items())[:MAX_MATCHES]:
+            m = page_hits[0]
+            print(root_path / path)
+            print(f"   → Page {', '.join(str(h.page) for h in page_hits)}: {' '.join(m.snippet.split())}")
+            t_url, c_url = build_links(m.tournament_id_ext, m.class_id_ext, m.stage)
+            print(f"   → Class PDF : {c_url}")
+            print(f"   → Tournament: {t_url}")
             print()
     else:
         print(f"No matches found for '{keyword}'")
@@ -15,6 +15,7 @@
 #      - player_profile_cache
 #      - player_results_summary_cache
 #      - player_matches_cache
+#      - player_h2h_cache (from src.player_h2h, both directions per pair)
 #    and a name FTS index:
 #      - player_name_fts
 # 3) **Opaque public IDs**: Every player gets a stable `public_id = HMAC(salt, player_id)`.
@@ -32,6 +33,12 @@
 # -----------------
 # - The build writes to OUT_DB.tmp, runs PRAGMA integrity_check + VACUUM, and atomically swaps it
 #   into OUT_DB. If anything fails, we never replace the old file.
+# - Delta mode (BUILD_MODE = "delta") copies the current OUT_DB to OUT_DB.tmp and only recomputes
+#   players whose source rows changed since the high-water mark stored in cache_metadata
+#   (max row_created/row_updated of the source tables at the previous build). It falls back to a
+#   full rebuild when there is no usable OUT_DB/high-water mark. Pure deletions are picked up for
+#   matches and players, player merges through player_merge_log; anything else that doesn't touch
+#   a timestamp (e.g. renamed clubs or tournaments) needs BUILD_MODE = "full".
 # - This file uses module variables (no CLI) to make it easy to run from your IDE/venv.
 #
 # How to run
@@ -45,7 +52,8 @@
 from __future__ import annotations
 
 import datetime as dt
-import hashlib, hmac, os, sqlite3, sys, json, time, logging
+import hashlib, hmac, os, shutil, sqlite3, sys, json, time, logging
+from concurrent.futures import ProcessPoolExecutor
 from logging.handlers import TimedRotatingFileHandler
 from contextlib import closing
 from pathlib import Path
@@ -55,6 +63,7 @@ from pathlib import Path
 # (Not strictly needed right now; safe to keep for future-proofing.)
 # ────────────────────────────────────────────────────────────────────────────
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from player_stats_engine import compute_player_stats, write_stats_tables
 # Example future imports (currently unused):
 # from config import DB_NAME, PUBLIC_DB_NAME
 # from db import get_conn
@@ -71,6 +80,15 @@ LOG_FILE    = "/home/filip/dev/pingiskollen/data/logs/public_db_migration.log"
 LOG_LEVEL   = os.getenv("PUBDB_LOG_LEVEL", "INFO").upper()
 
 
+# "delta": incremental update of OUT_DB (falls back to full when not possible) | "full": rebuild from scratch
+BUILD_MODE  = os.getenv("PUBDB_BUILD_MODE", "delta").lower()
+
+# "numpy": player_results_summary_cache aggregates via player_stats_engine | "sql": GROUP BY CTEs
+SUMMARY_ENGINE = os.getenv("PUBDB_SUMMARY_ENGINE", "numpy").lower()
+
+# Worker processes for the player_matches_cache phase of full builds (1 = single INSERT…SELECT)
+MATCHES_WORKERS = int(os.getenv("PUBDB_MATCHES_WORKERS", os.cpu_count() or 1))
+
 # Optional preference for a specific data source, if in the future you want to prefer e.g. the Swedish list.
 # Keep as None for neutral behavior. If set to an integer, we bias ties toward that data_source_id.
 PREFER_DATA_SOURCE_ID: int | None = None  # e.g. 3
@@ -217,6 +235,25 @@ CREATE TABLE player_matches_cache (
 );
 """
 
+DDL_PLAYER_H2H_CACHE = """
+-- Two rows per pair of opponents (one per perspective), so an H2H page is a single PK lookup
+-- and a player's opponent list is a prefix scan.
+CREATE TABLE player_h2h_cache (
+  public_id            TEXT NOT NULL,    -- The player's public id
+  opponent_public_id   TEXT NOT NULL,    -- Opponent's public id
+  opponent_name        TEXT NOT NULL,
+  matches              INTEGER NOT NULL,
+  wins                 INTEGER NOT NULL,
+  losses               INTEGER NOT NULL,
+  sets_won             INTEGER NOT NULL,
+  sets_lost            INTEGER NOT NULL,
+  last_match_id        INTEGER,
+  last_match_date      NUMERIC,
+  match_ids            TEXT,             -- Comma-separated internal match_ids, newest first
+  PRIMARY KEY (public_id, opponent_public_id)
+) WITHOUT ROWID;
+"""
+
 DDL_FTS = """
 -- Full-text search on players (name/club/year). public_id is UNINDEXED but carried along for result mapping.
 CREATE VIRTUAL TABLE player_name_fts USING fts5(
@@ -236,7 +273,11 @@ CREATE TABLE cache_metadata (
   source_db_hash  TEXT NOT NULL,   -- SHA-256 of Source DB at build time
   rows_profile    INTEGER NOT NULL,
   rows_summary    INTEGER NOT NULL,
-  rows_matches    INTEGER NOT NULL
+  rows_matches    INTEGER NOT NULL,
+  rows_h2h        INTEGER,
+  build_mode      TEXT,            -- 'full' | 'delta'
+  high_water_mark TEXT,            -- Max row_created/row_updated seen in the Source DB (delta cursor)
+  rows_delta      INTEGER          -- Players recomputed by a delta build (NULL for full builds)
 );
 """
 
@@ -247,6 +288,8 @@ INDEXES = [
     # Matches: fast access per player, newest first (tie-break by match_id)
     "CREATE INDEX ix_pmc_player_date ON player_matches_cache(public_id, match_date DESC, match_id DESC);",
     "CREATE INDEX ix_pmc_match_id     ON player_matches_cache(match_id);",
+    # H2H: purge/refresh by opponent in delta builds
+    "CREATE INDEX ix_h2h_opponent ON player_h2h_cache(opponent_public_id);",
 ]
 
 # ────────────────────────────────────────────────────────────────────────────
@@ -276,8 +319,8 @@ END
 #  - Your model: player → (many) player_id_ext → (many) player_ranking rows.
 #  - We must collapse this to exactly ONE row per player (no fan-out). We do it in stages:
 #
-#    ext_latest: latest row per (player_id_ext, data_source_id)
-#    ext_last_change: last run_date per ext where points actually changed
+#    ext_latest: latest row per (player_id_ext, data_source_id) and the last run_date where points
+#                actually changed, read from player_ranking_history (no window over player_ranking)
 #    ranking_points_per_player: choose the best ext for each player with this order:
 #       1) most recent run_date,
 #       2) most recent "last change" run_date (if ties on 1),
@@ -288,7 +331,12 @@ END
 #       ORDER BY (preferred first), then the rest as above.
 # ────────────────────────────────────────────────────────────────────────────
 
-def _insert_ppc_sql(prefer_ds: int | None) -> str:
+def _only_subset(col: str, subset: bool) -> str:
+    """Extra WHERE predicate restricting a CTE to the players in tmp_player_subset (delta builds, shards)."""
+    return f"AND {col} IN (SELECT player_id FROM tmp_player_subset)" if subset else ""
+
+
+def _insert_ppc_sql(prefer_ds: int | None, subset: bool = False) -> str:
     prefer_clause = "0"  # neutral (no preference)
     if prefer_ds is not None:
         prefer_clause = f"CASE WHEN el.data_source_id = {int(prefer_ds)} THEN 0 ELSE 1 END"
@@ -301,6 +349,7 @@ WITH recent_license AS (
     FROM src.player_license pl
     JOIN src.season s ON s.season_id = pl.season_id
     JOIN src.club   c ON c.club_id   = pl.club_id
+    WHERE 1 = 1 {_only_subset("pl.player_id", subset)}
 ),
 recent_tournament AS (
     SELECT tcp.player_id,
@@ -312,6 +361,7 @@ recent_tournament AS (
     JOIN src.tournament_class_entry tce ON tce.tournament_class_entry_id = tcp.tournament_class_entry_id
     JOIN src.tournament_class tc        ON tc.tournament_class_id        = tce.tournament_class_id
     JOIN src.tournament t               ON t.tournament_id               = tc.tournament_id
+    WHERE 1 = 1 {_only_subset("tcp.player_id", subset)}
 ),
 recent_transition AS (
     SELECT pt.player_id,
@@ -321,40 +371,31 @@ recent_transition AS (
     JOIN src.club cf ON pt.club_id_from = cf.club_id
     JOIN src.club ct ON pt.club_id_to   = ct.club_id
     JOIN src.season s ON pt.season_id   = s.season_id
+    WHERE 1 = 1 {_only_subset("pt.player_id", subset)}
 ),
 ranking_groups AS (
     SELECT prg.player_id, GROUP_CONCAT(rg.class_short, ', ') AS ranking_groups
     FROM src.player_ranking_group prg
     JOIN src.ranking_group rg ON rg.ranking_group_id = prg.ranking_group_id
+    WHERE 1 = 1 {_only_subset("prg.player_id", subset)}
     GROUP BY prg.player_id
 ),
 
--- Latest ranking row per (player_id_ext, data_source_id).
+-- Latest ranking row and last date where points actually changed per (player_id_ext, data_source_id),
+-- both kept on the packed ranking history (one row per ext, refreshed by resolve_player_rankings).
 ext_latest AS (
   SELECT
     pie.player_id,
-    pr.player_id_ext,
-    pr.data_source_id,
-    pr.points,
-    pr.run_date,
-    ROW_NUMBER() OVER (
-      PARTITION BY pr.player_id_ext, pr.data_source_id
-      ORDER BY pr.run_date DESC
-    ) AS rn_ext
+    prh.player_id_ext,
+    prh.data_source_id,
+    prh.last_points AS points,
+    prh.last_run_date AS run_date,
+    prh.last_change_date AS last_change_run_date
   FROM src.player_id_ext pie
-  JOIN src.player_ranking pr
-    ON pr.player_id_ext = pie.player_id_ext
-   AND pr.data_source_id = pie.data_source_id
-),
-
--- Last date where points actually changed per (player_id_ext, data_source_id).
-ext_last_change AS (
-  SELECT
-    pr.player_id_ext,
-    pr.data_source_id,
-    MAX(CASE WHEN pr.points_change_since_last <> 0 THEN pr.run_date END) AS last_change_run_date
-  FROM src.player_ranking pr
-  GROUP BY pr.player_id_ext, pr.data_source_id
+  JOIN src.player_ranking_history prh
+    ON prh.player_id_ext = pie.player_id_ext
+   AND prh.data_source_id = pie.data_source_id
+  WHERE 1 = 1 {_only_subset("pie.player_id", subset)}
 ),
 
 -- Choose ONE "best" ext per player with deterministic tie-breakers.
@@ -368,15 +409,11 @@ ranking_points_per_player AS (
         ORDER BY
           {prefer_clause},                                   -- preferred DS first (if configured)
           el.run_date DESC,                                  -- 1) most recent run
-          COALESCE(lc.last_change_run_date, '0000-00-00') DESC, -- 2) most recent actual change
+          COALESCE(el.last_change_run_date, '0000-00-00') DESC, -- 2) most recent actual change
           el.points DESC,                                    -- 3) higher points
           el.player_id_ext                                   -- 4) stable tiebreak
       ) AS rn
     FROM ext_latest el
-    LEFT JOIN ext_last_change lc
-      ON lc.player_id_ext = el.player_id_ext
-     AND lc.data_source_id = el.data_source_id
-    WHERE el.rn_ext = 1
   ) x
   WHERE x.rn = 1
 )
@@ -406,19 +443,21 @@ LEFT JOIN recent_license rl     ON rl.player_id = p.player_id AND rl.rn = 1
 LEFT JOIN recent_tournament rt  ON rt.player_id = p.player_id AND rt.rn = 1
 LEFT JOIN ranking_groups rg      ON rg.player_id = p.player_id
 LEFT JOIN recent_transition tr   ON tr.player_id = p.player_id AND tr.rn = 1
-LEFT JOIN ranking_points_per_player rpp ON rpp.player_id = p.player_id;
+LEFT JOIN ranking_points_per_player rpp ON rpp.player_id = p.player_id
+WHERE 1 = 1 {_only_subset("p.player_id", subset)};
 """
 
 
-# Player results summary: aggregate per player over completed, non-walkover matches
-INSERT_SUMMARY = f"""
+# Player results summary: aggregate per player over completed, non-walkover matches.
+def _summary_stats_ctes(subset: bool = False) -> str:
+    return f"""
 WITH match_stats AS (
     SELECT mp.player_id,
            COUNT(DISTINCT m.match_id) AS total_matches,
            SUM(CASE WHEN m.winner_side = mp.side_no THEN 1 ELSE 0 END) AS match_wins
     FROM src.match_player mp
     JOIN src.match m ON m.match_id = mp.match_id
-    WHERE m.status = 'completed' AND m.walkover_side IS NULL
+    WHERE m.status = 'completed' AND m.walkover_side IS NULL {_only_subset("mp.player_id", subset)}
     GROUP BY mp.player_id
 ),
 game_stats AS (
@@ -442,9 +481,21 @@ game_stats AS (
     FROM src.match_player mp
     JOIN src.match m ON m.match_id = mp.match_id
     JOIN src.game  g ON g.match_id = m.match_id
-    WHERE m.status = 'completed' AND m.walkover_side IS NULL
+    WHERE m.status = 'completed' AND m.walkover_side IS NULL {_only_subset("mp.player_id", subset)}
     GROUP BY mp.player_id
 )
+"""
+
+
+# With precomputed=True the match_stats/game_stats CTEs are replaced by the TEMP tables written by
+# player_stats_engine (same columns), so rounding/percentages/names stay identical.
+def _insert_summary_sql(subset: bool = False, precomputed: bool = False) -> str:
+    if precomputed:
+        stats_ctes, match_stats, game_stats = "", "tmp_match_stats", "tmp_game_stats"
+    else:
+        stats_ctes, match_stats, game_stats = _summary_stats_ctes(subset), "match_stats", "game_stats"
+    return f"""
+{stats_ctes}
 INSERT INTO player_results_summary_cache(
   public_id, player_name,
   total_matches, match_wins, match_losses, match_win_percentage,
@@ -481,17 +532,24 @@ SELECT
   gs.min_points_lost_in_set
 FROM src.player p
 JOIN tmp_public_id_map map ON map.player_id = p.player_id
-LEFT JOIN match_stats ms ON ms.player_id = p.player_id
-LEFT JOIN game_stats  gs ON gs.player_id = p.player_id;
+LEFT JOIN {match_stats} ms ON ms.player_id = p.player_id
+LEFT JOIN {game_stats}  gs ON gs.player_id = p.player_id
+WHERE 1 = 1 {_only_subset("p.player_id", subset)};
 """
 
+INSERT_SUMMARY = _insert_summary_sql()
+
 # Player matches: one row per (player, match), with opponents compacted and context attached.
-INSERT_MATCHES = f"""
+def _insert_matches_sql(subset: bool = False) -> str:
+    # Per-match CTEs only need the matches of the selected players
+    only_base_matches = "AND g.match_id IN (SELECT match_id FROM base)" if subset else ""
+    return f"""
 WITH base AS (
   SELECT mp.player_id, mp.match_id, mp.side_no,
          m.date AS match_date, m.best_of, m.status, m.walkover_side, m.winner_side AS winner_side_db
   FROM src.match_player mp
   JOIN src.match m ON m.match_id = mp.match_id
+  WHERE 1 = 1 {_only_subset("mp.player_id", subset)}
 ),
 
 -- Opponents (supports doubles: there can be 1 or more opponents)
@@ -529,7 +587,7 @@ games_calc AS (
   SELECT g.match_id,
          SUM(CASE WHEN g.points_side1 > g.points_side2 THEN 1 ELSE 0 END) AS side1_sets_won,
          SUM(CASE WHEN g.points_side2 > g.points_side1 THEN 1 ELSE 0 END) AS side2_sets_won
-  FROM src.game g GROUP BY g.match_id
+  FROM src.game g WHERE 1 = 1 {only_base_matches} GROUP BY g.match_id
 ),
 games_winner AS (
   SELECT match_id,
@@ -542,12 +600,12 @@ games_winner AS (
 scores_side1 AS (
   SELECT g.match_id,
          GROUP_CONCAT(g.game_no || ':' || g.points_side1 || '-' || g.points_side2, '; ') AS score_text
-  FROM src.game g GROUP BY g.match_id
+  FROM src.game g WHERE 1 = 1 {only_base_matches} GROUP BY g.match_id
 ),
 scores_side2 AS (
   SELECT g.match_id,
          GROUP_CONCAT(g.game_no || ':' || g.points_side2 || '-' || g.points_side1, '; ') AS score_text
-  FROM src.game g GROUP BY g.match_id
+  FROM src.game g WHERE 1 = 1 {only_base_matches} GROUP BY g.match_id
 ),
 
 -- Tournament/class stage context for UI
@@ -561,6 +619,7 @@ ctx AS (
   LEFT JOIN src.tournament_class tc ON tc.tournament_class_id = tcm.tournament_class_id
   LEFT JOIN src.tournament t        ON t.tournament_id        = tc.tournament_id
   LEFT JOIN src.tournament_class_stage tcs ON tcs.tournament_class_stage_id = tcm.tournament_class_stage_id
+  WHERE 1 = 1 {"AND tcm.match_id IN (SELECT match_id FROM base)" if subset else ""}
 )
 
 INSERT INTO player_matches_cache(
@@ -603,19 +662,441 @@ LEFT JOIN ctx c             ON c.match_id   = b.match_id
 ORDER BY b.match_date DESC, b.match_id DESC;
 """
 
+INSERT_MATCHES = _insert_matches_sql()
+
+# Head-to-head: src.player_h2h stores each pair once (a < b); publish both perspectives.
+def _insert_h2h_sql(subset: bool = False) -> str:
+    subset_filter = (
+        "AND (h.pid IN (SELECT player_id FROM tmp_player_subset) OR h.opp IN (SELECT player_id FROM tmp_player_subset))"
+        if subset else ""
+    )
+    return f"""
+WITH h AS (
+  SELECT player_id_a AS pid, player_id_b AS opp, matches, wins_a AS wins, wins_b AS losses,
+         sets_a AS sets_won, sets_b AS sets_lost, last_match_id, last_match_date, match_ids
+  FROM src.player_h2h
+  UNION ALL
+  SELECT player_id_b, player_id_a, matches, wins_b, wins_a,
+         sets_b, sets_a, last_match_id, last_match_date, match_ids
+  FROM src.player_h2h
+)
+INSERT INTO player_h2h_cache(
+  public_id, opponent_public_id, opponent_name, matches, wins, losses, sets_won, sets_lost,
+  last_match_id, last_match_date, match_ids
+)
+SELECT
+  map.public_id,
+  map_opp.public_id,
+  {NAME_SQL} AS opponent_name,
+  h.matches, h.wins, h.losses, h.sets_won, h.sets_lost,
+  h.last_match_id, h.last_match_date, h.match_ids
+FROM h
+JOIN tmp_public_id_map map     ON map.player_id     = h.pid
+JOIN tmp_public_id_map map_opp ON map_opp.player_id = h.opp
+JOIN src.player p              ON p.player_id       = h.opp
+WHERE 1 = 1 {subset_filter};
+"""
+
+# ────────────────────────────────────────────────────────────────────────────
+# Delta support
+# ---------------------------------------------------------------------------
+# High-water mark: the newest row_created/row_updated across the source tables that feed the
+# caches. A delta build recomputes every player touched by a row at/after the previous mark
+# (>= on purpose: re-doing the boundary second is harmless, missing it is not).
+# ────────────────────────────────────────────────────────────────────────────
+
+HIGH_WATER_MARK_SQL = """
+SELECT MAX(ts) FROM (
+  SELECT MAX(row_updated) AS ts FROM src.player
+  UNION ALL SELECT MAX(row_updated) FROM src.player_id_ext
+  UNION ALL SELECT MAX(row_updated) FROM src.player_license
+  UNION ALL SELECT MAX(row_created) FROM src.player_transition
+  UNION ALL SELECT MAX(row_created) FROM src.player_ranking_group
+  UNION ALL SELECT MAX(row_updated) FROM src.player_ranking
+  UNION ALL SELECT MAX(row_updated) FROM src.tournament_class_player
+  UNION ALL SELECT MAX(row_updated) FROM src.tournament_class_match
+  UNION ALL SELECT MAX(row_updated) FROM src.match
+  UNION ALL SELECT MAX(row_updated) FROM src.match_player
+  UNION ALL SELECT MAX(row_updated) FROM src.game
+  UNION ALL SELECT MAX(row_created) FROM src.player_merge_log
+  UNION ALL SELECT MAX(undone_at)   FROM src.player_merge_log
+);
+"""
+
+# Players touched since :hwm. Match-level changes pull in every participant (opponent columns),
+# and a changed player row pulls in everyone who played them (opponent names). Player merges
+# (and their undos) repoint rows without touching row_updated, so both players of every merge
+# logged since :hwm count as changed players.
+DELTA_PLAYERS_SQL = """
+INSERT OR IGNORE INTO tmp_player_subset(player_id)
+WITH changed_matches AS (
+  SELECT match_id FROM src.match                  WHERE row_updated >= :hwm
+  UNION SELECT match_id FROM src.match_player     WHERE row_updated >= :hwm
+  UNION SELECT match_id FROM src.game             WHERE row_updated >= :hwm
+  UNION SELECT match_id FROM src.tournament_class_match WHERE row_updated >= :hwm
+),
+changed_players AS (
+  SELECT player_id FROM src.player                      WHERE row_updated >= :hwm
+  UNION SELECT new_player_id FROM src.player_merge_log  WHERE row_created >= :hwm OR undone_at >= :hwm
+  UNION SELECT old_player_id FROM src.player_merge_log  WHERE row_created >= :hwm OR undone_at >= :hwm
+)
+SELECT player_id FROM changed_players
+UNION SELECT player_id FROM src.player_id_ext           WHERE row_updated >= :hwm
+UNION SELECT player_id FROM src.player_license          WHERE row_updated >= :hwm
+UNION SELECT player_id FROM src.player_transition       WHERE row_created >= :hwm
+UNION SELECT player_id FROM src.player_ranking_group    WHERE row_created >= :hwm
+UNION SELECT player_id FROM src.tournament_class_player WHERE row_updated >= :hwm
+UNION SELECT pie.player_id
+      FROM src.player_ranking_history prh
+      JOIN src.player_id_ext pie
+        ON pie.player_id_ext = prh.player_id_ext
+       AND pie.data_source_id = prh.data_source_id
+      WHERE prh.row_updated >= :hwm
+UNION SELECT mp.player_id FROM src.match_player mp WHERE mp.match_id IN (SELECT match_id FROM changed_matches)
+UNION SELECT mp2.player_id
+      FROM src.match_player mp1
+      JOIN src.match_player mp2 ON mp2.match_id = mp1.match_id
+      WHERE mp1.player_id IN (SELECT player_id FROM changed_players);
+"""
+
+# Deletions leave no timestamp behind: players whose published matches no longer exist in the source.
+DELTA_VANISHED_MATCHES_SQL = """
+INSERT OR IGNORE INTO tmp_player_subset(player_id)
+SELECT map.player_id
+FROM (
+  SELECT DISTINCT public_id FROM player_matches_cache
+  WHERE match_id NOT IN (SELECT match_id FROM src.match)
+) x
+JOIN tmp_public_id_map map ON map.public_id = x.public_id;
+"""
+
+# Public ids to drop before re-insert: delta players + players that no longer exist in the source.
+DELTA_PURGE_IDS_SQL = """
+CREATE TEMP TABLE tmp_delta_public_ids AS
+SELECT map.public_id FROM tmp_public_id_map map
+WHERE map.player_id IN (SELECT player_id FROM tmp_player_subset)
+UNION
+SELECT ppc.public_id FROM player_profile_cache ppc
+WHERE ppc.public_id NOT IN (SELECT public_id FROM tmp_public_id_map);
+"""
+
+DELTA_PURGE_SQL = """
+DELETE FROM player_profile_cache          WHERE public_id IN (SELECT public_id FROM tmp_delta_public_ids);
+DELETE FROM player_results_summary_cache  WHERE public_id IN (SELECT public_id FROM tmp_delta_public_ids);
+DELETE FROM player_matches_cache          WHERE public_id IN (SELECT public_id FROM tmp_delta_public_ids);
+DELETE FROM player_name_fts               WHERE public_id IN (SELECT public_id FROM tmp_delta_public_ids);
+DELETE FROM player_h2h_cache              WHERE public_id IN (SELECT public_id FROM tmp_delta_public_ids)
+                                             OR opponent_public_id IN (SELECT public_id FROM tmp_delta_public_ids);
+"""
+
+# ────────────────────────────────────────────────────────────────────────────
+# Sharded player_matches_cache build
+# ---------------------------------------------------------------------------
+# INSERT_MATCHES is the longest phase of a full build and runs on one core. With
+# MATCHES_WORKERS > 1 we split players into contiguous player_id ranges of roughly equal
+# match_player volume; each worker process runs the same INSERT…SELECT restricted to its range
+# (tmp_player_subset) into its own shard DB, and the main process bulk-copies the shards into
+# OUT_DB.tmp before the indexes are created.
+# ────────────────────────────────────────────────────────────────────────────
+
+def _player_id_ranges(src: sqlite3.Connection, n_shards: int) -> list[tuple[int, int]]:
+    """Split player ids into <= n_shards inclusive ranges with ~equal match_player rows each."""
+    rows = src.execute("""
+        SELECT p.player_id, COUNT(mp.match_id) AS n
+        FROM player p
+        LEFT JOIN match_player mp ON mp.player_id = p.player_id
+        GROUP BY p.player_id
+        ORDER BY p.player_id
+    """).fetchall()
+    if not rows:
+        return []
+
+    total  = sum(r["n"] for r in rows) or 1
+    target = total / n_shards
+    ranges, lo, acc = [], rows[0]["player_id"], 0
+    for r in rows:
+        acc += r["n"]
+        if acc >= target and len(ranges) < n_shards - 1:
+            ranges.append((lo, r["player_id"]))
+            lo, acc = r["player_id"] + 1, 0
+    ranges.append((lo, rows[-1]["player_id"]))
+    return [(a, b) for a, b in ranges if a <= b]
+
+
+def _matches_shard_worker(shard_path: str, source_db: str, salt: str, lo: int, hi: int) -> int:
+    """Worker process: build player_matches_cache rows for player_id in [lo, hi] into shard_path."""
+    salt_bytes = salt.encode("utf-8")
+    with closing(_connect_rw(shard_path)) as shard:
+        shard.executescript("""
+            PRAGMA journal_mode=OFF;
+            PRAGMA synchronous=OFF;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-200000;
+        """)
+        shard.executescript(DDL_PLAYER_MATCHES_CACHE)
+        shard.execute("ATTACH DATABASE ? AS src", (source_db,))
+
+        # Opponents can be any player, so the id map is always complete
+        shard.execute("CREATE TEMP TABLE tmp_public_id_map (player_id INTEGER PRIMARY KEY, public_id TEXT UNIQUE NOT NULL)")
+        ids = [r[0] for r in shard.execute("SELECT player_id FROM src.player")]
+        shard.executemany(
+            "INSERT INTO tmp_public_id_map(player_id, public_id) VALUES (?, ?)",
+            [(pid, _hmac_public_id(salt_bytes, pid)) for pid in ids]
+        )
+        shard.execute("CREATE TEMP TABLE tmp_player_subset (player_id INTEGER PRIMARY KEY)")
+        shard.execute("INSERT INTO tmp_player_subset(player_id) SELECT player_id FROM src.player WHERE player_id BETWEEN ? AND ?", (lo, hi))
+
+        shard.execute(_insert_matches_sql(subset=True))
+        n = shard.execute("SELECT COUNT(*) FROM player_matches_cache").fetchone()[0]
+        shard.commit()
+    return n
+
+
+def _build_matches_sharded(dst: sqlite3.Connection, src: sqlite3.Connection, out_tmp: str,
+                           n_workers: int, logger: logging.Logger) -> None:
+    """Fill dst.player_matches_cache from n_workers shard DBs built in parallel."""
+    ranges = _player_id_ranges(src, n_workers)
+    shard_paths = [f"{out_tmp}.shard{i}" for i in range(len(ranges))]
+    for path in shard_paths:
+        if Path(path).exists():
+            Path(path).unlink()
+
+    try:
+        with ProcessPoolExecutor(max_workers=len(ranges)) as ex:
+            futures = [
+                ex.submit(_matches_shard_worker, path, SOURCE_DB, PUBLIC_SALT, lo, hi)
+                for path, (lo, hi) in zip(shard_paths, ranges)
+            ]
+            counts = [f.result() for f in futures]
+        logger.info("Built %d player_matches_cache shards: %s rows", len(ranges), counts)
+
+        # Merge in player_id-range order with plain bulk copies
+        for path in shard_paths:
+            dst.execute("ATTACH DATABASE ? AS shard", (path,))
+            dst.execute("INSERT INTO player_matches_cache SELECT * FROM shard.player_matches_cache")
+            dst.commit()
+            dst.execute("DETACH DATABASE shard")
+    finally:
+        for path in shard_paths:
+            if Path(path).exists():
+                Path(path).unlink()
+
+
 # ────────────────────────────────────────────────────────────────────────────
 # Build routine
 # ────────────────────────────────────────────────────────────────────────────
 
-def run_public_db_build() -> None:
+def run_public_db_build(mode: str | None = None) -> None:
+    """Build OUT_DB. mode: "delta" (default from BUILD_MODE, falls back to full) or "full"."""
     logger = _setup_logging()
-    start = time.perf_counter()
 
     # Basic guards
     if not Path(SOURCE_DB).exists():
         _die(f"Source DB not found: {SOURCE_DB}")
     if not PUBLIC_SALT or len(PUBLIC_SALT) < 16:
         _die("Missing/short PUBLIC_SALT. Provide a long random secret (>=16 chars).")
+    # Ranking points are read from the packed ranking history (refreshed by resolve_player_rankings)
+    try:
+        with closing(_connect_ro(SOURCE_DB)) as src:
+            ranked = src.execute("SELECT EXISTS (SELECT 1 FROM player_ranking)").fetchone()[0]
+            packed = src.execute("SELECT EXISTS (SELECT 1 FROM player_ranking_history)").fetchone()[0]
+    except sqlite3.Error:
+        ranked, packed = True, False
+    if ranked and not packed:
+        _die("player_ranking_history is empty. Run resolve_player_rankings (or PlayerRankingHistory.refresh) first.")
+
+    mode = (mode or BUILD_MODE).lower()
+    if mode == "delta":
+        if _run_delta_build(logger):
+            return
+        logger.info("Delta build not possible, falling back to full rebuild")
+    _run_full_build(logger)
+
+
+def _previous_high_water_mark() -> str | None:
+    """High-water mark of the currently published OUT_DB, or None if a delta build isn't possible."""
+    if not Path(OUT_DB).exists():
+        return None
+    try:
+        with closing(_connect_ro(OUT_DB)) as con:
+            tables = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if "player_h2h_cache" not in tables:
+                return None  # schema predates the current build → rebuild once
+            row = con.execute("SELECT high_water_mark FROM cache_metadata ORDER BY built_at DESC LIMIT 1").fetchone()
+    except sqlite3.Error:
+        return None  # missing table/column → built before delta support
+    return row[0] if row else None
+
+
+def _run_delta_build(logger: logging.Logger) -> bool:
+    """
+    Incrementally update a copy of OUT_DB and swap it into place.
+    Returns False (nothing written) when there is no previous build to start from.
+    """
+    start = time.perf_counter()
+
+    prev_hwm = _previous_high_water_mark()
+    if not prev_hwm:
+        return False
+
+    salt_bytes = PUBLIC_SALT.encode("utf-8")
+    source_hash = _sha256_file(SOURCE_DB)
+    source_size = os.path.getsize(SOURCE_DB)
+
+    out_tmp = OUT_DB + ".tmp"
+    if Path(out_tmp).exists():
+        Path(out_tmp).unlink()
+
+    logger.info("▶️  Start delta build (since %s)", prev_hwm)
+    logger.info("source=%s (size=%d bytes, sha256=%s)", SOURCE_DB, source_size, source_hash)
+    logger.info("out=%s tmp=%s", OUT_DB, out_tmp)
+
+    try:
+        t0 = time.perf_counter()
+        shutil.copyfile(OUT_DB, out_tmp)
+        t_copy = time.perf_counter()
+
+        with closing(_connect_ro(SOURCE_DB)) as src, closing(_connect_rw(out_tmp)) as dst:
+            dst.executescript("""
+                PRAGMA journal_mode=OFF;
+                PRAGMA synchronous=OFF;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA cache_size=-400000;
+            """)
+
+            # 1) Attach + new high-water mark (taken before reading, so nothing written meanwhile is skipped)
+            dst.execute("ATTACH DATABASE ? AS src", (SOURCE_DB,))
+            high_water_mark = dst.execute(HIGH_WATER_MARK_SQL).fetchone()[0]
+
+            # 2) Id map for all players (opponent links need it, HMAC is cheap)
+            dst.execute("CREATE TEMP TABLE tmp_public_id_map (player_id INTEGER PRIMARY KEY, public_id TEXT UNIQUE NOT NULL)")
+            rows = src.execute("SELECT player_id FROM player").fetchall()
+            dst.executemany(
+                "INSERT INTO tmp_public_id_map(player_id, public_id) VALUES (?, ?)",
+                [(r["player_id"], _hmac_public_id(salt_bytes, r["player_id"])) for r in rows]
+            )
+
+            # 3) Players to recompute
+            dst.execute("CREATE TEMP TABLE tmp_player_subset (player_id INTEGER PRIMARY KEY)")
+            dst.execute(DELTA_PLAYERS_SQL, {"hwm": prev_hwm})
+            dst.execute(DELTA_VANISHED_MATCHES_SQL)
+            # Only players that still exist can be re-inserted; removed ones are purged below
+            dst.execute("DELETE FROM tmp_player_subset WHERE player_id NOT IN (SELECT player_id FROM tmp_public_id_map)")
+            dst.executescript(DELTA_PURGE_IDS_SQL)
+            n_delta  = dst.execute("SELECT COUNT(*) FROM tmp_player_subset").fetchone()[0]
+            n_purged = dst.execute("SELECT COUNT(*) FROM tmp_delta_public_ids").fetchone()[0]
+            t_detect = time.perf_counter()
+            logger.info("Delta: %d players to recompute, %d public ids purged", n_delta, n_purged)
+
+            # 4) Replace rows of the affected players
+            for stmt in DELTA_PURGE_SQL.strip().split(";"):
+                if stmt.strip():
+                    dst.execute(stmt)
+            dst.execute(_insert_ppc_sql(PREFER_DATA_SOURCE_ID, subset=True))
+            if SUMMARY_ENGINE == "numpy":
+                match_stats, game_stats = compute_player_stats(dst, schema="src", players="tmp_player_subset")
+                write_stats_tables(dst, match_stats, game_stats)
+                dst.execute(_insert_summary_sql(subset=True, precomputed=True))
+            else:
+                dst.execute(_insert_summary_sql(subset=True))
+            dst.execute(_insert_matches_sql(subset=True))
+            dst.execute(_insert_h2h_sql(subset=True))
+            dst.execute("""
+                INSERT INTO player_name_fts(public_id, player_name, recent_club, year_born)
+                SELECT public_id, player_name, COALESCE(recent_club,''), COALESCE(year_born,'')
+                FROM player_profile_cache
+                WHERE public_id IN (SELECT public_id FROM tmp_delta_public_ids);
+            """)
+            t_upsert = time.perf_counter()
+
+            # 5) Sanity checks (as in the full build)
+            src_count_players = dst.execute("SELECT COUNT(*) FROM src.player").fetchone()[0]
+            prof_count        = dst.execute("SELECT COUNT(*) FROM player_profile_cache").fetchone()[0]
+            dup_public_ids    = dst.execute("""
+                SELECT COUNT(*) FROM (
+                  SELECT public_id, COUNT(*) c
+                  FROM player_profile_cache
+                  GROUP BY public_id
+                  HAVING c > 1
+                ) d
+            """).fetchone()[0]
+
+            logger.info("Sanity: src.players=%d, profile_rows=%d, duplicate_public_id=%d",
+                        src_count_players, prof_count, dup_public_ids)
+
+            if dup_public_ids != 0:
+                _die("Duplicate public_id detected in player_profile_cache (should be impossible).")
+
+            # 6) Metadata (single row)
+            built_at    = dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+            rows_sum    = dst.execute("SELECT COUNT(*) FROM player_results_summary_cache").fetchone()[0]
+            rows_match  = dst.execute("SELECT COUNT(*) FROM player_matches_cache").fetchone()[0]
+            rows_h2h    = dst.execute("SELECT COUNT(*) FROM player_h2h_cache").fetchone()[0]
+            dst.execute("DELETE FROM cache_metadata")
+            dst.execute(
+                "INSERT INTO cache_metadata(built_at, source_db_path, source_db_hash, rows_profile, rows_summary, rows_matches, "
+                "rows_h2h, build_mode, high_water_mark, rows_delta) VALUES (?,?,?,?,?,?,?,?,?,?)",
+                (built_at, os.path.abspath(SOURCE_DB), source_hash, prof_count, rows_sum, rows_match, rows_h2h,
+                 "delta", high_water_mark or prev_hwm, n_delta)
+            )
+            dst.commit()
+            dst.execute("PRAGMA optimize;")
+            t_meta = time.perf_counter()
+
+            # 7) Validate + VACUUM
+            ok = dst.execute("PRAGMA integrity_check;").fetchone()[0]
+            if ok != "ok":
+                _die(f"Integrity check failed: {ok}")
+            dst.executescript("VACUUM;")
+            t_vac = time.perf_counter()
+            logger.info("Integrity check OK and VACUUM done")
+
+        os.replace(out_tmp, OUT_DB)
+        out_size = os.path.getsize(OUT_DB)
+
+        total = time.perf_counter() - start
+        summary = {
+            "built_at": built_at,
+            "mode": "delta",
+            "since": prev_hwm,
+            "high_water_mark": high_water_mark,
+            "source_db": SOURCE_DB,
+            "source_sha256": source_hash,
+            "source_size": source_size,
+            "out_db": OUT_DB,
+            "out_size": out_size,
+            "rows": {
+                "players_src": src_count_players,
+                "delta_players": n_delta,
+                "purged_public_ids": n_purged,
+                "player_profile_cache": prof_count,
+                "player_results_summary_cache": rows_sum,
+                "player_matches_cache": rows_match,
+                "player_h2h_cache": rows_h2h,
+            },
+            "timings_sec": {k: round(v, 3) for k, v in {
+                "copy": t_copy - t0,
+                "detect": t_detect - t_copy,
+                "upsert": t_upsert - t_detect,
+                "metadata": t_meta - t_upsert,
+                "integrity_vacuum": t_vac - t_meta,
+                "total": total,
+            }.items()},
+        }
+        logger.info("SUMMARY %s", json.dumps(summary, ensure_ascii=False))
+        return True
+
+    except Exception:
+        try:
+            if Path(out_tmp).exists():
+                Path(out_tmp).unlink()
+        finally:
+            logger.exception("❌ Delta build failed")
+            raise
+
+
+def _run_full_build(logger: logging.Logger) -> None:
+    start = time.perf_counter()
 
     salt_bytes = PUBLIC_SALT.encode("utf-8")
     source_hash = _sha256_file(SOURCE_DB)
@@ -647,12 +1128,18 @@ def run_public_db_build() -> None:
             dst.executescript(DDL_PLAYER_PROFILE_CACHE)
             dst.executescript(DDL_PLAYER_RESULTS_SUMMARY_CACHE)
             dst.executescript(DDL_PLAYER_MATCHES_CACHE)
+            dst.executescript(DDL_PLAYER_H2H_CACHE)
             dst.executescript(DDL_FTS)
             dst.executescript(DDL_METADATA)
             logger.info("Schema created")
             t_schema = time.perf_counter()
 
-            # 2) Temp map: player_id → public_id
+            # 2) Attach source (high-water mark first, so rows written during the build are picked up by the next delta)
+            dst.execute("ATTACH DATABASE ? AS src", (SOURCE_DB,))
+            logger.info("Attached source DB as 'src'")
+            high_water_mark = dst.execute(HIGH_WATER_MARK_SQL).fetchone()[0]
+
+            # Temp map: player_id → public_id
             dst.execute("CREATE TEMP TABLE tmp_public_id_map (player_id INTEGER PRIMARY KEY, public_id TEXT UNIQUE NOT NULL)")
             rows = src.execute("SELECT player_id FROM player").fetchall()
             dst.executemany(
@@ -663,20 +1150,29 @@ def run_public_db_build() -> None:
             t_map = time.perf_counter()
 
             # 3) Populate caches
-            dst.execute("ATTACH DATABASE ? AS src", (SOURCE_DB,))
-            logger.info("Attached source DB as 'src'")
-
             dst.executescript(_insert_ppc_sql(PREFER_DATA_SOURCE_ID))
             t_ppc = time.perf_counter()
             logger.info("Inserted player_profile_cache")
 
-            dst.executescript(INSERT_SUMMARY)
+            if SUMMARY_ENGINE == "numpy":
+                match_stats, game_stats = compute_player_stats(dst, schema="src")
+                write_stats_tables(dst, match_stats, game_stats)
+                dst.executescript(_insert_summary_sql(precomputed=True))
+            else:
+                dst.executescript(INSERT_SUMMARY)
             t_sum = time.perf_counter()
-            logger.info("Inserted player_results_summary_cache")
+            logger.info("Inserted player_results_summary_cache (engine=%s)", SUMMARY_ENGINE)
 
-            dst.executescript(INSERT_MATCHES)
+            if MATCHES_WORKERS > 1:
+                _build_matches_sharded(dst, src, out_tmp, MATCHES_WORKERS, logger)
+            else:
+                dst.executescript(INSERT_MATCHES)
             t_matches = time.perf_counter()
-            logger.info("Inserted player_matches_cache")
+            logger.info("Inserted player_matches_cache (workers=%d)", MATCHES_WORKERS)
+
+            dst.executescript(_insert_h2h_sql())
+            t_h2h = time.perf_counter()
+            logger.info("Inserted player_h2h_cache")
 
             # 4) Seed FTS
             dst.execute("""
@@ -717,11 +1213,14 @@ def run_public_db_build() -> None:
             built_at    = built_at_dt.isoformat().replace("+00:00", "Z")
             rows_sum    = dst.execute("SELECT COUNT(*) FROM player_results_summary_cache").fetchone()[0]
             rows_match  = dst.execute("SELECT COUNT(*) FROM player_matches_cache").fetchone()[0]
+            rows_h2h    = dst.execute("SELECT COUNT(*) FROM player_h2h_cache").fetchone()[0]
             dst.execute(
-                "INSERT INTO cache_metadata(built_at, source_db_path, source_db_hash, rows_profile, rows_summary, rows_matches) VALUES (?,?,?,?,?,?)",
-                (built_at, os.path.abspath(SOURCE_DB), source_hash, prof_count, rows_sum, rows_match)
+                "INSERT INTO cache_metadata(built_at, source_db_path, source_db_hash, rows_profile, rows_summary, rows_matches, "
+                "rows_h2h, build_mode, high_water_mark) VALUES (?,?,?,?,?,?,?,?,?)",
+                (built_at, os.path.abspath(SOURCE_DB), source_hash, prof_count, rows_sum, rows_match, rows_h2h,
+                 "full", high_water_mark)
             )
-            logger.info("Metadata inserted: built_at=%s", built_at)
+            logger.info("Metadata inserted: built_at=%s high_water_mark=%s", built_at, high_water_mark)
 
             # 8) Validate + VACUUM
             ok = dst.execute("PRAGMA integrity_check;").fetchone()[0]
@@ -744,7 +1243,8 @@ def run_public_db_build() -> None:
             "insert_profiles": t_ppc - t_map,
             "insert_summary": t_sum - t_ppc,
             "insert_matches": t_matches - t_sum,
-            "fts_seed": t_fts - t_matches,
+            "insert_h2h": t_h2h - t_matches,
+            "fts_seed": t_fts - t_h2h,
             "index_optimize": t_index - t_fts,
             "integrity_vacuum": t_vac - t_index,
             "total": total,
@@ -753,6 +1253,8 @@ def run_public_db_build() -> None:
         # One-line JSON summary for easy grepping
         summary = {
             "built_at": built_at,
+            "mode": "full",
+            "high_water_mark": high_water_mark,
             "source_db": SOURCE_DB,
             "source_sha256": source_hash,
             "source_size": source_size,
@@ -763,6 +1265,7 @@ def run_public_db_build() -> None:
                 "player_profile_cache": prof_count,
                 "player_results_summary_cache": rows_sum,
                 "player_matches_cache": rows_match,
+                "player_h2h_cache": rows_h2h,
             },
             "timings_sec": {k: round(v, 3) for k, v in timings.items()},
         }